@@ -1,11 +1,10 @@
-from flask import Flask
+from flask import Flask, has_app_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_socketio import SocketIO
 from celery import Celery
-import redis
 
 db = SQLAlchemy()
 migrate = Migrate()
@@ -18,22 +17,81 @@ def create_app(config_object="config.DevelopmentConfig"):
     app = Flask(__name__)
     app.config.from_object(config_object)
 
+    # Pool checkout timing has to be configured before engines are built
+    from .services.metrics_service import (configure_pool_metrics,
+                                           redis_client, register_metrics)
+
+    configure_pool_metrics(app)
+
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     CORS(app)
-    socketio.init_app(app)
+
+    # Socket.IO namespaces; the message queue lets several server processes
+    # (and the live P&L publisher) share rooms
+    from .sockets import register_sockets
+
+    register_sockets(socketio)
+    socketio.init_app(app,
+                      message_queue=app.config.get('SOCKETIO_MESSAGE_QUEUE'))
 
     # Initialize Redis
-    app.redis = redis.from_url(app.config["REDIS_URL"])
+    app.redis = redis_client(app)
+
+    # Initialize Celery from the CELERY_* settings (conf.update would leave
+    # CELERY_TASK_ALWAYS_EAGER and friends as unknown keys)
+    celery.config_from_object(app.config, namespace='CELERY')
+
+    class ContextTask(celery.Task):
+        # Workers run tasks outside any request, give them the app context
 
-    # Initialize Celery
-    celery.conf.update(app.config)
+        def __call__(self, *args, **kwargs):
+            if has_app_context():
+                return super().__call__(*args, **kwargs)
+            with app.app_context():
+                return super().__call__(*args, **kwargs)
+
+    celery.Task = ContextTask
 
     # Register blueprints
     from .routes import register_routes
 
     register_routes(app)
 
+    # Request latency, in-flight and status metrics for /metrics
+    register_metrics(app)
+
+    # Per-request SQL query counts, timings and N+1 detection
+    from .services.query_stats_service import register_query_instrumentation
+
+    register_query_instrumentation(app)
+
+    # Register CLI commands
+    from .cli import register_commands
+
+    register_commands(app)
+
+    # Register model event listeners
+    from .services.performance_service import register_performance_listeners
+
+    register_performance_listeners()
+
+    from .services.cache_service import register_cache_listeners
+
+    register_cache_listeners()
+
+    from .services.live_pnl_service import register_live_listeners
+
+    register_live_listeners()
+
+    from .services.plan_version_service import register_plan_version_listeners
+
+    register_plan_version_listeners()
+
+    from .services.plan_rules_service import register_plan_rules_listeners
+
+    register_plan_rules_listeners()
+
     return app
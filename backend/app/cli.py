@@ -0,0 +1,167 @@
+import uuid
+import click
+from marshmallow import ValidationError
+from flask import current_app
+from flask.cli import AppGroup
+from app import db
+from app.models.trading_plan import TradingPlan
+from app.services.plan_rules_service import PlanRulesService
+from app.services.synthetic_data_service import (SyntheticDataService,
+                                                 DEFAULT_PASSWORD)
+from app.services.tick_service import TickIngestService, TickReplaySource
+from app.services.trade_import_service import (TradeImportService,
+                                               detect_format, IMPORT_FORMATS,
+                                               MAX_CHUNK_SIZE)
+
+trades_cli = AppGroup('trades', help='Trade maintenance commands.')
+ticks_cli = AppGroup('ticks', help='Price feed commands.')
+data_cli = AppGroup('data', help='Synthetic data commands.')
+
+
+@trades_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--plan-id', required=True, help='Trading plan to import into.')
+@click.option('--format',
+              'fmt',
+              type=click.Choice(IMPORT_FORMATS),
+              help='File format (detected from the extension by default).')
+@click.option('--chunk-size',
+              default=1000,
+              show_default=True,
+              type=click.IntRange(1, MAX_CHUNK_SIZE))
+def import_trades(path, plan_id, fmt, chunk_size):
+    """Stream a broker CSV/NDJSON export into a trading plan."""
+    plan = db.session.get(TradingPlan, uuid.UUID(plan_id))
+    if plan is None:
+        raise click.ClickException(f"Trading plan {plan_id} not found")
+
+    def progress(report):
+        click.echo(f"processed={report['processed']} "
+                   f"inserted={report['inserted']} "
+                   f"failed={report['failed']}")
+
+    with open(path, 'rb') as stream:
+        report = TradeImportService.import_stream(stream,
+                                                  fmt or detect_format(path),
+                                                  plan.id,
+                                                  chunk_size=chunk_size,
+                                                  progress=progress)
+
+    for error in report['errors']:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    click.echo(f"Imported {report['inserted']} of {report['processed']} rows")
+
+
+@trades_cli.command('check-compliance')
+@click.option('--plan-id', required=True, help='Trading plan to check.')
+def check_compliance(plan_id):
+    """Recompute plan compliance of every journal entry of a plan."""
+    plan = db.session.get(TradingPlan, uuid.UUID(plan_id))
+    if plan is None:
+        raise click.ClickException(f"Trading plan {plan_id} not found")
+    updated = PlanRulesService.fill_plan(plan.id)
+    click.echo(f"Updated {updated} journal entries (plan version "
+               f"{plan.version})")
+
+
+@ticks_cli.command('replay')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--speed',
+              type=float,
+              default=1.0,
+              show_default=True,
+              help='Playback speed multiple; 0 replays as fast as possible.')
+@click.option('--timeframes',
+              help='Comma separated timeframes (the plans\' by default).')
+@click.option('--batch-size', default=10000, show_default=True)
+@click.option('--store/--no-store',
+              default=True,
+              help='Append completed candles to the market data store.')
+@click.option('--publish/--no-publish',
+              default=None,
+              help='Publish live P&L frames from this process '
+              '(LIVE_PUBLISHER_ENABLED by default).')
+def replay_ticks(path, speed, timeframes, batch_size, store, publish):
+    """Play a recorded tick file through the ingestion pipeline."""
+    pipeline = TickIngestService.from_config(
+        timeframes=timeframes.split(',') if timeframes else None,
+        store=store,
+        publish=publish)
+    if pipeline.publish and not current_app.config.get(
+            'SOCKETIO_MESSAGE_QUEUE'):
+        click.echo("Warning: SOCKETIO_MESSAGE_QUEUE is not set, live P&L "
+                   "frames will not reach the web processes", err=True)
+    source = TickReplaySource(path,
+                              speed=speed or None,
+                              batch_size=batch_size)
+    report = source.replay(pipeline)
+
+    click.echo(f"Replayed {report['ticks']} ticks in "
+               f"{report['seconds']:.2f}s "
+               f"({report['ticks_per_second'] or 0:,.0f} ticks/s), "
+               f"{report['candles']} candles for "
+               f"{','.join(pipeline.aggregator.timeframes)}")
+
+
+@data_cli.command('generate')
+@click.option('--users', default=10, show_default=True)
+@click.option('--plans-per-user', default=2, show_default=True)
+@click.option('--strategies', default=5, show_default=True)
+@click.option('--trades-per-plan', default=1000, show_default=True)
+@click.option('--journal-ratio',
+              type=click.FloatRange(0, 1),
+              default=0.5,
+              show_default=True,
+              help='Share of closed trades with a journal entry.')
+@click.option('--open-ratio',
+              type=click.FloatRange(0, 1),
+              default=0.02,
+              show_default=True,
+              help='Share of each plan\'s latest trades left open.')
+@click.option('--days',
+              default=365,
+              show_default=True,
+              help='Days the trades of each plan are spread over.')
+@click.option('--seed', default=42, show_default=True)
+@click.option('--password',
+              default=DEFAULT_PASSWORD,
+              show_default=True,
+              help='Password of every generated user.')
+@click.option('--chunk-size', default=50000, show_default=True)
+def generate_data(users, plans_per_user, strategies, trades_per_plan,
+                  journal_ratio, open_ratio, days, seed, password,
+                  chunk_size):
+    """Bulk-load a seeded synthetic dataset for load testing."""
+
+    def progress(report):
+        click.echo(f"trades={report.get('trades', 0)} "
+                   f"journal_entries={report.get('journal_entries', 0)} "
+                   f"{report['rows_per_second']:,.0f} rows/s")
+
+    try:
+        report = SyntheticDataService.generate(
+            users=users,
+            plans_per_user=plans_per_user,
+            strategies=strategies,
+            trades_per_plan=trades_per_plan,
+            journal_ratio=journal_ratio,
+            open_ratio=open_ratio,
+            days=days,
+            seed=seed,
+            password=password,
+            chunk_size=chunk_size,
+            progress=progress)
+    except (ValueError, ValidationError) as e:
+        raise click.ClickException(str(e))
+
+    counts = ', '.join(f"{report[table]} {table}"
+                       for table in SyntheticDataService.TABLES)
+    click.echo(f"Generated {counts} in {report['seconds']:.2f}s "
+               f"({report['rows_per_second']:,.0f} rows/s)")
+
+
+def register_commands(app):
+    """Register Flask CLI command groups"""
+    app.cli.add_command(trades_cli)
+    app.cli.add_command(ticks_cli)
+    app.cli.add_command(data_cli)
@@ -1,6 +1,7 @@
 from .base import BaseModel, GUID
 from .user import User
 from .trading_plan import TradingPlan
+from .trading_plan_version import TradingPlanVersion
 from .trade import Trade
 from .strategy import Strategy
 from .journal import Journal
@@ -11,6 +12,7 @@ __all__ = [
     'GUID',
     'User',
     'TradingPlan',
+    'TradingPlanVersion',
     'Trade',
     'Strategy',
     'Journal',
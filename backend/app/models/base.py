@@ -1,41 +1,60 @@
 from datetime import datetime
 import uuid
 from app import db
-from sqlalchemy.types import TypeDecorator, String
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator, CHAR, LargeBinary
 
 
 class GUID(TypeDecorator):
     """Platform-independent GUID type.
-    Uses String(36) for SQLite and PostgreSQL
+    Uses the native UUID type on PostgreSQL, 16 raw bytes on SQLite and
+    CHAR(36) elsewhere. Values are always returned as uuid.UUID.
     """
-    impl = String
+    impl = CHAR
     cache_ok = True
 
     def __init__(self, length=36, **kwargs):
         super(GUID, self).__init__(length, **kwargs)
 
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        if dialect.name == 'sqlite':
+            return dialect.type_descriptor(LargeBinary(16))
+        return dialect.type_descriptor(CHAR(36))
+
+    @staticmethod
+    def _to_uuid(value):
+        # Fast path: ids coming from the ORM are already UUID instances
+        if isinstance(value, uuid.UUID):
+            return value
+        if isinstance(value, bytes):
+            return uuid.UUID(bytes=value)
+        return uuid.UUID(str(value))
+
     def process_bind_param(self, value, dialect):
         if value is None:
             return value
-        elif isinstance(value, str):
-            return str(uuid.UUID(value))
-        elif isinstance(value, uuid.UUID):
-            return str(value)
-        else:
-            return str(uuid.UUID(str(value)))
+        value = self._to_uuid(value)
+        if dialect.name == 'postgresql':
+            return value
+        if dialect.name == 'sqlite':
+            return value.bytes
+        return str(value)
 
     def process_result_value(self, value, dialect):
-        if value is None:
+        if value is None or isinstance(value, uuid.UUID):
             return value
-        else:
-            return uuid.UUID(value)
+        if isinstance(value, bytes):
+            return uuid.UUID(bytes=value)
+        return uuid.UUID(value)
 
 
 class BaseModel(db.Model):
     """Base model class that includes GUID column"""
     __abstract__ = True
 
-    id = db.Column(GUID(), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=uuid.uuid4)
     created_at = db.Column(db.DateTime,
                            nullable=False,
                            default=datetime.utcnow)
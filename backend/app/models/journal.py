@@ -1,19 +1,28 @@
+from sqlalchemy.orm import validates
 from .base import BaseModel, GUID
+from .mixins import ImageFieldsMixin
 from app import db
-from app.utils.validators import ImageValidator
 
 
-class Journal(BaseModel):
+class Journal(BaseModel, ImageFieldsMixin):
     __tablename__ = 'journal_entries'
+    image_list_fields = ('images',)
+    __table_args__ = (
+        db.Index('ix_journal_entries_plan_created_at', 'trading_plan_id',
+                 'created_at', 'id'),
+    )
 
     trade_id = db.Column(GUID(),
                          db.ForeignKey('trades.id',
                                        ondelete='CASCADE'),
-                         nullable=False)
+                         nullable=False,
+                         index=True)
     trading_plan_id = db.Column(GUID(),
                                 db.ForeignKey('trading_plans.id',
                                               ondelete='CASCADE'),
                                 nullable=False)
+    # Plan version the entry was judged against (its trade's version)
+    trading_plan_version = db.Column(db.Integer)
     notes = db.Column(db.Text)
     emotions = db.Column(db.String(50))
     market_conditions = db.Column(db.JSON)
@@ -36,8 +45,29 @@ class Journal(BaseModel):
     trading_plan = db.relationship('TradingPlan',
                                    back_populates='journal_entries')
 
-    def __setattr__(self, name, value):
+    def to_dict(self, exclude=()):
+        """
+        Serialize journal entry for API responses
+        Args:
+            exclude: Deferred columns to leave out instead of loading
+        """
+        data = {
+            'id': str(self.id),
+            'trade_id': str(self.trade_id),
+            'trading_plan_id': str(self.trading_plan_id),
+            'trading_plan_version': self.trading_plan_version,
+            'notes': self.notes,
+            'emotions': self.emotions,
+            'plan_adherence': self.plan_adherence,
+        }
+        for field in ('market_conditions', 'images'):
+            if field not in exclude:
+                data[field] = getattr(self, field)
+        data['created_at'] = (self.created_at.isoformat()
+                              if self.created_at else None)
+        return data
+
+    @validates('images')
+    def _validate_images(self, name, value):
         """Validate images before setting"""
-        if name == 'images' and value is not None:
-            ImageValidator.validate_image_list(value)
-        super().__setattr__(name, value)
+        return self.validate_image_field(name, value)
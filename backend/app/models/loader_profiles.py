@@ -0,0 +1,89 @@
+from sqlalchemy import select
+from sqlalchemy.orm import defer, selectinload
+from .journal import Journal
+from .performance import Performance
+from .strategy import Strategy
+from .trade import Trade
+from .trading_plan import TradingPlan
+
+# Large JSON columns the profiles leave unloaded unless asked for
+DEFERRABLE_COLUMNS = {
+    'risk_management': TradingPlan.risk_management,
+    'entry_rules': TradingPlan.entry_rules,
+    'market_conditions': Journal.market_conditions,
+    'images': Journal.images,
+    'metrics': Performance.metrics,
+}
+
+
+def _deferred(model, include):
+    return [
+        defer(column) for name, column in DEFERRABLE_COLUMNS.items()
+        if column.class_ is model and name not in include
+    ]
+
+
+def _plan_aggregate(include, user_id=None):
+    """Plan with its trades, their journal entries and its performances"""
+    return [
+        *_deferred(TradingPlan, include),
+        # Journals are reached through their trades, so trade.journal_entry
+        # never lazy-loads one row per trade
+        selectinload(TradingPlan.trades).selectinload(
+            Trade.journal_entry).options(*_deferred(Journal, include)),
+        selectinload(TradingPlan.performances).options(
+            *_deferred(Performance, include)),
+    ]
+
+
+def _strategy_aggregate(include, user_id=None):
+    """Strategy with its trades (and their plan) and its performances"""
+    trades = Strategy.trades
+    performances = Strategy.performances
+    if user_id is not None:
+        plan_ids = select(TradingPlan.id).where(TradingPlan.user_id == user_id)
+        trades = trades.and_(Trade.trading_plan_id.in_(plan_ids))
+        performances = performances.and_(
+            Performance.trading_plan_id.in_(plan_ids))
+    return [
+        # Few plans per strategy, so the plan rides along in the join
+        selectinload(trades).joinedload(Trade.trading_plan).load_only(
+            TradingPlan.id, TradingPlan.user_id, TradingPlan.name),
+        selectinload(performances).options(*_deferred(Performance, include)),
+    ]
+
+
+LOADER_PROFILES = {
+    'plan_aggregate': (_plan_aggregate, ('risk_management', 'entry_rules',
+                                         'market_conditions', 'images',
+                                         'metrics')),
+    'strategy_aggregate': (_strategy_aggregate, ('metrics', )),
+}
+
+
+def deferrable_columns(profile):
+    """JSON columns a profile defers unless they are included"""
+    return LOADER_PROFILES[profile][1]
+
+
+def loader_options(profile, include=(), user_id=None):
+    """
+    Loader options of a named profile
+    Every relationship is loaded in one extra query whatever its size.
+    Args:
+        profile: Key of LOADER_PROFILES
+        include: Deferrable JSON columns to load anyway
+        user_id: Restrict collections to the user's plans (strategies)
+    Returns:
+        List of options for select(...).options()
+    Raises:
+        ValueError: For unknown profiles or columns
+    """
+    if profile not in LOADER_PROFILES:
+        raise ValueError(f"Unknown loader profile: {profile}")
+    build, columns = LOADER_PROFILES[profile]
+    unknown = set(include) - set(columns)
+    if unknown:
+        raise ValueError(f"Profile {profile} cannot include: "
+                         f"{', '.join(sorted(unknown))}")
+    return build(set(include), user_id)
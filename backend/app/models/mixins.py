@@ -1,6 +1,9 @@
 from werkzeug.security import generate_password_hash, check_password_hash
 from marshmallow.exceptions import ValidationError
-from app.utils.validators import UserValidator
+from app.utils.validators import UserValidator, ImageValidator
+
+# Werkzeug hash method; PASSWORD_HASH_METHOD overrides it for AuthService
+DEFAULT_PASSWORD_METHOD = 'pbkdf2:sha256:100000'
 
 
 class PasswordMixin:
@@ -8,12 +11,16 @@ class PasswordMixin:
 
     password_hash = None  # Must be defined in the model
 
-    def set_password(self, password: str, validate: bool = True):
+    def set_password(self,
+                     password: str,
+                     validate: bool = True,
+                     method: str = None):
         """
         Set password with optional validation
         Args:
             password: Password string
             validate: Whether to validate password against rules
+            method: Werkzeug hash method (defaults to DEFAULT_PASSWORD_METHOD)
         """
         if validate:
             UserValidator.validate_password(password)
@@ -23,11 +30,8 @@ class PasswordMixin:
                 f"Model {self.__class__.__name__} must define password_hash column"
             )
 
-        # Use stronger hashing method and more iterations for production
         self.password_hash = generate_password_hash(
-            password,
-            method='pbkdf2:sha256:100000'  # More secure hashing
-        )
+            password, method=method or DEFAULT_PASSWORD_METHOD)
 
     def check_password(self, password: str) -> bool:
         """Check if provided password matches the hash"""
@@ -47,7 +51,56 @@ class PasswordMixin:
 
         self.set_password(new_password)
 
+    def needs_rehash(self, method: str = None) -> bool:
+        """Check if the stored hash was made with a different method/cost"""
+        if not self.password_hash:
+            return False
+        current = self.password_hash.split('$', 1)[0]
+        return current != (method or DEFAULT_PASSWORD_METHOD)
+
     @property
     def has_password(self) -> bool:
         """Check if password is set"""
         return bool(self.password_hash)
+
+
+class ImageFieldsMixin:
+    """Mixin for models with image URL / image list columns
+
+    Models list their columns in image_url_fields and image_list_fields and
+    route them through validate_image_field with SQLAlchemy's @validates,
+    which only runs on assignment, never while rows are loaded.
+    """
+
+    image_url_fields = ()
+    image_list_fields = ()
+
+    @classmethod
+    def validate_image_field(cls, name, value):
+        """Validate one image column value and return it unchanged"""
+        if value is None:
+            return value
+        if name in cls.image_url_fields:
+            ImageValidator.validate_image_url(value)
+        elif name in cls.image_list_fields:
+            ImageValidator.validate_image_list(value)
+        return value
+
+    @classmethod
+    def validate_image_mappings(cls, mappings):
+        """
+        Batch-validate plain dict rows before a bulk insert/update
+        Args:
+            mappings: Iterable of column -> value dicts
+        Raises:
+            ValidationError: on the first invalid image value, with its
+                             messages keyed by the column name
+        """
+        fields = cls.image_url_fields + cls.image_list_fields
+        for mapping in mappings:
+            for name in fields:
+                if name in mapping:
+                    try:
+                        cls.validate_image_field(name, mapping[name])
+                    except ValidationError as e:
+                        raise ValidationError({name: e.messages})
@@ -4,6 +4,11 @@ from app import db
 
 class Performance(BaseModel):
     __tablename__ = 'performance_metrics'
+    __table_args__ = (
+        # Rollup lookups; the leading strategy_id also serves its FK
+        db.Index('ix_performance_metrics_strategy_plan', 'strategy_id',
+                 'trading_plan_id', 'timeframe', 'period'),
+    )
 
     strategy_id = db.Column(GUID(),
                             db.ForeignKey('strategies.id',
@@ -12,7 +17,8 @@ class Performance(BaseModel):
     trading_plan_id = db.Column(GUID(),
                                 db.ForeignKey('trading_plans.id',
                                               ondelete='CASCADE'),
-                                nullable=False)
+                                nullable=False,
+                                index=True)
     metrics = db.Column(db.JSON)
     timeframe = db.Column(db.String(10), nullable=False)
     period = db.Column(db.String(20), nullable=False)
@@ -21,3 +27,22 @@ class Performance(BaseModel):
     strategy = db.relationship('Strategy', back_populates='performances')
     trading_plan = db.relationship('TradingPlan',
                                    back_populates='performances')
+
+    def to_dict(self, exclude=()):
+        """
+        Serialize performance metrics for API responses
+        Args:
+            exclude: Deferred columns to leave out instead of loading
+        """
+        data = {
+            'id': str(self.id),
+            'strategy_id': str(self.strategy_id),
+            'trading_plan_id': str(self.trading_plan_id),
+            'timeframe': self.timeframe,
+            'period': self.period,
+        }
+        if 'metrics' not in exclude:
+            data['metrics'] = self.metrics
+        data['updated_at'] = (self.updated_at.isoformat()
+                              if self.updated_at else None)
+        return data
@@ -1,10 +1,13 @@
+from sqlalchemy.orm import validates
 from .base import BaseModel, GUID
+from .mixins import ImageFieldsMixin
 from app import db
-from app.utils.validators import ImageValidator
 
 
-class Strategy(BaseModel):
+class Strategy(BaseModel, ImageFieldsMixin):
     __tablename__ = 'strategies'
+    image_url_fields = ('strategy_image_url',)
+    image_list_fields = ('example_images',)
 
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
@@ -23,10 +26,19 @@ class Strategy(BaseModel):
                                    lazy=True,
                                    cascade='all, delete-orphan')
 
-    def __setattr__(self, name, value):
+    def to_dict(self):
+        """Serialize strategy for API responses"""
+        return {
+            'id': str(self.id),
+            'name': self.name,
+            'description': self.description,
+            'parameters': self.parameters,
+            'performance_metrics': self.performance_metrics,
+            'strategy_image_url': self.strategy_image_url,
+            'example_images': self.example_images,
+        }
+
+    @validates('strategy_image_url', 'example_images')
+    def _validate_images(self, name, value):
         """Validate images before setting"""
-        if name == 'strategy_image_url' and value is not None:
-            ImageValidator.validate_image_url(value)
-        elif name == 'example_images' and value is not None:
-            ImageValidator.validate_image_list(value)
-        super().__setattr__(name, value)
+        return self.validate_image_field(name, value)
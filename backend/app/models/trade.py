@@ -1,11 +1,42 @@
+from sqlalchemy.orm import validates
 from .base import BaseModel, GUID
+from .mixins import ImageFieldsMixin
 from app import db
 from decimal import Decimal
-from app.utils.validators import ImageValidator
 
 
-class Trade(BaseModel):
+class Trade(BaseModel, ImageFieldsMixin):
     __tablename__ = 'trades'
+    image_url_fields = ('entry_image_url', 'exit_image_url')
+    __table_args__ = (
+        # Keyset pagination on (entry_time, id) within the filtered scope.
+        # The leading plan/strategy columns also index both foreign keys.
+        db.Index('ix_trades_plan_entry_time', 'trading_plan_id', 'entry_time',
+                 'id'),
+        db.Index('ix_trades_plan_symbol_entry_time', 'trading_plan_id',
+                 'symbol', 'entry_time', 'id'),
+        db.Index('ix_trades_plan_timeframe_entry_time', 'trading_plan_id',
+                 'timeframe', 'entry_time', 'id'),
+        db.Index('ix_trades_strategy_entry_time', 'strategy_id', 'entry_time',
+                 'id'),
+        db.Index('ix_trades_symbol_entry_time', 'symbol', 'entry_time',
+                 'id'),
+        db.Index('ix_trades_plan_version', 'trading_plan_id',
+                 'trading_plan_version'),
+        # Partial indexes: open positions and per-pair closed trade history
+        db.Index('ix_trades_open_plan_entry_time',
+                 'trading_plan_id',
+                 'entry_time',
+                 postgresql_where=db.text('exit_time IS NULL'),
+                 sqlite_where=db.text('exit_time IS NULL')),
+        db.Index('ix_trades_closed_strategy_plan_exit_time',
+                 'strategy_id',
+                 'trading_plan_id',
+                 'exit_time',
+                 'id',
+                 postgresql_where=db.text('exit_time IS NOT NULL'),
+                 sqlite_where=db.text('exit_time IS NOT NULL')),
+    )
 
     trading_plan_id = db.Column(GUID(),
                                 db.ForeignKey('trading_plans.id'),
@@ -13,6 +44,8 @@ class Trade(BaseModel):
     strategy_id = db.Column(GUID(),
                             db.ForeignKey('strategies.id'),
                             nullable=True)
+    # Plan version in force when the trade was recorded
+    trading_plan_version = db.Column(db.Integer)
 
     # Core trade data
     entry_price = db.Column(db.Numeric, nullable=False)
@@ -51,8 +84,41 @@ class Trade(BaseModel):
         """Get the quote currency (second part of the pair)"""
         return self.symbol[3:] if self.symbol else None
 
-    def __setattr__(self, name, value):
+    @property
+    def is_open(self):
+        """A trade is open until it has an exit time"""
+        return self.exit_time is None
+
+    def to_dict(self):
+        """Serialize trade for API responses (Decimals as strings)"""
+
+        def decimal(value):
+            return str(value) if value is not None else None
+
+        def timestamp(value):
+            return value.isoformat() if value is not None else None
+
+        return {
+            'id': str(self.id),
+            'trading_plan_id': str(self.trading_plan_id),
+            'trading_plan_version': self.trading_plan_version,
+            'strategy_id':
+            str(self.strategy_id) if self.strategy_id else None,
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'entry_price': decimal(self.entry_price),
+            'exit_price': decimal(self.exit_price),
+            'entry_time': timestamp(self.entry_time),
+            'exit_time': timestamp(self.exit_time),
+            'position_size': decimal(self.position_size),
+            'entry_fee': decimal(self.entry_fee),
+            'exit_fee': decimal(self.exit_fee),
+            'entry_image_url': self.entry_image_url,
+            'exit_image_url': self.exit_image_url,
+            'is_open': self.is_open,
+        }
+
+    @validates('entry_image_url', 'exit_image_url')
+    def _validate_images(self, name, value):
         """Validate image URLs before setting"""
-        if name in ['entry_image_url', 'exit_image_url'] and value is not None:
-            ImageValidator.validate_image_url(value)
-        super().__setattr__(name, value)
+        return self.validate_image_field(name, value)
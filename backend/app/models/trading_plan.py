@@ -1,12 +1,20 @@
+from sqlalchemy.orm import validates
 from .base import BaseModel, GUID
+from .mixins import ImageFieldsMixin
 from app import db
-from app.utils.validators import ImageValidator
 
 
-class TradingPlan(BaseModel):
+class TradingPlan(BaseModel, ImageFieldsMixin):
     __tablename__ = 'trading_plans'
+    image_list_fields = ('plan_images',)
+    # Columns snapshotted per version; editing any of them bumps version
+    RULE_FIELDS = ('entry_rules', 'exit_rules', 'risk_management',
+                   'position_sizing', 'markets', 'timeframes')
 
-    user_id = db.Column(GUID(), db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(GUID(),
+                        db.ForeignKey('users.id'),
+                        nullable=False,
+                        index=True)
     name = db.Column(db.String(100), nullable=False)
     type = db.Column(db.String(50), nullable=False)
     risk_management = db.Column(db.JSON)
@@ -36,9 +44,46 @@ class TradingPlan(BaseModel):
                                    back_populates='trading_plan',
                                    lazy=True,
                                    cascade='all, delete-orphan')
+    versions = db.relationship('TradingPlanVersion',
+                               back_populates='trading_plan',
+                               lazy='dynamic',
+                               passive_deletes=True,
+                               order_by='TradingPlanVersion.version')
 
-    def __setattr__(self, name, value):
+    def rules(self):
+        """Current values of the versioned rule columns"""
+        return {field: getattr(self, field) for field in self.RULE_FIELDS}
+
+    def to_dict(self, exclude=()):
+        """
+        Serialize trading plan for API responses
+        Args:
+            exclude: Deferred columns to leave out instead of loading
+        """
+        data = {
+            'id': str(self.id),
+            'user_id': str(self.user_id),
+            'name': self.name,
+            'type': self.type,
+        }
+        for field in ('risk_management', 'entry_rules'):
+            if field not in exclude:
+                data[field] = getattr(self, field)
+        data.update({
+            'exit_rules': self.exit_rules,
+            'timeframes': self.timeframes,
+            'position_sizing': self.position_sizing,
+            'markets': self.markets,
+            'notes': self.notes,
+            'version': self.version,
+            'is_active': self.is_active,
+            'plan_images': self.plan_images,
+            'updated_at': self.updated_at.isoformat()
+            if self.updated_at else None,
+        })
+        return data
+
+    @validates('plan_images')
+    def _validate_images(self, name, value):
         """Validate images before setting"""
-        if name == 'plan_images' and value is not None:
-            ImageValidator.validate_image_list(value)
-        super().__setattr__(name, value)
+        return self.validate_image_field(name, value)
@@ -0,0 +1,29 @@
+from .base import BaseModel, GUID
+from app import db
+
+
+class TradingPlanVersion(BaseModel):
+    """
+    Immutable snapshot of a plan's rules at one version. Checkpoint rows
+    hold the full rules; the others hold a diff against the previous
+    version (see PlanVersionService).
+    """
+    __tablename__ = 'trading_plan_versions'
+    __table_args__ = (
+        # Version lookups; the leading plan id also serves the FK
+        db.Index('ix_trading_plan_versions_plan_version',
+                 'trading_plan_id',
+                 'version',
+                 unique=True),
+    )
+
+    trading_plan_id = db.Column(GUID(),
+                                db.ForeignKey('trading_plans.id',
+                                              ondelete='CASCADE'),
+                                nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+    is_checkpoint = db.Column(db.Boolean, nullable=False, default=False)
+    data = db.Column(db.JSON, nullable=False)
+
+    # Relationships
+    trading_plan = db.relationship('TradingPlan', back_populates='versions')
@@ -1,4 +1,13 @@
-from flask import Blueprint
+import uuid
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow.exceptions import ValidationError
+from app.services.equity_curve_service import EquityCurveService
+from app.services.performance_service import PerformanceService
+from app.services.strategy_service import StrategyService
+from app.services.trading_plan_service import TradingPlanService
+from app.utils.decorators import cached
+from app.utils.validators import validate_equity_curve
 
 analysis_bp = Blueprint('analysis', __name__)
 
@@ -7,3 +16,56 @@ analysis_bp = Blueprint('analysis', __name__)
 @analysis_bp.route('/', methods=['GET'])
 def get_analysis():
     return {"message": "Analysis endpoint"}, 200
+
+
+@analysis_bp.route('/performance/<uuid:plan_id>', methods=['GET'])
+@jwt_required()
+@cached('performance_dashboard',
+        tags=lambda user_id, plan_id:
+        [f'plan:{plan_id}', f'performance:plan:{plan_id}'])
+def get_performance_dashboard(plan_id):
+    try:
+        user_id = uuid.UUID(str(get_jwt_identity()))
+        if TradingPlanService.get_plan(user_id, plan_id) is None:
+            return {'error': 'Trading plan not found'}, 404
+        return PerformanceService.dashboard(plan_id), 200
+    except Exception as e:
+        return {'error': 'Failed to load performance dashboard'}, 500
+
+
+@analysis_bp.route('/equity/plan/<uuid:plan_id>', methods=['GET'])
+@jwt_required()
+@cached('plan_equity_curve',
+        tags=lambda user_id, plan_id:
+        [f'plan:{plan_id}', f'trades:plan:{plan_id}'])
+def get_plan_equity_curve(plan_id):
+    try:
+        args = validate_equity_curve(request.args.to_dict())
+        user_id = uuid.UUID(str(get_jwt_identity()))
+        plan = TradingPlanService.get_plan(user_id, plan_id)
+        if plan is None:
+            return {'error': 'Trading plan not found'}, 404
+        return EquityCurveService.plan_curve(plan, **args), 200
+    except ValidationError as e:
+        return {'error': e.messages}, 400
+    except Exception as e:
+        return {'error': 'Failed to load equity curve'}, 500
+
+
+@analysis_bp.route('/equity/strategy/<uuid:strategy_id>', methods=['GET'])
+@jwt_required()
+@cached('strategy_equity_curve',
+        tags=lambda user_id, strategy_id:
+        [f'user:{user_id}:plans', f'trades:strategy:{strategy_id}'])
+def get_strategy_equity_curve(strategy_id):
+    try:
+        args = validate_equity_curve(request.args.to_dict())
+        user_id = uuid.UUID(str(get_jwt_identity()))
+        if StrategyService.get_strategy(strategy_id) is None:
+            return {'error': 'Strategy not found'}, 404
+        return EquityCurveService.strategy_curve(user_id, strategy_id,
+                                                 **args), 200
+    except ValidationError as e:
+        return {'error': e.messages}, 400
+    except Exception as e:
+        return {'error': 'Failed to load equity curve'}, 500
@@ -2,11 +2,18 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
 from app.services.auth_service import AuthService
 from app.utils.validators import validate_registration, validate_login
-from app.utils.exceptions import AuthenticationError
+from app.utils.exceptions import AuthenticationError, PasswordHashingBusyError
 
 auth_bp = Blueprint('auth', __name__)
 
 
+def _busy_response():
+    """Shed load while the password hashing pool is saturated"""
+    response = jsonify({'error': 'Service busy, please retry'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     try:
@@ -24,6 +31,8 @@ def register():
 
     except AuthenticationError as e:
         return jsonify({'error': str(e)}), 400
+    except PasswordHashingBusyError:
+        return _busy_response()
     except Exception as e:
         return jsonify({'error': 'Registration failed'}), 500
 
@@ -41,6 +50,8 @@ def login():
 
     except AuthenticationError as e:
         return jsonify({'error': str(e)}), 401
+    except PasswordHashingBusyError:
+        return _busy_response()
     except Exception as e:
         return jsonify({'error': 'Login failed'}), 500
 
@@ -1,4 +1,10 @@
-from flask import Blueprint
+import uuid
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow.exceptions import ValidationError
+from app.services.export_service import ExportService
+from app.utils.validators import validate_journal_export
+from app.utils.exceptions import ExportFormatError
 
 journal_bp = Blueprint('journal', __name__)
 
@@ -7,3 +13,31 @@ journal_bp = Blueprint('journal', __name__)
 @journal_bp.route('/', methods=['GET'])
 def get_journal_entries():
     return {"message": "Journal entries endpoint"}, 200
+
+
+@journal_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_journal_entries():
+    try:
+        args = validate_journal_export(request.args.to_dict())
+        user_id = uuid.UUID(str(get_jwt_identity()))
+
+        mimetype, extension = ExportService.media_type(args['format'])
+        body = ExportService.stream(
+            ExportService.journal_query(user_id,
+                                        args.get('trading_plan_id')),
+            args['format'])
+
+        return Response(stream_with_context(body),
+                        mimetype=mimetype,
+                        headers={
+                            'Content-Disposition':
+                            f'attachment; filename=journal.{extension}'
+                        })
+
+    except ValidationError as e:
+        return jsonify({'error': e.messages}), 400
+    except ExportFormatError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Export failed'}), 500
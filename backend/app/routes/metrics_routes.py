@@ -0,0 +1,33 @@
+import hmac
+from flask import Blueprint, Response, current_app, request
+from flask_jwt_extended import jwt_required
+from app.services.metrics_service import MetricsService
+from app.services.query_stats_service import QueryStatsService
+from app.utils.decorators import admin_required
+from app.utils.metrics import MetricsRegistry
+
+metrics_bp = Blueprint('metrics', __name__)
+# Scrape endpoint at the conventional /metrics path, outside /api/v1
+prometheus_bp = Blueprint('prometheus', __name__)
+
+
+@metrics_bp.route('/queries', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_query_metrics():
+    # SQL fingerprints and timings cover every user's traffic
+    try:
+        return {'endpoints': QueryStatsService.snapshot()}, 200
+    except Exception as e:
+        return {'error': 'Failed to load query metrics'}, 500
+
+
+@prometheus_bp.route('/metrics', methods=['GET'])
+def get_prometheus_metrics():
+    # Scrapers authenticate with a static token instead of a user JWT
+    token = current_app.config.get('METRICS_AUTH_TOKEN')
+    if token and not hmac.compare_digest(
+            request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return {'error': 'Unauthorized'}, 401
+    return Response(MetricsService.render(),
+                    mimetype=MetricsRegistry.CONTENT_TYPE)
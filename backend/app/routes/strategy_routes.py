@@ -0,0 +1,61 @@
+import uuid
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow.exceptions import ValidationError
+from app.models.loader_profiles import deferrable_columns
+from app.services.strategy_service import StrategyService
+from app.utils.decorators import cached
+from app.utils.validators import validate_loader_include
+
+strategy_bp = Blueprint('strategy', __name__)
+
+
+@strategy_bp.route('/', methods=['GET'])
+@jwt_required()
+@cached('strategies', tags=['strategies'])
+def get_strategies():
+    try:
+        strategies = StrategyService.list_strategies()
+        return {
+            'strategies': [strategy.to_dict() for strategy in strategies]
+        }, 200
+    except Exception as e:
+        return {'error': 'Failed to load strategies'}, 500
+
+
+@strategy_bp.route('/<uuid:strategy_id>', methods=['GET'])
+@jwt_required()
+@cached('strategy',
+        tags=lambda user_id, strategy_id: [f'strategy:{strategy_id}'])
+def get_strategy(strategy_id):
+    try:
+        strategy = StrategyService.get_strategy(strategy_id)
+        if strategy is None:
+            return {'error': 'Strategy not found'}, 404
+        return strategy.to_dict(), 200
+    except Exception as e:
+        return {'error': 'Failed to load strategy'}, 500
+
+
+@strategy_bp.route('/<uuid:strategy_id>/dashboard', methods=['GET'])
+@jwt_required()
+@cached('strategy_dashboard',
+        tags=lambda user_id, strategy_id: [
+            f'strategy:{strategy_id}', f'user:{user_id}:plans',
+            f'trades:strategy:{strategy_id}',
+            f'performance:strategy:{strategy_id}'
+        ])
+def get_strategy_dashboard(strategy_id):
+    try:
+        include = validate_loader_include(
+            request.args.to_dict(), deferrable_columns('strategy_aggregate'))
+        user_id = uuid.UUID(str(get_jwt_identity()))
+        dashboard = StrategyService.get_strategy_aggregate(
+            user_id, strategy_id, include)
+        if dashboard is None:
+            return {'error': 'Strategy not found'}, 404
+        return dashboard, 200
+    except ValidationError as e:
+        return {'error': e.messages}, 400
+    except Exception as e:
+        return {'error': 'Failed to load strategy dashboard'}, 500
@@ -1,9 +1,100 @@
-from flask import Blueprint
+import uuid
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow.exceptions import ValidationError
+from app import db
+from app.models.trading_plan import TradingPlan
+from app.services.trade_service import TradeService
+from app.services.export_service import ExportService
+from app.services.trade_import_service import (TradeImportService,
+                                               detect_format)
+from app.utils.validators import validate_trade_list, validate_trade_export
+from app.utils.exceptions import InvalidCursorError, ExportFormatError
 
 trade_bp = Blueprint('trade', __name__)
 
 
-# Placeholder for trade routes
 @trade_bp.route('/', methods=['GET'])
+@jwt_required()
 def get_trades():
-    return {"message": "Trades endpoint"}, 200
+    try:
+        args = validate_trade_list(request.args.to_dict())
+        user_id = uuid.UUID(str(get_jwt_identity()))
+
+        page = TradeService.list_trades(user_id,
+                                        filters=args,
+                                        cursor=args.get('cursor'),
+                                        limit=args['limit'])
+
+        return jsonify(page), 200
+
+    except ValidationError as e:
+        return jsonify({'error': e.messages}), 400
+    except InvalidCursorError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Failed to list trades'}), 500
+
+
+@trade_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_trades():
+    try:
+        user_id = uuid.UUID(str(get_jwt_identity()))
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({'error': 'No file uploaded'}), 400
+
+        try:
+            plan_id = uuid.UUID(request.form.get('trading_plan_id', ''))
+        except ValueError:
+            return jsonify({'error': 'Invalid trading_plan_id'}), 400
+
+        plan = db.session.get(TradingPlan, plan_id)
+        if plan is None or plan.user_id != user_id:
+            return jsonify({'error': 'Trading plan not found'}), 404
+
+        try:
+            chunk_size = int(request.form.get('chunk_size', 1000))
+        except ValueError:
+            return jsonify({'error': 'Invalid chunk_size'}), 400
+
+        fmt = request.form.get('format') or detect_format(upload.filename)
+        report = TradeImportService.import_stream(upload.stream,
+                                                  fmt,
+                                                  plan.id,
+                                                  chunk_size=chunk_size)
+
+        return jsonify(report), 200
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Import failed'}), 500
+
+
+@trade_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_trades():
+    try:
+        args = validate_trade_export(request.args.to_dict())
+        user_id = uuid.UUID(str(get_jwt_identity()))
+        fmt = args.pop('format')
+
+        mimetype, extension = ExportService.media_type(fmt)
+        body = ExportService.stream(ExportService.trades_query(user_id, args),
+                                    fmt)
+
+        return Response(stream_with_context(body),
+                        mimetype=mimetype,
+                        headers={
+                            'Content-Disposition':
+                            f'attachment; filename=trades.{extension}'
+                        })
+
+    except ValidationError as e:
+        return jsonify({'error': e.messages}), 400
+    except ExportFormatError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Export failed'}), 500
@@ -1,9 +1,107 @@
-from flask import Blueprint
+import uuid
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow.exceptions import ValidationError
+from app.models.loader_profiles import deferrable_columns
+from app.services.plan_version_service import PlanVersionService
+from app.services.trading_plan_service import TradingPlanService
+from app.utils.decorators import cached
+from app.utils.validators import validate_loader_include
 
 trading_plan_bp = Blueprint('trading_plan', __name__)
 
 
-# Placeholder for trading plan routes
 @trading_plan_bp.route('/', methods=['GET'])
+@jwt_required()
+@cached('trading_plans', tags=lambda user_id: [f'user:{user_id}:plans'])
 def get_trading_plans():
-    return {"message": "Trading plans endpoint"}, 200
+    try:
+        user_id = uuid.UUID(str(get_jwt_identity()))
+        plans = TradingPlanService.list_plans(user_id)
+        return {'trading_plans': [plan.to_dict() for plan in plans]}, 200
+    except Exception as e:
+        return {'error': 'Failed to load trading plans'}, 500
+
+
+@trading_plan_bp.route('/<uuid:plan_id>', methods=['GET'])
+@jwt_required()
+@cached('trading_plan', tags=lambda user_id, plan_id: [f'plan:{plan_id}'])
+def get_trading_plan(plan_id):
+    try:
+        user_id = uuid.UUID(str(get_jwt_identity()))
+        plan = TradingPlanService.get_plan(user_id, plan_id)
+        if plan is None:
+            return {'error': 'Trading plan not found'}, 404
+        return plan.to_dict(), 200
+    except Exception as e:
+        return {'error': 'Failed to load trading plan'}, 500
+
+
+@trading_plan_bp.route('/<uuid:plan_id>/dashboard', methods=['GET'])
+@jwt_required()
+@cached('trading_plan_dashboard',
+        tags=lambda user_id, plan_id: [
+            f'plan:{plan_id}', f'trades:plan:{plan_id}',
+            f'journals:plan:{plan_id}', f'performance:plan:{plan_id}'
+        ])
+def get_trading_plan_dashboard(plan_id):
+    try:
+        include = validate_loader_include(
+            request.args.to_dict(), deferrable_columns('plan_aggregate'))
+        user_id = uuid.UUID(str(get_jwt_identity()))
+        dashboard = TradingPlanService.get_plan_aggregate(
+            user_id, plan_id, include)
+        if dashboard is None:
+            return {'error': 'Trading plan not found'}, 404
+        return dashboard, 200
+    except ValidationError as e:
+        return {'error': e.messages}, 400
+    except Exception as e:
+        return {'error': 'Failed to load trading plan dashboard'}, 500
+
+
+@trading_plan_bp.route('/<uuid:plan_id>/versions', methods=['GET'])
+@jwt_required()
+@cached('trading_plan_versions',
+        tags=lambda user_id, plan_id: [f'plan:{plan_id}'])
+def get_trading_plan_versions(plan_id):
+    try:
+        user_id = uuid.UUID(str(get_jwt_identity()))
+        plan = TradingPlanService.get_plan(user_id, plan_id)
+        if plan is None:
+            return {'error': 'Trading plan not found'}, 404
+        versions = PlanVersionService.list_versions(plan_id)
+        return {
+            'current_version': plan.version,
+            'versions': [{
+                'version': row.version,
+                'is_checkpoint': row.is_checkpoint,
+                'created_at': row.created_at.isoformat()
+            } for row in versions]
+        }, 200
+    except Exception as e:
+        return {'error': 'Failed to load trading plan versions'}, 500
+
+
+@trading_plan_bp.route('/<uuid:plan_id>/versions/<int:version>',
+                       methods=['GET'])
+@jwt_required()
+@cached('trading_plan_version',
+        tags=lambda user_id, plan_id, version: [f'plan:{plan_id}'])
+def get_trading_plan_version(plan_id, version):
+    try:
+        user_id = uuid.UUID(str(get_jwt_identity()))
+        plan = TradingPlanService.get_plan(user_id, plan_id)
+        if plan is None:
+            return {'error': 'Trading plan not found'}, 404
+        try:
+            rules = PlanVersionService.state_at(plan_id, version)
+        except LookupError:
+            return {'error': 'Trading plan version not found'}, 404
+        return {
+            'trading_plan_id': str(plan_id),
+            'version': version,
+            **rules
+        }, 200
+    except Exception as e:
+        return {'error': 'Failed to load trading plan version'}, 500
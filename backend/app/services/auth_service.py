@@ -2,7 +2,9 @@ from datetime import datetime
 from flask_jwt_extended import create_access_token, create_refresh_token
 from app import db
 from app.models.user import User
+from app.services.password_service import PasswordService
 from app.utils.exceptions import AuthenticationError
+from app.utils.validators import UserValidator
 
 
 class AuthService:
@@ -14,8 +16,9 @@ class AuthService:
         if User.query.filter_by(username=username).first():
             raise AuthenticationError("Username already taken")
 
+        UserValidator.validate_password(password)
         user = User(email=email, username=username)
-        user.set_password(password)
+        user.password_hash = PasswordService.hash_password(password)
 
         db.session.add(user)
         db.session.commit()
@@ -26,12 +29,21 @@ class AuthService:
     def login_user(email, password):
         user = User.query.filter_by(email=email).first()
 
-        if not user or not user.check_password(password):
+        if not user or not user.password_hash or \
+                not PasswordService.verify_password(user.password_hash,
+                                                    password):
             raise AuthenticationError("Invalid email or password")
 
         if not user.is_active:
             raise AuthenticationError("Account is deactivated")
 
+        # Upgrade hashes made with an older method/cost while we have the
+        # plain password, instead of forcing a reset
+        method = PasswordService.method()
+        if user.needs_rehash(method):
+            user.password_hash = PasswordService.hash_password(
+                password, method)
+
         user.last_login = datetime.utcnow()
         db.session.commit()
 
@@ -0,0 +1,403 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+import numpy as np
+from app import db
+from app.models.performance import Performance
+from app.models.trade import Trade
+from app.services.market_data_service import MarketDataStore
+from app.services.performance_service import PerformanceService
+from app.utils.timeframes import normalize_symbol, normalize_timeframe
+
+DEFAULT_INITIAL_CAPITAL = 10000.0
+
+# Exit reasons, also used as tie-break priority within the same bar:
+# exits at the bar open happen before intrabar stops and targets
+EXIT_SIGNAL = 0
+EXIT_STOP_LOSS = 1
+EXIT_TAKE_PROFIT = 2
+EXIT_END_OF_DATA = 3
+EXIT_REASONS = {
+    EXIT_SIGNAL: 'signal',
+    EXIT_STOP_LOSS: 'stop_loss',
+    EXIT_TAKE_PROFIT: 'take_profit',
+    EXIT_END_OF_DATA: 'end_of_data',
+}
+
+
+def _sma(values, period):
+    out = np.full(len(values), np.nan)
+    if period <= 0 or period > len(values):
+        return out
+    csum = np.cumsum(np.insert(values, 0, 0.0))
+    out[period - 1:] = (csum[period:] - csum[:-period]) / period
+    return out
+
+
+def _rolling(values, period, reducer):
+    out = np.full(len(values), np.nan)
+    if period <= 0 or period > len(values):
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(values, period)
+    out[period - 1:] = reducer(windows, axis=1)
+    return out
+
+
+def _datetime64(seconds):
+    return seconds.astype('datetime64[s]').astype('datetime64[us]')
+
+
+def _forward_fill(events):
+    """Carry the last non-NaN event forward (0 before the first event)"""
+    positions = np.where(~np.isnan(events), np.arange(len(events)), 0)
+    np.maximum.accumulate(positions, out=positions)
+    filled = events[positions]
+    return np.nan_to_num(filled, nan=0.0)
+
+
+def signal_from_parameters(candles, parameters):
+    """
+    Compute the desired position (-1, 0, 1) at each bar close
+    Supported strategy parameters:
+        fast_ma/slow_ma: moving-average crossover
+        rsi_period/overbought/oversold: RSI mean reversion (SMA-based RSI)
+        breakout_period: channel breakout on prior highs/lows
+    """
+    close = np.asarray(candles['close'], dtype=np.float64)
+    signal_type = parameters.get('signal')
+    if signal_type is None:
+        if 'fast_ma' in parameters and 'slow_ma' in parameters:
+            signal_type = 'ma_crossover'
+        elif 'rsi_period' in parameters:
+            signal_type = 'rsi'
+        elif 'breakout_period' in parameters:
+            signal_type = 'breakout'
+
+    if signal_type == 'ma_crossover':
+        fast = _sma(close, int(parameters['fast_ma']))
+        slow = _sma(close, int(parameters['slow_ma']))
+        return np.nan_to_num(np.sign(fast - slow))
+
+    if signal_type == 'rsi':
+        period = int(parameters['rsi_period'])
+        change = np.diff(close, prepend=close[:1])
+        avg_gain = _sma(np.clip(change, 0, None), period)
+        avg_loss = _sma(np.clip(-change, 0, None), period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(avg_loss > 0,
+                           100.0 - 100.0 / (1.0 + avg_gain / avg_loss), 100.0)
+        rsi[np.isnan(avg_gain)] = np.nan
+        events = np.where(rsi < parameters.get('oversold', 30), 1.0,
+                          np.where(rsi > parameters.get('overbought', 70),
+                                   -1.0, np.nan))
+        return _forward_fill(events)
+
+    if signal_type == 'breakout':
+        period = int(parameters['breakout_period'])
+        high = np.asarray(candles['high'], dtype=np.float64)
+        low = np.asarray(candles['low'], dtype=np.float64)
+        prior_high = np.roll(_rolling(high, period, np.max), 1)
+        prior_low = np.roll(_rolling(low, period, np.min), 1)
+        prior_high[0] = prior_low[0] = np.nan
+        with np.errstate(invalid='ignore'):
+            events = np.where(close > prior_high, 1.0,
+                              np.where(close < prior_low, -1.0, np.nan))
+        return _forward_fill(events)
+
+    raise ValueError(f"Unsupported strategy parameters: {signal_type}")
+
+
+def rules_from_plan(trading_plan):
+    """Extract the backtest-relevant rule blobs from a TradingPlan"""
+    return {
+        'entry_rules': trading_plan.entry_rules or {},
+        'exit_rules': trading_plan.exit_rules or {},
+        'position_sizing': trading_plan.position_sizing or {},
+        'risk_management': trading_plan.risk_management or {},
+    }
+
+
+def _position_sizes(entry_price, parameters, rules, stop_pct, capital):
+    sizing = rules['position_sizing']
+    risk = rules['risk_management']
+    method = sizing.get('type')
+    value = sizing.get('value')
+    if method is None:
+        # Fall back to the strategy's own risk setting when it has stops
+        if 'risk_percent' in parameters and stop_pct:
+            method, value = 'risk_percent', parameters['risk_percent']
+        else:
+            method, value = 'fixed', 1
+
+    if method == 'fixed':
+        return np.full(len(entry_price), float(value))
+    if method == 'percent_equity':
+        return capital * float(value) / 100.0 / entry_price
+    if method == 'risk_percent':
+        if not stop_pct:
+            raise ValueError("risk_percent sizing requires a stop_loss_pct")
+        risk_amount = capital * float(value) / 100.0
+        if risk.get('max_risk_per_trade') is not None:
+            risk_amount = min(risk_amount,
+                              capital * float(risk['max_risk_per_trade']))
+        return risk_amount / (entry_price * stop_pct)
+    raise ValueError(f"Unsupported position sizing: {method}")
+
+
+def run_backtest(candles, parameters, rules):
+    """
+    Run a strategy over a candle range using whole-array operations
+    Signals are taken on the bar close and filled at the next bar open.
+    Position size is based on the initial capital (no compounding), so
+    every trade can be sized independently of the equity path.
+    Args:
+        candles: Mapping of OHLCV column -> array (see MarketDataStore)
+        parameters: Strategy.parameters
+        rules: Output of rules_from_plan()
+    Returns:
+        dict of per-trade arrays, the equity curve and summary metrics
+    """
+    parameters = parameters or {}
+    exit_rules = rules['exit_rules']
+    risk = rules['risk_management']
+    capital = float(risk.get('initial_capital', DEFAULT_INITIAL_CAPITAL))
+    fee_rate = float(parameters.get('fee_rate', risk.get('fee_rate', 0)))
+    stop_pct = exit_rules.get('stop_loss_pct')
+    target_pct = exit_rules.get('take_profit_pct')
+    max_bars = exit_rules.get('max_holding_bars')
+
+    times = np.asarray(candles['time'], dtype=np.int64)
+    open_ = np.asarray(candles['open'], dtype=np.float64)
+    high = np.asarray(candles['high'], dtype=np.float64)
+    low = np.asarray(candles['low'], dtype=np.float64)
+    close = np.asarray(candles['close'], dtype=np.float64)
+    n = len(close)
+
+    signal = signal_from_parameters(candles, parameters) if n else close
+    direction_rule = rules['entry_rules'].get('direction', 'long')
+    if direction_rule == 'long':
+        signal = np.maximum(signal, 0)
+    elif direction_rule == 'short':
+        signal = np.minimum(signal, 0)
+
+    # Position held during each bar: yesterday's signal, filled at the open
+    position = np.zeros(n)
+    position[1:] = signal[:-1]
+
+    previous = np.concatenate(([0.0], position[:-1]))
+    following = np.concatenate((position[1:], [0.0]))
+    starts = np.flatnonzero((position != 0) & (position != previous))
+    ends = np.flatnonzero((position != 0) & (position != following))
+    direction = position[starts]
+    entry_price = open_[starts]
+
+    # Candidate exits encoded as bar * 4 + reason; the minimum wins
+    big = (n + 1) * 4
+    natural = np.where(ends + 1 < n, (ends + 1) * 4 + EXIT_SIGNAL,
+                       ends * 4 + EXIT_END_OF_DATA)
+    exit_code = natural.astype(np.int64)
+    if max_bars:
+        capped = starts + int(max_bars)
+        exit_code = np.minimum(
+            exit_code, np.where(capped <= ends, capped * 4 + EXIT_SIGNAL,
+                                big))
+
+    stop_price = target_price = None
+    if len(starts) and (stop_pct or target_pct):
+        lengths = ends - starts + 1
+        bars = np.flatnonzero(position != 0)
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        segment = np.repeat(np.arange(len(starts)), lengths)
+        is_long = direction[segment] > 0
+
+        if stop_pct:
+            stop_price = entry_price * (1 - direction * stop_pct)
+            level = stop_price[segment]
+            hit = np.where(is_long, low[bars] <= level, high[bars] >= level)
+            first = np.minimum.reduceat(np.where(hit, bars, big), offsets)
+            exit_code = np.minimum(
+                exit_code,
+                np.where(first < big, first * 4 + EXIT_STOP_LOSS, big))
+        if target_pct:
+            target_price = entry_price * (1 + direction * target_pct)
+            level = target_price[segment]
+            hit = np.where(is_long, high[bars] >= level, low[bars] <= level)
+            first = np.minimum.reduceat(np.where(hit, bars, big), offsets)
+            exit_code = np.minimum(
+                exit_code,
+                np.where(first < big, first * 4 + EXIT_TAKE_PROFIT, big))
+
+    exit_bar = exit_code // 4
+    reason = exit_code % 4
+    exit_price = np.where(reason == EXIT_END_OF_DATA, close[exit_bar],
+                          open_[exit_bar])
+    is_long = direction > 0
+    if stop_price is not None:
+        # Gaps through the stop fill at the (worse) open
+        fill = np.where(is_long, np.minimum(open_[exit_bar], stop_price),
+                        np.maximum(open_[exit_bar], stop_price))
+        exit_price = np.where(reason == EXIT_STOP_LOSS, fill, exit_price)
+    if target_price is not None:
+        fill = np.where(is_long, np.maximum(open_[exit_bar], target_price),
+                        np.minimum(open_[exit_bar], target_price))
+        exit_price = np.where(reason == EXIT_TAKE_PROFIT, fill, exit_price)
+
+    size = _position_sizes(entry_price, parameters, rules, stop_pct,
+                           capital) * direction
+    entry_fee = np.abs(entry_price * size) * fee_rate
+    exit_fee = np.abs(exit_price * size) * fee_rate
+    net_pnl = (exit_price - entry_price) * size - entry_fee - exit_fee
+
+    equity = capital + np.cumsum(
+        np.bincount(exit_bar, weights=net_pnl, minlength=n))
+
+    columns = {
+        'id': np.arange(len(starts)),
+        'entry_time': _datetime64(times[starts]),
+        'exit_time': _datetime64(times[exit_bar]),
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'position_size': size,
+        'entry_fee': entry_fee,
+        'exit_fee': exit_fee,
+    }
+    # Sort by exit so drawdown and monthly figures follow realized order
+    order = np.argsort(columns['exit_time'], kind='stable')
+    rollup = PerformanceService.rollup_from_columns(
+        {key: values[order] for key, values in columns.items()})
+
+    metrics = rollup.to_metrics()
+    metrics.pop('rollup')
+    metrics['backtest'] = {
+        'initial_capital': capital,
+        'final_equity': float(equity[-1]) if n else capital,
+        'return_pct': ((float(equity[-1]) / capital - 1) * 100.0
+                       if n else 0.0),
+        'bars': int(n),
+        'parameters': parameters,
+    }
+
+    return {
+        'entry_index': starts,
+        'exit_index': exit_bar,
+        'entry_time': times[starts],
+        'exit_time': times[exit_bar],
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'position_size': size,
+        'entry_fee': entry_fee,
+        'exit_fee': exit_fee,
+        'net_pnl': net_pnl,
+        'exit_reason': reason,
+        'equity': equity,
+        'metrics': metrics,
+    }
+
+
+def _utc(seconds):
+    return datetime.fromtimestamp(int(seconds),
+                                  tz=timezone.utc).replace(tzinfo=None)
+
+
+def _decimal(value):
+    return Decimal(repr(float(value)))
+
+
+class BacktestService:
+
+    @staticmethod
+    def resolve_timeframe(strategy, trading_plan, timeframe=None):
+        timeframe = timeframe or (strategy.parameters or {}).get('timeframe')
+        if timeframe is None and trading_plan.timeframes:
+            timeframe = trading_plan.timeframes[0]
+        if timeframe is None:
+            raise ValueError("No timeframe given for the backtest")
+        return normalize_timeframe(timeframe)
+
+    @classmethod
+    def run(cls,
+            strategy,
+            trading_plan,
+            symbol,
+            timeframe=None,
+            start=None,
+            end=None,
+            store=None,
+            persist=False):
+        """
+        Backtest a strategy under a trading plan's rules
+        Args:
+            strategy: Strategy whose parameters drive the signals
+            trading_plan: Plan supplying entry/exit/sizing/risk rules
+            symbol: Instrument to test, e.g. 'EURUSD'
+            timeframe: Candle timeframe (defaults to the strategy's)
+            start/end: Candle range
+            store: MarketDataStore (defaults to the configured one)
+            persist: Commit the Performance row, replacing the one of an
+                     earlier run over the same range; the fills are never
+                     saved, since as Trade rows they would count as real
+                     trades in rollups, equity curves and exports
+        Returns:
+            (trades, performance, result) where trades are unsaved Trade
+            objects and result is the raw output of run_backtest()
+        """
+        store = store or MarketDataStore.from_config()
+        symbol = normalize_symbol(symbol)
+        timeframe = cls.resolve_timeframe(strategy, trading_plan, timeframe)
+        candles = store.candles(symbol, timeframe, start=start, end=end)
+
+        result = run_backtest(candles, strategy.parameters,
+                              rules_from_plan(trading_plan))
+        trades = cls.build_trades(result, strategy, trading_plan, symbol,
+                                  timeframe)
+        performance = cls.build_performance(result, strategy, trading_plan,
+                                            timeframe, candles['time'])
+
+        if persist:
+            # A rerun over the same range replaces its earlier result
+            existing = PerformanceService.get_row(
+                strategy.id, trading_plan.id, performance.timeframe,
+                performance.period, create=False)
+            if existing is not None:
+                existing.metrics = performance.metrics
+                performance = existing
+            else:
+                db.session.add(performance)
+            db.session.commit()
+        return trades, performance, result
+
+    @staticmethod
+    def build_trades(result, strategy, trading_plan, symbol, timeframe):
+        """Materialize backtest fills as (unsaved) Trade rows"""
+        return [
+            Trade(trading_plan_id=trading_plan.id,
+                  strategy_id=strategy.id,
+                  symbol=symbol,
+                  timeframe=timeframe,
+                  entry_time=_utc(entry_time),
+                  exit_time=_utc(exit_time),
+                  entry_price=_decimal(entry_price),
+                  exit_price=_decimal(exit_price),
+                  position_size=_decimal(size),
+                  entry_fee=_decimal(entry_fee),
+                  exit_fee=_decimal(exit_fee))
+            for entry_time, exit_time, entry_price, exit_price, size,
+            entry_fee, exit_fee in zip(
+                result['entry_time'], result['exit_time'],
+                result['entry_price'], result['exit_price'],
+                result['position_size'], result['entry_fee'],
+                result['exit_fee'])
+        ]
+
+    @staticmethod
+    def build_performance(result, strategy, trading_plan, timeframe, times):
+        """Wrap backtest metrics in an (unsaved) Performance row"""
+        if len(times):
+            period = (f"bt-{_utc(times[0]):%Y%m%d}-"
+                      f"{_utc(times[-1]):%Y%m%d}")
+        else:
+            period = 'bt-empty'
+        return Performance(strategy_id=strategy.id,
+                           trading_plan_id=trading_plan.id,
+                           metrics=result['metrics'],
+                           timeframe=timeframe,
+                           period=period)
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import time
+import uuid
+from flask import current_app, has_app_context
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app import db
+from app.models.journal import Journal
+from app.models.performance import Performance
+from app.models.strategy import Strategy
+from app.models.trade import Trade
+from app.models.trading_plan import TradingPlan
+
+CACHE_PREFIX = 'cache'
+STATS_KEY = f'{CACHE_PREFIX}:stats'
+DEFAULT_TTL = 300
+
+# Single-flight: one worker rebuilds a missing entry, others wait for it
+LOCK_TTL_MS = 10000
+LOCK_WAIT_SECONDS = 2.0
+LOCK_POLL_SECONDS = 0.02
+
+PENDING_TAGS_KEY = 'cache_pending_tags'
+
+
+def _tag_key(tag):
+    return f'{CACHE_PREFIX}:tag:{tag}'
+
+
+def _column_values(target, column):
+    """Current and (if changed) previous value of a column"""
+    values = {getattr(target, column)}
+    history = inspect(target).attrs[column].history
+    values.update(history.deleted or ())
+    return {value for value in values if value is not None}
+
+
+def model_tags(target):
+    """
+    Cache tags that depend on a model instance
+    A change to the instance must invalidate exactly these tags.
+    """
+    if isinstance(target, TradingPlan):
+        return {f'plan:{target.id}'} | {
+            f'user:{user_id}:plans'
+            for user_id in _column_values(target, 'user_id')
+        }
+    if isinstance(target, Strategy):
+        return {f'strategy:{target.id}', 'strategies'}
+    if isinstance(target, Performance):
+        return {
+            f'performance:plan:{plan_id}'
+            for plan_id in _column_values(target, 'trading_plan_id')
+        } | {
+            f'performance:strategy:{strategy_id}'
+            for strategy_id in _column_values(target, 'strategy_id')
+        }
+    if isinstance(target, Journal):
+        return {
+            f'journals:plan:{plan_id}'
+            for plan_id in _column_values(target, 'trading_plan_id')
+        }
+    if isinstance(target, Trade):
+        return {
+            f'trades:plan:{plan_id}'
+            for plan_id in _column_values(target, 'trading_plan_id')
+        } | {
+            f'trades:strategy:{strategy_id}'
+            for strategy_id in _column_values(target, 'strategy_id')
+        }
+    return set()
+
+
+class CacheService:
+
+    @staticmethod
+    def enabled():
+        return (has_app_context()
+                and current_app.config.get('CACHE_ENABLED', False)
+                and getattr(current_app, 'redis', None) is not None)
+
+    @staticmethod
+    def client():
+        return current_app.redis
+
+    @classmethod
+    def _record(cls, namespace, outcome):
+        try:
+            cls.client().hincrby(STATS_KEY, f'{namespace}:{outcome}', 1)
+        except RedisError:
+            pass
+
+    @classmethod
+    def versioned_key(cls, namespace, parts, tags=()):
+        """
+        Build the key for an entry from its identity and its tags' versions
+        Bumping any tag version makes the old key unreachable; it then
+        expires through its TTL.
+        """
+        tags = sorted(tags)
+        versions = cls.client().mget([_tag_key(tag) for tag in tags
+                                      ]) if tags else []
+        identity = json.dumps(
+            [parts, tags, [int(version or 0) for version in versions]],
+            sort_keys=True,
+            default=str)
+        digest = hashlib.sha1(identity.encode()).hexdigest()
+        return f'{CACHE_PREFIX}:{namespace}:{digest}'
+
+    @classmethod
+    def get_or_load(cls,
+                    namespace,
+                    parts,
+                    loader,
+                    tags=(),
+                    ttl=None,
+                    should_cache=None):
+        """
+        Read-through cache lookup
+        Args:
+            namespace: Cache namespace (also used for hit/miss counters)
+            parts: JSON-serializable identity of the entry
+            loader: Callable producing the JSON-serializable value
+            tags: Tags the entry depends on
+            ttl: Seconds to keep the entry (CACHE_DEFAULT_TTL by default)
+            should_cache: Optional predicate deciding if a value is stored
+        Returns:
+            The cached or freshly loaded value
+        """
+        if not cls.enabled():
+            return loader()
+
+        client = cls.client()
+        try:
+            key = cls.versioned_key(namespace, parts, tags)
+            raw = client.get(key)
+        except RedisError:
+            return loader()
+        if raw is not None:
+            cls._record(namespace, 'hit')
+            return json.loads(raw)
+        cls._record(namespace, 'miss')
+
+        ttl = ttl or current_app.config.get('CACHE_DEFAULT_TTL', DEFAULT_TTL)
+        lock_key = f'{key}:lock'
+        token = uuid.uuid4().hex
+        try:
+            locked = client.set(lock_key, token, nx=True, px=LOCK_TTL_MS)
+        except RedisError:
+            return loader()
+
+        if not locked:
+            # Someone else is rebuilding this entry: wait for their result
+            deadline = time.monotonic() + LOCK_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL_SECONDS)
+                raw = client.get(key)
+                if raw is not None:
+                    cls._record(namespace, 'coalesced')
+                    return json.loads(raw)
+            return loader()
+
+        try:
+            value = loader()
+            if should_cache is None or should_cache(value):
+                client.set(key, json.dumps(value, default=str), ex=ttl)
+            return value
+        finally:
+            try:
+                if client.get(lock_key) == token.encode():
+                    client.delete(lock_key)
+            except RedisError:
+                pass
+
+    @classmethod
+    def invalidate(cls, *tags):
+        """Bump tag versions so every entry depending on them is evicted"""
+        if not tags or not cls.enabled():
+            return
+        try:
+            pipeline = cls.client().pipeline()
+            for tag in sorted(set(tags)):
+                pipeline.incr(_tag_key(tag))
+            pipeline.execute()
+        except RedisError:
+            current_app.logger.warning("Cache invalidation failed for %s",
+                                       tags)
+
+    @classmethod
+    def stats(cls):
+        """Hit/miss/coalesced counters per namespace"""
+        raw = cls.client().hgetall(STATS_KEY)
+        stats = {}
+        for field, count in raw.items():
+            namespace, outcome = field.decode().rsplit(':', 1)
+            stats.setdefault(namespace, {})[outcome] = int(count)
+        return stats
+
+
+def _collect_tags(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(PENDING_TAGS_KEY,
+                                set()).update(model_tags(target))
+
+
+def _invalidate_committed(session):
+    # Only committed changes evict; rolled back ones never happened
+    tags = session.info.pop(PENDING_TAGS_KEY, None)
+    if tags:
+        CacheService.invalidate(*tags)
+
+
+def _discard_pending(session, previous_transaction):
+    session.info.pop(PENDING_TAGS_KEY, None)
+
+
+def register_cache_listeners():
+    """Hook model changes to tag invalidation (idempotent)"""
+    for model in (TradingPlan, Strategy, Performance, Trade, Journal):
+        for name in ('after_insert', 'after_update', 'after_delete'):
+            if not event.contains(model, name, _collect_tags):
+                event.listen(model, name, _collect_tags)
+    if not event.contains(db.session, 'after_commit', _invalidate_committed):
+        event.listen(db.session, 'after_commit', _invalidate_committed)
+    if not event.contains(db.session, 'after_soft_rollback',
+                          _discard_pending):
+        event.listen(db.session, 'after_soft_rollback', _discard_pending)
@@ -0,0 +1,146 @@
+import numpy as np
+from sqlalchemy import Float, cast, extract, func
+from app import db
+from app.models.trade import Trade
+from app.services.backtest_service import DEFAULT_INITIAL_CAPITAL
+from app.services.trade_analytics_service import TradeAnalyticsService
+from app.utils.downsampling import lttb
+
+DEFAULT_POINTS = 1000
+
+# Net P&L of a closed trade; negative position size denotes a short
+NET_PNL = cast((Trade.exit_price - Trade.entry_price) * Trade.position_size -
+               func.coalesce(Trade.entry_fee, 0) -
+               func.coalesce(Trade.exit_fee, 0), Float)
+# Exit time as epoch seconds, so no datetime objects are built per row
+EXIT_EPOCH = cast(extract('epoch', Trade.exit_time), Float)
+
+
+def _times(seconds):
+    return np.datetime_as_string(seconds.astype('datetime64[s]'),
+                                 unit='s').tolist()
+
+
+def _floats(values):
+    return np.round(values, 2).tolist()
+
+
+class EquityCurveService:
+    """
+    Equity and underwater (drawdown) curves built from cumulative closed
+    trade P&L, downsampled for charting
+    """
+
+    @staticmethod
+    def load_pnl(start=None, **filters):
+        """
+        Exit times and net P&L of closed trades in exit order
+        Args:
+            start: Inclusive lower bound on exit_time; P&L realized before
+                   it is returned as the opening balance offset
+            filters: trading_plan_id, user_id, strategy_id, end
+        Returns:
+            (exit epoch seconds, net_pnl, offset) with float64 arrays
+        """
+        stmt = TradeAnalyticsService.closed_trades_query(
+            [EXIT_EPOCH, NET_PNL], start=start, **filters)
+        # Two float columns straight off the connection: this is the bulk
+        # of the request, ORM result handling would double it
+        rows = db.session.connection().execute(stmt).all()
+        exit_time, net = (zip(*rows) if rows else ((), ()))
+        exit_time = np.array(exit_time, dtype=np.float64)
+        net = np.array(net, dtype=np.float64)
+
+        offset = 0.0
+        if start is not None:
+            before = TradeAnalyticsService.closed_trades_query(
+                [func.sum(NET_PNL)], **dict(filters, end=start))
+            offset = db.session.execute(before.order_by(None)).scalar() or 0.0
+        return exit_time, net, float(offset)
+
+    @staticmethod
+    def build(exit_time, net_pnl, initial_capital, points=DEFAULT_POINTS):
+        """
+        Equity and drawdown series at a chart resolution
+        Args:
+            exit_time: Exit epoch seconds in increasing order
+            net_pnl: Net P&L per trade
+            initial_capital: Balance before the first trade
+            points: Maximum points per series
+        Returns:
+            dict with summary figures plus 'equity' and 'drawdown' series
+            as parallel time/value lists
+        """
+        equity = initial_capital + np.cumsum(net_pnl)
+        peak = np.maximum(np.maximum.accumulate(equity), initial_capital)
+        drawdown = equity - peak
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown_pct = np.where(peak > 0, drawdown / peak * 100.0, 0.0)
+
+        equity_index = lttb(exit_time, equity, points)
+        drawdown_index = lttb(exit_time, drawdown, points)
+        final_equity = initial_capital
+        max_drawdown = max_drawdown_pct = 0.0
+        if len(equity):
+            trough = int(drawdown.argmin())
+            # LTTB favours large swings but the deepest point must show
+            drawdown_index = np.union1d(drawdown_index, [trough])
+            final_equity = equity[-1]
+            max_drawdown = drawdown[trough]
+            max_drawdown_pct = drawdown_pct[trough]
+
+        return {
+            'initial_capital': _floats(initial_capital),
+            'trades': len(net_pnl),
+            'final_equity': _floats(final_equity),
+            'max_drawdown': _floats(max_drawdown),
+            'max_drawdown_pct': _floats(max_drawdown_pct),
+            'equity': {
+                'time': _times(exit_time[equity_index]),
+                'value': _floats(equity[equity_index]),
+            },
+            'drawdown': {
+                'time': _times(exit_time[drawdown_index]),
+                'value': _floats(drawdown[drawdown_index]),
+                'pct': _floats(drawdown_pct[drawdown_index]),
+            },
+        }
+
+    @classmethod
+    def plan_curve(cls,
+                   plan,
+                   points=DEFAULT_POINTS,
+                   start=None,
+                   end=None,
+                   initial_capital=None):
+        """Curves of a trading plan, starting from its initial capital"""
+        if initial_capital is None:
+            initial_capital = (plan.risk_management or {}).get(
+                'initial_capital', DEFAULT_INITIAL_CAPITAL)
+        exit_time, net, offset = cls.load_pnl(trading_plan_id=plan.id,
+                                              start=start,
+                                              end=end)
+        curve = cls.build(exit_time, net,
+                          float(initial_capital) + offset, points)
+        curve['trading_plan_id'] = str(plan.id)
+        return curve
+
+    @classmethod
+    def strategy_curve(cls,
+                       user_id,
+                       strategy_id,
+                       points=DEFAULT_POINTS,
+                       start=None,
+                       end=None,
+                       initial_capital=None):
+        """Curves of a strategy across the plans of one user"""
+        if initial_capital is None:
+            initial_capital = DEFAULT_INITIAL_CAPITAL
+        exit_time, net, offset = cls.load_pnl(user_id=user_id,
+                                              strategy_id=strategy_id,
+                                              start=start,
+                                              end=end)
+        curve = cls.build(exit_time, net,
+                          float(initial_capital) + offset, points)
+        curve['strategy_id'] = str(strategy_id)
+        return curve
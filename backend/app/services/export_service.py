@@ -0,0 +1,211 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import select
+from app import db
+from app.models.journal import Journal
+from app.models.trade import Trade
+from app.models.trading_plan import TradingPlan
+from app.services.trade_service import TradeService
+from app.utils.exceptions import ExportFormatError
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+TRADE_EXPORT_COLUMNS = [
+    Trade.id, Trade.trading_plan_id, Trade.strategy_id, Trade.symbol,
+    Trade.timeframe, Trade.entry_time, Trade.exit_time, Trade.entry_price,
+    Trade.exit_price, Trade.position_size, Trade.entry_fee, Trade.exit_fee,
+    Trade.entry_image_url, Trade.exit_image_url, Trade.created_at,
+    Trade.updated_at
+]
+
+JOURNAL_EXPORT_COLUMNS = [
+    Journal.id, Journal.trade_id, Journal.trading_plan_id, Journal.notes,
+    Journal.emotions, Journal.market_conditions, Journal.plan_adherence,
+    Journal.images, Journal.created_at, Journal.updated_at
+]
+
+# Rows fetched per round trip and per Parquet row group
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _plain(value):
+    """Convert a column value to a JSON/CSV friendly scalar"""
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_cell(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return _plain(value)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each write"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ExportService:
+
+    @staticmethod
+    def media_type(fmt):
+        if fmt not in EXPORT_FORMATS:
+            raise ExportFormatError(f"Unsupported export format: {fmt}")
+        return EXPORT_FORMATS[fmt]
+
+    @staticmethod
+    def trades_query(user_id, filters=None):
+        stmt = TradeService.user_trades_query(user_id,
+                                              filters,
+                                              columns=TRADE_EXPORT_COLUMNS)
+        return stmt.order_by(Trade.entry_time, Trade.id)
+
+    @staticmethod
+    def journal_query(user_id, trading_plan_id=None):
+        plan_ids = select(
+            TradingPlan.id).where(TradingPlan.user_id == user_id)
+        stmt = select(*JOURNAL_EXPORT_COLUMNS).where(
+            Journal.trading_plan_id.in_(plan_ids))
+        if trading_plan_id is not None:
+            stmt = stmt.where(Journal.trading_plan_id == trading_plan_id)
+        return stmt.order_by(Journal.created_at, Journal.id)
+
+    @staticmethod
+    def iter_chunks(stmt, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Execute a statement with a server-side cursor and yield row chunks
+        Only one chunk of rows is held in memory at a time.
+        """
+        result = db.session.execute(
+            stmt.execution_options(yield_per=chunk_size, stream_results=True))
+        try:
+            for partition in result.partitions(chunk_size):
+                yield partition
+        finally:
+            result.close()
+
+    @classmethod
+    def stream(cls, stmt, fmt, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Serialize a column select lazily
+        Args:
+            stmt: Core select of plain columns
+            fmt: 'csv', 'ndjson' or 'parquet'
+            chunk_size: Rows per fetch/serialization chunk
+        Returns:
+            Generator of str (csv/ndjson) or bytes (parquet) chunks
+        """
+        cls.media_type(fmt)
+        columns = [column.key for column in stmt.selected_columns]
+        chunks = cls.iter_chunks(stmt, chunk_size)
+        if fmt == 'csv':
+            return cls._stream_csv(columns, chunks)
+        if fmt == 'ndjson':
+            return cls._stream_ndjson(columns, chunks)
+        return cls._stream_parquet(stmt, columns, chunks)
+
+    @staticmethod
+    def _stream_csv(columns, chunks):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for rows in chunks:
+            writer.writerows([_csv_cell(value) for value in row]
+                             for row in rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    @staticmethod
+    def _stream_ndjson(columns, chunks):
+        for rows in chunks:
+            yield ''.join(
+                json.dumps(dict(zip(columns, map(_plain, row)))) + '\n'
+                for row in rows)
+
+    @staticmethod
+    def _parquet_schema(stmt, pa):
+        fields = []
+        for column in stmt.selected_columns:
+            python_type = None
+            try:
+                python_type = column.type.python_type
+            except NotImplementedError:
+                pass
+            if python_type is datetime:
+                arrow_type = pa.timestamp('us')
+            elif python_type is bool:
+                arrow_type = pa.bool_()
+            elif python_type is int:
+                arrow_type = pa.int64()
+            else:
+                # Ids, Decimals (kept exact) and JSON are exported as text
+                arrow_type = pa.string()
+            fields.append(pa.field(column.key, arrow_type))
+        return pa.schema(fields)
+
+    @classmethod
+    def _stream_parquet(cls, stmt, columns, chunks):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ExportFormatError(
+                "Parquet export requires pyarrow to be installed") from e
+
+        schema = cls._parquet_schema(stmt, pa)
+        text_columns = {
+            field.name
+            for field in schema if pa.types.is_string(field.type)
+        }
+
+        def generate():
+            sink = _ChunkSink()
+            writer = pq.ParquetWriter(sink, schema)
+            try:
+                for rows in chunks:
+                    data = {}
+                    for index, name in enumerate(columns):
+                        values = [row[index] for row in rows]
+                        if name in text_columns:
+                            values = [
+                                json.dumps(v) if isinstance(v, (dict, list))
+                                else None if v is None else str(v)
+                                for v in values
+                            ]
+                        data[name] = values
+                    # One row group per chunk keeps writer memory bounded
+                    writer.write_table(pa.table(data, schema=schema))
+                    yield sink.drain()
+            finally:
+                writer.close()
+            yield sink.drain()
+
+        return generate()
@@ -0,0 +1,354 @@
+import threading
+from flask import current_app, has_app_context
+from redis.exceptions import RedisError
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+from app import db, socketio
+from app.models.trade import Trade
+
+LIVE_NAMESPACE = '/live'
+DEFAULT_FRAME_INTERVAL = 0.1
+
+# Shared between server processes: subscriber counts per plan, plans that
+# need a full snapshot, and per-plan versions bumped by trade commits
+SUBSCRIBERS_KEY = 'live:subscribers'
+RESYNC_KEY = 'live:resync'
+VERSIONS_KEY = 'live:plan_versions'
+PENDING_PLANS_KEY = 'live_pending_plans'
+
+# Rounding applied before comparing values, so float noise is not a change
+PNL_PLACES = 8
+
+
+def plan_room(plan_id):
+    return f'plan:{plan_id}'
+
+
+def _round(value):
+    return None if value is None else round(float(value), PNL_PLACES)
+
+
+class LiveBook:
+    """
+    Open positions of the watched plans, priced from the latest ticks.
+    Ticks only record the last price of a symbol; a frame then reprices
+    the plans holding the symbols that moved and reports only the fields
+    that changed since the previous frame.
+    """
+
+    def __init__(self):
+        self.prices = {}  # symbol -> last price
+        self.plans = {}  # plan_id -> {'realized_pnl', 'positions'}
+        self.by_symbol = {}  # symbol -> {plan_id}
+        self.sent = {}  # plan_id -> state as of the last frame
+        self.seq = {}  # plan_id -> frame counter
+        self._dirty_symbols = set()
+        self._dirty_plans = set()
+
+    def update_price(self, symbol, price):
+        """Record a tick; many ticks within a frame collapse into one"""
+        self.prices[symbol] = float(price)
+        self._dirty_symbols.add(symbol)
+
+    def load_plan(self, plan_id, positions, realized_pnl):
+        """
+        Replace a plan's open positions
+        Args:
+            positions: Iterable of (trade_id, symbol, entry_price,
+                       position_size, entry_fee)
+            realized_pnl: Net P&L of the plan's closed trades
+        """
+        self._unindex(plan_id)
+        self.plans[plan_id] = {
+            'realized_pnl': float(realized_pnl or 0),
+            'positions': {
+                str(trade_id): {
+                    'symbol': symbol,
+                    'entry_price': float(entry_price),
+                    'position_size': float(position_size),
+                    'entry_fee': float(entry_fee or 0),
+                }
+                for trade_id, symbol, entry_price, position_size, entry_fee in
+                positions
+            }
+        }
+        for position in self.plans[plan_id]['positions'].values():
+            self.by_symbol.setdefault(position['symbol'], set()).add(plan_id)
+        self._dirty_plans.add(plan_id)
+
+    def drop_plan(self, plan_id):
+        self._unindex(plan_id)
+        self.plans.pop(plan_id, None)
+        self.sent.pop(plan_id, None)
+        self.seq.pop(plan_id, None)
+        self._dirty_plans.discard(plan_id)
+
+    def _unindex(self, plan_id):
+        for plan_ids in self.by_symbol.values():
+            plan_ids.discard(plan_id)
+
+    def state(self, plan_id):
+        """Full priced state of a plan"""
+        plan = self.plans[plan_id]
+        positions = {}
+        unrealized = 0.0
+        for trade_id, position in plan['positions'].items():
+            price = self.prices.get(position['symbol'])
+            pnl = None
+            if price is not None:
+                # Negative position size denotes a short position
+                pnl = ((price - position['entry_price']) *
+                       position['position_size'] - position['entry_fee'])
+                unrealized += pnl
+            positions[trade_id] = {
+                'symbol': position['symbol'],
+                'position_size': _round(position['position_size']),
+                'entry_price': _round(position['entry_price']),
+                'price': _round(price),
+                'unrealized_pnl': _round(pnl),
+            }
+        return {
+            'positions': positions,
+            'equity': {
+                'realized_pnl': _round(plan['realized_pnl']),
+                'unrealized_pnl': _round(unrealized),
+                'equity': _round(plan['realized_pnl'] + unrealized),
+            }
+        }
+
+    def snapshot(self, plan_id):
+        """Full state message; later deltas are relative to it"""
+        state = self.state(plan_id)
+        self.sent[plan_id] = state
+        self.seq[plan_id] = self.seq.get(plan_id, 0) + 1
+        self._dirty_plans.discard(plan_id)
+        return {'plan_id': str(plan_id), 'seq': self.seq[plan_id], **state}
+
+    def frame(self):
+        """
+        Deltas for every plan touched since the previous frame
+        Returns:
+            List of (plan_id, delta). A delta holds only changed position
+            fields (all fields for new positions), the ids of positions no
+            longer open and the changed equity fields.
+        """
+        touched = set(self._dirty_plans)
+        for symbol in self._dirty_symbols:
+            touched.update(self.by_symbol.get(symbol, ()))
+        self._dirty_symbols.clear()
+        self._dirty_plans.clear()
+
+        deltas = []
+        for plan_id in sorted(touched, key=str):
+            if plan_id not in self.plans:
+                continue
+            previous = self.sent.get(plan_id)
+            if previous is None:
+                continue  # Waits for its snapshot
+            current = self.state(plan_id)
+            delta = {}
+
+            positions = {}
+            for trade_id, fields in current['positions'].items():
+                before = previous['positions'].get(trade_id, {})
+                changed = {
+                    key: value
+                    for key, value in fields.items()
+                    if key not in before or before[key] != value
+                }
+                if changed:
+                    positions[trade_id] = changed
+            if positions:
+                delta['positions'] = positions
+            closed = sorted(
+                set(previous['positions']) - set(current['positions']))
+            if closed:
+                delta['closed'] = closed
+            equity = {
+                key: value
+                for key, value in current['equity'].items()
+                if previous['equity'].get(key) != value
+            }
+            if equity:
+                delta['equity'] = equity
+
+            if delta:
+                self.sent[plan_id] = current
+                self.seq[plan_id] += 1
+                deltas.append((plan_id, {
+                    'plan_id': str(plan_id),
+                    'seq': self.seq[plan_id],
+                    **delta
+                }))
+        return deltas
+
+
+class LivePnLService:
+    """
+    Streams open-position P&L and plan equity to the /live namespace.
+    Subscriptions are counted in Redis so the publisher (one process
+    feeding ticks) knows which plans any server process is watching;
+    emits go through the Socket.IO message queue to every process.
+    """
+
+    _lock = threading.Lock()
+    _book = LiveBook()
+    _versions = {}  # plan_id -> trade version the book was loaded at
+
+    @staticmethod
+    def client():
+        return getattr(current_app, 'redis', None)
+
+    @staticmethod
+    def load_positions(plan_id):
+        """Open positions and realized net P&L of a plan"""
+        positions = db.session.execute(
+            select(Trade.id, Trade.symbol, Trade.entry_price,
+                   Trade.position_size, Trade.entry_fee).where(
+                       Trade.trading_plan_id == plan_id,
+                       Trade.exit_time.is_(None)).order_by(
+                           Trade.entry_time)).all()
+        realized = db.session.execute(
+            select(
+                func.sum((Trade.exit_price - Trade.entry_price) *
+                         Trade.position_size - Trade.entry_fee -
+                         func.coalesce(Trade.exit_fee, 0))).where(
+                             Trade.trading_plan_id == plan_id,
+                             Trade.exit_time.isnot(None),
+                             Trade.exit_price.isnot(None))).scalar()
+        return positions, realized or 0
+
+    @classmethod
+    def add_subscriber(cls, plan_id):
+        """Count a watcher of a plan and ask for a fresh snapshot"""
+        try:
+            pipeline = cls.client().pipeline()
+            pipeline.hincrby(SUBSCRIBERS_KEY, str(plan_id), 1)
+            pipeline.sadd(RESYNC_KEY, str(plan_id))
+            pipeline.execute()
+        except (AttributeError, RedisError):
+            current_app.logger.warning("Live subscription failed for %s",
+                                       plan_id)
+            return False
+        return True
+
+    @classmethod
+    def remove_subscriber(cls, plan_id):
+        try:
+            if cls.client().hincrby(SUBSCRIBERS_KEY, str(plan_id), -1) <= 0:
+                cls.client().hdel(SUBSCRIBERS_KEY, str(plan_id))
+        except (AttributeError, RedisError):
+            pass
+
+    @classmethod
+    def on_tick(cls, symbol, price):
+        """Feed a price tick; it is published with the next frame"""
+        with cls._lock:
+            cls._book.update_price(symbol, price)
+
+    @classmethod
+    def _sync(cls):
+        """Align the book with the shared subscriptions; returns the plans
+        that need a snapshot"""
+        pipeline = cls.client().pipeline()
+        pipeline.hgetall(SUBSCRIBERS_KEY)
+        pipeline.smembers(RESYNC_KEY)
+        pipeline.delete(RESYNC_KEY)
+        pipeline.hgetall(VERSIONS_KEY)
+        subscribers, resync, _, versions = pipeline.execute()
+
+        watched = {
+            field.decode()
+            for field, count in subscribers.items() if int(count) > 0
+        }
+        resync = {plan_id.decode() for plan_id in resync} & watched
+        versions = {
+            field.decode(): int(version)
+            for field, version in versions.items()
+        }
+
+        for plan_id in set(cls._book.plans) - watched:
+            cls._book.drop_plan(plan_id)
+            cls._versions.pop(plan_id, None)
+        for plan_id in watched:
+            version = versions.get(plan_id, 0)
+            if (plan_id not in cls._book.plans
+                    or cls._versions.get(plan_id) != version):
+                cls._book.load_plan(plan_id, *cls.load_positions(plan_id))
+                cls._versions[plan_id] = version
+            if plan_id not in cls._book.sent:
+                resync.add(plan_id)
+        return resync
+
+    @classmethod
+    def flush(cls):
+        """
+        Publish one frame: snapshots for new subscribers, then deltas
+        Returns:
+            Number of messages emitted
+        """
+        try:
+            with cls._lock:
+                resync = cls._sync()
+                messages = [('snapshot', plan_id, cls._book.snapshot(plan_id))
+                            for plan_id in sorted(resync)]
+                messages.extend(('delta', plan_id, delta)
+                                for plan_id, delta in cls._book.frame())
+        except RedisError:
+            current_app.logger.warning("Live P&L frame skipped")
+            return 0
+
+        for name, plan_id, payload in messages:
+            socketio.emit(name,
+                          payload,
+                          namespace=LIVE_NAMESPACE,
+                          to=plan_room(plan_id))
+        return len(messages)
+
+    @classmethod
+    def reset(cls):
+        """Forget all live state of this process"""
+        with cls._lock:
+            cls._book = LiveBook()
+            cls._versions = {}
+
+
+def _collect_plans(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        # A trade moved between plans changes both of them
+        plan_ids = {target.trading_plan_id}
+        plan_ids.update(inspect(target).attrs.trading_plan_id.history.deleted)
+        session.info.setdefault(PENDING_PLANS_KEY, set()).update(
+            str(plan_id) for plan_id in plan_ids if plan_id is not None)
+
+
+def _bump_committed(session):
+    # Tell the publisher to reload the plans whose trades changed
+    plan_ids = session.info.pop(PENDING_PLANS_KEY, None)
+    if (not plan_ids or not has_app_context()
+            or not current_app.config.get('LIVE_PNL_ENABLED', False)):
+        return
+    try:
+        pipeline = LivePnLService.client().pipeline()
+        for plan_id in sorted(plan_ids):
+            pipeline.hincrby(VERSIONS_KEY, plan_id, 1)
+        pipeline.execute()
+    except (AttributeError, RedisError):
+        pass
+
+
+def _discard_pending(session, previous_transaction):
+    session.info.pop(PENDING_PLANS_KEY, None)
+
+
+def register_live_listeners():
+    """Hook trade changes to live book reloads (idempotent)"""
+    for name in ('after_insert', 'after_update', 'after_delete'):
+        if not event.contains(Trade, name, _collect_plans):
+            event.listen(Trade, name, _collect_plans)
+    if not event.contains(db.session, 'after_commit', _bump_committed):
+        event.listen(db.session, 'after_commit', _bump_committed)
+    if not event.contains(db.session, 'after_soft_rollback',
+                          _discard_pending):
+        event.listen(db.session, 'after_soft_rollback', _discard_pending)
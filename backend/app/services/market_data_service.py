@@ -0,0 +1,333 @@
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import numpy as np
+from flask import current_app
+from app.utils.timeframes import (normalize_symbol, normalize_timeframe,
+                                  timeframe_seconds)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Column name -> on-disk dtype. 'time' is the bar open time in epoch seconds
+CANDLE_COLUMNS = {
+    'time': np.dtype('<i8'),
+    'open': np.dtype('<f8'),
+    'high': np.dtype('<f8'),
+    'low': np.dtype('<f8'),
+    'close': np.dtype('<f8'),
+    'volume': np.dtype('<f8'),
+}
+
+# Higher timeframes are resampled from this one when not stored natively
+BASE_TIMEFRAME = '1m'
+# Cache of resampled series, a MarketDataStore of its own under the root
+RESAMPLED_DIR = '.resampled'
+
+
+def to_epoch_seconds(value):
+    """Convert a datetime, datetime64 or number to epoch seconds"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    if isinstance(value, np.datetime64):
+        return int(value.astype('datetime64[s]').astype(np.int64))
+    return int(value)
+
+
+def resample_candles(candles, seconds):
+    """
+    Aggregate time-ordered candles into `seconds`-long bars
+    Bars are aligned to the epoch (UTC midnight for 1d); buckets without
+    candles produce no bar.
+    Returns:
+        dict of column name -> new array
+    """
+    times = np.asarray(candles['time'])
+    if not len(times):
+        return {
+            column: np.empty(0, dtype=dtype)
+            for column, dtype in CANDLE_COLUMNS.items()
+        }
+    buckets = times // seconds * seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(times)] - 1
+    return {
+        'time': buckets[starts].astype(CANDLE_COLUMNS['time']),
+        'open': np.asarray(candles['open'])[starts],
+        'high': np.maximum.reduceat(candles['high'], starts),
+        'low': np.minimum.reduceat(candles['low'], starts),
+        'close': np.asarray(candles['close'])[ends],
+        'volume': np.add.reduceat(candles['volume'], starts),
+    }
+
+
+class MarketDataStore:
+    """
+    Append-only OHLCV store with one binary file per column, laid out as
+    <root>/<SYMBOL>/<timeframe>/<column>.bin. Reads return numpy.memmap
+    slices so a range query never copies candle data.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._maps = {}  # path -> (length, memmap)
+        self._resampled = None
+
+    @classmethod
+    def from_config(cls):
+        """Build a store rooted at the app's MARKET_DATA_DIR"""
+        return cls(current_app.config['MARKET_DATA_DIR'])
+
+    def series_path(self, symbol, timeframe):
+        return os.path.join(self.root, normalize_symbol(symbol),
+                            normalize_timeframe(timeframe))
+
+    def _column_path(self, symbol, timeframe, column):
+        return os.path.join(self.series_path(symbol, timeframe),
+                            f'{column}.bin')
+
+    def length(self, symbol, timeframe):
+        """Number of complete candles stored for a series"""
+        lengths = []
+        for column, dtype in CANDLE_COLUMNS.items():
+            path = self._column_path(symbol, timeframe, column)
+            if not os.path.exists(path):
+                return 0
+            lengths.append(os.path.getsize(path) // dtype.itemsize)
+        # A partially written append is ignored until all columns match
+        return min(lengths)
+
+    def _column(self, symbol, timeframe, column, length):
+        path = self._column_path(symbol, timeframe, column)
+        cached = self._maps.get(path)
+        if cached is not None and cached[0] == length:
+            return cached[1]
+        if length == 0:
+            return np.empty(0, dtype=CANDLE_COLUMNS[column])
+
+        data = np.memmap(path,
+                         dtype=CANDLE_COLUMNS[column],
+                         mode='r',
+                         shape=(length, ))
+        self._maps[path] = (length, data)
+        return data
+
+    def last_time(self, symbol, timeframe):
+        """Open time of the newest stored candle, or None"""
+        length = self.length(symbol, timeframe)
+        if not length:
+            return None
+        return int(self._column(symbol, timeframe, 'time', length)[-1])
+
+    def append(self, symbol, timeframe, candles):
+        """
+        Append candles to a series
+        Appends to one series are serialized across processes with a
+        file lock; columns left uneven by a crashed append are cut back
+        to the last complete candle first.
+        Args:
+            symbol: Instrument symbol, e.g. 'EURUSD'
+            timeframe: Bar timeframe, e.g. '1m' or 'H1'
+            candles: Mapping of column name -> array-like, all of equal
+                     length; 'time' must be strictly increasing and newer
+                     than the last stored candle
+        Returns:
+            Number of candles appended
+        """
+        missing = set(CANDLE_COLUMNS) - set(candles)
+        if missing:
+            raise ValueError(f"Candles missing columns: {sorted(missing)}")
+
+        times = np.asarray(candles['time'])
+        if np.issubdtype(times.dtype, np.datetime64):
+            times = times.astype('datetime64[s]').astype(np.int64)
+        arrays = {'time': np.ascontiguousarray(times, dtype='<i8')}
+        for column, dtype in CANDLE_COLUMNS.items():
+            if column != 'time':
+                arrays[column] = np.ascontiguousarray(candles[column],
+                                                      dtype=dtype)
+
+        count = len(arrays['time'])
+        if any(len(values) != count for values in arrays.values()):
+            raise ValueError("Candle columns must have equal length")
+        if count == 0:
+            return 0
+        if count > 1 and np.any(np.diff(arrays['time']) <= 0):
+            raise ValueError("Candle times must be strictly increasing")
+
+        with self._locked(symbol, timeframe):
+            self._write(symbol, timeframe, arrays)
+
+        # Roll new base candles into the resampled series already cached
+        if normalize_timeframe(timeframe) == BASE_TIMEFRAME:
+            for derived in self.resampled.timeframes(symbol):
+                self.refresh_resampled(symbol, derived)
+        return count
+
+    def _write(self, symbol, timeframe, arrays):
+        # Callers hold the series lock
+        length = self.length(symbol, timeframe)
+        last = (int(self._column(symbol, timeframe, 'time', length)[-1])
+                if length else None)
+        if last is not None and arrays['time'][0] <= last:
+            raise ValueError("Candles overlap the stored series; the store "
+                             "is append-only")
+
+        # Drop the tail of an append that crashed part way, so every
+        # column continues from the same row
+        for column, dtype in CANDLE_COLUMNS.items():
+            path = self._column_path(symbol, timeframe, column)
+            if (os.path.exists(path)
+                    and os.path.getsize(path) != length * dtype.itemsize):
+                os.truncate(path, length * dtype.itemsize)
+
+        # 'time' is written last so readers never see a bar whose prices
+        # are still being written
+        for column in list(CANDLE_COLUMNS)[1:] + ['time']:
+            path = self._column_path(symbol, timeframe, column)
+            with open(path, 'ab') as handle:
+                handle.write(arrays[column].tobytes())
+
+    def read(self, symbol, timeframe, start=None, end=None):
+        """
+        Read candles with start <= time < end without copying
+        Args:
+            start: Inclusive lower bound (datetime, datetime64 or epoch)
+            end: Exclusive upper bound
+        Returns:
+            dict of column name -> read-only numpy array view
+        """
+        length = self.length(symbol, timeframe)
+        times = self._column(symbol, timeframe, 'time', length)
+
+        lo = 0 if start is None else int(
+            np.searchsorted(times, to_epoch_seconds(start), side='left'))
+        hi = length if end is None else int(
+            np.searchsorted(times, to_epoch_seconds(end), side='left'))
+
+        return {
+            column: self._column(symbol, timeframe, column, length)[lo:hi]
+            for column in CANDLE_COLUMNS
+        }
+
+    def series(self):
+        """List stored (symbol, timeframe) pairs"""
+        if not os.path.isdir(self.root):
+            return []
+        pairs = []
+        for symbol in sorted(os.listdir(self.root)):
+            symbol_dir = os.path.join(self.root, symbol)
+            if symbol.startswith('.') or not os.path.isdir(symbol_dir):
+                continue
+            for timeframe in sorted(os.listdir(symbol_dir)):
+                pairs.append((symbol, timeframe))
+        return pairs
+
+    def timeframes(self, symbol):
+        """Timeframes stored for a symbol"""
+        symbol_dir = os.path.join(self.root, normalize_symbol(symbol))
+        if not os.path.isdir(symbol_dir):
+            return []
+        return sorted(os.listdir(symbol_dir), key=timeframe_seconds)
+
+    @property
+    def resampled(self):
+        """Store holding the cached resampled series"""
+        if self._resampled is None:
+            self._resampled = MarketDataStore(
+                os.path.join(self.root, RESAMPLED_DIR))
+        return self._resampled
+
+    @contextmanager
+    def _locked(self, symbol, timeframe):
+        # Serializes writes to a series between processes sharing the store
+        path = self.series_path(symbol, timeframe)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, '.lock'), 'a') as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def refresh_resampled(self, symbol, timeframe):
+        """
+        Extend a cached resampled series with the newer base candles
+        Only base candles after the last cached bar are read, and only
+        completed bars are cached; the bar still filling is rebuilt on
+        read.
+        Returns:
+            Number of bars appended to the cache
+        """
+        seconds = timeframe_seconds(timeframe)
+        base_seconds = timeframe_seconds(BASE_TIMEFRAME)
+        if seconds <= base_seconds or seconds % base_seconds:
+            raise ValueError(f"Cannot resample {BASE_TIMEFRAME} candles to "
+                             f"{timeframe}")
+
+        with self.resampled._locked(symbol, timeframe):
+            last = self.resampled.last_time(symbol, timeframe)
+            base = self.read(symbol,
+                             BASE_TIMEFRAME,
+                             start=None if last is None else last + seconds)
+            if not len(base['time']):
+                return 0
+            bars = resample_candles(base, seconds)
+            complete = (bars['time'] + seconds <=
+                        base['time'][-1] + base_seconds)
+            if not complete.any():
+                return 0
+            # Already under the cache series lock, so bypass append()
+            self.resampled._write(
+                symbol, timeframe,
+                {column: values[complete]
+                 for column, values in bars.items()})
+            return int(complete.sum())
+
+    def candles(self, symbol, timeframe, start=None, end=None, refresh=True):
+        """
+        Read a series, resampling it from 1m base candles when the
+        timeframe is not stored natively
+        Completed resampled bars come from the cache (views like read());
+        only the bar still filling is aggregated per call.
+        Args:
+            refresh: Update the cache first; pass False in workers that
+                     share a store another process keeps current
+        """
+        timeframe = normalize_timeframe(timeframe)
+        if (timeframe == BASE_TIMEFRAME or self.length(symbol, timeframe)
+                or not self.length(symbol, BASE_TIMEFRAME)):
+            return self.read(symbol, timeframe, start=start, end=end)
+
+        if refresh:
+            self.refresh_resampled(symbol, timeframe)
+        cached = self.resampled.read(symbol, timeframe, start=start, end=end)
+
+        seconds = timeframe_seconds(timeframe)
+        last = self.resampled.last_time(symbol, timeframe)
+        tail_start = None if last is None else last + seconds
+        if (end is not None and tail_start is not None
+                and to_epoch_seconds(end) <= tail_start):
+            return cached
+
+        tail = resample_candles(
+            self.read(symbol, BASE_TIMEFRAME, start=tail_start), seconds)
+        keep = np.ones(len(tail['time']), dtype=bool)
+        if start is not None:
+            keep &= tail['time'] >= to_epoch_seconds(start)
+        if end is not None:
+            keep &= tail['time'] < to_epoch_seconds(end)
+        if not keep.any():
+            return cached
+        return {
+            column: np.concatenate([cached[column], tail[column][keep]])
+            for column in CANDLE_COLUMNS
+        }
@@ -0,0 +1,174 @@
+import time
+import redis
+from flask import g, request
+from redis.exceptions import RedisError
+from sqlalchemy.pool import QueuePool
+from app.services.cache_service import CacheService
+from app.services.password_service import PasswordService
+from app.utils.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+# Requests that matched no route share one label value
+UNMATCHED_ENDPOINT = 'unmatched'
+
+
+class MetricsService:
+    """
+    Process-wide request, DB pool and Redis metrics, served in the
+    Prometheus text format. Every worker process keeps its own values;
+    scrape each worker (or sum them) like any multi-process exporter.
+    """
+
+    registry = MetricsRegistry()
+    request_latency = registry.register(
+        Histogram('http_request_duration_seconds',
+                  'Request latency by blueprint and endpoint.',
+                  ('blueprint', 'endpoint', 'method')))
+    requests = registry.register(
+        Counter('http_requests_total',
+                'Finished requests by blueprint, endpoint and status.',
+                ('blueprint', 'endpoint', 'method', 'status')))
+    in_flight = registry.register(
+        Gauge('http_requests_in_flight', 'Requests being served.',
+              ('blueprint', )))
+    pool_checkout = registry.register(
+        Histogram('db_pool_checkout_seconds',
+                  'Time to check a connection out of the DB pool.'))
+    redis_latency = registry.register(
+        Histogram('redis_command_duration_seconds',
+                  'Redis round-trip time by command.', ('command', )))
+    password_hash_tasks = registry.register(
+        Gauge('password_hash_tasks',
+              'Password hashing tasks by state (running or queued).',
+              ('state', )))
+    password_hash_rejected = registry.register(
+        Counter('password_hash_rejected_total',
+                'Password hashing requests rejected as saturated or timed '
+                'out.'))
+    cache_requests = registry.register(
+        Counter('cache_requests_total',
+                'Read-through cache lookups by namespace and outcome.',
+                ('namespace', 'outcome')))
+
+    @classmethod
+    def collect(cls):
+        """Copy the counts other services keep into their series"""
+        stats = PasswordService.stats()
+        cls.password_hash_tasks.set(stats['running'], 'running')
+        cls.password_hash_tasks.set(stats['queued'], 'queued')
+        cls.password_hash_rejected.set(stats['rejected'])
+        if not CacheService.enabled():
+            return
+        try:
+            # Shared by every worker, unlike the other series
+            for namespace, outcomes in CacheService.stats().items():
+                for outcome, count in outcomes.items():
+                    cls.cache_requests.set(count, namespace, outcome)
+        except RedisError:
+            pass
+
+    @classmethod
+    def render(cls):
+        cls.collect()
+        return cls.registry.render()
+
+    @classmethod
+    def reset(cls):
+        cls.registry.clear()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits"""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            MetricsService.pool_checkout.observe(time.perf_counter() -
+                                                 started)
+
+
+class TimedPipeline(redis.client.Pipeline):
+
+    def execute(self, raise_on_error=True):
+        started = time.perf_counter()
+        try:
+            return super().execute(raise_on_error)
+        finally:
+            MetricsService.redis_latency.observe(
+                time.perf_counter() - started, 'PIPELINE')
+
+
+class TimedRedis(redis.Redis):
+    """Redis client that records the round-trip time of every command"""
+
+    def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            MetricsService.redis_latency.observe(
+                time.perf_counter() - started, str(args[0]).upper())
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return TimedPipeline(self.connection_pool, self.response_callbacks,
+                             transaction, shard_hint)
+
+
+def _start_request():
+    blueprint = request.blueprint or 'app'
+    g.metrics_request = (time.perf_counter(), blueprint)
+    MetricsService.in_flight.inc(blueprint)
+
+
+def _observe(status):
+    started, blueprint = g.pop('metrics_request')
+    # One proxy lookup instead of one per attribute
+    current = request._get_current_object()
+    labels = (blueprint, current.endpoint or UNMATCHED_ENDPOINT,
+              current.method)
+    MetricsService.request_latency.observe(time.perf_counter() - started,
+                                           *labels)
+    MetricsService.requests.inc(*labels, str(status))
+    MetricsService.in_flight.dec(blueprint)
+
+
+def _after_request(response):
+    if 'metrics_request' in g:
+        _observe(response.status_code)
+    return response
+
+
+def _teardown_request(exc):
+    # Requests that raised past the error handlers skip after_request
+    if 'metrics_request' in g:
+        _observe(500)
+
+
+def configure_pool_metrics(app):
+    """
+    Time DB pool checkouts; must run before db.init_app builds engines
+    SQLite engines keep their own pool classes.
+    """
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    if app.config.get('METRICS_ENABLED', False) and not uri.startswith(
+            'sqlite'):
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        options.setdefault('poolclass', TimedQueuePool)
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def redis_client(app):
+    """Redis client of the app, timed when metrics are enabled"""
+    client_class = (TimedRedis
+                    if app.config.get('METRICS_ENABLED', False) else
+                    redis.Redis)
+    return client_class.from_url(app.config['REDIS_URL'])
+
+
+def register_metrics(app):
+    """Time every request of the app when METRICS_ENABLED is set"""
+    if app.config.get('METRICS_ENABLED', False):
+        app.before_request(_start_request)
+        app.after_request(_after_request)
+        app.teardown_request(_teardown_request)
@@ -0,0 +1,269 @@
+import itertools
+import os
+import random
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from flask import current_app
+from app import db
+from app.models.performance import Performance
+from app.services.backtest_service import (BacktestService, run_backtest,
+                                           rules_from_plan)
+from app.services.market_data_service import MarketDataStore
+from app.utils.timeframes import normalize_symbol
+
+# Metrics where a lower value ranks better
+ASCENDING_METRICS = {'max_drawdown'}
+# Ranked results stored as Performance rows unless keep_top says otherwise
+DEFAULT_KEEP_TOP = 20
+
+# Per-process candle cache: workers memory-map the store once and share the
+# pages read-only through the OS page cache
+_worker_candles = {}
+
+
+def grid_combinations(ranges):
+    """
+    Expand parameter ranges into every combination
+    Args:
+        ranges: Mapping of parameter -> list of values, or
+                {'start', 'stop', 'step'} (stop inclusive)
+    """
+    names = sorted(ranges)
+    axes = []
+    for name in names:
+        spec = ranges[name]
+        if isinstance(spec, dict):
+            step = spec.get('step', 1)
+            values = []
+            value = spec['start']
+            while value <= spec['stop']:
+                values.append(value)
+                value += step
+            axes.append(values)
+        else:
+            axes.append(list(spec))
+    return [dict(zip(names, combo)) for combo in itertools.product(*axes)]
+
+
+def random_combinations(ranges, samples, seed=None):
+    """
+    Draw random parameter sets
+    Args:
+        ranges: Mapping of parameter -> list of values, or {'min', 'max'}
+                (integers are drawn when both bounds are integers)
+        samples: Number of parameter sets
+        seed: Seed for reproducible sweeps
+    """
+    rng = random.Random(seed)
+    names = sorted(ranges)
+    combinations = []
+    for _ in range(samples):
+        combo = {}
+        for name in names:
+            spec = ranges[name]
+            if isinstance(spec, dict):
+                low, high = spec['min'], spec['max']
+                if isinstance(low, int) and isinstance(high, int):
+                    combo[name] = rng.randint(low, high)
+                else:
+                    combo[name] = rng.uniform(low, high)
+            else:
+                combo[name] = rng.choice(list(spec))
+        combinations.append(combo)
+    return combinations
+
+
+def load_candles(store_root, symbol, timeframe, start=None, end=None):
+    """Memory-map a candle range once per process"""
+    key = (store_root, symbol, timeframe, start, end)
+    candles = _worker_candles.get(key)
+    if candles is None:
+        # The parent refreshed any resampled series before fanning out
+        candles = MarketDataStore(store_root).candles(symbol,
+                                                      timeframe,
+                                                      start=start,
+                                                      end=end,
+                                                      refresh=False)
+        _worker_candles[key] = candles
+    return candles
+
+
+def evaluate_batch(source, base_parameters, rules, combinations):
+    """
+    Backtest a batch of parameter sets against one candle range
+    Args:
+        source: (store_root, symbol, timeframe, start, end)
+        base_parameters: Strategy.parameters the combinations override
+        rules: Output of rules_from_plan()
+        combinations: List of parameter overrides
+    Returns:
+        List of (combination, metrics) tuples
+    """
+    candles = load_candles(*source)
+    results = []
+    for combo in combinations:
+        parameters = dict(base_parameters or {}, **combo)
+        try:
+            metrics = run_backtest(candles, parameters, rules)['metrics']
+        except ValueError as e:
+            metrics = {'error': str(e)}
+        results.append((combo, metrics))
+    return results
+
+
+def _sort_key(metric):
+    descending = metric not in ASCENDING_METRICS
+
+    def key(item):
+        value = item[1].get('summary', {}).get(metric)
+        if value is None:
+            return (1, 0)
+        return (0, -value if descending else value)
+
+    return key
+
+
+class OptimizerService:
+
+    @staticmethod
+    def _batches(combinations, batch_size):
+        for i in range(0, len(combinations), batch_size):
+            yield combinations[i:i + batch_size]
+
+    @classmethod
+    def _run_process_pool(cls, source, base, rules, combinations,
+                          max_workers, batch_size):
+        if max_workers == 0:
+            for batch in cls._batches(combinations, batch_size):
+                yield evaluate_batch(source, base, rules, batch)
+            return
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(evaluate_batch, source, base, rules, batch)
+                for batch in cls._batches(combinations, batch_size)
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+
+    @classmethod
+    def _run_celery(cls, source, base, rules, combinations, batch_size):
+        from celery import group
+        from app.tasks.optimizer_tasks import evaluate_batch_task
+
+        job = group(
+            evaluate_batch_task.s(source, base, rules, batch)
+            for batch in cls._batches(combinations, batch_size))
+        for result in job.apply_async().results:
+            yield [tuple(item) for item in result.get()]
+
+    @classmethod
+    def optimize(cls,
+                 strategy,
+                 trading_plan,
+                 symbol,
+                 ranges,
+                 method='grid',
+                 samples=100,
+                 seed=None,
+                 metric='net_profit',
+                 timeframe=None,
+                 start=None,
+                 end=None,
+                 store=None,
+                 max_workers=None,
+                 batch_size=None,
+                 keep_top=DEFAULT_KEEP_TOP,
+                 persist=True,
+                 progress=None):
+        """
+        Sweep strategy parameters and rank the backtest results
+        Args:
+            strategy: Strategy whose parameters are the sweep baseline
+            trading_plan: Plan supplying the backtest rules
+            symbol: Instrument to test
+            ranges: Parameter ranges (see grid_combinations and
+                    random_combinations)
+            method: 'grid' or 'random'
+            samples: Number of random parameter sets
+            metric: Summary metric used for ranking
+            max_workers: Process count; 0 runs in-process
+            batch_size: Parameter sets per task (defaults to an even split
+                        of ~4 tasks per worker)
+            keep_top: Only store the best N results as Performance rows;
+                      None stores every result
+            persist: Commit Performance rows for the ranked results
+            progress: Optional callback(done, total) per finished batch
+        Returns:
+            (ranked, performances) where ranked is a list of dicts with
+            'rank', 'parameters' and 'metrics'
+        """
+        if method == 'grid':
+            combinations = grid_combinations(ranges)
+        elif method == 'random':
+            combinations = random_combinations(ranges, samples, seed=seed)
+        else:
+            raise ValueError(f"Unsupported optimization method: {method}")
+
+        store = store or MarketDataStore.from_config()
+        symbol = normalize_symbol(symbol)
+        timeframe = BacktestService.resolve_timeframe(strategy, trading_plan,
+                                                      timeframe)
+        # Bring a resampled series up to date once, before workers read it
+        store.candles(symbol, timeframe, start=start, end=end)
+        source = (os.path.abspath(store.root), symbol, timeframe, start, end)
+        base = strategy.parameters or {}
+        rules = rules_from_plan(trading_plan)
+
+        config = current_app.config
+        if max_workers is None:
+            max_workers = config.get('OPTIMIZER_MAX_WORKERS') or os.cpu_count()
+        if batch_size is None:
+            batch_size = max(1, len(combinations) // (max(max_workers, 1) * 4))
+
+        if config.get('OPTIMIZER_BACKEND') == 'celery':
+            batches = cls._run_celery(source, base, rules, combinations,
+                                      batch_size)
+        else:
+            batches = cls._run_process_pool(source, base, rules,
+                                             combinations, max_workers,
+                                             batch_size)
+
+        results = []
+        for batch in batches:
+            results.extend(batch)
+            if progress is not None:
+                progress(len(results), len(combinations))
+        results.sort(key=_sort_key(metric))
+
+        run_id = uuid.uuid4().hex[:8]
+        ranked = []
+        performances = []
+        for rank, (combo, metrics) in enumerate(results, start=1):
+            ranked.append({
+                'rank': rank,
+                'parameters': combo,
+                'metrics': metrics
+            })
+            if keep_top is not None and rank > keep_top:
+                continue
+            metrics = dict(metrics,
+                           optimization={
+                               'run_id': run_id,
+                               'rank': rank,
+                               'metric': metric,
+                               'method': method,
+                               'symbol': symbol,
+                               'parameters': combo,
+                           })
+            performances.append(
+                Performance(strategy_id=strategy.id,
+                            trading_plan_id=trading_plan.id,
+                            metrics=metrics,
+                            timeframe=timeframe,
+                            period=f'opt-{run_id}'))
+
+        if persist:
+            db.session.add_all(performances)
+            db.session.commit()
+        return ranked, performances
@@ -0,0 +1,143 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.models.mixins import DEFAULT_PASSWORD_METHOD
+from app.utils.exceptions import PasswordHashingBusyError
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_TIMEOUT = 5.0
+
+
+class PasswordService:
+    """
+    Runs password hashing on a bounded thread pool.
+    hashlib's PBKDF2 releases the GIL, so only `workers` hashes burn CPU at
+    once while request threads wait. At most `max_queue` more may wait;
+    beyond that callers get PasswordHashingBusyError instead of piling up.
+    """
+
+    _lock = threading.Lock()
+    _executor = None
+    _slots = None
+    _settings = None
+    _in_flight = 0
+    _running = 0
+    _rejected = 0
+
+    @staticmethod
+    def _config():
+        config = current_app.config
+        return (config.get('PASSWORD_HASH_WORKERS', DEFAULT_WORKERS),
+                config.get('PASSWORD_HASH_MAX_QUEUE', DEFAULT_MAX_QUEUE))
+
+    @classmethod
+    def _pool(cls):
+        settings = cls._config()
+        with cls._lock:
+            if cls._executor is None or cls._settings != settings:
+                if cls._executor is not None:
+                    cls._executor.shutdown(wait=False)
+                workers, max_queue = settings
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix='password-hash')
+                cls._slots = threading.BoundedSemaphore(workers + max_queue)
+                cls._settings = settings
+            return cls._executor, cls._slots
+
+    @classmethod
+    def method(cls):
+        """Hash method new and rehashed passwords should use"""
+        return current_app.config.get('PASSWORD_HASH_METHOD',
+                                      DEFAULT_PASSWORD_METHOD)
+
+    @classmethod
+    def _track(cls, attribute, delta):
+        with cls._lock:
+            setattr(cls, attribute, getattr(cls, attribute) + delta)
+
+    @classmethod
+    def _reject(cls, message):
+        cls._track('_rejected', 1)
+        stats = cls.stats()
+        current_app.logger.warning(
+            "%s: in_flight=%d running=%d queued=%d rejected=%d", message,
+            stats['in_flight'], stats['running'], stats['queued'],
+            stats['rejected'])
+        return PasswordHashingBusyError(message)
+
+    @classmethod
+    def _run(cls, func, *args):
+        executor, slots = cls._pool()
+        if not slots.acquire(blocking=False):
+            raise cls._reject("Password hashing is saturated")
+
+        def task():
+            cls._track('_running', 1)
+            try:
+                return func(*args)
+            finally:
+                cls._track('_running', -1)
+
+        def done(_):
+            cls._track('_in_flight', -1)
+            slots.release()
+
+        cls._track('_in_flight', 1)
+        try:
+            future = executor.submit(task)
+        except RuntimeError:
+            done(None)
+            raise
+        future.add_done_callback(done)
+
+        timeout = current_app.config.get('PASSWORD_HASH_TIMEOUT',
+                                         DEFAULT_TIMEOUT)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            # Drop the work if it has not started; its slot frees either way
+            future.cancel()
+            raise cls._reject("Password hashing timed out")
+
+    @classmethod
+    def hash_password(cls, password, method=None):
+        """
+        Hash a password on the hashing pool
+        Args:
+            password: Plain text password
+            method: Werkzeug hash method, defaults to PASSWORD_HASH_METHOD
+        Raises:
+            PasswordHashingBusyError: when the pool and queue are full
+        """
+        return cls._run(generate_password_hash, password, method or
+                        cls.method())
+
+    @classmethod
+    def verify_password(cls, password_hash, password):
+        """Check a password against a stored hash on the hashing pool"""
+        return cls._run(check_password_hash, password_hash, password)
+
+    @classmethod
+    def stats(cls):
+        """Current pool usage; queued is submitted work not yet running"""
+        with cls._lock:
+            workers, max_queue = cls._settings or (None, None)
+            return {
+                'workers': workers,
+                'max_queue': max_queue,
+                'in_flight': cls._in_flight,
+                'running': cls._running,
+                'queued': cls._in_flight - cls._running,
+                'rejected': cls._rejected,
+            }
+
+    @classmethod
+    def reset(cls):
+        """Shut the pool down and clear counters"""
+        with cls._lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=True)
+            cls._executor = cls._slots = cls._settings = None
+            cls._in_flight = cls._running = cls._rejected = 0
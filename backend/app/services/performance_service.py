@@ -0,0 +1,702 @@
+import math
+from datetime import datetime
+from itertools import islice, product
+import numpy as np
+from flask import current_app, has_app_context
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect, select
+from app import db
+from app.models.performance import Performance
+from app.models.strategy import Strategy
+from app.models.trade import Trade
+from app.models.trading_plan import TradingPlan
+from app.services.trade_analytics_service import TradeAnalyticsService
+
+# Key of the all-time rollup row maintained for every
+# (strategy_id, trading_plan_id) pair
+ROLLUP_TIMEFRAME = 'all'
+ROLLUP_PERIOD = 'all_time'
+
+# Trade writes either update rollups inline ('sync') or enqueue a
+# debounced background recompute ('async')
+ROLLUP_MODES = ('sync', 'async')
+DEFAULT_DEBOUNCE_SECONDS = 5
+PENDING_KEY_PREFIX = 'performance:pending'
+PENDING_RECOMPUTES_KEY = 'performance_pending_recomputes'
+
+TRADE_METRIC_FIELDS = ('strategy_id', 'trading_plan_id', 'entry_price',
+                       'exit_price', 'position_size', 'entry_fee', 'exit_fee',
+                       'exit_time')
+# Trade columns that decide which Performance rows a trade counts towards
+ROW_KEY_FIELDS = ('strategy_id', 'trading_plan_id', 'timeframe', 'exit_time')
+
+
+class PerformanceRollup:
+    """
+    Running aggregate of closed-trade results for one Performance row.
+    Every update is O(1): sums and counters for win rate/profit factor,
+    Welford mean/M2 of per-trade returns for the Sharpe ratio and a
+    running equity peak for drawdown.
+    """
+
+    def __init__(self, state=None):
+        state = state or {}
+        self.count = state.get('count', 0)
+        self.wins = state.get('wins', 0)
+        self.losses = state.get('losses', 0)
+        self.gross_profit = state.get('gross_profit', 0.0)
+        self.gross_loss = state.get('gross_loss', 0.0)
+        self.mean = state.get('mean', 0.0)
+        self.m2 = state.get('m2', 0.0)
+        self.equity = state.get('equity', 0.0)
+        self.peak = state.get('peak', 0.0)
+        self.max_drawdown = state.get('max_drawdown', 0.0)
+        self.last_exit_time = state.get('last_exit_time')
+        self.drawdown_exact = state.get('drawdown_exact', True)
+        self.monthly_returns = dict(state.get('monthly_returns', {}))
+
+    def add(self, net_pnl, return_pct, exit_time):
+        """Fold one closed trade into the rollup"""
+        self.count += 1
+        if net_pnl > 0:
+            self.wins += 1
+            self.gross_profit += net_pnl
+        elif net_pnl < 0:
+            self.losses += 1
+            self.gross_loss += -net_pnl
+
+        delta = return_pct - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (return_pct - self.mean)
+
+        self.equity += net_pnl
+        exit_iso = exit_time.isoformat()
+        if self.last_exit_time is None or exit_iso >= self.last_exit_time:
+            self.last_exit_time = exit_iso
+            self.peak = max(self.peak, self.equity)
+            self.max_drawdown = max(self.max_drawdown,
+                                    self.peak - self.equity)
+        else:
+            # Out-of-order fills change the equity path behind us
+            self.drawdown_exact = False
+
+        month = exit_time.strftime('%Y-%m')
+        self.monthly_returns[month] = self.monthly_returns.get(month,
+                                                               0.0) + net_pnl
+
+    def remove(self, net_pnl, return_pct, exit_time):
+        """Take one previously folded trade back out of the rollup"""
+        if self.count <= 1:
+            self.__init__()
+            return
+
+        if net_pnl > 0:
+            self.wins -= 1
+            self.gross_profit -= net_pnl
+        elif net_pnl < 0:
+            self.losses -= 1
+            self.gross_loss -= -net_pnl
+
+        # Reverse Welford update
+        previous_mean = (self.mean * self.count - return_pct) / (self.count -
+                                                                 1)
+        self.m2 -= (return_pct - self.mean) * (return_pct - previous_mean)
+        self.m2 = max(self.m2, 0.0)
+        self.mean = previous_mean
+        self.count -= 1
+
+        # A running peak cannot be unwound, so drawdown becomes an
+        # estimate until the next full recompute
+        self.equity -= net_pnl
+        self.drawdown_exact = False
+
+        month = exit_time.strftime('%Y-%m')
+        remaining = self.monthly_returns.get(month, 0.0) - net_pnl
+        if math.isclose(remaining, 0.0, abs_tol=1e-9):
+            self.monthly_returns.pop(month, None)
+        else:
+            self.monthly_returns[month] = remaining
+
+    def state(self):
+        return {
+            'count': self.count,
+            'wins': self.wins,
+            'losses': self.losses,
+            'gross_profit': self.gross_profit,
+            'gross_loss': self.gross_loss,
+            'mean': self.mean,
+            'm2': self.m2,
+            'equity': self.equity,
+            'peak': self.peak,
+            'max_drawdown': self.max_drawdown,
+            'last_exit_time': self.last_exit_time,
+            'drawdown_exact': self.drawdown_exact,
+            'monthly_returns': self.monthly_returns,
+        }
+
+    def summary(self):
+        variance = self.m2 / (self.count - 1) if self.count > 1 else 0.0
+        std = math.sqrt(variance)
+        return {
+            'total_trades': self.count,
+            'winning_trades': self.wins,
+            'losing_trades': self.losses,
+            'win_rate': (self.wins / self.count * 100.0
+                         if self.count else 0.0),
+            'profit_factor': (self.gross_profit / self.gross_loss
+                              if self.gross_loss else None),
+            'sharpe_ratio': self.mean / std if std else None,
+            'max_drawdown': self.max_drawdown,
+            'avg_win': self.gross_profit / self.wins if self.wins else 0.0,
+            'avg_loss': (self.gross_loss / self.losses
+                         if self.losses else 0.0),
+            'net_profit': self.equity,
+        }
+
+    def to_metrics(self):
+        return {
+            'summary': self.summary(),
+            'monthly_returns': dict(sorted(self.monthly_returns.items())),
+            'rollup': self.state(),
+        }
+
+
+class PerformanceService:
+
+    @staticmethod
+    def trade_contribution(values):
+        """
+        Compute the rollup contribution of a single trade
+        Args:
+            values: Mapping of trade column name -> value
+        Returns:
+            (net_pnl, return_pct, exit_time) or None for open trades
+        """
+        if values.get('exit_price') is None or values.get(
+                'exit_time') is None:
+            return None
+
+        entry = float(values['entry_price'])
+        size = float(values['position_size'])
+        fees = float(values.get('entry_fee') or 0) + float(
+            values.get('exit_fee') or 0)
+        net = (float(values['exit_price']) - entry) * size - fees
+        notional = abs(entry * size)
+        return_pct = net / notional * 100.0 if notional else 0.0
+        return net, return_pct, values['exit_time']
+
+    @staticmethod
+    def get_row(strategy_id, trading_plan_id, timeframe, period, create=True):
+        """Fetch (or create) the Performance row for a key"""
+        with db.session.no_autoflush:
+            performance = Performance.query.filter_by(
+                strategy_id=strategy_id,
+                trading_plan_id=trading_plan_id,
+                timeframe=timeframe,
+                period=period).first()
+        if performance is None and create:
+            performance = Performance(strategy_id=strategy_id,
+                                      trading_plan_id=trading_plan_id,
+                                      timeframe=timeframe,
+                                      period=period,
+                                      metrics=PerformanceRollup().to_metrics())
+            db.session.add(performance)
+        return performance
+
+    @classmethod
+    def get_rollup_row(cls, strategy_id, trading_plan_id, create=True):
+        """Fetch (or create) the all-time Performance row for a pair"""
+        return cls.get_row(strategy_id, trading_plan_id, ROLLUP_TIMEFRAME,
+                           ROLLUP_PERIOD, create)
+
+    @staticmethod
+    def period_bounds(period):
+        """
+        Exit-time range covered by a trade-derived period
+        Args:
+            period: 'all_time', 'YYYY' or 'YYYY-MM'
+        Returns:
+            (start, end) datetimes, end exclusive; None means unbounded
+        Raises:
+            ValueError: for periods not derived from trades (backtests etc.)
+        """
+        if period == ROLLUP_PERIOD:
+            return None, None
+        try:
+            if len(period) == 4:
+                start = datetime(int(period), 1, 1)
+                return start, start.replace(year=start.year + 1)
+            if len(period) == 7 and period[4] == '-':
+                start = datetime(int(period[:4]), int(period[5:]), 1)
+                if start.month == 12:
+                    return start, start.replace(year=start.year + 1, month=1)
+                return start, start.replace(month=start.month + 1)
+        except ValueError:
+            pass
+        raise ValueError(f"Period {period!r} is not derived from trades")
+
+    @classmethod
+    def is_derived_key(cls, timeframe, period):
+        try:
+            cls.period_bounds(period)
+        except ValueError:
+            return False
+        return True
+
+    @classmethod
+    def recompute_key(cls,
+                      strategy_id,
+                      trading_plan_id,
+                      timeframe=ROLLUP_TIMEFRAME,
+                      period=ROLLUP_PERIOD,
+                      commit=True):
+        """
+        Rebuild one Performance row from the closed trades it covers
+        Args:
+            timeframe: 'all' or a trade timeframe to restrict to
+            period: 'all_time', 'YYYY' or 'YYYY-MM' (by exit_time)
+        """
+        if (timeframe, period) == (ROLLUP_TIMEFRAME, ROLLUP_PERIOD):
+            return cls.recompute(strategy_id, trading_plan_id, commit)
+
+        start, end = cls.period_bounds(period)
+        columns = TradeAnalyticsService.load_closed_trades(
+            trading_plan_id=trading_plan_id,
+            strategy_id=strategy_id,
+            timeframe=None if timeframe == ROLLUP_TIMEFRAME else timeframe,
+            start=start,
+            end=end)
+        performance = cls.get_row(strategy_id, trading_plan_id, timeframe,
+                                  period)
+        performance.metrics = cls.rollup_from_columns(columns).to_metrics()
+        if commit:
+            db.session.commit()
+        return performance
+
+    @staticmethod
+    def rollup_mode():
+        mode = current_app.config.get('PERFORMANCE_ROLLUP_MODE', 'sync')
+        if mode not in ROLLUP_MODES:
+            raise ValueError(f"Unknown PERFORMANCE_ROLLUP_MODE: {mode}")
+        return mode
+
+    @staticmethod
+    def pending_key(key):
+        return ':'.join([PENDING_KEY_PREFIX] + [str(part) for part in key])
+
+    @classmethod
+    def schedule_recompute(cls, keys):
+        """
+        Enqueue background recomputes, coalescing repeated requests
+        The first request for a key sets a Redis marker and schedules the
+        task after the debounce window; later requests inside the window
+        find the marker and are dropped. The task clears the marker before
+        reading trades, so edits made while it runs schedule a new pass.
+        Args:
+            keys: Iterable of (strategy_id, trading_plan_id, timeframe,
+                  period)
+        Returns:
+            Number of tasks enqueued
+        """
+        from app.tasks.analysis_tasks import recompute_performance_task
+
+        window = current_app.config.get('PERFORMANCE_RECOMPUTE_DEBOUNCE',
+                                        DEFAULT_DEBOUNCE_SECONDS)
+        client = getattr(current_app, 'redis', None)
+        scheduled = 0
+        for key in sorted(set(keys), key=str):
+            try:
+                if client is not None and not client.set(
+                        cls.pending_key(key), 1, nx=True, ex=window + 60):
+                    continue
+            except RedisError:
+                pass  # Without Redis every request is scheduled
+            try:
+                recompute_performance_task.apply_async(
+                    args=[str(part) for part in key], countdown=window)
+                scheduled += 1
+            except Exception:
+                # Analytics must never fail the trade write that caused it;
+                # drop the marker so the next write can schedule again
+                cls.clear_pending(key)
+                current_app.logger.exception(
+                    "Could not schedule performance recompute for %s", key)
+        return scheduled
+
+    @classmethod
+    def clear_pending(cls, key):
+        client = getattr(current_app, 'redis', None)
+        if client is None:
+            return
+        try:
+            client.delete(cls.pending_key(key))
+        except RedisError:
+            pass
+
+    @staticmethod
+    def row_keys(strategy_id, trading_plan_id, timeframe, exit_time):
+        """
+        Keys of every Performance row a closed trade counts towards: the
+        rollup plus its timeframe, each crossed with all-time, its year
+        and its month
+        """
+        timeframes = {ROLLUP_TIMEFRAME, timeframe} - {None}
+        return {(strategy_id, trading_plan_id, row_timeframe, period)
+                for row_timeframe in timeframes
+                for period in _period_keys(exit_time)}
+
+    @classmethod
+    def refresh_keys(cls, keys):
+        """
+        Bring Performance rows up to date after writes that bypassed the
+        ORM. 'async' schedules every key; 'sync' recomputes the all-time
+        rollup of each pair, the only row it maintains.
+        Args:
+            keys: Iterable of (strategy_id, trading_plan_id, timeframe,
+                  period)
+        """
+        keys = {key for key in keys if key[0] is not None}
+        if cls.rollup_mode() == 'async':
+            cls.schedule_recompute(keys)
+            return
+        for strategy_id, plan_id in {key[:2] for key in keys}:
+            cls.recompute(strategy_id, plan_id)
+
+    @classmethod
+    def account_keys(cls, user_id):
+        """
+        Every trade-derived Performance key of a user's account: the
+        rollup of each pair with closed trades plus existing derived rows
+        """
+        plan_ids = select(
+            TradingPlan.id).where(TradingPlan.user_id == user_id)
+        pairs = db.session.execute(
+            select(Trade.strategy_id, Trade.trading_plan_id).where(
+                Trade.trading_plan_id.in_(plan_ids),
+                Trade.strategy_id.isnot(None),
+                Trade.exit_time.isnot(None)).distinct()).all()
+        keys = {(strategy_id, plan_id, ROLLUP_TIMEFRAME, ROLLUP_PERIOD)
+                for strategy_id, plan_id in pairs}
+
+        rows = db.session.execute(
+            select(Performance.strategy_id, Performance.trading_plan_id,
+                   Performance.timeframe, Performance.period).where(
+                       Performance.trading_plan_id.in_(plan_ids))).all()
+        keys.update(
+            tuple(row) for row in rows if cls.is_derived_key(*row[2:]))
+        return sorted(keys, key=str)
+
+    @classmethod
+    def rebuild_account(cls, user_id, chunk_size=50):
+        """
+        Recompute every trade-derived row of an account on the workers
+        Keys are fanned out in chunks with a Celery chord; the callback
+        reports how many rows were rebuilt.
+        Returns:
+            AsyncResult of the chord callback
+        """
+        from celery import chord
+        from app.tasks.analysis_tasks import (recompute_chunk_task,
+                                              rebuild_complete_task)
+
+        keys = iter(cls.account_keys(user_id))
+        chunks = []
+        while True:
+            chunk = [[str(part) for part in key]
+                     for key in islice(keys, chunk_size)]
+            if not chunk:
+                break
+            chunks.append(recompute_chunk_task.s(chunk))
+
+        callback = rebuild_complete_task.s(str(user_id))
+        if not chunks:
+            return callback.apply_async(args=[[]])
+        return chord(chunks)(callback)
+
+    @classmethod
+    def recompute(cls, strategy_id, trading_plan_id, commit=True):
+        """
+        Rebuild the rollup from all closed trades of the pair.
+        This is the verification/repair path for the incremental updates.
+        """
+        columns = TradeAnalyticsService.load_closed_trades(
+            trading_plan_id=trading_plan_id, strategy_id=strategy_id)
+        rollup = cls.rollup_from_columns(columns)
+
+        performance = cls.get_rollup_row(strategy_id, trading_plan_id)
+        performance.metrics = rollup.to_metrics()
+        if commit:
+            db.session.commit()
+        return performance
+
+    @staticmethod
+    def rollup_from_columns(columns):
+        """Build a rollup from columnar trades in one vectorized pass"""
+        rollup = PerformanceRollup()
+        if not len(columns['id']):
+            return rollup
+
+        pnl = TradeAnalyticsService.compute_pnl(columns)
+        net = pnl['net_pnl']
+        returns = np.nan_to_num(pnl['return_pct'])
+
+        rollup.count = int(net.size)
+        rollup.wins = int((net > 0).sum())
+        rollup.losses = int((net < 0).sum())
+        rollup.gross_profit = float(net[net > 0].sum())
+        rollup.gross_loss = float(-net[net < 0].sum())
+        rollup.mean = float(returns.mean())
+        rollup.m2 = float(((returns - returns.mean())**2).sum())
+
+        equity = np.cumsum(net)
+        peak = np.maximum(np.maximum.accumulate(equity), 0.0)
+        rollup.equity = float(equity[-1])
+        rollup.peak = float(peak[-1])
+        rollup.max_drawdown = float((peak - equity).max())
+        rollup.last_exit_time = columns['exit_time'][-1].item().isoformat()
+        rollup.drawdown_exact = True
+
+        months = columns['exit_time'].astype('datetime64[M]')
+        unique_months, inverse = np.unique(months, return_inverse=True)
+        totals = np.bincount(inverse, weights=net)
+        rollup.monthly_returns = {
+            str(month): float(total)
+            for month, total in zip(unique_months, totals)
+        }
+        return rollup
+
+    @classmethod
+    def verify(cls, strategy_id, trading_plan_id, rel_tol=1e-6):
+        """Check the stored rollup against a full recompute"""
+        performance = cls.get_rollup_row(strategy_id,
+                                         trading_plan_id,
+                                         create=False)
+        stored = PerformanceRollup(
+            (performance.metrics or {}).get('rollup') if performance else
+            None).summary()
+        columns = TradeAnalyticsService.load_closed_trades(
+            trading_plan_id=trading_plan_id, strategy_id=strategy_id)
+        expected = cls.rollup_from_columns(columns).summary()
+
+        for key, value in expected.items():
+            actual = stored.get(key)
+            if value is None or actual is None:
+                if value != actual:
+                    return False
+            elif not math.isclose(actual, value, rel_tol=rel_tol,
+                                  abs_tol=1e-9):
+                return False
+        return True
+
+    @staticmethod
+    def dashboard(trading_plan_id):
+        """Performance rows of a plan, grouped for the dashboard"""
+        performances = Performance.query.filter_by(
+            trading_plan_id=trading_plan_id).order_by(
+                Performance.strategy_id, Performance.timeframe,
+                Performance.period).all()
+        return {
+            'trading_plan_id': str(trading_plan_id),
+            'rollups': [
+                p.to_dict() for p in performances
+                if p.timeframe == ROLLUP_TIMEFRAME
+                and p.period == ROLLUP_PERIOD
+            ],
+            'performances': [
+                p.to_dict() for p in performances
+                if not (p.timeframe == ROLLUP_TIMEFRAME
+                        and p.period == ROLLUP_PERIOD)
+            ],
+        }
+
+
+def _trade_values(trade, committed):
+    """Read trade column values, either current or as last flushed"""
+    state = inspect(trade)
+    values = {}
+    for key in TRADE_METRIC_FIELDS:
+        if not committed:
+            values[key] = getattr(trade, key)
+            continue
+        history = state.attrs[key].history
+        if history.deleted:
+            values[key] = history.deleted[0]
+        elif history.unchanged:
+            values[key] = history.unchanged[0]
+        elif history.added:
+            # Value replaced before the previous one was ever loaded
+            return None
+        else:
+            # Expired and untouched: loading it yields the stored value
+            values[key] = getattr(trade, key)
+    return values
+
+
+def _period_keys(exit_time):
+    """Trade-derived periods a trade closed at exit_time counts towards"""
+    return (ROLLUP_PERIOD, f'{exit_time:%Y}', f'{exit_time:%Y-%m}')
+
+
+def _row_key_values(session, trade):
+    """Current and previous values of the columns keying a trade's rows"""
+    attrs = inspect(trade).attrs
+    values = {}
+    unknown = False
+    for key in ROW_KEY_FIELDS:
+        history = attrs[key].history
+        values[key] = {getattr(trade, key)}
+        values[key].update(history.deleted)
+        # Replaced before the old value was ever loaded
+        if history.added and not (history.deleted or history.unchanged):
+            unknown = unknown or trade not in session.new
+    if unknown:
+        # Still the stored row: before_flush runs ahead of the UPDATE
+        stored = session.execute(
+            select(*(getattr(Trade, key) for key in ROW_KEY_FIELDS)).where(
+                Trade.id == trade.id)).one_or_none()
+        for key, value in zip(ROW_KEY_FIELDS, stored or ()):
+            values[key].add(value)
+    return values
+
+
+def _collect_recompute_keys(session):
+    """Remember the Performance rows touched by pending trade writes"""
+    keys = set()
+    for obj in session.new | session.dirty | session.deleted:
+        if not isinstance(obj, Trade):
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        # Old and new values both matter when a trade moves between rows
+        values = _row_key_values(session, obj)
+        for strategy_id, plan_id, timeframe, exit_time in product(
+                *(values[key] for key in ROW_KEY_FIELDS)):
+            # Open trades never counted towards a rollup
+            if (strategy_id is None or plan_id is None
+                    or exit_time is None):
+                continue
+            keys.update(
+                PerformanceService.row_keys(strategy_id, plan_id, timeframe,
+                                            exit_time))
+    if keys:
+        session.info.setdefault(PENDING_RECOMPUTES_KEY, set()).update(keys)
+
+
+def _apply_trade_changes(session, flush_context, instances):
+    if not has_app_context() or not current_app.config.get(
+            'PERFORMANCE_ROLLUPS_ENABLED', False):
+        return
+    if PerformanceService.rollup_mode() == 'async':
+        _collect_recompute_keys(session)
+        return
+
+    changes = []  # (values, sign)
+    stale = set()
+    for obj in session.new:
+        if isinstance(obj, Trade):
+            changes.append((_trade_values(obj, committed=False), 1))
+    for obj in session.deleted:
+        if isinstance(obj, Trade):
+            changes.append((_trade_values(obj, committed=True), -1))
+    for obj in session.dirty:
+        if not isinstance(obj, Trade) or not session.is_modified(obj):
+            continue
+        old_values = _trade_values(obj, committed=True)
+        new_values = _trade_values(obj, committed=False)
+        if old_values is None:
+            stale.add((new_values['strategy_id'],
+                       new_values['trading_plan_id']))
+            continue
+        if old_values == new_values:
+            continue
+        changes.append((old_values, -1))
+        changes.append((new_values, 1))
+
+    # Rollups of plans/strategies being deleted go away with them
+    deleted_ids = {
+        obj.id
+        for obj in session.deleted
+        if isinstance(obj, (TradingPlan, Strategy))
+    }
+
+    rows = {}
+    rollups = {}
+    for values, sign in changes:
+        key = (values['strategy_id'], values['trading_plan_id'])
+        contribution = PerformanceService.trade_contribution(values)
+        if (key[0] is None or contribution is None or key in stale or
+                deleted_ids.intersection(key)):
+            continue
+        if key not in rows:
+            performance = PerformanceService.get_rollup_row(*key)
+            if performance in session.deleted:
+                continue
+            rows[key] = performance
+            rollups[key] = PerformanceRollup(
+                (rows[key].metrics or {}).get('rollup'))
+        if sign > 0:
+            rollups[key].add(*contribution)
+        else:
+            rollups[key].remove(*contribution)
+
+    inexact = set()
+    for key, performance in rows.items():
+        performance.metrics = rollups[key].to_metrics()
+        # Deletes, edits and backdated closes leave max_drawdown an
+        # estimate; a background recompute makes it exact after commit
+        if not rollups[key].drawdown_exact:
+            inexact.add(key + (ROLLUP_TIMEFRAME, ROLLUP_PERIOD))
+
+    if inexact:
+        session.info.setdefault(PENDING_RECOMPUTES_KEY, set()).update(inexact)
+
+    if stale:
+        session.info.setdefault('performance_stale_keys', set()).update(stale)
+
+
+def _repair_stale_rollups(session):
+    if not has_app_context() or not current_app.config.get(
+            'PERFORMANCE_ROLLUPS_ENABLED', False):
+        return
+    if PerformanceService.rollup_mode() == 'async':
+        return
+
+    # Flush first so edits pending in this commit register their keys
+    session.flush()
+    stale = session.info.pop('performance_stale_keys', None)
+    if not stale:
+        return
+    for strategy_id, trading_plan_id in stale:
+        if strategy_id is not None:
+            PerformanceService.recompute(strategy_id,
+                                         trading_plan_id,
+                                         commit=False)
+    session.flush()
+
+
+def _schedule_committed_recomputes(session):
+    # Enqueued only once the trades are committed and visible to workers
+    keys = session.info.pop(PENDING_RECOMPUTES_KEY, None)
+    if keys:
+        PerformanceService.schedule_recompute(keys)
+
+
+def _discard_pending_recomputes(session, previous_transaction):
+    session.info.pop(PENDING_RECOMPUTES_KEY, None)
+
+
+def register_performance_listeners():
+    """Keep all-time Performance rollups in sync with Trade writes"""
+    if not event.contains(db.session, 'before_flush', _apply_trade_changes):
+        event.listen(db.session, 'before_flush', _apply_trade_changes)
+    if not event.contains(db.session, 'before_commit',
+                          _repair_stale_rollups):
+        event.listen(db.session, 'before_commit', _repair_stale_rollups)
+    if not event.contains(db.session, 'after_commit',
+                          _schedule_committed_recomputes):
+        event.listen(db.session, 'after_commit',
+                     _schedule_committed_recomputes)
+    if not event.contains(db.session, 'after_soft_rollback',
+                          _discard_pending_recomputes):
+        event.listen(db.session, 'after_soft_rollback',
+                     _discard_pending_recomputes)
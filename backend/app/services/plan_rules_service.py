@@ -0,0 +1,463 @@
+import threading
+from collections import OrderedDict, namedtuple
+from types import SimpleNamespace
+import numpy as np
+from flask import has_app_context
+from sqlalchemy import event, inspect, select, update
+from app import db
+from app.models.journal import Journal
+from app.models.trade import Trade
+from app.models.trading_plan import TradingPlan
+from app.services.backtest_service import DEFAULT_INITIAL_CAPITAL
+from app.services.plan_version_service import PlanVersionService
+from app.utils.timeframes import (TIMEFRAME_SECONDS, normalize_symbol,
+                                  normalize_timeframe)
+
+# Trade columns a compliance result depends on
+TRADE_RULE_FIELDS = ('symbol', 'timeframe', 'entry_price', 'exit_price',
+                     'position_size', 'entry_time', 'exit_time', 'entry_fee',
+                     'exit_fee')
+
+CACHE_SIZE = 256
+TOLERANCE = 1e-9
+
+# scalar(values) -> True/False, or None when the rule does not apply;
+# vector(columns) -> (ok, applicable) boolean arrays
+Check = namedtuple('Check', ['name', 'scalar', 'vector'])
+
+
+def _canonical_timeframe(value):
+    try:
+        return normalize_timeframe(value) if value else None
+    except ValueError:
+        return None
+
+
+def _symbol(value):
+    return value.replace('/', '').replace('-', '').upper() if value else ''
+
+
+def _symbols(values):
+    symbols = set()
+    for value in values or ():
+        try:
+            symbols.add(normalize_symbol(value))
+        except ValueError:
+            continue
+    return frozenset(symbols)
+
+
+def _market_check(plan):
+    allowed = _symbols(plan.markets)
+    if not allowed:
+        return None
+    allowed_list = sorted(allowed)
+    return Check(
+        'market', lambda t: t['symbol'] in allowed, lambda c:
+        (np.isin(c['symbol'], allowed_list), np.ones(len(c['symbol']),
+                                                     dtype=bool)))
+
+
+def _timeframe_check(plan):
+    allowed = frozenset(
+        filter(None, map(_canonical_timeframe, plan.timeframes or ())))
+    if not allowed:
+        return None
+    allowed_list = sorted(allowed)
+    return Check(
+        'timeframe', lambda t: None
+        if t['timeframe'] is None else t['timeframe'] in allowed, lambda c:
+        (np.isin(c['timeframe'], allowed_list), c['timeframe'] != ''))
+
+
+def _direction_check(plan):
+    direction = (plan.entry_rules or {}).get('direction')
+    if direction not in ('long', 'short'):
+        return None
+    sign = 1 if direction == 'long' else -1
+    return Check(
+        'direction', lambda t: t['size'] * sign > 0, lambda c:
+        (c['size'] * sign > 0, np.ones(len(c['size']), dtype=bool)))
+
+
+def _position_size_check(plan, capital):
+    sizing = plan.position_sizing or {}
+    method, value = sizing.get('type'), sizing.get('value')
+    if value is None:
+        return None
+    value = float(value)
+    stop_pct = (plan.exit_rules or {}).get('stop_loss_pct')
+
+    if method == 'fixed':
+        limit = value * (1 + TOLERANCE)
+
+        def exposure(size, entry):
+            return abs(size)
+    elif method == 'percent_equity':
+        limit = capital * value / 100.0 * (1 + TOLERANCE)
+
+        def exposure(size, entry):
+            return abs(size * entry)
+    elif method == 'risk_percent' and stop_pct:
+        limit = capital * value / 100.0 * (1 + TOLERANCE)
+        stop_pct = float(stop_pct)
+
+        def exposure(size, entry):
+            return abs(size * entry) * stop_pct
+    else:
+        return None
+
+    return Check(
+        'position_size', lambda t: exposure(t['size'], t['entry']) <= limit,
+        lambda c: (np.abs(exposure(c['size'], c['entry'])) <= limit,
+                   np.ones(len(c['size']), dtype=bool)))
+
+
+def _risk_per_trade_check(plan, capital):
+    max_risk = (plan.risk_management or {}).get('max_risk_per_trade')
+    if max_risk is None:
+        return None
+    floor = -capital * float(max_risk) * (1 + TOLERANCE)
+    return Check(
+        'risk_per_trade', lambda t: None
+        if t['net_pnl'] is None else t['net_pnl'] >= floor, lambda c:
+        (~(c['net_pnl'] < floor), ~np.isnan(c['net_pnl'])))
+
+
+def _stop_loss_check(plan):
+    stop_pct = (plan.exit_rules or {}).get('stop_loss_pct')
+    if not stop_pct:
+        return None
+    floor = -float(stop_pct) - TOLERANCE
+
+    def scalar(t):
+        if t['exit'] is None or not t['entry']:
+            return None
+        move = (t['exit'] - t['entry']) / t['entry']
+        return (move if t['size'] > 0 else -move) >= floor
+
+    def vector(c):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            move = (c['exit'] - c['entry']) / c['entry'] * np.sign(c['size'])
+        applicable = ~np.isnan(move)
+        return ~(move < floor), applicable
+
+    return Check('stop_loss', scalar, vector)
+
+
+def _holding_time_check(plan):
+    max_bars = (plan.exit_rules or {}).get('max_holding_bars')
+    if not max_bars:
+        return None
+    limits = {
+        timeframe: int(max_bars) * seconds
+        for timeframe, seconds in TIMEFRAME_SECONDS.items()
+    }
+
+    def scalar(t):
+        if t['holding'] is None or t['timeframe'] is None:
+            return None
+        return t['holding'] <= limits[t['timeframe']]
+
+    def vector(c):
+        limit = np.array([limits.get(tf, np.nan) for tf in c['timeframe']],
+                         dtype=np.float64)
+        applicable = ~np.isnan(limit) & ~np.isnan(c['holding'])
+        return ~(c['holding'] > limit), applicable
+
+    return Check('holding_time', scalar, vector)
+
+
+def _daily_trades_check(plan):
+    max_daily = (plan.risk_management or {}).get('max_daily_trades')
+    if not max_daily:
+        return None
+    max_daily = int(max_daily)
+
+    def vector(c):
+        # Rank of each trade among the trades entered the same UTC day
+        order = np.argsort(c['entry_time'], kind='stable')
+        days = c['entry_time'][order].astype('datetime64[D]')
+        starts = np.r_[True, days[1:] != days[:-1]]
+        group_start = np.maximum.accumulate(
+            np.where(starts, np.arange(len(days)), 0))
+        rank = np.empty(len(days), dtype=np.int64)
+        rank[order] = np.arange(len(days)) - group_start
+        return rank < max_daily, np.ones(len(days), dtype=bool)
+
+    return Check('daily_trades', None, vector)
+
+
+class CompiledPlan:
+    """
+    Compliance predicates compiled from one version of a plan's rules.
+    Only the rules a plan actually sets become checks, with thresholds
+    resolved up front, so evaluating a trade is a few float comparisons.
+    Checks needing other trades (max_daily_trades) run in batches only.
+    """
+
+    def __init__(self, plan):
+        self.plan_id = plan.id
+        self.version = plan.version
+        capital = float((plan.risk_management or {}).get(
+            'initial_capital', DEFAULT_INITIAL_CAPITAL))
+        checks = [
+            _market_check(plan),
+            _timeframe_check(plan),
+            _direction_check(plan),
+            _position_size_check(plan, capital),
+            _risk_per_trade_check(plan, capital),
+            _stop_loss_check(plan),
+            _holding_time_check(plan),
+            _daily_trades_check(plan),
+        ]
+        self.checks = [check for check in checks if check is not None]
+        self.trade_checks = [
+            check for check in self.checks if check.scalar is not None
+        ]
+
+    @staticmethod
+    def trade_values(trade):
+        """Float/str view of a trade used by the scalar checks"""
+        entry = float(trade.entry_price)
+        size = float(trade.position_size)
+        closed = trade.exit_price is not None and trade.exit_time is not None
+        exit_ = float(trade.exit_price) if closed else None
+        return {
+            'symbol': _symbol(trade.symbol),
+            'timeframe': _canonical_timeframe(trade.timeframe),
+            'entry': entry,
+            'exit': exit_,
+            'size': size,
+            'net_pnl': ((exit_ - entry) * size - float(trade.entry_fee or 0) -
+                        float(trade.exit_fee or 0)) if closed else None,
+            'holding': (trade.exit_time - trade.entry_time).total_seconds()
+            if closed else None,
+        }
+
+    def _result(self, checks):
+        violations = [name for name, ok in checks.items() if not ok]
+        return {
+            'followed_rules': not violations,
+            'checks': checks,
+            'violations': violations,
+            'plan_version': self.version,
+        }
+
+    def evaluate(self, trade):
+        """
+        Check one trade against the per-trade rules
+        Returns:
+            dict with followed_rules, checks (rule -> passed, applicable
+            rules only), violations and plan_version
+        """
+        values = self.trade_values(trade)
+        checks = {}
+        for check in self.trade_checks:
+            ok = check.scalar(values)
+            if ok is not None:
+                checks[check.name] = bool(ok)
+        return self._result(checks)
+
+    def evaluate_many(self, columns):
+        """
+        Check a batch of trades in one vectorized pass per rule
+        Args:
+            columns: Arrays as returned by PlanRulesService.load_columns
+        Returns:
+            dict with 'followed_rules' (bool array) and 'checks' mapping
+            rule -> (ok, applicable) bool arrays
+        """
+        followed = np.ones(len(columns['id']), dtype=bool)
+        checks = {}
+        for check in self.checks:
+            ok, applicable = check.vector(columns)
+            ok = ok | ~applicable
+            checks[check.name] = (ok, applicable)
+            followed &= ok
+        return {'followed_rules': followed, 'checks': checks}
+
+    def results(self, columns):
+        """Per-trade result dicts (as from evaluate) for a batch"""
+        evaluated = self.evaluate_many(columns)
+        results = []
+        for i in range(len(columns['id'])):
+            results.append(
+                self._result({
+                    name: bool(ok[i])
+                    for name, (ok, applicable) in evaluated['checks'].items()
+                    if applicable[i]
+                }))
+        return results
+
+
+class PlanRulesService:
+
+    _lock = threading.Lock()
+    _cache = OrderedDict()  # (plan_id, version) -> CompiledPlan
+
+    @classmethod
+    def compile(cls, plan):
+        """Compiled rules of a plan, cached per (plan_id, version)"""
+        key = (plan.id, plan.version)
+        with cls._lock:
+            compiled = cls._cache.get(key)
+            if compiled is not None:
+                cls._cache.move_to_end(key)
+                return compiled
+        compiled = CompiledPlan(plan)
+        with cls._lock:
+            cls._cache[key] = compiled
+            while len(cls._cache) > CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        return compiled
+
+    @classmethod
+    def compile_version(cls, trading_plan_id, version):
+        """Compiled rules of a historical plan version"""
+        with cls._lock:
+            compiled = cls._cache.get((trading_plan_id, version))
+        if compiled is not None:
+            return compiled
+        rules = PlanVersionService.state_at(trading_plan_id, version)
+        return cls.compile(
+            SimpleNamespace(id=trading_plan_id, version=version, **rules))
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._lock:
+            cls._cache.clear()
+
+    @classmethod
+    def _compiled_for(cls, plan, version):
+        if version is None or version == plan.version:
+            return cls.compile(plan)
+        try:
+            return cls.compile_version(plan.id, version)
+        except LookupError:
+            return cls.compile(plan)
+
+    @classmethod
+    def evaluate_trade(cls, trade, plan=None):
+        """
+        Compliance of one trade with the plan version it was recorded
+        under (the current rules for trades not stamped yet)
+        """
+        plan = plan or trade.trading_plan or db.session.get(
+            TradingPlan, trade.trading_plan_id)
+        return cls._compiled_for(plan,
+                                 trade.trading_plan_version).evaluate(trade)
+
+    @staticmethod
+    def load_columns(trading_plan_id):
+        """
+        Columnar trades of a plan with the ids of their journal entries
+        Open trades have NaN exit/net_pnl/holding values.
+        """
+        rows = db.session.execute(
+            select(Trade.id, Trade.symbol, Trade.timeframe, Trade.entry_price,
+                   Trade.exit_price, Trade.position_size, Trade.entry_time,
+                   Trade.exit_time, Trade.entry_fee, Trade.exit_fee,
+                   Journal.id, Journal.plan_adherence,
+                   Trade.trading_plan_version).outerjoin(
+                       Journal, Journal.trade_id == Trade.id).where(
+                           Trade.trading_plan_id == trading_plan_id).order_by(
+                               Trade.entry_time, Trade.id)).all()
+
+        def floats(index):
+            return np.array(
+                [np.nan if row[index] is None else float(row[index])
+                 for row in rows],
+                dtype=np.float64)
+
+        entry_time = np.array([row[6] for row in rows], dtype='datetime64[us]')
+        exit_time = np.array([row[7] for row in rows], dtype='datetime64[us]')
+        entry, exit_, size = floats(3), floats(4), floats(5)
+        exit_[np.isnat(exit_time)] = np.nan
+        fees = np.nan_to_num(floats(8)) + np.nan_to_num(floats(9))
+        return {
+            'id': [row[0] for row in rows],
+            'journal_id': [row[10] for row in rows],
+            'plan_adherence': [row[11] for row in rows],
+            'version': np.array([row[12] or 0 for row in rows],
+                                dtype=np.int64),
+            'symbol': np.array([_symbol(row[1]) for row in rows],
+                               dtype=object),
+            'timeframe': np.array(
+                [_canonical_timeframe(row[2]) or '' for row in rows],
+                dtype=object),
+            'entry': entry,
+            'exit': exit_,
+            'size': size,
+            'entry_time': entry_time,
+            'net_pnl': (exit_ - entry) * size - fees,
+            'holding': (exit_time - entry_time) / np.timedelta64(1, 's'),
+        }
+
+    @classmethod
+    def fill_plan(cls, trading_plan_id, commit=True):
+        """
+        Recompute plan_adherence['compliance'] of every journal entry of a
+        plan with one vectorized pass per plan version and one bulk update
+        Returns:
+            Number of journal entries updated
+        """
+        plan = db.session.get(TradingPlan, trading_plan_id)
+        columns = cls.load_columns(trading_plan_id)
+        results = [None] * len(columns['id'])
+        for version in np.unique(columns['version']):
+            # Unstamped trades (version 0) are judged by the current rules
+            index = np.flatnonzero(columns['version'] == version)
+            subset = {
+                key: ([values[i] for i in index] if isinstance(
+                    values, list) else values[index])
+                for key, values in columns.items()
+            }
+            compiled = cls._compiled_for(plan, int(version) or None)
+            for i, result in zip(index, compiled.results(subset)):
+                results[i] = result
+
+        updates = [{
+            'id': journal_id,
+            'plan_adherence': dict(adherence or {}, compliance=result)
+        } for journal_id, adherence, result in zip(
+            columns['journal_id'], columns['plan_adherence'], results)
+                   if journal_id is not None]
+        if updates:
+            db.session.execute(update(Journal), updates)
+        if commit:
+            db.session.commit()
+        return len(updates)
+
+
+def _apply_compliance(journal, trade):
+    result = PlanRulesService.evaluate_trade(trade)
+    journal.plan_adherence = dict(journal.plan_adherence or {},
+                                  compliance=result)
+
+
+def _fill_adherence(session, flush_context, instances):
+    if not has_app_context():
+        return
+    for obj in list(session.new):
+        if isinstance(obj, Journal):
+            trade = obj.trade or (obj.trade_id and session.get(
+                Trade, obj.trade_id))
+            if trade is not None:
+                _apply_compliance(obj, trade)
+    for obj in list(session.dirty):
+        if not isinstance(obj, Trade) or obj in session.new:
+            continue
+        state = inspect(obj)
+        if not any(state.attrs[key].history.has_changes()
+                   for key in TRADE_RULE_FIELDS):
+            continue
+        journal = obj.journal_entry
+        if journal is not None and journal not in session.deleted:
+            _apply_compliance(journal, obj)
+
+
+def register_plan_rules_listeners():
+    """Fill journal compliance on writes (idempotent)"""
+    if not event.contains(db.session, 'before_flush', _fill_adherence):
+        event.listen(db.session, 'before_flush', _fill_adherence)
@@ -0,0 +1,241 @@
+import copy
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, insert, inspect, select
+from app import db
+from app.models.journal import Journal
+from app.models.trade import Trade
+from app.models.trading_plan import TradingPlan
+from app.models.trading_plan_version import TradingPlanVersion
+
+# A full snapshot every N versions bounds a reconstruction to N - 1 diffs
+DEFAULT_CHECKPOINT_INTERVAL = 10
+CACHE_SIZE = 512
+
+
+def diff_rules(old, new, path=()):
+    """
+    Compact structural diff between two JSON values
+    Dicts are compared key by key; any other changed value (lists
+    included) is replaced whole.
+    Returns:
+        {'set': [[path, value], ...], 'unset': [path, ...]} where a path
+        is the list of keys leading to the value
+    """
+    changes = {'set': [], 'unset': []}
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                changes['unset'].append(list(path) + [key])
+        for key, value in new.items():
+            if key not in old:
+                changes['set'].append([list(path) + [key], value])
+            elif old[key] != value:
+                nested = diff_rules(old[key], value, tuple(path) + (key, ))
+                changes['set'].extend(nested['set'])
+                changes['unset'].extend(nested['unset'])
+    elif old != new:
+        changes['set'].append([list(path), new])
+    return changes
+
+
+def apply_diff(state, diff):
+    """Apply a diff_rules() diff to a copy of `state`"""
+    state = copy.deepcopy(state)
+    for path in diff.get('unset', ()):
+        parent = state
+        for key in path[:-1]:
+            parent = parent[key]
+        parent.pop(path[-1], None)
+    for path, value in diff.get('set', ()):
+        if not path:
+            state = copy.deepcopy(value)
+            continue
+        parent = state
+        for key in path[:-1]:
+            if not isinstance(parent.get(key), dict):
+                parent[key] = {}
+            parent = parent[key]
+        parent[path[-1]] = copy.deepcopy(value)
+    return state
+
+
+class PlanVersionService:
+    """
+    Copy-on-write history of trading plan rules. The trading_plans row is
+    the materialized current version; every version also gets an
+    immutable trading_plan_versions row holding either a full checkpoint
+    or a diff against the version before it.
+    """
+
+    _lock = threading.Lock()
+    _states = OrderedDict()  # (plan_id, version) -> rules
+
+    @staticmethod
+    def checkpoint_interval():
+        interval = DEFAULT_CHECKPOINT_INTERVAL
+        if has_app_context():
+            interval = current_app.config.get('PLAN_CHECKPOINT_INTERVAL',
+                                              DEFAULT_CHECKPOINT_INTERVAL)
+        if not isinstance(interval, int) or interval < 1:
+            raise ValueError(
+                f"PLAN_CHECKPOINT_INTERVAL must be at least 1: {interval!r}")
+        return interval
+
+    @classmethod
+    def _cache(cls, key, state):
+        with cls._lock:
+            cls._states[key] = state
+            cls._states.move_to_end(key)
+            while len(cls._states) > CACHE_SIZE:
+                cls._states.popitem(last=False)
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._lock:
+            cls._states.clear()
+
+    @classmethod
+    def state_at(cls, trading_plan_id, version, connection=None):
+        """
+        Reconstruct a plan's rules at a version
+        Reads the nearest checkpoint at or below the version plus the
+        diffs after it, in one query.
+        Raises:
+            LookupError: when the version was never recorded
+        """
+        key = (trading_plan_id, version)
+        with cls._lock:
+            state = cls._states.get(key)
+        if state is not None:
+            return copy.deepcopy(state)
+
+        checkpoint = select(func.max(TradingPlanVersion.version)).where(
+            TradingPlanVersion.trading_plan_id == trading_plan_id,
+            TradingPlanVersion.is_checkpoint.is_(True),
+            TradingPlanVersion.version <= version).scalar_subquery()
+        rows = (connection or db.session).execute(
+            select(TradingPlanVersion.version,
+                   TradingPlanVersion.is_checkpoint,
+                   TradingPlanVersion.data).where(
+                       TradingPlanVersion.trading_plan_id == trading_plan_id,
+                       TradingPlanVersion.version <= version,
+                       TradingPlanVersion.version >= checkpoint).order_by(
+                           TradingPlanVersion.version)).all()
+        if not rows or rows[-1].version != version:
+            raise LookupError(
+                f"Version {version} of plan {trading_plan_id} not found")
+
+        state = copy.deepcopy(rows[0].data)
+        for row in rows[1:]:
+            state = apply_diff(state, row.data)
+        if connection is None:
+            # Rows read inside a flush may still be rolled back
+            cls._cache(key, state)
+        return copy.deepcopy(state)
+
+    @staticmethod
+    def list_versions(trading_plan_id):
+        """Recorded versions of a plan, oldest first"""
+        return TradingPlanVersion.query.with_entities(
+            TradingPlanVersion.version, TradingPlanVersion.is_checkpoint,
+            TradingPlanVersion.created_at).filter_by(
+                trading_plan_id=trading_plan_id).order_by(
+                    TradingPlanVersion.version).all()
+
+    @classmethod
+    def record(cls, connection, plan, previous_version=None):
+        """
+        Store the plan's current rules as its current version
+        Args:
+            connection: Connection of the flush that saves the plan
+            previous_version: Version the diff is taken against; None
+                              (or a missing one) stores a checkpoint
+        """
+        version = plan.version
+        state = copy.deepcopy(plan.rules())
+        # Versions 1, 1 + interval, 1 + 2 * interval, ... are checkpoints
+        checkpoint = (previous_version is None
+                      or (version - 1) % cls.checkpoint_interval() == 0)
+        data = state
+        if not checkpoint:
+            try:
+                data = diff_rules(
+                    cls.state_at(plan.id, previous_version, connection),
+                    state)
+            except LookupError:
+                checkpoint = True
+
+        now = datetime.utcnow()
+        connection.execute(
+            insert(TradingPlanVersion.__table__).values(
+                id=uuid.uuid4(),
+                trading_plan_id=plan.id,
+                version=version,
+                is_checkpoint=checkpoint,
+                data=data,
+                created_at=now,
+                updated_at=now))
+
+
+def _bump_plan_version(mapper, connection, target):
+    # Rule edits create a new version instead of overwriting the old one
+    state = inspect(target)
+    if any(state.attrs[key].history.has_changes()
+           for key in TradingPlan.RULE_FIELDS):
+        if not state.attrs.version.history.has_changes():
+            target.version = (target.version or 1) + 1
+
+
+def _record_new_plan(mapper, connection, target):
+    PlanVersionService.record(connection, target)
+
+
+def _record_plan_version(mapper, connection, target):
+    history = inspect(target).attrs.version.history
+    if not history.has_changes():
+        return
+    previous = history.deleted[0] if history.deleted else None
+    PlanVersionService.record(connection, target, previous)
+
+
+def _stamp_plan_version(mapper, connection, target):
+    """Pin trades and journals to the plan version they were made under"""
+    if target.trading_plan_version is not None:
+        return
+    if isinstance(target, Journal):
+        trade = target.__dict__.get('trade')
+        if trade is not None and trade.trading_plan_version is not None:
+            target.trading_plan_version = trade.trading_plan_version
+            return
+        version = connection.scalar(
+            select(Trade.trading_plan_version).where(
+                Trade.id == target.trade_id))
+        if version is not None:
+            target.trading_plan_version = version
+            return
+
+    plan = target.__dict__.get('trading_plan')
+    if plan is not None and plan.id == target.trading_plan_id:
+        target.trading_plan_version = plan.version
+    else:
+        target.trading_plan_version = connection.scalar(
+            select(TradingPlan.version).where(
+                TradingPlan.id == target.trading_plan_id))
+
+
+def register_plan_version_listeners():
+    """Version rule edits and stamp trades/journals (idempotent)"""
+    listeners = (
+        (TradingPlan, 'before_update', _bump_plan_version),
+        (TradingPlan, 'after_insert', _record_new_plan),
+        (TradingPlan, 'after_update', _record_plan_version),
+        (Trade, 'before_insert', _stamp_plan_version),
+        (Journal, 'before_insert', _stamp_plan_version),
+    )
+    for model, name, listener in listeners:
+        if not event.contains(model, name, listener):
+            event.listen(model, name, listener)
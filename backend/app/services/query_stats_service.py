@@ -0,0 +1,229 @@
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.utils.exceptions import QueryBudgetExceededError
+
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+FINGERPRINT_CACHE_SIZE = 2048
+TOP_STATEMENTS = 5
+
+_current = ContextVar('query_stats', default=None)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETER_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_PLACEHOLDERS = re.compile(r'%\(\w+\)s|%s|:\w+|\$\d+')
+_WHITESPACE = re.compile(r'\s+')
+_fingerprints = {}
+
+
+def fingerprint(statement):
+    """
+    Statement text with literals, placeholders and IN lists folded, so
+    the same query with different values maps to one fingerprint
+    """
+    cached = _fingerprints.get(statement)
+    if cached is not None:
+        return cached
+    text = _PLACEHOLDERS.sub('?', statement)
+    text = _LITERALS.sub('?', text)
+    text = _PARAMETER_LISTS.sub('(...)', text)
+    text = _WHITESPACE.sub(' ', text).strip()
+    if len(_fingerprints) >= FINGERPRINT_CACHE_SIZE:
+        _fingerprints.clear()
+    _fingerprints[statement] = text
+    return text
+
+
+class QueryStats:
+    """Queries executed within one request (or track() block)"""
+
+    __slots__ = ('count', 'duration', 'statements')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold=DEFAULT_N_PLUS_ONE_THRESHOLD):
+        """
+        Statements run at least `threshold` times, most frequent first
+        Returns:
+            List of (fingerprint, count)
+        """
+        counts = Counter()
+        for statement, count in self.statements.items():
+            counts[fingerprint(statement)] += count
+        return [(text, count) for text, count in counts.most_common()
+                if count >= threshold]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    if _current.get() is not None:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    stats = _current.get()
+    started = conn.info.get('query_started')
+    if stats is not None and started:
+        stats.record(statement, time.perf_counter() - started.pop())
+
+
+def _handle_error(context):
+    if context.connection is not None:
+        started = context.connection.info.get('query_started')
+        if started:
+            started.pop()
+
+
+class QueryStatsService:
+    """
+    Per-request SQL instrumentation. Engine events count queries and DB
+    time into the request's QueryStats; after the request they go into
+    response headers, the log (for N+1 suspects and budget overruns) and
+    per-endpoint totals kept by this process.
+    """
+
+    _lock = threading.Lock()
+    _endpoints = {}  # endpoint -> totals
+
+    @staticmethod
+    @contextmanager
+    def track():
+        """Collect the queries run inside the block"""
+        stats = QueryStats()
+        token = _current.set(stats)
+        try:
+            yield stats
+        finally:
+            _current.reset(token)
+
+    @staticmethod
+    def current():
+        return _current.get()
+
+    @staticmethod
+    def budget_for(endpoint):
+        """Query budget of an endpoint (@query_budget or SQL_QUERY_BUDGET)"""
+        view = current_app.view_functions.get(endpoint)
+        budget = getattr(view, 'query_budget', None)
+        if budget is None:
+            budget = current_app.config.get('SQL_QUERY_BUDGET')
+        return budget
+
+    @classmethod
+    def _aggregate(cls, endpoint, stats, repeated, over_budget):
+        with cls._lock:
+            totals = cls._endpoints.setdefault(
+                endpoint, {
+                    'requests': 0,
+                    'queries': 0,
+                    'max_queries': 0,
+                    'db_time_ms': 0.0,
+                    'over_budget': 0,
+                    'n_plus_one': 0,
+                    'repeated': Counter(),
+                })
+            totals['requests'] += 1
+            totals['queries'] += stats.count
+            totals['max_queries'] = max(totals['max_queries'], stats.count)
+            totals['db_time_ms'] += stats.duration * 1000.0
+            totals['over_budget'] += int(over_budget)
+            if repeated:
+                totals['n_plus_one'] += 1
+                for text, count in repeated:
+                    totals['repeated'][text] += count
+
+    @classmethod
+    def snapshot(cls):
+        """Per-endpoint totals with the most repeated statements"""
+        with cls._lock:
+            return {
+                endpoint: {
+                    **{
+                        key: value
+                        for key, value in totals.items() if key != 'repeated'
+                    },
+                    'db_time_ms': round(totals['db_time_ms'], 3),
+                    'avg_queries': round(
+                        totals['queries'] / totals['requests'], 2),
+                    'repeated': [{
+                        'statement': text,
+                        'count': count
+                    } for text, count in totals['repeated'].most_common(
+                        TOP_STATEMENTS)],
+                }
+                for endpoint, totals in cls._endpoints.items()
+            }
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._endpoints = {}
+
+    @classmethod
+    def finish_request(cls, response):
+        """Report the request's queries; enforce the budget in strict mode"""
+        stats = _current.get()
+        if stats is None or request.endpoint is None:
+            return response
+        config = current_app.config
+        threshold = config.get('SQL_N_PLUS_ONE_THRESHOLD',
+                               DEFAULT_N_PLUS_ONE_THRESHOLD)
+        repeated = stats.repeated(threshold)
+        budget = cls.budget_for(request.endpoint)
+        over_budget = budget is not None and stats.count > budget
+        cls._aggregate(request.endpoint, stats, repeated, over_budget)
+
+        if config.get('SQL_STATS_HEADERS', False):
+            response.headers['X-DB-Query-Count'] = str(stats.count)
+            response.headers['X-DB-Time-Ms'] = f'{stats.duration * 1000:.3f}'
+            response.headers['X-DB-Repeated-Statements'] = str(len(repeated))
+        for text, count in repeated:
+            current_app.logger.warning("Possible N+1 in %s: %d x %s",
+                                       request.endpoint, count, text)
+        if over_budget:
+            message = (f"{request.endpoint} ran {stats.count} queries, "
+                       f"budget is {budget}")
+            if config.get('SQL_QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceededError(message)
+            current_app.logger.warning(message)
+        return response
+
+
+def _start_request():
+    _current.set(QueryStats())
+
+
+def _end_request(exc):
+    _current.set(None)
+
+
+def register_query_instrumentation(app):
+    """Instrument every engine and this app's requests (idempotent)"""
+    listeners = (
+        ('before_cursor_execute', _before_cursor_execute),
+        ('after_cursor_execute', _after_cursor_execute),
+        ('handle_error', _handle_error),
+    )
+    for name, listener in listeners:
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+
+    if app.config.get('SQL_INSTRUMENTATION_ENABLED', True):
+        app.before_request(_start_request)
+        app.after_request(QueryStatsService.finish_request)
+        app.teardown_request(_end_request)
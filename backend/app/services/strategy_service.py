@@ -0,0 +1,51 @@
+from sqlalchemy import select
+from app import db
+from app.models.loader_profiles import deferrable_columns, loader_options
+from app.models.strategy import Strategy
+
+
+class StrategyService:
+
+    @staticmethod
+    def list_strategies():
+        return Strategy.query.order_by(Strategy.name).all()
+
+    @staticmethod
+    def get_strategy(strategy_id):
+        return db.session.get(Strategy, strategy_id)
+
+    @staticmethod
+    def get_strategy_aggregate(user_id, strategy_id, include=()):
+        """
+        Strategy with the user's trades and performances for it in three
+        queries, whatever the number of trades
+        Args:
+            include: Deferred JSON columns to load as well
+        Returns:
+            dict for the API, or None if there is no such strategy
+        """
+        strategy = db.session.execute(
+            select(Strategy).options(*loader_options(
+                'strategy_aggregate', include, user_id=user_id)).where(
+                    Strategy.id == strategy_id).execution_options(
+                        # Collections loaded earlier without the user
+                        # filter must not be reused
+                        populate_existing=True)).scalar_one_or_none()
+        if strategy is None:
+            return None
+
+        exclude = set(deferrable_columns('strategy_aggregate')) - set(include)
+        trades = []
+        for trade in sorted(strategy.trades,
+                            key=lambda t: (t.entry_time, t.id)):
+            data = trade.to_dict()
+            data['trading_plan_name'] = trade.trading_plan.name
+            trades.append(data)
+        return {
+            'strategy': strategy.to_dict(),
+            'trades': trades,
+            'performances': [
+                performance.to_dict(exclude)
+                for performance in strategy.performances
+            ],
+        }
@@ -0,0 +1,557 @@
+import io
+import json
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import select
+from app import db
+from app.models.journal import Journal
+from app.models.base import GUID
+from app.models.mixins import ImageFieldsMixin
+from app.models.performance import Performance
+from app.models.strategy import Strategy
+from app.models.trade import Trade
+from app.models.trading_plan import TradingPlan
+from app.models.trading_plan_version import TradingPlanVersion
+from app.models.user import User
+from app.services.password_service import PasswordService
+from app.services.performance_service import (PerformanceService,
+                                              ROLLUP_PERIOD,
+                                              ROLLUP_TIMEFRAME)
+from app.utils.validators import UserValidator
+
+# (plan market, Trade.symbol, starting price, price decimals, daily vol)
+MARKETS = (
+    ('EUR/USD', 'EURUSD', 1.08, 5, 0.005),
+    ('GBP/USD', 'GBPUSD', 1.27, 5, 0.006),
+    ('USD/JPY', 'USDJPY', 150.0, 3, 0.006),
+    ('XAU/USD', 'XAUUSD', 2000.0, 2, 0.01),
+    ('BTC/USD', 'BTCUSD', 42000.0, 2, 0.03),
+    ('ETH/USD', 'ETHUSD', 2300.0, 2, 0.04),
+)
+TIMEFRAMES = ('15m', '1h', '4h', '1d')
+PLAN_TYPES = ('day_trading', 'swing_trading', 'scalping')
+EMOTIONS = ('calm', 'confident', 'anxious', 'greedy', 'fearful')
+TRENDS = ('up', 'down', 'range')
+IMAGE_TYPES = ('setup', 'analysis', 'result')
+
+DEFAULT_PASSWORD = 'Synthetic123!'
+# Per side, on notional
+FEE_RATE = 0.0005
+# Notional per trade before the random size multiple
+BASE_NOTIONAL = 10000.0
+SECONDS_PER_DAY = 86400
+
+
+def _copy_text(value):
+    """Render one value in PostgreSQL's COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, bytes):
+        # GUIDs; PostgreSQL reads 32 hex digits as a uuid
+        return value.hex()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    elif not isinstance(value, str):
+        return str(value)
+    return (value.replace('\\', '\\\\').replace('\t', '\\t').replace(
+        '\n', '\\n').replace('\r', '\\r'))
+
+
+def _sqlite_datetime(value):
+    # SQLAlchemy's default SQLite DATETIME storage format
+    return None if value is None else value.isoformat(' ', 'microseconds')
+
+
+def _image_model(table):
+    """Mapped class of a table when it has validated image columns"""
+    for mapper in db.Model.registry.mappers:
+        if (mapper.local_table is table
+                and issubclass(mapper.class_, ImageFieldsMixin)):
+            return mapper.class_
+    return None
+
+
+class BulkWriter:
+    """
+    Writes column-oriented rows with the fastest path of the dialect:
+    COPY FROM STDIN on PostgreSQL (psycopg2), a single driver-level
+    executemany elsewhere. Both skip the ORM and its listeners, so image
+    columns are checked with validate_image_mappings first.
+    GUID values are passed as their 16 raw bytes.
+    """
+
+    def __init__(self, connection, chunk_size=50000):
+        self.connection = connection
+        self.dialect = connection.dialect
+        self.chunk_size = chunk_size
+        self.counts = {}
+        self.use_copy = (self.dialect.name == 'postgresql'
+                         and self.dialect.driver == 'psycopg2')
+
+    def write(self, table, columns):
+        """
+        Args:
+            table: Table to insert into
+            columns: dict of column name -> list of values, all the
+                     same length
+        Raises:
+            ValidationError: for an invalid image URL or image list
+        """
+        names = list(columns)
+        total = len(columns[names[0]]) if names else 0
+        if not total:
+            return
+        self._validate_images(table, columns)
+        for offset in range(0, total, self.chunk_size):
+            # Columns sharing one list (created_at/updated_at) are sliced
+            # and converted once
+            sliced = {}
+            chunk = {}
+            for name, values in columns.items():
+                if id(values) not in sliced:
+                    sliced[id(values)] = values[offset:offset +
+                                                self.chunk_size]
+                chunk[name] = sliced[id(values)]
+            if self.use_copy:
+                self._copy(table, names, chunk)
+            else:
+                self._executemany(table, names, chunk)
+        self.counts[table.name] = self.counts.get(table.name, 0) + total
+
+    @staticmethod
+    def _validate_images(table, columns):
+        model = _image_model(table)
+        if model is None:
+            return
+        fields = [
+            name for name in model.image_url_fields + model.image_list_fields
+            if name in columns
+        ]
+        if fields:
+            model.validate_image_mappings(
+                dict(zip(fields, values))
+                for values in zip(*(columns[name] for name in fields)))
+
+    def _copy(self, table, names, chunk):
+        text = io.StringIO()
+        rendered = {}
+        for name in names:
+            values = chunk[name]
+            if id(values) not in rendered:
+                rendered[id(values)] = list(map(_copy_text, values))
+        rendered = [rendered[id(chunk[name])] for name in names]
+        for row in zip(*rendered):
+            text.write('\t'.join(row))
+            text.write('\n')
+        text.seek(0)
+        cursor = self.connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(names)}) FROM STDIN", text)
+        finally:
+            cursor.close()
+
+    def _processor(self, column):
+        if self.dialect.name == 'sqlite':
+            # What SQLite stores for these, minus the per-value dispatch
+            if isinstance(column.type, GUID):
+                return None
+            if isinstance(column.type, db.DateTime):
+                return _sqlite_datetime
+        return column.type.dialect_impl(self.dialect).bind_processor(
+            self.dialect)
+
+    def _executemany(self, table, names, chunk):
+        processed = []
+        converted = {}
+        for name in names:
+            process = self._processor(table.c[name])
+            values = chunk[name]
+            if process is None:
+                processed.append(values)
+                continue
+            key = (id(values), process)
+            if key not in converted:
+                converted[key] = list(map(process, values))
+            processed.append(converted[key])
+        marker = '?' if self.dialect.paramstyle == 'qmark' else '%s'
+        sql = (f"INSERT INTO {table.name} ({', '.join(names)}) "
+               f"VALUES ({', '.join([marker] * len(names))})")
+        self.connection.exec_driver_sql(sql, list(zip(*processed)))
+
+
+class SyntheticDataService:
+    """
+    Deterministic, seeded account data for load and scale testing.
+    The same arguments and seed always produce the same ids and values.
+    """
+
+    TABLES = ('users', 'strategies', 'trading_plans', 'trading_plan_versions',
+              'trades', 'journal_entries', 'performance_metrics')
+
+    @staticmethod
+    def _uuids(rng, count):
+        raw = rng.integers(0, 256, size=(count, 16), dtype=np.uint8)
+        # RFC 4122 version 4 bits, so the ids look like uuid4()
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+        raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+        data = raw.tobytes()
+        return [data[i:i + 16] for i in range(0, count * 16, 16)]
+
+    @staticmethod
+    def _datetimes(start, seconds):
+        """datetime list from float second offsets, microsecond precision"""
+        stamps = (np.datetime64(start, 'us') +
+                  np.round(seconds * 1e6).astype('timedelta64[us]'))
+        return stamps, stamps.tolist()
+
+    @classmethod
+    def _plan_rules(cls, rng):
+        markets = sorted(
+            rng.choice(len(MARKETS), size=rng.integers(2, 5),
+                       replace=False).tolist())
+        timeframes = sorted(
+            rng.choice(len(TIMEFRAMES), size=rng.integers(1, 4),
+                       replace=False).tolist())
+        return markets, timeframes, {
+            'markets': [MARKETS[i][0] for i in markets],
+            'timeframes': [TIMEFRAMES[i] for i in timeframes],
+            'entry_rules': {
+                'setup': str(rng.choice(('breakout', 'pullback', 'reversal')))
+            },
+            'exit_rules': {
+                'stop_loss_pct': float(rng.choice((0.01, 0.02, 0.03))),
+                'max_holding_bars': int(rng.integers(5, 50))
+            },
+            'position_sizing': {
+                'type': 'fixed',
+                'value': BASE_NOTIONAL
+            },
+            'risk_management': {
+                'initial_capital': 100000,
+                'max_risk_per_trade': 0.02,
+                'max_daily_trades': int(rng.integers(3, 20))
+            },
+        }
+
+    @classmethod
+    def _trades(cls, rng, plan_id, markets, timeframes, strategy_ids, count,
+                start, days, open_ratio):
+        """Trade columns of one plan plus the arrays the rollups need"""
+        offsets = np.sort(rng.uniform(0, days * SECONDS_PER_DAY, count))
+        market = rng.choice(np.asarray(markets), size=count)
+        entry = np.empty(count)
+        exit_ = np.empty(count)
+        holding = np.clip(rng.lognormal(np.log(4 * 3600), 1.0, count), 60,
+                          30 * SECONDS_PER_DAY)
+        for index in np.unique(market):
+            _, _, price, places, vol = MARKETS[index]
+            mask = market == index
+            # Geometric random walk sampled at each trade's entry time
+            gaps = np.diff(offsets[mask], prepend=0.0) / SECONDS_PER_DAY
+            walk = np.cumsum(rng.normal(0, vol * np.sqrt(gaps)))
+            entry[mask] = np.round(price * np.exp(walk), places)
+            moves = rng.normal(0, vol * np.sqrt(holding[mask] /
+                                                SECONDS_PER_DAY))
+            exit_[mask] = np.round(entry[mask] * np.exp(moves), places)
+
+        # Negative sizes are shorts
+        side = np.where(rng.random(count) < 0.35, -1.0, 1.0)
+        size = np.round(
+            side * rng.choice((0.5, 1.0, 2.0), size=count) * BASE_NOTIONAL /
+            entry, 4)
+        entry_fee = np.round(np.abs(entry * size) * FEE_RATE, 2)
+        exit_fee = np.round(np.abs(exit_ * size) * FEE_RATE, 2)
+        exit_offsets = offsets + holding
+        # The most recent trades are still open
+        closed = np.ones(count, dtype=bool)
+        closed[count - int(round(count * open_ratio)):] = False
+
+        # -1 leaves the trade without a strategy
+        strategy = rng.integers(-1, len(strategy_ids), size=count)
+        ids = cls._uuids(rng, count)
+        entry_stamps, entry_times = cls._datetimes(start, offsets)
+        exit_stamps, exit_times = cls._datetimes(start, exit_offsets)
+        images = rng.random(count) < 0.3
+        image_numbers = rng.integers(0, 100, count)
+
+        def when_closed(values):
+            return [
+                value if is_closed else None
+                for value, is_closed in zip(values, closed.tolist())
+            ]
+
+        columns = {
+            'id': ids,
+            'trading_plan_id': [plan_id] * count,
+            'strategy_id': [strategy_ids[i] if i >= 0 else None
+                            for i in strategy.tolist()],
+            'trading_plan_version': [1] * count,
+            'entry_price': entry.tolist(),
+            'exit_price': when_closed(exit_.tolist()),
+            'entry_time': entry_times,
+            'exit_time': when_closed(exit_times),
+            'symbol': [MARKETS[i][1] for i in market.tolist()],
+            'position_size': size.tolist(),
+            'timeframe': [
+                TIMEFRAMES[timeframes[i]]
+                for i in rng.integers(0, len(timeframes), count).tolist()
+            ],
+            'entry_fee': entry_fee.tolist(),
+            'exit_fee': when_closed(exit_fee.tolist()),
+            'entry_image_url': [
+                f"/static/trades/synthetic_{number}.png" if has_image else None
+                for has_image, number in zip(images.tolist(),
+                                             image_numbers.tolist())
+            ],
+            'exit_image_url': [None] * count,
+            'created_at': entry_times,
+            'updated_at': entry_times,
+        }
+        arrays = {
+            'closed': closed,
+            'strategy': strategy,
+            'entry_price': entry,
+            'exit_price': exit_,
+            'position_size': size,
+            'entry_fee': entry_fee,
+            'exit_fee': exit_fee,
+            'entry_stamp': entry_stamps,
+            'exit_stamp': exit_stamps,
+        }
+        return columns, arrays
+
+    @classmethod
+    def _journals(cls, rng, trades, arrays, ratio):
+        closed = np.flatnonzero(arrays['closed'])
+        picked = closed[rng.random(closed.size) < ratio].tolist()
+        count = len(picked)
+        image_counts = rng.integers(0, 4, count).tolist()
+        image_types = rng.integers(0, len(IMAGE_TYPES),
+                                   sum(image_counts)).tolist()
+        emotions = rng.integers(0, len(EMOTIONS), count).tolist()
+        trends = rng.integers(0, len(TRENDS), count).tolist()
+        volatility = np.round(rng.random(count), 3).tolist()
+
+        images = []
+        position = 0
+        for index, image_count in zip(picked, image_counts):
+            uploaded = trades['exit_time'][index].isoformat()
+            entry = []
+            for _ in range(image_count):
+                kind = IMAGE_TYPES[image_types[position]]
+                entry.append({
+                    'url': f"/static/journal/synthetic_{kind}_"
+                           f"{position % 100}.png",
+                    'description': f"{kind.title()} chart",
+                    'type': kind,
+                    'upload_date': uploaded,
+                })
+                position += 1
+            images.append(entry)
+
+        exit_times = [trades['exit_time'][index] for index in picked]
+        return {
+            'id': cls._uuids(rng, count),
+            'trade_id': [trades['id'][index] for index in picked],
+            'trading_plan_id': [trades['trading_plan_id'][0]] * count,
+            'trading_plan_version': [1] * count,
+            'notes': [
+                f"{trades['symbol'][index]} {trades['timeframe'][index]} "
+                f"trade review" for index in picked
+            ],
+            'emotions': [EMOTIONS[i] for i in emotions],
+            'market_conditions': [{
+                'trend': TRENDS[trend],
+                'volatility': value
+            } for trend, value in zip(trends, volatility)],
+            'plan_adherence': [None] * count,
+            'images': images,
+            'created_at': exit_times,
+            'updated_at': exit_times,
+        }
+
+    @classmethod
+    def _performances(cls, rng, plan_id, strategy_ids, arrays, updated):
+        """All-time rollup rows, computed the way recompute() does"""
+        rows = {
+            'id': [],
+            'strategy_id': [],
+            'trading_plan_id': [],
+            'metrics': [],
+            'timeframe': [],
+            'period': [],
+            'created_at': [],
+            'updated_at': [],
+        }
+        for index, strategy_id in enumerate(strategy_ids):
+            mask = arrays['closed'] & (arrays['strategy'] == index)
+            if not mask.any():
+                continue
+            order = np.argsort(arrays['exit_stamp'][mask], kind='stable')
+            columns = {
+                key: arrays[key][mask][order]
+                for key in ('entry_price', 'exit_price', 'position_size',
+                            'entry_fee', 'exit_fee')
+            }
+            columns['entry_time'] = arrays['entry_stamp'][mask][order]
+            columns['exit_time'] = arrays['exit_stamp'][mask][order]
+            columns['id'] = order
+            rollup = PerformanceService.rollup_from_columns(columns)
+            rows['id'].extend(cls._uuids(rng, 1))
+            rows['strategy_id'].append(strategy_id)
+            rows['trading_plan_id'].append(plan_id)
+            rows['metrics'].append(rollup.to_metrics())
+            rows['timeframe'].append(ROLLUP_TIMEFRAME)
+            rows['period'].append(ROLLUP_PERIOD)
+            rows['created_at'].append(updated)
+            rows['updated_at'].append(updated)
+        return rows
+
+    @classmethod
+    def generate(cls,
+                 users=10,
+                 plans_per_user=2,
+                 strategies=5,
+                 trades_per_plan=1000,
+                 journal_ratio=0.5,
+                 open_ratio=0.02,
+                 days=365,
+                 seed=42,
+                 start=datetime(2024, 1, 1),
+                 password=DEFAULT_PASSWORD,
+                 chunk_size=50000,
+                 progress=None):
+        """
+        Create users, plans, strategies, trades, journal entries and
+        all-time Performance rollups in the session's transaction
+        Args:
+            users: Number of users, named synth<seed>_<n>
+            plans_per_user: Trading plans per user
+            strategies: Strategies shared by all plans
+            trades_per_plan: Trades per plan, spread over `days` days
+            journal_ratio: Share of closed trades with a journal entry
+            open_ratio: Share of each plan's latest trades left open
+            seed: Random seed; equal seeds give equal data
+            password: Password of every user (hashed once)
+            chunk_size: Rows per COPY/executemany batch
+            progress: Optional callable receiving the running report
+        Returns:
+            dict of rows written per table plus timing
+        Raises:
+            ValidationError: If the password is too weak
+            ValueError: If the data of this seed already exists
+        """
+        UserValidator.validate_password(password)
+        prefix = f"synth{seed}_"
+        if db.session.execute(
+                select(User.id).where(
+                    User.username == f"{prefix}0")).first() is not None:
+            raise ValueError(f"Synthetic data for seed {seed} already exists")
+
+        rng = np.random.default_rng(seed)
+        password_hash = PasswordService.hash_password(password)
+        started = time.perf_counter()
+        report = dict.fromkeys(cls.TABLES, 0)
+        report.update(seconds=0.0, rows_per_second=0.0)
+
+        def update_report(writer):
+            report.update(writer.counts)
+            report['seconds'] = time.perf_counter() - started
+            total = sum(writer.counts.values())
+            report['rows_per_second'] = (total / report['seconds']
+                                         if report['seconds'] else 0.0)
+
+        writer = BulkWriter(db.session.connection(), chunk_size)
+        try:
+
+            user_ids = cls._uuids(rng, users)
+            writer.write(
+                User.__table__, {
+                    'id': user_ids,
+                    'email': [f"{prefix}{i}@example.com"
+                              for i in range(users)],
+                    'username': [f"{prefix}{i}" for i in range(users)],
+                    'password_hash': [password_hash] * users,
+                    'is_active': [True] * users,
+                    'role': ['user'] * users,
+                    'created_at': [start] * users,
+                    'updated_at': [start] * users,
+                })
+
+            strategy_ids = cls._uuids(rng, strategies)
+            fast = rng.integers(5, 20, strategies).tolist()
+            writer.write(
+                Strategy.__table__, {
+                    'id': strategy_ids,
+                    'name': [f"Synthetic strategy {seed}-{i}"
+                             for i in range(strategies)],
+                    'parameters': [{
+                        'fast_ma': value,
+                        'slow_ma': value * 3
+                    } for value in fast],
+                    'example_images': [[]] * strategies,
+                    'created_at': [start] * strategies,
+                    'updated_at': [start] * strategies,
+                })
+
+            end = start + timedelta(days=days)
+            for user_number, user_id in enumerate(user_ids):
+                for plan_number in range(plans_per_user):
+                    plan_id, = cls._uuids(rng, 1)
+                    markets, timeframes, rules = cls._plan_rules(rng)
+                    writer.write(
+                        TradingPlan.__table__, {
+                            'id': [plan_id],
+                            'user_id': [user_id],
+                            'name': [f"Synthetic plan {plan_number + 1}"],
+                            'type': [str(rng.choice(PLAN_TYPES))],
+                            'version': [1],
+                            'is_active': [True],
+                            'plan_images': [[]],
+                            'created_at': [start],
+                            'updated_at': [start],
+                            **{
+                                field: [rules[field]]
+                                for field in TradingPlan.RULE_FIELDS
+                            },
+                        })
+                    version_id, = cls._uuids(rng, 1)
+                    writer.write(
+                        TradingPlanVersion.__table__, {
+                            'id': [version_id],
+                            'trading_plan_id': [plan_id],
+                            'version': [1],
+                            'is_checkpoint': [True],
+                            'data': [rules],
+                            'created_at': [start],
+                            'updated_at': [start],
+                        })
+
+                    trades, arrays = cls._trades(rng, plan_id, markets,
+                                                 timeframes, strategy_ids,
+                                                 trades_per_plan, start, days,
+                                                 open_ratio)
+                    writer.write(Trade.__table__, trades)
+                    writer.write(
+                        Journal.__table__,
+                        cls._journals(rng, trades, arrays, journal_ratio))
+                    writer.write(
+                        Performance.__table__,
+                        cls._performances(rng, plan_id, strategy_ids,
+                                          arrays, end))
+                    if progress is not None:
+                        update_report(writer)
+                        progress(dict(report))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        update_report(writer)
+        return report
@@ -0,0 +1,471 @@
+import csv
+import os
+import time
+from datetime import datetime, timezone
+import numpy as np
+from flask import current_app
+from app.models.trading_plan import TradingPlan
+from app.services.live_pnl_service import (DEFAULT_FRAME_INTERVAL,
+                                           LivePnLService)
+from app.services.market_data_service import MarketDataStore
+from app.utils.timeframes import (normalize_symbol, normalize_timeframe,
+                                  timeframe_seconds)
+
+DEFAULT_TIMEFRAMES = ('1m', )
+DEFAULT_SYMBOL_CAPACITY = 256
+DEFAULT_REPLAY_BATCH = 10000
+
+# Candle state columns kept per timeframe, indexed by symbol code
+CANDLE_STATE = ('open', 'high', 'low', 'close', 'volume')
+
+
+class TickAggregator:
+    """
+    Folds tick batches into OHLCV candles for several timeframes.
+    Symbols are interned to integer codes so every table is a numpy
+    array indexed by code: the latest-price table and, per timeframe,
+    the candle still being built. A batch is processed with a handful of
+    vectorized passes (sort, group boundaries, reduceat) instead of
+    per-tick Python work.
+    Ticks must be time-ordered per symbol across batches; a tick older
+    than its symbol's open candle is counted as late and dropped.
+    """
+
+    def __init__(self, timeframes=DEFAULT_TIMEFRAMES,
+                 capacity=DEFAULT_SYMBOL_CAPACITY):
+        self.timeframes = sorted({normalize_timeframe(tf)
+                                  for tf in timeframes},
+                                 key=timeframe_seconds)
+        self.symbols = []
+        self._codes = {}
+        self.capacity = 0
+        self.last_price = np.empty(0, dtype=np.float64)
+        self.last_time = np.empty(0, dtype=np.int64)  # epoch milliseconds
+        self._open = {tf: {} for tf in self.timeframes}
+        self._completed = {tf: [] for tf in self.timeframes}
+        self.ticks = 0
+        self.late = {tf: 0 for tf in self.timeframes}
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        extra = capacity - self.capacity
+        self.last_price = np.concatenate(
+            [self.last_price, np.full(extra, np.nan)])
+        self.last_time = np.concatenate(
+            [self.last_time, np.full(extra, -1, dtype=np.int64)])
+        for state in self._open.values():
+            state['time'] = np.concatenate([
+                state.get('time', np.empty(0, dtype=np.int64)),
+                np.full(extra, -1, dtype=np.int64)
+            ])
+            for column in CANDLE_STATE:
+                state[column] = np.concatenate(
+                    [state.get(column, np.empty(0)),
+                     np.zeros(extra)])
+        self.capacity = capacity
+
+    def code(self, symbol):
+        """Integer code of a symbol, interning it on first sight"""
+        code = self._codes.get(symbol)
+        if code is None:
+            code = self._codes.get(normalize_symbol(symbol))
+            if code is None:
+                code = len(self.symbols)
+                if code >= self.capacity:
+                    self._grow(self.capacity * 2)
+                self.symbols.append(normalize_symbol(symbol))
+                self._codes[self.symbols[code]] = code
+            self._codes[symbol] = code
+        return code
+
+    def codes(self, symbols):
+        """Vectorized code lookup for an array of symbol strings"""
+        unique, inverse = np.unique(np.asarray(symbols), return_inverse=True)
+        lookup = np.array([self.code(str(symbol)) for symbol in unique],
+                          dtype=np.int32)
+        return lookup[inverse]
+
+    def ingest(self, codes, times, prices, volumes=None):
+        """
+        Fold a batch of ticks
+        Args:
+            codes: Symbol codes (see code/codes)
+            times: Tick times in epoch milliseconds
+            prices: Trade or mid prices
+            volumes: Tick volumes (zeros if omitted)
+        Returns:
+            Number of ticks folded
+        """
+        codes = np.asarray(codes, dtype=np.int32)
+        times = np.asarray(times, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = (np.zeros(len(prices)) if volumes is None else np.asarray(
+            volumes, dtype=np.float64))
+        if not len(codes):
+            return 0
+
+        order = np.lexsort((times, codes))
+        codes, times = codes[order], times[order]
+        prices, volumes = prices[order], volumes[order]
+
+        # Latest-price table: the last tick of each symbol in the batch
+        last = np.flatnonzero(np.r_[codes[1:] != codes[:-1], True])
+        newer = times[last] >= self.last_time[codes[last]]
+        self.last_price[codes[last][newer]] = prices[last][newer]
+        self.last_time[codes[last][newer]] = times[last][newer]
+
+        for timeframe in self.timeframes:
+            self._fold(timeframe, codes, times, prices, volumes)
+        self.ticks += len(codes)
+        return len(codes)
+
+    def _fold(self, timeframe, codes, times, prices, volumes):
+        seconds = timeframe_seconds(timeframe)
+        state = self._open[timeframe]
+        buckets = times // 1000 // seconds * seconds
+
+        current = state['time'][codes]
+        keep = buckets >= current
+        if not keep.all():
+            self.late[timeframe] += int((~keep).sum())
+            codes, buckets = codes[keep], buckets[keep]
+            prices, volumes = prices[keep], volumes[keep]
+            if not len(codes):
+                return
+
+        # One group per (symbol, bucket); input is sorted by symbol, time
+        starts = np.flatnonzero(
+            np.r_[True, (codes[1:] != codes[:-1]) |
+                  (buckets[1:] != buckets[:-1])])
+        ends = np.r_[starts[1:], len(codes)] - 1
+        group = {
+            'code': codes[starts],
+            'time': buckets[starts],
+            'open': prices[starts],
+            'high': np.maximum.reduceat(prices, starts),
+            'low': np.minimum.reduceat(prices, starts),
+            'close': prices[ends],
+            'volume': np.add.reduceat(volumes, starts),
+        }
+        group_codes = group['code']
+        first = np.r_[True, group_codes[1:] != group_codes[:-1]]
+        last = np.r_[group_codes[1:] != group_codes[:-1], True]
+
+        # A symbol's first group may continue its open candle
+        open_times = state['time'][group_codes]
+        continued = group['time'] == open_times
+        if continued.any():
+            merged = group_codes[continued]
+            group['open'][continued] = state['open'][merged]
+            group['high'][continued] = np.maximum(
+                group['high'][continued], state['high'][merged])
+            group['low'][continued] = np.minimum(group['low'][continued],
+                                                 state['low'][merged])
+            group['volume'][continued] += state['volume'][merged]
+
+        # Completed: open candles a newer bucket replaced, plus every group
+        # that is not its symbol's last one in the batch
+        rolled = group_codes[first & ~continued & (open_times >= 0)]
+        done = ~last
+        completed = {
+            'code': np.concatenate([rolled, group_codes[done]]),
+            'time': np.concatenate([state['time'][rolled],
+                                    group['time'][done]]),
+        }
+        for column in CANDLE_STATE:
+            completed[column] = np.concatenate(
+                [state[column][rolled], group[column][done]])
+        if len(completed['code']):
+            self._completed[timeframe].append(completed)
+
+        opened = group_codes[last]
+        state['time'][opened] = group['time'][last]
+        for column in CANDLE_STATE:
+            state[column][opened] = group[column][last]
+
+    def close_open(self):
+        """Complete every open candle (e.g. at the end of a replay)"""
+        for timeframe, state in self._open.items():
+            codes = np.flatnonzero(state['time'] >= 0)
+            if not len(codes):
+                continue
+            completed = {'code': codes, 'time': state['time'][codes].copy()}
+            for column in CANDLE_STATE:
+                completed[column] = state[column][codes].copy()
+            self._completed[timeframe].append(completed)
+            state['time'][codes] = -1
+
+    def drain(self):
+        """
+        Take the completed candles
+        Returns:
+            dict of (symbol, timeframe) -> candle columns ('time' in epoch
+            seconds) ordered by time, as accepted by MarketDataStore.append
+        """
+        series = {}
+        for timeframe, chunks in self._completed.items():
+            if not chunks:
+                continue
+            columns = {
+                key: np.concatenate([chunk[key] for chunk in chunks])
+                for key in chunks[0]
+            }
+            chunks.clear()
+            order = np.lexsort((columns['time'], columns['code']))
+            codes = columns['code'][order]
+            bounds = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+            for start, end in zip(bounds, np.r_[bounds[1:], len(codes)]):
+                rows = order[start:end]
+                candles = {
+                    column: columns[column][rows]
+                    for column in ('time', ) + CANDLE_STATE
+                }
+                series[(self.symbols[codes[start]], timeframe)] = candles
+        return series
+
+    def latest(self, symbol):
+        """(price, epoch ms) of a symbol's newest tick, or None"""
+        code = self._codes.get(symbol)
+        if code is None or self.last_time[code] < 0:
+            return None
+        return float(self.last_price[code]), int(self.last_time[code])
+
+    def prices(self):
+        """Latest price of every symbol seen"""
+        seen = np.flatnonzero(self.last_time[:len(self.symbols)] >= 0)
+        return {
+            self.symbols[code]: float(self.last_price[code])
+            for code in seen
+        }
+
+
+class TickIngestService:
+    """
+    Tick ingestion pipeline: keeps the latest-price table, folds ticks into
+    candles for the plans' timeframes, appends completed candles to the
+    market data store and feeds prices to the live P&L stream.
+    With publish set this process is the live P&L publisher: ingesting
+    emits a frame whenever the frame interval has passed.
+    """
+
+    def __init__(self, timeframes=DEFAULT_TIMEFRAMES, store=None,
+                 publish=True, frame_interval=DEFAULT_FRAME_INTERVAL,
+                 clock=time.monotonic):
+        self.aggregator = TickAggregator(timeframes)
+        self.store = store
+        self.publish = publish
+        self.frame_interval = frame_interval
+        self._clock = clock
+        self._next_frame = None
+
+    @classmethod
+    def from_config(cls, timeframes=None, store=True, publish=None):
+        """
+        Pipeline for the running app; timeframes default to the plans' and
+        publish to LIVE_PUBLISHER_ENABLED
+        """
+        config = current_app.config
+        root = config.get('MARKET_DATA_DIR')
+        if publish is None:
+            publish = config.get('LIVE_PUBLISHER_ENABLED', False)
+        return cls(timeframes or cls.plan_timeframes(),
+                   store=MarketDataStore(root) if store and root else None,
+                   publish=publish,
+                   frame_interval=config.get('LIVE_FRAME_INTERVAL',
+                                             DEFAULT_FRAME_INTERVAL))
+
+    @staticmethod
+    def plan_timeframes():
+        """Canonical timeframes listed by active trading plans"""
+        timeframes = set()
+        for (values, ) in TradingPlan.query.with_entities(
+                TradingPlan.timeframes).filter_by(is_active=True):
+            for value in values or ():
+                try:
+                    timeframes.add(normalize_timeframe(value))
+                except ValueError:
+                    continue
+        return sorted(timeframes, key=timeframe_seconds) or list(
+            DEFAULT_TIMEFRAMES)
+
+    def ingest(self, symbols, times, prices, volumes=None):
+        """
+        Consume a batch of ticks
+        Args:
+            symbols: Symbol per tick
+            times: Tick times in epoch milliseconds
+        Returns:
+            Number of ticks ingested
+        """
+        codes = self.aggregator.codes(symbols)
+        count = self.aggregator.ingest(codes, times, prices, volumes)
+        if self.publish and count:
+            for code in np.unique(codes):
+                LivePnLService.on_tick(self.aggregator.symbols[code],
+                                       self.aggregator.last_price[code])
+            self.publish_frame()
+        return count
+
+    def publish_frame(self, force=False):
+        """
+        Emit a live P&L frame if the frame interval has passed
+        Args:
+            force: Emit now regardless of the interval
+        Returns:
+            Number of messages emitted
+        """
+        now = self._clock()
+        if not force and self._next_frame is not None \
+                and now < self._next_frame:
+            return 0
+        self._next_frame = now + self.frame_interval
+        return LivePnLService.flush()
+
+    def flush(self, close=False):
+        """
+        Persist completed candles
+        Args:
+            close: Also complete the candles still open and publish the
+                   final prices
+        Returns:
+            dict of (symbol, timeframe) -> candles written
+        """
+        if close:
+            self.aggregator.close_open()
+            if self.publish:
+                self.publish_frame(force=True)
+        written = {}
+        for (symbol, timeframe), candles in self.aggregator.drain().items():
+            if self.store is not None:
+                # The store is append-only: skip bars it already holds
+                last = self.store.last_time(symbol, timeframe)
+                if last is not None:
+                    newer = candles['time'] > last
+                    candles = {
+                        key: values[newer]
+                        for key, values in candles.items()
+                    }
+                self.store.append(symbol, timeframe, candles)
+            written[(symbol, timeframe)] = len(candles['time'])
+        return written
+
+
+def _epoch_ms(value):
+    try:
+        return int(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(parsed.timestamp() * 1000)
+
+
+def write_ticks(path, symbols, times, prices, volumes=None):
+    """Record ticks to a .npz or .csv file readable by TickReplaySource"""
+    volumes = np.zeros(len(prices)) if volumes is None else volumes
+    if path.endswith('.npz'):
+        np.savez(path,
+                 symbol=np.asarray(symbols, dtype=str),
+                 time=np.asarray(times, dtype=np.int64),
+                 price=np.asarray(prices, dtype=np.float64),
+                 volume=np.asarray(volumes, dtype=np.float64))
+        return
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(['time', 'symbol', 'price', 'volume'])
+        writer.writerows(zip(times, symbols, prices, volumes))
+
+
+class TickReplaySource:
+    """
+    Plays a recorded tick file back in batches.
+    Files are .npz (symbol/time/price/volume arrays) or CSV with a
+    time,symbol,price[,volume] header, time in epoch milliseconds or
+    ISO 8601, ordered by time. Batches are released when their first
+    tick is due at `speed` times real time; speed=None replays as fast
+    as possible for load tests.
+    """
+
+    def __init__(self, path, speed=1.0, batch_size=DEFAULT_REPLAY_BATCH,
+                 clock=time.monotonic, sleep=time.sleep):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        if speed is not None and speed <= 0:
+            raise ValueError("Replay speed must be positive")
+        self.path = path
+        self.speed = speed
+        self.batch_size = batch_size
+        self._clock = clock
+        self._sleep = sleep
+
+    def _chunks(self):
+        if self.path.endswith('.npz'):
+            with np.load(self.path) as data:
+                columns = {key: data[key] for key in data.files}
+            for start in range(0, len(columns['time']), self.batch_size):
+                yield {
+                    key: values[start:start + self.batch_size]
+                    for key, values in columns.items()
+                }
+            return
+
+        with open(self.path, newline='') as handle:
+            reader = csv.DictReader(handle)
+            rows = []
+            for row in reader:
+                rows.append(row)
+                if len(rows) == self.batch_size:
+                    yield self._columns(rows)
+                    rows = []
+            if rows:
+                yield self._columns(rows)
+
+    @staticmethod
+    def _columns(rows):
+        return {
+            'symbol': np.array([row['symbol'] for row in rows]),
+            'time': np.array([_epoch_ms(row['time']) for row in rows],
+                             dtype=np.int64),
+            'price': np.array([row['price'] for row in rows],
+                              dtype=np.float64),
+            'volume': np.array([row.get('volume') or 0 for row in rows],
+                               dtype=np.float64),
+        }
+
+    def batches(self):
+        """Yield (symbols, times, prices, volumes) batches on schedule"""
+        started = first_tick = None
+        for chunk in self._chunks():
+            if self.speed is not None:
+                if started is None:
+                    started, first_tick = self._clock(), int(chunk['time'][0])
+                due = started + (int(chunk['time'][0]) -
+                                 first_tick) / 1000 / self.speed
+                delay = due - self._clock()
+                if delay > 0:
+                    self._sleep(delay)
+            yield chunk['symbol'], chunk['time'], chunk['price'], chunk[
+                'volume']
+
+    def replay(self, pipeline, flush=True):
+        """
+        Feed the whole file into a TickIngestService
+        Returns:
+            dict with ticks, seconds, ticks_per_second and candles written
+        """
+        ticks = 0
+        candles = 0
+        start = time.perf_counter()
+        for batch in self.batches():
+            ticks += pipeline.ingest(*batch)
+            if flush:
+                candles += sum(pipeline.flush().values())
+        if flush:
+            candles += sum(pipeline.flush(close=True).values())
+        elapsed = time.perf_counter() - start
+        return {
+            'ticks': ticks,
+            'seconds': elapsed,
+            'ticks_per_second': ticks / elapsed if elapsed else None,
+            'candles': candles,
+        }
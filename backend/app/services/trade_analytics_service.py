@@ -0,0 +1,261 @@
+from decimal import Decimal
+import numpy as np
+from sqlalchemy import select, cast, func, Float
+from app import db
+from app.models.trade import Trade
+from app.models.trading_plan import TradingPlan
+
+
+class TradeAnalyticsService:
+    """Columnar P&L analytics for closed trades"""
+
+    # Largest magnitude we allow in an int64 fixed-point product before
+    # falling back to exact Python integers (object arrays)
+    INT64_SAFE_LIMIT = 2**62
+
+    @staticmethod
+    def closed_trades_query(columns,
+                            trading_plan_id=None,
+                            user_id=None,
+                            strategy_id=None,
+                            timeframe=None,
+                            start=None,
+                            end=None):
+        """
+        Select columns of closed trades in exit order
+        Args:
+            columns: Columns or expressions to select
+            trading_plan_id/user_id/strategy_id/timeframe/start/end:
+                Filters as in load_closed_trades; trading_plan_id or
+                user_id is required
+        Returns:
+            Select statement ordered by (exit_time, id)
+        """
+        if trading_plan_id is None and user_id is None:
+            raise ValueError("trading_plan_id or user_id is required")
+
+        stmt = select(*columns).where(Trade.exit_price.isnot(None),
+                                      Trade.exit_time.isnot(None))
+        if trading_plan_id is not None:
+            stmt = stmt.where(Trade.trading_plan_id == trading_plan_id)
+        if user_id is not None:
+            stmt = stmt.join(TradingPlan,
+                             TradingPlan.id == Trade.trading_plan_id).where(
+                                 TradingPlan.user_id == user_id)
+        if strategy_id is not None:
+            stmt = stmt.where(Trade.strategy_id == strategy_id)
+        if timeframe is not None:
+            stmt = stmt.where(Trade.timeframe == timeframe)
+        if start is not None:
+            stmt = stmt.where(Trade.exit_time >= start)
+        if end is not None:
+            stmt = stmt.where(Trade.exit_time < end)
+        return stmt.order_by(Trade.exit_time, Trade.id)
+
+    @classmethod
+    def load_closed_trades(cls,
+                           trading_plan_id=None,
+                           user_id=None,
+                           strategy_id=None,
+                           exact=False,
+                           timeframe=None,
+                           start=None,
+                           end=None):
+        """
+        Load closed trades into columnar arrays with a single query
+        Args:
+            trading_plan_id: Restrict to one trading plan
+            user_id: Restrict to plans owned by one user
+            strategy_id: Optional strategy filter
+            timeframe: Optional trade timeframe filter
+            start: Optional inclusive lower bound on exit_time
+            end: Optional exclusive upper bound on exit_time
+            exact: Keep prices and fees as Decimal (for fixed-point mode)
+                   instead of casting them to float in the database
+        Returns:
+            dict of column name -> numpy array
+        """
+        numeric = [
+            Trade.entry_price, Trade.exit_price, Trade.position_size,
+            Trade.entry_fee, Trade.exit_fee
+        ]
+        if exact:
+            numeric_columns = [
+                func.coalesce(col, 0).label(col.key) for col in numeric
+            ]
+        else:
+            numeric_columns = [
+                cast(func.coalesce(col, 0), Float).label(col.key)
+                for col in numeric
+            ]
+
+        stmt = cls.closed_trades_query(
+            [Trade.id, Trade.entry_time, Trade.exit_time] + numeric_columns,
+            trading_plan_id=trading_plan_id,
+            user_id=user_id,
+            strategy_id=strategy_id,
+            timeframe=timeframe,
+            start=start,
+            end=end)
+        rows = db.session.execute(stmt).all()
+
+        ids, entry_times, exit_times, *values = zip(*rows) if rows else (
+            (), (), (), (), (), (), (), ())
+        columns = {
+            'id': np.array(ids, dtype=object),
+            'entry_time': np.array(entry_times, dtype='datetime64[us]'),
+            'exit_time': np.array(exit_times, dtype='datetime64[us]'),
+        }
+        for col, data in zip(numeric, values):
+            if exact:
+                columns[col.key] = np.array(
+                    [Decimal(str(v)).normalize() for v in data],
+                    dtype=object)
+            else:
+                columns[col.key] = np.array(data, dtype=np.float64)
+        return columns
+
+    @staticmethod
+    def compute_pnl(columns, risk=None):
+        """
+        Compute P&L metrics for a batch of trades in float64
+        Args:
+            columns: Arrays as returned by load_closed_trades
+            risk: Amount risked per trade (scalar or array) used as 1R.
+                  Defaults to the average absolute loss of the batch.
+        Returns:
+            dict with gross_pnl, net_pnl, fees, return_pct, r_multiple
+            and holding_seconds arrays
+        """
+        entry = np.asarray(columns['entry_price'], dtype=np.float64)
+        exit_ = np.asarray(columns['exit_price'], dtype=np.float64)
+        size = np.asarray(columns['position_size'], dtype=np.float64)
+        fees = (np.asarray(columns['entry_fee'], dtype=np.float64) +
+                np.asarray(columns['exit_fee'], dtype=np.float64))
+
+        # Negative position size denotes a short position
+        gross = (exit_ - entry) * size
+        net = gross - fees
+        notional = np.abs(entry * size)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return_pct = np.where(notional > 0, net / notional * 100.0,
+                                  np.nan)
+
+            if risk is None:
+                losses = net[net < 0]
+                risk = -losses.mean() if losses.size else np.nan
+            risk = np.asarray(risk, dtype=np.float64)
+            r_multiple = np.where(risk > 0, net / risk, np.nan)
+
+        holding = (columns['exit_time'] -
+                   columns['entry_time']) / np.timedelta64(1, 's')
+
+        return {
+            'gross_pnl': gross,
+            'net_pnl': net,
+            'fees': fees,
+            'return_pct': return_pct,
+            'r_multiple': r_multiple,
+            'holding_seconds': holding,
+        }
+
+    @staticmethod
+    def _decimal_places(values):
+        places = 0
+        for value in values:
+            exponent = value.as_tuple().exponent
+            if isinstance(exponent, int) and -exponent > places:
+                places = -exponent
+        return places
+
+    @classmethod
+    def _to_fixed(cls, values, places):
+        return [int(value.scaleb(places)) for value in values]
+
+    @classmethod
+    def _fixed_array(cls, ints, bound):
+        # Products of large fixed-point ints can overflow int64; in that
+        # case keep Python ints, which numpy still handles element-wise
+        if bound < cls.INT64_SAFE_LIMIT:
+            return np.array(ints, dtype=np.int64)
+        return np.array(ints, dtype=object)
+
+    @classmethod
+    def compute_pnl_exact(cls, columns):
+        """
+        Compute gross/net P&L and fees in exact fixed-point arithmetic
+        Args:
+            columns: Arrays loaded with load_closed_trades(exact=True)
+        Returns:
+            dict with integer gross_pnl, net_pnl and fees arrays plus the
+            decimal 'scale' shared by all of them
+        """
+        entry = columns['entry_price']
+        exit_ = columns['exit_price']
+        size = columns['position_size']
+        entry_fee = columns['entry_fee']
+        exit_fee = columns['exit_fee']
+
+        price_places = cls._decimal_places(np.concatenate([entry, exit_]))
+        size_places = cls._decimal_places(size)
+        fee_places = cls._decimal_places(np.concatenate([entry_fee,
+                                                         exit_fee]))
+        scale = max(price_places + size_places, fee_places)
+
+        entry_i = cls._to_fixed(entry, price_places)
+        exit_i = cls._to_fixed(exit_, price_places)
+        size_i = cls._to_fixed(size, size_places)
+        fee_shift = 10**(scale - fee_places)
+        fees_i = [(a + b) * fee_shift for a, b in zip(
+            cls._to_fixed(entry_fee, fee_places),
+            cls._to_fixed(exit_fee, fee_places))]
+
+        max_price = max((abs(v) for v in entry_i + exit_i), default=0)
+        max_size = max((abs(v) for v in size_i), default=0)
+        max_fee = max((abs(v) for v in fees_i), default=0)
+        bound = (2 * max_price * max_size * 10**(scale - price_places -
+                                                size_places) + max_fee)
+
+        entry_a = cls._fixed_array(entry_i, bound)
+        exit_a = cls._fixed_array(exit_i, bound)
+        size_a = cls._fixed_array(size_i, bound)
+        fees_a = cls._fixed_array(fees_i, bound)
+
+        gross = (exit_a - entry_a) * size_a * 10**(scale - price_places -
+                                                   size_places)
+        return {
+            'gross_pnl': gross,
+            'net_pnl': gross - fees_a,
+            'fees': fees_a,
+            'scale': scale,
+        }
+
+    @staticmethod
+    def to_decimal(values, scale):
+        """Convert a fixed-point integer array back to Decimals"""
+        return [Decimal(int(v)).scaleb(-scale) for v in values]
+
+    @classmethod
+    def trade_pnl(cls,
+                  trading_plan_id=None,
+                  user_id=None,
+                  strategy_id=None,
+                  exact=False,
+                  risk=None):
+        """
+        Load closed trades and compute their P&L in one pass
+        Args:
+            exact: Use fixed-point arithmetic (Decimal-exact) for P&L and
+                   fees instead of float64
+        """
+        columns = cls.load_closed_trades(trading_plan_id=trading_plan_id,
+                                         user_id=user_id,
+                                         strategy_id=strategy_id,
+                                         exact=exact)
+        if exact:
+            result = cls.compute_pnl_exact(columns)
+        else:
+            result = cls.compute_pnl(columns, risk=risk)
+        result['id'] = columns['id']
+        return result
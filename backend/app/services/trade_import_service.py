@@ -0,0 +1,363 @@
+import csv
+import json
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from flask import current_app
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from marshmallow.exceptions import ValidationError
+from app import db
+from app.models.strategy import Strategy
+from app.models.trade import Trade
+from app.models.trading_plan import TradingPlan
+from app.services.cache_service import CacheService
+from app.services.performance_service import PerformanceService
+from app.utils.timeframes import normalize_symbol, normalize_timeframe
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+REQUIRED_FIELDS = ('symbol', 'entry_price', 'entry_time', 'position_size')
+DECIMAL_FIELDS = ('entry_price', 'exit_price', 'position_size', 'entry_fee',
+                  'exit_fee')
+MAX_REPORTED_ERRORS = 1000
+# A chunk is one multi-row INSERT, so its rows times the trade columns must
+# fit SQLite's default limit on bind parameters per statement
+MAX_BIND_PARAMETERS = 32766
+MAX_CHUNK_SIZE = MAX_BIND_PARAMETERS // len(Trade.__table__.columns)
+
+
+class RowError(Exception):
+    pass
+
+
+def detect_format(filename):
+    """Guess the import format from a file name"""
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl', '.json')):
+        return 'ndjson'
+    raise ValueError(f"Cannot detect import format of {filename!r}")
+
+
+def text_lines(stream, errors=None):
+    """
+    Decode a binary stream lazily, line by line
+    Args:
+        stream: Binary file-like object (or iterable of byte lines)
+        errors: Optional list collecting (line_number, RowError) for lines
+                that are not UTF-8; they are read as blank lines so the
+                parsers keep counting lines. Without it the error raises.
+    """
+    for line_number, raw in enumerate(stream, start=1):
+        try:
+            yield raw.decode('utf-8-sig' if line_number == 1 else 'utf-8')
+        except UnicodeDecodeError as e:
+            if errors is None:
+                raise
+            errors.append(
+                (line_number, RowError(f"Invalid UTF-8: {e.reason}")))
+            yield '\n'
+
+
+def parse_csv(lines):
+    """Yield (line_number, record or RowError) from CSV lines with a header"""
+    # csv.Reader.line_num skips the line a csv.Error was raised on
+    line_number = 0
+
+    def counted():
+        nonlocal line_number
+        for line in lines:
+            line_number += 1
+            yield line
+
+    reader = csv.DictReader(counted())
+    try:
+        reader.fieldnames
+    except csv.Error as e:
+        # Without a header no later row can be read; stop here
+        yield line_number, RowError(f"Invalid CSV header: {e}")
+        return
+
+    while True:
+        previous = line_number
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield line_number, RowError(f"Invalid CSV: {e}")
+            if line_number == previous:
+                return  # Nothing was consumed; retrying would loop
+            continue
+        yield line_number, record
+
+
+def parse_ndjson(lines):
+    """Yield (line_number, record or RowError) from NDJSON lines"""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, RowError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield line_number, RowError("Each line must be a JSON object")
+            continue
+        yield line_number, record
+
+
+def parse_stream(stream, fmt):
+    """Yield (line_number, record or RowError) for every row of an export"""
+    decode_errors = []
+    lines = text_lines(stream, decode_errors)
+    records = parse_csv(lines) if fmt == 'csv' else parse_ndjson(lines)
+    for item in records:
+        # Undecodable lines were read before the record that follows them
+        yield from decode_errors
+        decode_errors.clear()
+        yield item
+    yield from decode_errors
+
+
+def _decimal(value, field):
+    try:
+        return Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        raise RowError(f"{field} is not a number")
+
+
+def _datetime(value, field):
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace('Z',
+                                                                   '+00:00'))
+    except ValueError:
+        raise RowError(f"{field} is not an ISO 8601 timestamp")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def validate_record(record, trading_plan_id):
+    """
+    Turn a parsed broker record into a trades row
+    Raises:
+        RowError: when the record cannot be imported
+    """
+    missing = [field for field in REQUIRED_FIELDS if _blank(record.get(field))]
+    if missing:
+        raise RowError(f"Missing required fields: {missing}")
+
+    row = {'trading_plan_id': trading_plan_id}
+    try:
+        row['symbol'] = normalize_symbol(str(record['symbol']))
+    except ValueError as e:
+        raise RowError(str(e))
+
+    for field in DECIMAL_FIELDS:
+        if not _blank(record.get(field)):
+            row[field] = _decimal(record[field], field)
+    row.setdefault('entry_fee', Decimal('0'))
+    row.setdefault('exit_fee', Decimal('0'))
+
+    row['entry_time'] = _datetime(record['entry_time'], 'entry_time')
+    row['exit_time'] = (None if _blank(record.get('exit_time')) else
+                        _datetime(record['exit_time'], 'exit_time'))
+    row.setdefault('exit_price', None)
+    if (row['exit_price'] is None) != (row['exit_time'] is None):
+        raise RowError("exit_price and exit_time must be given together")
+    if row['exit_time'] is not None and row['exit_time'] < row['entry_time']:
+        raise RowError("exit_time is before entry_time")
+
+    timeframe = record.get('timeframe')
+    if _blank(timeframe):
+        row['timeframe'] = None
+    else:
+        row['timeframe'] = str(timeframe).strip()
+        try:
+            normalize_timeframe(row['timeframe'])
+        except ValueError as e:
+            raise RowError(str(e))
+
+    strategy_id = record.get('strategy_id')
+    try:
+        row['strategy_id'] = (None if _blank(strategy_id) else uuid.UUID(
+            str(strategy_id)))
+    except ValueError:
+        raise RowError("strategy_id is not a UUID")
+
+    for field in Trade.image_url_fields:
+        url = record.get(field)
+        row[field] = None if _blank(url) else url
+    try:
+        Trade.validate_image_mappings([row])
+    except ValidationError as e:
+        field, messages = next(iter(e.messages.items()))
+        raise RowError(f"{field}: {messages[0]}")
+    return row
+
+
+def validate_records(records, trading_plan_id):
+    """Yield (line_number, row, error) for each parsed record"""
+    for line_number, record in records:
+        if isinstance(record, RowError):
+            yield line_number, None, str(record)
+            continue
+        try:
+            yield line_number, validate_record(record,
+                                               trading_plan_id), None
+        except RowError as e:
+            yield line_number, None, str(e)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class TradeImportService:
+
+    @staticmethod
+    def _insert_rows(rows):
+        now = datetime.utcnow()
+        # Core inserts skip the ORM hook that pins trades to a plan version
+        versions = dict(
+            db.session.execute(
+                select(TradingPlan.id, TradingPlan.version).where(
+                    TradingPlan.id.in_(
+                        {row['trading_plan_id']
+                         for row in rows}))).all())
+        for row in rows:
+            row['id'] = uuid.uuid4()
+            row['created_at'] = now
+            row['updated_at'] = now
+            row['trading_plan_version'] = versions.get(row['trading_plan_id'])
+        db.session.execute(insert(Trade.__table__).values(rows))
+
+    @staticmethod
+    def _unknown_strategies(rows):
+        ids = {row['strategy_id'] for row in rows if row['strategy_id']}
+        if not ids:
+            return set()
+        known = set(
+            db.session.execute(
+                select(Strategy.id).where(Strategy.id.in_(ids))).scalars())
+        return ids - known
+
+    @classmethod
+    def _flush_chunk(cls, chunk, report):
+        unknown = cls._unknown_strategies([row for _, row in chunk])
+        rows = []
+        for line_number, row in chunk:
+            if row['strategy_id'] in unknown:
+                cls._record_error(report, line_number, "Unknown strategy_id")
+            else:
+                rows.append((line_number, row))
+        if not rows:
+            return []
+
+        try:
+            cls._insert_rows([row for _, row in rows])
+            db.session.commit()
+            return [row for _, row in rows]
+        except SQLAlchemyError:
+            db.session.rollback()
+
+        # Isolate the offending rows without losing the rest of the chunk
+        inserted = []
+        for line_number, row in rows:
+            try:
+                cls._insert_rows([row])
+                db.session.commit()
+                inserted.append(row)
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                cls._record_error(report, line_number,
+                                  f"Database error: {e.orig}")
+        return inserted
+
+    @staticmethod
+    def _record_error(report, line_number, message):
+        report['failed'] += 1
+        if len(report['errors']) < MAX_REPORTED_ERRORS:
+            report['errors'].append({'line': line_number, 'error': message})
+
+    @classmethod
+    def import_stream(cls,
+                      stream,
+                      fmt,
+                      trading_plan_id,
+                      chunk_size=1000,
+                      progress=None):
+        """
+        Stream a broker export into the trades table
+        The file is read line by line; valid rows are inserted in chunks
+        with a multi-row Core INSERT (no ORM objects), one transaction per
+        chunk. Invalid rows are reported and skipped.
+        Args:
+            stream: Binary file-like object (or iterable of byte lines)
+            fmt: 'csv' or 'ndjson'
+            trading_plan_id: Plan that receives the trades
+            chunk_size: Rows per INSERT statement, 1 to MAX_CHUNK_SIZE
+            progress: Optional callback(report) after each chunk
+        Returns:
+            dict with processed, inserted, failed and per-row errors
+        """
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format: {fmt}")
+        if not 1 <= chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(
+                f"chunk_size must be between 1 and {MAX_CHUNK_SIZE}")
+
+        records = parse_stream(stream, fmt)
+        report = {'processed': 0, 'inserted': 0, 'failed': 0, 'errors': []}
+        touched = set()
+        strategy_ids = set()
+
+        for batch in chunked(validate_records(records, trading_plan_id),
+                             chunk_size):
+            valid = []
+            for line_number, row, error in batch:
+                report['processed'] += 1
+                if error is not None:
+                    cls._record_error(report, line_number, error)
+                else:
+                    valid.append((line_number, row))
+
+            for row in cls._flush_chunk(valid, report):
+                report['inserted'] += 1
+                if row['strategy_id']:
+                    strategy_ids.add(row['strategy_id'])
+                if row['strategy_id'] and row['exit_time'] is not None:
+                    touched.update(
+                        PerformanceService.row_keys(row['strategy_id'],
+                                                    trading_plan_id,
+                                                    row['timeframe'],
+                                                    row['exit_time']))
+
+            if progress is not None:
+                progress(report)
+
+        # Core inserts bypass the ORM events that keep caches and rollups
+        # current
+        if report['inserted']:
+            CacheService.invalidate(
+                f'trades:plan:{trading_plan_id}',
+                *(f'trades:strategy:{strategy_id}'
+                  for strategy_id in strategy_ids))
+
+        if current_app.config.get('PERFORMANCE_ROLLUPS_ENABLED', False):
+            PerformanceService.refresh_keys(touched)
+
+        return report
@@ -0,0 +1,134 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import select, tuple_, union_all
+from app import db
+from app.models.trade import Trade
+from app.models.trading_plan import TradingPlan
+from app.utils.exceptions import InvalidCursorError
+
+
+class TradeService:
+
+    @staticmethod
+    def encode_cursor(trade):
+        """Opaque keyset cursor for the (entry_time, id) position"""
+        payload = json.dumps([trade.entry_time.isoformat(), str(trade.id)])
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            entry_time, trade_id = json.loads(
+                base64.urlsafe_b64decode(cursor.encode()))
+            return datetime.fromisoformat(entry_time), uuid.UUID(trade_id)
+        except (ValueError, TypeError) as e:
+            raise InvalidCursorError("Invalid pagination cursor") from e
+
+    @staticmethod
+    def _naive_utc(value):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    @classmethod
+    def user_trades_query(cls, user_id, filters=None, columns=None):
+        """
+        Build the filtered trade query for one user's plans
+        Args:
+            user_id: Owner of the trading plans
+            filters: Mapping with optional symbol, strategy_id,
+                     trading_plan_id, timeframe, status ('open'/'closed'),
+                     start and end (entry_time range, end exclusive)
+            columns: Columns to select instead of Trade entities
+        """
+        filters = filters or {}
+        plan_ids = select(
+            TradingPlan.id).where(TradingPlan.user_id == user_id)
+        stmt = select(*(columns or [Trade])).where(
+            Trade.trading_plan_id.in_(plan_ids))
+
+        if filters.get('trading_plan_id') is not None:
+            stmt = stmt.where(
+                Trade.trading_plan_id == filters['trading_plan_id'])
+        if filters.get('strategy_id') is not None:
+            stmt = stmt.where(Trade.strategy_id == filters['strategy_id'])
+        if filters.get('symbol'):
+            stmt = stmt.where(Trade.symbol == filters['symbol'].upper())
+        if filters.get('timeframe'):
+            stmt = stmt.where(Trade.timeframe == filters['timeframe'])
+        if filters.get('status') == 'open':
+            stmt = stmt.where(Trade.exit_time.is_(None))
+        elif filters.get('status') == 'closed':
+            stmt = stmt.where(Trade.exit_time.isnot(None))
+        if filters.get('start') is not None:
+            stmt = stmt.where(
+                Trade.entry_time >= cls._naive_utc(filters['start']))
+        if filters.get('end') is not None:
+            stmt = stmt.where(
+                Trade.entry_time < cls._naive_utc(filters['end']))
+        return stmt
+
+    @staticmethod
+    def _page_query(stmt, after, size):
+        """Order newest first and take `size` rows after a keyset position"""
+        if after is not None:
+            stmt = stmt.where(tuple_(Trade.entry_time, Trade.id) < after)
+        return stmt.order_by(Trade.entry_time.desc(),
+                             Trade.id.desc()).limit(size)
+
+    @classmethod
+    def _merged_page_query(cls, user_id, filters, after, size):
+        """
+        Page across all of a user's plans as a merge of per-plan pages.
+        Each branch is one range scan of the (trading_plan_id, entry_time,
+        id) index, so no plan is read past its first `size` rows.
+        """
+        plan_ids = db.session.execute(
+            select(TradingPlan.id).where(
+                TradingPlan.user_id == user_id)).scalars().all()
+        if not plan_ids:
+            return select(Trade).where(db.false())
+
+        branches = []
+        for plan_id in plan_ids:
+            page = cls._page_query(
+                cls.user_trades_query(user_id, {
+                    **filters, 'trading_plan_id': plan_id
+                }, columns=[Trade.id]), after, size).subquery()
+            branches.append(select(page.c.id))
+        merged = union_all(*branches).subquery()
+        return cls._page_query(
+            select(Trade).where(Trade.id.in_(select(merged.c.id))), None,
+            size)
+
+    @classmethod
+    def list_trades(cls, user_id, filters=None, cursor=None, limit=50):
+        """
+        List a user's trades newest first with keyset pagination
+        Args:
+            user_id: Owner of the trading plans
+            filters: See user_trades_query
+            cursor: Cursor returned as next_cursor by the previous page
+            limit: Page size
+        Returns:
+            dict with 'trades', 'next_cursor' and 'has_more'
+        """
+        filters = filters or {}
+        after = cls.decode_cursor(cursor) if cursor else None
+        if filters.get('trading_plan_id') is not None:
+            stmt = cls._page_query(cls.user_trades_query(user_id, filters),
+                                   after, limit + 1)
+        else:
+            stmt = cls._merged_page_query(user_id, filters, after, limit + 1)
+
+        trades = db.session.execute(stmt).scalars().all()
+        has_more = len(trades) > limit
+        trades = trades[:limit]
+        return {
+            'trades': [trade.to_dict() for trade in trades],
+            'next_cursor':
+            cls.encode_cursor(trades[-1]) if has_more else None,
+            'has_more': has_more,
+        }
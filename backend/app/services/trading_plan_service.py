@@ -0,0 +1,55 @@
+from sqlalchemy import select
+from app import db
+from app.models.loader_profiles import deferrable_columns, loader_options
+from app.models.trading_plan import TradingPlan
+
+
+class TradingPlanService:
+
+    @staticmethod
+    def list_plans(user_id):
+        """A user's trading plans, active first, by name"""
+        return TradingPlan.query.filter_by(user_id=user_id).order_by(
+            TradingPlan.is_active.desc(), TradingPlan.name).all()
+
+    @staticmethod
+    def get_plan(user_id, plan_id):
+        """Fetch a plan if it belongs to the user, else None"""
+        plan = db.session.get(TradingPlan, plan_id)
+        if plan is None or plan.user_id != user_id:
+            return None
+        return plan
+
+    @staticmethod
+    def get_plan_aggregate(user_id, plan_id, include=()):
+        """
+        Plan with its trades, journal entries and performances in four
+        queries, whatever the number of trades
+        Args:
+            include: Deferred JSON columns to load as well
+        Returns:
+            dict for the API, or None if the user has no such plan
+        """
+        plan = db.session.execute(
+            select(TradingPlan).options(
+                *loader_options('plan_aggregate', include)).where(
+                    TradingPlan.id == plan_id,
+                    TradingPlan.user_id == user_id)).scalar_one_or_none()
+        if plan is None:
+            return None
+
+        exclude = set(deferrable_columns('plan_aggregate')) - set(include)
+        trades = []
+        for trade in sorted(plan.trades, key=lambda t: (t.entry_time, t.id)):
+            data = trade.to_dict()
+            data['journal_entry'] = (trade.journal_entry.to_dict(exclude)
+                                     if trade.journal_entry else None)
+            trades.append(data)
+        return {
+            'trading_plan': plan.to_dict(exclude),
+            'trades': trades,
+            'performances': [
+                performance.to_dict(exclude)
+                for performance in plan.performances
+            ],
+        }
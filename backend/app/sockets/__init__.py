@@ -0,0 +1,8 @@
+from .live_namespace import LiveNamespace
+
+
+def register_sockets(socketio):
+    """Register Socket.IO namespaces (once per SocketIO instance)"""
+    registered = {handler.namespace for handler in socketio.namespace_handlers}
+    if LiveNamespace.NAMESPACE not in registered:
+        socketio.on_namespace(LiveNamespace(LiveNamespace.NAMESPACE))
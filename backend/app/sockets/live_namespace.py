@@ -0,0 +1,72 @@
+import uuid
+from flask import request
+from flask_jwt_extended import decode_token
+from flask_socketio import Namespace, join_room, leave_room
+from app.services.live_pnl_service import (LIVE_NAMESPACE, LivePnLService,
+                                           plan_room)
+from app.services.trading_plan_service import TradingPlanService
+
+
+class LiveNamespace(Namespace):
+    """
+    Live P&L stream. Clients connect with {'token': <access token>} as
+    auth, then emit 'subscribe' with a trading_plan_id. They receive a
+    'snapshot' of the plan followed by 'delta' messages holding only the
+    fields that changed, at most one per frame.
+    """
+
+    NAMESPACE = LIVE_NAMESPACE
+
+    def __init__(self, namespace=None):
+        super().__init__(namespace)
+        self.users = {}  # sid -> user_id
+        self.subscriptions = {}  # sid -> {plan_id}
+
+    def on_connect(self, auth=None):
+        token = (auth or {}).get('token') or request.args.get('token')
+        try:
+            decoded = decode_token(token)
+            # Like jwt_required(), only access tokens grant access
+            if decoded['type'] != 'access':
+                raise ValueError("Not an access token")
+            user_id = uuid.UUID(str(decoded['sub']))
+        except Exception:
+            raise ConnectionRefusedError('unauthorized')
+        self.users[request.sid] = user_id
+        self.subscriptions[request.sid] = set()
+
+    def on_disconnect(self, reason=None):
+        self.users.pop(request.sid, None)
+        for plan_id in self.subscriptions.pop(request.sid, ()):
+            LivePnLService.remove_subscriber(plan_id)
+
+    def on_subscribe(self, data):
+        plan_id = self._plan_id(data)
+        if plan_id is None:
+            return {'error': 'Trading plan not found'}
+        if plan_id in self.subscriptions[request.sid]:
+            return {'subscribed': str(plan_id)}
+        if not LivePnLService.add_subscriber(plan_id):
+            return {'error': 'Live updates are unavailable'}
+
+        join_room(plan_room(plan_id))
+        self.subscriptions[request.sid].add(plan_id)
+        return {'subscribed': str(plan_id)}
+
+    def on_unsubscribe(self, data):
+        plan_id = self._plan_id(data)
+        if plan_id is None or plan_id not in self.subscriptions[request.sid]:
+            return {'error': 'Not subscribed'}
+        leave_room(plan_room(plan_id))
+        self.subscriptions[request.sid].discard(plan_id)
+        LivePnLService.remove_subscriber(plan_id)
+        return {'unsubscribed': str(plan_id)}
+
+    def _plan_id(self, data):
+        """The requested plan if it belongs to the connected user"""
+        try:
+            plan_id = uuid.UUID(str((data or {}).get('trading_plan_id')))
+        except ValueError:
+            return None
+        plan = TradingPlanService.get_plan(self.users[request.sid], plan_id)
+        return plan.id if plan is not None else None
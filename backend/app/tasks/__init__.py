@@ -0,0 +1,3 @@
+from . import analysis_tasks, optimizer_tasks
+
+__all__ = ['analysis_tasks', 'optimizer_tasks']
@@ -0,0 +1,28 @@
+from app import celery, db
+from app.services.performance_service import PerformanceService
+
+
+@celery.task(name='analysis.recompute_performance')
+def recompute_performance_task(strategy_id, trading_plan_id, timeframe,
+                               period):
+    """Rebuild one Performance row on a Celery worker"""
+    key = (strategy_id, trading_plan_id, timeframe, period)
+    # Cleared before reading trades so edits made meanwhile schedule again
+    PerformanceService.clear_pending(key)
+    PerformanceService.recompute_key(*key)
+    return list(key)
+
+
+@celery.task(name='analysis.recompute_performance_chunk')
+def recompute_chunk_task(keys):
+    """Rebuild a chunk of Performance rows in one transaction"""
+    for key in keys:
+        PerformanceService.recompute_key(*key, commit=False)
+    db.session.commit()
+    return len(keys)
+
+
+@celery.task(name='analysis.rebuild_complete')
+def rebuild_complete_task(counts, user_id):
+    """Chord callback of an account rebuild"""
+    return {'user_id': user_id, 'recomputed': sum(counts)}
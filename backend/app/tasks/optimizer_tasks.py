@@ -0,0 +1,8 @@
+from app import celery
+from app.services.optimizer_service import evaluate_batch
+
+
+@celery.task(name='optimizer.evaluate_batch')
+def evaluate_batch_task(source, base_parameters, rules, combinations):
+    """Backtest a batch of parameter sets on a Celery worker"""
+    return evaluate_batch(tuple(source), base_parameters, rules, combinations)
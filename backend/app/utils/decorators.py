@@ -0,0 +1,79 @@
+import uuid
+from functools import wraps
+from flask import request
+from flask_jwt_extended import get_jwt_identity
+from app import db
+from app.models.user import User
+from app.services.cache_service import CacheService
+
+ADMIN_ROLE = 'admin'
+
+
+def cached(namespace, tags=None, ttl=None):
+    """
+    Cache a JSON view's response per user through CacheService
+    The view must return (dict, status) and run under @jwt_required.
+    Only 200 responses are stored.
+    Args:
+        namespace: Cache namespace for the endpoint
+        tags: Callable(user_id, **view_kwargs) returning the tags the
+              response depends on, or a static list of tags
+        ttl: Seconds to keep the entry (CACHE_DEFAULT_TTL by default)
+    """
+
+    def decorator(view):
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            user_id = str(get_jwt_identity())
+            parts = [
+                user_id,
+                {key: str(value)
+                 for key, value in kwargs.items()},
+                sorted(request.args.items(multi=True))
+            ]
+            entry_tags = (tags(user_id=user_id, **kwargs)
+                          if callable(tags) else list(tags or []))
+
+            body, status = CacheService.get_or_load(
+                namespace,
+                parts,
+                lambda: list(view(*args, **kwargs)),
+                tags=entry_tags,
+                ttl=ttl,
+                should_cache=lambda value: value[1] == 200)
+            return body, status
+
+        return wrapper
+
+    return decorator
+
+
+def query_budget(limit):
+    """
+    Override SQL_QUERY_BUDGET for one view
+    Args:
+        limit: Most queries a request to the view may run
+    """
+
+    def decorator(view):
+        view.query_budget = limit
+        return view
+
+    return decorator
+
+
+def admin_required(view):
+    """
+    Restrict a view to users with the admin role
+    Apply below @jwt_required(); other users get a 403.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        user = db.session.get(User, uuid.UUID(str(get_jwt_identity())))
+        if user is None or user.role != ADMIN_ROLE:
+            return {'error': 'Admin access required'}, 403
+        return view(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,44 @@
+import numpy as np
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+    Keeps the first and last points and, from each of threshold - 2
+    equal buckets in between, the point forming the largest triangle with
+    the point kept from the previous bucket and the average of the next
+    one. Peaks and troughs survive, flat stretches collapse.
+    Args:
+        x: Increasing x values (e.g. epoch seconds)
+        y: Values to downsample
+        threshold: Number of points to keep
+    Returns:
+        Sorted int64 array of the indices to keep
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n, dtype=np.int64)
+
+    # Bucket b holds points edges[b]:edges[b + 1]; the last point is
+    # its own bucket so the final average is simply that point
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    edges = np.append(edges, n)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x, edges[:-1]) / counts
+    avg_y = np.add.reduceat(y, edges[:-1]) / counts
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for b in range(threshold - 2):
+        start, stop = edges[b], edges[b + 1]
+        ax, ay = x[a], y[a]
+        # Twice the triangle area; the constant factor does not matter
+        area = np.abs((ax - avg_x[b + 1]) * (y[start:stop] - ay) -
+                      (ax - x[start:stop]) * (avg_y[b + 1] - ay))
+        a = start + int(area.argmax())
+        selected[b + 1] = a
+    selected[-1] = n - 1
+    return selected
@@ -1,2 +1,18 @@
 class AuthenticationError(Exception):
     pass
+
+
+class InvalidCursorError(Exception):
+    pass
+
+
+class ExportFormatError(Exception):
+    pass
+
+
+class PasswordHashingBusyError(Exception):
+    pass
+
+
+class QueryBudgetExceededError(Exception):
+    pass
@@ -0,0 +1,154 @@
+import threading
+from bisect import bisect_left
+
+# Seconds; covers sub-millisecond Redis calls up to slow requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return text.replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base of the in-process metrics; one series per label value tuple"""
+
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def clear(self):
+        with self._lock:
+            self._series = {}
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type_name}'
+        ]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def set(self, value, *labels):
+        # Counters mirror totals kept elsewhere; gauges any current value
+        with self._lock:
+            self._series[labels] = value
+
+    def value(self, *labels):
+        return self._series.get(labels, 0)
+
+    def _samples(self):
+        with self._lock:
+            series = list(self._series.items())
+        return [
+            f'{self.name}{_format_labels(self.labelnames, labels)} '
+            f'{_format_value(value)}' for labels, value in sorted(series)
+        ]
+
+
+class Gauge(Counter):
+    type_name = 'gauge'
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    """Fixed-bucket histogram; buckets are cumulated only when rendered"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), then the sum
+                series = [0] * (len(self.buckets) + 1) + [0.0]
+                self._series[labels] = series
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def _samples(self):
+        with self._lock:
+            series = [(labels, list(values))
+                      for labels, values in self._series.items()]
+        lines = []
+        bounds = self.buckets + (float('inf'), )
+        for labels, values in sorted(series):
+            total = 0
+            for bound, count in zip(bounds, values):
+                total += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket'
+                             f'{_format_labels(self.labelnames, labels, le)}'
+                             f' {total}')
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} '
+                         f'{_format_value(values[-1])}')
+            lines.append(f'{self.name}_count{label_text} {total}')
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics rendered together in the Prometheus text format (0.0.4)"""
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def clear(self):
+        for metric in self._metrics:
+            metric.clear()
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,55 @@
+import re
+
+# Canonical timeframe -> bar length in seconds
+TIMEFRAME_SECONDS = {
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '30m': 1800,
+    '1h': 3600,
+    '4h': 14400,
+    '1d': 86400,
+}
+
+# Broker-style aliases used in trading plans (e.g. "H1", "H4")
+TIMEFRAME_ALIASES = {
+    'M1': '1m',
+    'M5': '5m',
+    'M15': '15m',
+    'M30': '30m',
+    'H1': '1h',
+    'H4': '4h',
+    'D1': '1d',
+    'D': '1d',
+}
+
+SYMBOL_PATTERN = r'^[A-Z0-9]{1,10}$'
+
+
+def normalize_timeframe(timeframe: str) -> str:
+    """Map a timeframe or its alias to the canonical form ('1h', '1d')"""
+    if not timeframe or not isinstance(timeframe, str):
+        raise ValueError("Timeframe is required and must be a string")
+
+    if timeframe in TIMEFRAME_SECONDS:
+        return timeframe
+    canonical = TIMEFRAME_ALIASES.get(timeframe.upper())
+    if canonical is None:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return canonical
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    """Bar length of a timeframe in seconds"""
+    return TIMEFRAME_SECONDS[normalize_timeframe(timeframe)]
+
+
+def normalize_symbol(symbol: str) -> str:
+    """Normalize 'EUR/USD' style pairs to the Trade.symbol form 'EURUSD'"""
+    if not symbol or not isinstance(symbol, str):
+        raise ValueError("Symbol is required and must be a string")
+
+    normalized = symbol.replace('/', '').replace('-', '').upper()
+    if not re.match(SYMBOL_PATTERN, normalized):
+        raise ValueError(f"Invalid symbol: {symbol}")
+    return normalized
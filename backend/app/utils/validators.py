@@ -29,6 +29,88 @@ def validate_login(data):
     return schema.load(data)
 
 
+class TradeFilterSchema(Schema):
+    symbol = fields.Str(validate=validate.Length(min=1, max=10))
+    strategy_id = fields.UUID()
+    trading_plan_id = fields.UUID()
+    timeframe = fields.Str(validate=validate.Length(min=1, max=5))
+    status = fields.Str(validate=validate.OneOf(['open', 'closed']))
+    start = fields.DateTime()
+    end = fields.DateTime()
+
+
+class TradeListSchema(TradeFilterSchema):
+    cursor = fields.Str()
+    limit = fields.Int(load_default=50,
+                       validate=validate.Range(min=1, max=200))
+
+
+class TradeExportSchema(TradeFilterSchema):
+    format = fields.Str(load_default='csv',
+                        validate=validate.OneOf(['csv', 'ndjson',
+                                                 'parquet']))
+
+
+class JournalExportSchema(Schema):
+    trading_plan_id = fields.UUID()
+    format = fields.Str(load_default='csv',
+                        validate=validate.OneOf(['csv', 'ndjson',
+                                                 'parquet']))
+
+
+class EquityCurveSchema(Schema):
+    points = fields.Int(load_default=1000,
+                        validate=validate.Range(min=3, max=10000))
+    start = fields.DateTime()
+    end = fields.DateTime()
+    initial_capital = fields.Float(
+        validate=validate.Range(min=0, min_inclusive=False))
+
+
+class LoaderIncludeSchema(Schema):
+    include = fields.Str(load_default='')
+
+
+def validate_loader_include(args, allowed):
+    """
+    Parse a comma separated ?include= of deferred columns
+    Args:
+        allowed: Column names the loader profile can include
+    Returns:
+        Tuple of the requested column names
+    """
+    schema = LoaderIncludeSchema()
+    include = schema.load(args)['include']
+    names = tuple(
+        dict.fromkeys(name.strip() for name in include.split(',')
+                      if name.strip()))
+    unknown = sorted(set(names) - set(allowed))
+    if unknown:
+        raise ValidationError(
+            {'include': [f"Unknown fields: {', '.join(unknown)}"]})
+    return names
+
+
+def validate_trade_list(args):
+    schema = TradeListSchema()
+    return schema.load(args)
+
+
+def validate_trade_export(args):
+    schema = TradeExportSchema()
+    return schema.load(args)
+
+
+def validate_journal_export(args):
+    schema = JournalExportSchema()
+    return schema.load(args)
+
+
+def validate_equity_curve(args):
+    schema = EquityCurveSchema()
+    return schema.load(args)
+
+
 class ImageValidator:
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
     MAX_URL_LENGTH = 255
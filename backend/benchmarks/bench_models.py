@@ -0,0 +1,80 @@
+"""
+Measure per-object model and validator costs that need no database.
+
+Usage (from backend/):
+    python -m benchmarks.bench_models --rows 100000
+"""
+import argparse
+import uuid
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models import User
+from app.models.base import GUID
+from app.utils.validators import ImageValidator
+from benchmarks import data
+from benchmarks.common import print_results, result, timed
+
+DIALECTS = (sqlite.dialect(), postgresql.dialect())
+
+
+def _guid_cases(rows, repeat):
+    guid = GUID()
+    values = [uuid.UUID(int=i, version=4) for i in range(rows)]
+    results = []
+    for dialect in DIALECTS:
+        # The processors SQLAlchemy itself builds for this dialect
+        bind = guid.bind_processor(dialect)
+        stored = [bind(value) for value in values]
+        process = guid.result_processor(dialect, None)
+
+        def bind_all():
+            for value in values:
+                bind(value)
+
+        def result_all():
+            for value in stored:
+                process(value)
+
+        results.append(
+            result('guid_bind', rows, timed(bind_all, repeat), dialect.name))
+        results.append(
+            result('guid_result', rows, timed(result_all, repeat),
+                   dialect.name))
+    return results
+
+
+def run(rows, repeat, database_url=None):
+    """
+    Args:
+        rows: Objects per case
+        repeat: Runs per case; the fastest counts
+
+    Returns:
+        List of result records
+    """
+    users = list(data.user_payloads(rows))
+    images = list(data.images(rows))
+
+    def construct_users():
+        for email, username in users:
+            User(email=email, username=username)
+
+    def validate_images():
+        ImageValidator.validate_image_list(images)
+
+    return [
+        result('user_construct', rows, timed(construct_users, repeat)),
+        result('image_list_validate', rows, timed(validate_images, repeat)),
+    ] + _guid_cases(rows, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print_results(run(args.rows, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Measure tick ingestion throughput into the candle aggregator.
+
+Usage (from backend/):
+    python -m benchmarks.bench_tick_ingest --ticks 1000000 --batch 10000
+"""
+import argparse
+import time
+import numpy as np
+from app.services.tick_service import TickAggregator
+
+TIMEFRAMES = ('1m', '5m', '15m', '1h', '4h', '1d')
+
+
+def _ticks(count, symbols, seed=7):
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, symbols, count).astype(np.int32)
+    # ~20 ticks per second across all symbols, starting 2025-01-01
+    times = 1735689600000 + np.cumsum(rng.integers(0, 100, count))
+    prices = 100 + np.cumsum(rng.normal(0, 0.01, count))
+    volumes = rng.random(count)
+    return codes, times, prices, volumes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ticks', type=int, default=1000000)
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--batch', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    codes, times, prices, volumes = _ticks(args.ticks, args.symbols)
+    best = None
+    for _ in range(args.repeat):
+        aggregator = TickAggregator(TIMEFRAMES)
+        for code in range(args.symbols):
+            aggregator.code(f'SYM{code}')
+        start = time.perf_counter()
+        for offset in range(0, args.ticks, args.batch):
+            window = slice(offset, offset + args.batch)
+            aggregator.ingest(codes[window], times[window], prices[window],
+                              volumes[window])
+            aggregator.drain()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    print(f"{args.ticks} ticks, {args.symbols} symbols, batch {args.batch}, "
+          f"{len(TIMEFRAMES)} timeframes")
+    print(f"best of {args.repeat}: {best:.3f}s "
+          f"({args.ticks / best:,.0f} ticks/s)")
+
+
+if __name__ == '__main__':
+    main()
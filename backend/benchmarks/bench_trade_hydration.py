@@ -0,0 +1,93 @@
+"""
+Measure the per-row cost of materializing Trade objects.
+
+Usage (from backend/):
+    python -m benchmarks.bench_trade_hydration --rows 100000
+"""
+import argparse
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import insert, select
+from app import db
+from app.models import User, TradingPlan, Trade
+from benchmarks import data
+from benchmarks.common import (benchmark_app, database_name, reachable,
+                               print_results, result, skipped, timed)
+
+
+def _seed(rows, plan_id):
+    for chunk in data.chunks(data.trade_rows(rows, plan_id), 5000):
+        db.session.execute(insert(Trade.__table__), chunk)
+    db.session.commit()
+
+
+def _run_database(rows, repeat, database_url):
+    database = database_name(database_url)
+    with benchmark_app(database_url):
+        user = User(email='bench@example.com', username='bench')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+        plan = TradingPlan(user_id=user.id, name="Bench", type="day_trading")
+        db.session.add(plan)
+        db.session.commit()
+        plan_id = plan.id
+        _seed(rows, plan_id)
+
+        def hydrate():
+            trades = db.session.execute(select(Trade)).scalars().all()
+            assert len(trades) == rows
+
+        def construct():
+            entry_time = datetime(2025, 1, 1)
+            for _ in range(rows):
+                Trade(trading_plan_id=plan_id,
+                      entry_price=Decimal('1.1'),
+                      entry_time=entry_time,
+                      symbol='EURUSD',
+                      position_size=Decimal('1'),
+                      entry_image_url='/static/trades/entry.png')
+
+        return [
+            result('trade_hydrate', rows,
+                   timed(hydrate, repeat, setup=db.session.expunge_all),
+                   database),
+            result('trade_construct', rows, timed(construct, repeat),
+                   database),
+        ]
+
+
+def run(rows, repeat, database_url=None):
+    """
+    Args:
+        rows: Trades to load and construct
+        repeat: Runs per case; the fastest counts
+        database_url: Extra database to run against besides SQLite
+
+    Returns:
+        List of result records
+    """
+    results = _run_database(rows, repeat, None)
+    if database_url is not None:
+        reason = reachable(database_url)
+        if reason is None:
+            results.extend(_run_database(rows, repeat, database_url))
+        else:
+            results.extend(
+                skipped(name, database_name(database_url), reason)
+                for name in ('trade_hydrate', 'trade_construct'))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    print_results(run(args.rows, args.repeat, args.database_url))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Helpers shared by the benchmark modules: timing, throwaway apps and
+result records.
+"""
+import gc
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from config.testing import TestingConfig
+
+
+def timed(func, repeat, setup=None):
+    """
+    Best wall time of `repeat` runs, with GC paused like timeit.
+
+    Args:
+        func: Callable to time
+        repeat: Number of runs
+        setup: Optional callable run untimed before every run
+
+    Returns:
+        Seconds of the fastest run
+    """
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def result(name, rows, seconds, database=None):
+    """One machine-readable measurement"""
+    return {
+        'name': name,
+        'database': database,
+        'rows': rows,
+        'seconds': round(seconds, 6),
+        'us_per_row': round(seconds / rows * 1e6, 4) if rows else None,
+    }
+
+
+def skipped(name, database, reason):
+    return {'name': name, 'database': database, 'skipped': reason}
+
+
+def benchmark_config(database_uri):
+    """Testing config on `database_uri` with the request hooks turned off"""
+
+    class BenchmarkConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        METRICS_ENABLED = False
+        SQL_STATS_HEADERS = False
+        SQL_QUERY_BUDGET_STRICT = False
+
+    return BenchmarkConfig
+
+
+@contextmanager
+def benchmark_app(database_url=None):
+    """
+    App context on a fresh schema, dropped again on exit.
+
+    Args:
+        database_url: Database to benchmark; a temporary SQLite file
+            when omitted
+
+    Yields:
+        The app, with its context pushed
+    """
+    path = None
+    if database_url is None:
+        handle, path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        database_url = f'sqlite:///{path}'
+
+    app = create_app(benchmark_config(database_url))
+    try:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            try:
+                yield app
+            finally:
+                db.session.remove()
+                db.drop_all()
+                db.engine.dispose()
+    finally:
+        if path is not None:
+            os.remove(path)
+
+
+def database_name(database_url):
+    return 'sqlite' if database_url is None else database_url.split(
+        ':', 1)[0].split('+', 1)[0]
+
+
+def reachable(database_url):
+    """
+    Whether the benchmarks can connect to `database_url`.
+
+    Returns:
+        None when reachable, otherwise the reason it is not
+    """
+    if database_url is None:
+        return None
+    try:
+        engine = create_engine(database_url)
+    except ImportError as e:
+        return f'driver not installed: {e}'
+    try:
+        with engine.connect():
+            return None
+    except OperationalError as e:
+        return f'cannot connect: {e.orig}'
+    finally:
+        engine.dispose()
+
+
+def print_results(records):
+    """Human-readable table of result records"""
+    for record in records:
+        label = f"{record['name']:<22} {record['database'] or '-':<11}"
+        if 'skipped' in record:
+            print(f"{label}skipped: {record['skipped']}")
+        else:
+            print(f"{label}{record['seconds']:9.3f}s "
+                  f"{record['us_per_row']:10.2f} us/row")
@@ -0,0 +1,141 @@
+"""
+Seeded synthetic rows for the benchmarks.
+
+Every generator is deterministic for a given seed and lazy, so the 1M
+trade scale is produced chunk by chunk instead of held in memory.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+
+SCALES = {
+    '1k': 1000,
+    '10k': 10000,
+    '100k': 100000,
+    '1m': 1000000,
+}
+
+SYMBOLS = ('EURUSD', 'GBPUSD', 'USDJPY', 'XAUUSD', 'BTCUSD', 'ETHUSD')
+TIMEFRAMES = ('5m', '15m', '1h', '4h', '1d')
+EMOTIONS = ('calm', 'confident', 'anxious', 'greedy', 'fearful')
+IMAGE_TYPES = ('setup', 'analysis', 'result')
+START = datetime(2025, 1, 1)
+TICK = Decimal('0.00001')
+
+
+def chunks(rows, size):
+    """Split an iterable into lists of at most `size` items"""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def user_payloads(count, seed=1):
+    """(email, username) pairs that pass UserValidator"""
+    rng = random.Random(seed)
+    for i in range(count):
+        name = f"trader_{i}_{rng.randrange(10**6)}"
+        yield f"{name}@example.com", name
+
+
+def images(count, seed=1):
+    """Journal image dicts in the shape ImageValidator expects"""
+    rng = random.Random(seed)
+    for i in range(count):
+        kind = rng.choice(IMAGE_TYPES)
+        uploaded = START + timedelta(seconds=rng.randrange(31536000))
+        yield {
+            'url': f"/static/journal/{kind}_{i}.png",
+            'description': f"{kind.title()} chart {i}",
+            'type': kind,
+            'upload_date': uploaded.isoformat(),
+        }
+
+
+def trade_rows(count, trading_plan_id, strategy_ids=(), seed=1):
+    """
+    Core-insertable trade rows following a random walk per symbol.
+
+    Args:
+        count: Number of trades
+        trading_plan_id: Plan the trades belong to
+        strategy_ids: Strategies assigned round-robin; none when empty
+        seed: Random seed
+
+    Returns:
+        Iterator of column dicts for insert(Trade.__table__)
+    """
+    rng = random.Random(seed)
+    prices = {symbol: 100.0 + 10 * i for i, symbol in enumerate(SYMBOLS)}
+    now = datetime.utcnow()
+    entry_time = START
+    for i in range(count):
+        symbol = SYMBOLS[i % len(SYMBOLS)]
+        price = prices[symbol] = max(
+            1.0, prices[symbol] * (1 + rng.gauss(0, 0.002)))
+        entry_time += timedelta(seconds=rng.randrange(60, 3600))
+        exit_price = price * (1 + rng.gauss(0, 0.01))
+        size = Decimal(rng.choice((1, 2, 5, 10, 25)))
+        entry_price = Decimal(price).quantize(TICK)
+        yield {
+            'id': uuid.UUID(int=rng.getrandbits(128), version=4),
+            'trading_plan_id': trading_plan_id,
+            'strategy_id': (strategy_ids[i % len(strategy_ids)]
+                            if strategy_ids else None),
+            'trading_plan_version': 1,
+            'entry_price': entry_price,
+            'exit_price': Decimal(exit_price).quantize(TICK),
+            'entry_time': entry_time,
+            'exit_time': entry_time + timedelta(
+                minutes=rng.randrange(5, 1440)),
+            'symbol': symbol,
+            'position_size': size,
+            'timeframe': rng.choice(TIMEFRAMES),
+            # 0.1% per side
+            'entry_fee': (entry_price * size / 1000).quantize(TICK),
+            'exit_fee': (entry_price * size / 1000).quantize(TICK),
+            'entry_image_url': f"/static/trades/{symbol.lower()}_entry.png",
+            'exit_image_url': None,
+            'created_at': now,
+            'updated_at': now,
+        }
+
+
+def journal_rows(trades, seed=1):
+    """
+    One journal entry per trade row, with one to three images.
+
+    Args:
+        trades: Trade rows from trade_rows()
+        seed: Random seed
+
+    Returns:
+        Iterator of column dicts for insert(Journal.__table__)
+    """
+    rng = random.Random(seed)
+    image_pool = list(images(64, seed))
+    now = datetime.utcnow()
+    for trade in trades:
+        yield {
+            'id': uuid.UUID(int=rng.getrandbits(128), version=4),
+            'trade_id': trade['id'],
+            'trading_plan_id': trade['trading_plan_id'],
+            'trading_plan_version': trade['trading_plan_version'],
+            'notes': f"Followed the plan on {trade['symbol']}",
+            'emotions': rng.choice(EMOTIONS),
+            'market_conditions': {
+                'trend': rng.choice(('up', 'down', 'range')),
+                'volatility': round(rng.random(), 3),
+            },
+            'plan_adherence': {
+                'score': rng.randrange(1, 11)
+            },
+            'images': rng.sample(image_pool, rng.randrange(1, 4)),
+            'created_at': now,
+            'updated_at': now,
+        }
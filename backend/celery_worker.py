@@ -1,4 +1,5 @@
 from app import create_app, celery
+from app import tasks  # noqa: F401 (registers Celery tasks)
 
 app = create_app()
 app.app_context().push()
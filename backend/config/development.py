@@ -14,3 +14,50 @@ class DevelopmentConfig:
                                   "redis://localhost:6379/1")
     CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND",
                                       "redis://localhost:6379/1")
+    PERFORMANCE_ROLLUPS_ENABLED = True
+    # 'async' (default) enqueues a debounced Celery recompute for every
+    # Performance row a trade write touches: the all-time rollup and its
+    # per-timeframe and per-period rows. Edits within the window coalesce
+    # into one task per row. 'sync' updates only the all-time rollup,
+    # inline and O(1) per trade, for deployments without Celery workers.
+    PERFORMANCE_ROLLUP_MODE = os.getenv("PERFORMANCE_ROLLUP_MODE", "async")
+    PERFORMANCE_RECOMPUTE_DEBOUNCE = int(
+        os.getenv("PERFORMANCE_RECOMPUTE_DEBOUNCE", "5"))
+    MARKET_DATA_DIR = os.getenv("MARKET_DATA_DIR", "data/market")
+    OPTIMIZER_BACKEND = os.getenv("OPTIMIZER_BACKEND", "process")
+    OPTIMIZER_MAX_WORKERS = None
+
+    # Password hashing pool; PASSWORD_HASH_METHOD must be a full werkzeug
+    # method (e.g. pbkdf2:sha256:600000) so stored hashes compare equal
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD",
+                                     "pbkdf2:sha256:100000")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+    PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "5"))
+
+    # Read-through response cache in Redis
+    CACHE_ENABLED = True
+    CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", "300"))
+
+    # Live P&L over Socket.IO; frames are published by the process that
+    # ingests ticks, so enable the publisher for that process only
+    SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE", REDIS_URL)
+    LIVE_PNL_ENABLED = True
+    LIVE_PUBLISHER_ENABLED = os.getenv("LIVE_PUBLISHER_ENABLED",
+                                       "false").lower() == "true"
+    LIVE_FRAME_INTERVAL = float(os.getenv("LIVE_FRAME_INTERVAL", "0.1"))
+
+    # Plan history: a full snapshot every N versions, diffs in between
+    PLAN_CHECKPOINT_INTERVAL = int(os.getenv("PLAN_CHECKPOINT_INTERVAL", "10"))
+
+    # Per-request SQL instrumentation; over-budget routes are logged
+    SQL_INSTRUMENTATION_ENABLED = True
+    SQL_STATS_HEADERS = True
+    SQL_QUERY_BUDGET = int(os.getenv("SQL_QUERY_BUDGET", "30"))
+    SQL_QUERY_BUDGET_STRICT = False
+    SQL_N_PLUS_ONE_THRESHOLD = 5
+
+    # Prometheus metrics at /metrics; set METRICS_AUTH_TOKEN to require
+    # "Authorization: Bearer <token>" from scrapers
+    METRICS_ENABLED = True
+    METRICS_AUTH_TOKEN = os.getenv("METRICS_AUTH_TOKEN")
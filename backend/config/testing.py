@@ -19,6 +19,28 @@ class TestingConfig:
     CELERY_TASK_ALWAYS_EAGER = True
     CELERY_TASK_EAGER_PROPAGATES = True
 
+    # Performance rollups are enabled per test
+    PERFORMANCE_ROLLUPS_ENABLED = False
+
+    # Tests enable the cache with a fake Redis client
+    CACHE_ENABLED = False
+
+    # Live P&L frames are flushed by hand in tests
+    SOCKETIO_MESSAGE_QUEUE = None
+    LIVE_PNL_ENABLED = False
+    LIVE_PUBLISHER_ENABLED = False
+
+    # Routes exceeding the query budget fail the test
+    SQL_STATS_HEADERS = True
+    SQL_QUERY_BUDGET = 20
+    SQL_QUERY_BUDGET_STRICT = True
+
+    # Request metrics; values are process-wide, tests reset them
+    METRICS_ENABLED = True
+
+    # Tests point the market data store at a temporary directory
+    MARKET_DATA_DIR = None
+
     # Disable rate limiting in tests
     RATELIMIT_ENABLED = False
 
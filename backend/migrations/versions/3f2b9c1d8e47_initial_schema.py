@@ -0,0 +1,148 @@
+"""initial schema
+
+Revision ID: 3f2b9c1d8e47
+Revises:
+Create Date: 2026-10-18 09:12:41.503214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2b9c1d8e47'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _timestamps():
+    return [
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    ]
+
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('username', sa.String(length=80), nullable=False),
+        sa.Column('password_hash', sa.String(length=256), nullable=False),
+        sa.Column('profile_picture', sa.String(length=255), nullable=True),
+        sa.Column('profile_picture_updated_at', sa.DateTime(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('role', sa.String(length=20), nullable=True),
+        sa.Column('last_login', sa.DateTime(), nullable=True),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('username'),
+    )
+    op.create_table(
+        'strategies',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('parameters', sa.JSON(), nullable=True),
+        sa.Column('performance_metrics', sa.JSON(), nullable=True),
+        sa.Column('strategy_image_url', sa.String(length=255), nullable=True),
+        sa.Column('example_images', sa.JSON(), nullable=True),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'trading_plans',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('risk_management', sa.JSON(), nullable=True),
+        sa.Column('entry_rules', sa.JSON(), nullable=True),
+        sa.Column('exit_rules', sa.JSON(), nullable=True),
+        sa.Column('timeframes', sa.JSON(), nullable=True),
+        sa.Column('position_sizing', sa.JSON(), nullable=True),
+        sa.Column('markets', sa.JSON(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('plan_images', sa.JSON(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'trades',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trading_plan_id', sa.String(length=36), nullable=False),
+        sa.Column('strategy_id', sa.String(length=36), nullable=True),
+        sa.Column('entry_price', sa.Numeric(), nullable=False),
+        sa.Column('exit_price', sa.Numeric(), nullable=True),
+        sa.Column('entry_time', sa.DateTime(), nullable=False),
+        sa.Column('exit_time', sa.DateTime(), nullable=True),
+        sa.Column('symbol', sa.String(length=10), nullable=False),
+        sa.Column('position_size', sa.Numeric(), nullable=False),
+        sa.Column('timeframe', sa.String(length=5), nullable=True),
+        sa.Column('entry_fee', sa.Numeric(), nullable=False),
+        sa.Column('exit_fee', sa.Numeric(), nullable=True),
+        sa.Column('entry_image_url', sa.String(length=255), nullable=True),
+        sa.Column('exit_image_url', sa.String(length=255), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['strategy_id'], ['strategies.id']),
+        sa.ForeignKeyConstraint(['trading_plan_id'], ['trading_plans.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_trades_plan_entry_time', 'trades',
+                    ['trading_plan_id', 'entry_time', 'id'])
+    op.create_index('ix_trades_plan_symbol_entry_time', 'trades',
+                    ['trading_plan_id', 'symbol', 'entry_time', 'id'])
+    op.create_index('ix_trades_plan_timeframe_entry_time', 'trades',
+                    ['trading_plan_id', 'timeframe', 'entry_time', 'id'])
+    op.create_index('ix_trades_strategy_entry_time', 'trades',
+                    ['strategy_id', 'entry_time', 'id'])
+    op.create_table(
+        'journal_entries',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('trade_id', sa.String(length=36), nullable=False),
+        sa.Column('trading_plan_id', sa.String(length=36), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('emotions', sa.String(length=50), nullable=True),
+        sa.Column('market_conditions', sa.JSON(), nullable=True),
+        sa.Column('plan_adherence', sa.JSON(), nullable=True),
+        sa.Column('images', sa.JSON(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['trade_id'], ['trades.id'],
+                                ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['trading_plan_id'], ['trading_plans.id'],
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'performance_metrics',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('strategy_id', sa.String(length=36), nullable=False),
+        sa.Column('trading_plan_id', sa.String(length=36), nullable=False),
+        sa.Column('metrics', sa.JSON(), nullable=True),
+        sa.Column('timeframe', sa.String(length=10), nullable=False),
+        sa.Column('period', sa.String(length=20), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['strategy_id'], ['strategies.id'],
+                                ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['trading_plan_id'], ['trading_plans.id'],
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade():
+    op.drop_table('performance_metrics')
+    op.drop_table('journal_entries')
+    op.drop_index('ix_trades_strategy_entry_time', table_name='trades')
+    op.drop_index('ix_trades_plan_timeframe_entry_time', table_name='trades')
+    op.drop_index('ix_trades_plan_symbol_entry_time', table_name='trades')
+    op.drop_index('ix_trades_plan_entry_time', table_name='trades')
+    op.drop_table('trades')
+    op.drop_table('trading_plans')
+    op.drop_table('strategies')
+    op.drop_table('users')
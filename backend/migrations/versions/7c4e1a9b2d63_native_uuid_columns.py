@@ -0,0 +1,126 @@
+"""store GUID columns as native uuid / 16-byte binary
+
+Revision ID: 7c4e1a9b2d63
+Revises: 3f2b9c1d8e47
+Create Date: 2026-10-18 10:04:17.218930
+
+"""
+import uuid
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4e1a9b2d63'
+down_revision = '3f2b9c1d8e47'
+branch_labels = None
+depends_on = None
+
+# Parents first so referenced keys are converted before their referrers
+GUID_COLUMNS = {
+    'users': [('id', False)],
+    'strategies': [('id', False)],
+    'trading_plans': [('id', False), ('user_id', False)],
+    'trades': [('id', False), ('trading_plan_id', False),
+               ('strategy_id', True)],
+    'journal_entries': [('id', False), ('trade_id', False),
+                        ('trading_plan_id', False)],
+    'performance_metrics': [('id', False), ('strategy_id', False),
+                            ('trading_plan_id', False)],
+}
+
+# (table, column, referred table, ondelete) using PostgreSQL default names
+FOREIGN_KEYS = [
+    ('trading_plans', 'user_id', 'users', None),
+    ('trades', 'trading_plan_id', 'trading_plans', None),
+    ('trades', 'strategy_id', 'strategies', None),
+    ('journal_entries', 'trade_id', 'trades', 'CASCADE'),
+    ('journal_entries', 'trading_plan_id', 'trading_plans', 'CASCADE'),
+    ('performance_metrics', 'strategy_id', 'strategies', 'CASCADE'),
+    ('performance_metrics', 'trading_plan_id', 'trading_plans', 'CASCADE'),
+]
+
+
+def _fk_name(table, column):
+    return f'{table}_{column}_fkey'
+
+
+def _convert_postgresql(new_type, using):
+    for table, column, _, _ in FOREIGN_KEYS:
+        op.drop_constraint(_fk_name(table, column), table, type_='foreignkey')
+
+    for table, columns in GUID_COLUMNS.items():
+        for column, nullable in columns:
+            op.alter_column(table,
+                            column,
+                            type_=new_type,
+                            existing_nullable=nullable,
+                            postgresql_using=using.format(column=column))
+
+    for table, column, referred, ondelete in FOREIGN_KEYS:
+        op.create_foreign_key(_fk_name(table, column),
+                              table,
+                              referred, [column], ['id'],
+                              ondelete=ondelete)
+
+
+def _rewrite_sqlite_values(table, column, convert):
+    """Rewrite every distinct value of a column in place"""
+    bind = op.get_bind()
+    values = bind.execute(
+        sa.text(f'SELECT DISTINCT {column} FROM {table} '
+                f'WHERE {column} IS NOT NULL')).scalars().all()
+    if values:
+        bind.execute(
+            sa.text(f'UPDATE {table} SET {column} = :new '
+                    f'WHERE {column} = :old'),
+            [{'old': value, 'new': convert(value)} for value in values])
+
+
+def _alter_sqlite(old_type, new_type):
+    for table, columns in GUID_COLUMNS.items():
+        # SQLite cannot ALTER a column type; batch mode recreates the table
+        with op.batch_alter_table(table, recreate='always') as batch_op:
+            for column, nullable in columns:
+                batch_op.alter_column(column,
+                                      existing_type=old_type,
+                                      type_=new_type,
+                                      existing_nullable=nullable)
+
+
+def _rewrite_sqlite(convert):
+    for table, columns in GUID_COLUMNS.items():
+        for column, _ in columns:
+            _rewrite_sqlite_values(table, column, convert)
+
+
+def _text_to_bytes(value):
+    if isinstance(value, bytes):
+        value = value.decode('ascii')
+    return uuid.UUID(value).bytes
+
+
+def _bytes_to_text(value):
+    return str(uuid.UUID(bytes=value))
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        _convert_postgresql(postgresql.UUID(as_uuid=True),
+                            '{column}::uuid')
+    elif dialect == 'sqlite':
+        # The copy casts text to BLOB byte for byte; values are then packed
+        # from their 36 character form into 16 raw bytes
+        _alter_sqlite(sa.String(length=36), sa.LargeBinary(length=16))
+        _rewrite_sqlite(_text_to_bytes)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        _convert_postgresql(sa.String(length=36), '{column}::text')
+    elif dialect == 'sqlite':
+        _rewrite_sqlite(_bytes_to_text)
+        _alter_sqlite(sa.LargeBinary(length=16), sa.String(length=36))
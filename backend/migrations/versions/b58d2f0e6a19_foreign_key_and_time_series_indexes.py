@@ -0,0 +1,59 @@
+"""foreign key and time-series indexes
+
+Revision ID: b58d2f0e6a19
+Revises: 7c4e1a9b2d63
+Create Date: 2026-10-18 11:37:52.640118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b58d2f0e6a19'
+down_revision = '7c4e1a9b2d63'
+branch_labels = None
+depends_on = None
+
+
+def _partial(condition):
+    return {
+        'postgresql_where': sa.text(condition),
+        'sqlite_where': sa.text(condition),
+    }
+
+
+def upgrade():
+    op.create_index('ix_trading_plans_user_id', 'trading_plans', ['user_id'])
+    op.create_index('ix_trades_symbol_entry_time', 'trades',
+                    ['symbol', 'entry_time'])
+    op.create_index('ix_trades_open_plan_entry_time', 'trades',
+                    ['trading_plan_id', 'entry_time'],
+                    **_partial('exit_time IS NULL'))
+    op.create_index('ix_trades_closed_strategy_plan_exit_time', 'trades',
+                    ['strategy_id', 'trading_plan_id', 'exit_time', 'id'],
+                    **_partial('exit_time IS NOT NULL'))
+    op.create_index('ix_journal_entries_trade_id', 'journal_entries',
+                    ['trade_id'])
+    op.create_index('ix_journal_entries_plan_created_at', 'journal_entries',
+                    ['trading_plan_id', 'created_at', 'id'])
+    op.create_index('ix_performance_metrics_trading_plan_id',
+                    'performance_metrics', ['trading_plan_id'])
+    op.create_index('ix_performance_metrics_strategy_plan',
+                    'performance_metrics',
+                    ['strategy_id', 'trading_plan_id', 'timeframe', 'period'])
+
+
+def downgrade():
+    op.drop_index('ix_performance_metrics_strategy_plan',
+                  table_name='performance_metrics')
+    op.drop_index('ix_performance_metrics_trading_plan_id',
+                  table_name='performance_metrics')
+    op.drop_index('ix_journal_entries_plan_created_at',
+                  table_name='journal_entries')
+    op.drop_index('ix_journal_entries_trade_id', table_name='journal_entries')
+    op.drop_index('ix_trades_closed_strategy_plan_exit_time',
+                  table_name='trades')
+    op.drop_index('ix_trades_open_plan_entry_time', table_name='trades')
+    op.drop_index('ix_trades_symbol_entry_time', table_name='trades')
+    op.drop_index('ix_trading_plans_user_id', table_name='trading_plans')
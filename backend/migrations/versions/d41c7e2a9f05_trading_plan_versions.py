@@ -0,0 +1,116 @@
+"""trading plan version history
+
+Revision ID: d41c7e2a9f05
+Revises: b58d2f0e6a19
+Create Date: 2026-10-18 14:12:06.481337
+
+"""
+import uuid
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41c7e2a9f05'
+down_revision = 'b58d2f0e6a19'
+branch_labels = None
+depends_on = None
+
+RULE_FIELDS = ('entry_rules', 'exit_rules', 'risk_management',
+               'position_sizing', 'markets', 'timeframes')
+
+
+def _guid_type(dialect):
+    # Same storage as app.models.base.GUID
+    if dialect == 'postgresql':
+        return postgresql.UUID(as_uuid=True)
+    if dialect == 'sqlite':
+        return sa.LargeBinary(length=16)
+    return sa.CHAR(length=36)
+
+
+def _new_id(dialect):
+    value = uuid.uuid4()
+    if dialect == 'postgresql':
+        return value
+    if dialect == 'sqlite':
+        return value.bytes
+    return str(value)
+
+
+def _backfill_checkpoints(guid):
+    """Snapshot every existing plan as a checkpoint of its version"""
+    dialect = op.get_bind().dialect.name
+    plans = sa.table('trading_plans', sa.column('id', guid),
+                     sa.column('version', sa.Integer),
+                     *(sa.column(field, sa.JSON) for field in RULE_FIELDS))
+    versions = sa.table('trading_plan_versions', sa.column('id', guid),
+                        sa.column('created_at', sa.DateTime),
+                        sa.column('updated_at', sa.DateTime),
+                        sa.column('trading_plan_id', guid),
+                        sa.column('version', sa.Integer),
+                        sa.column('is_checkpoint', sa.Boolean),
+                        sa.column('data', sa.JSON))
+
+    now = datetime.utcnow()
+    rows = [{
+        'id': _new_id(dialect),
+        'created_at': now,
+        'updated_at': now,
+        'trading_plan_id': plan.id,
+        'version': plan.version or 1,
+        'is_checkpoint': True,
+        'data': {field: getattr(plan, field)
+                 for field in RULE_FIELDS},
+    } for plan in op.get_bind().execute(sa.select(plans))]
+    if rows:
+        op.bulk_insert(versions, rows)
+
+
+def upgrade():
+    guid = _guid_type(op.get_bind().dialect.name)
+    op.create_table(
+        'trading_plan_versions',
+        sa.Column('id', guid, nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('trading_plan_id', guid, nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('is_checkpoint', sa.Boolean(), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['trading_plan_id'], ['trading_plans.id'],
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'))
+    op.create_index('ix_trading_plan_versions_plan_version',
+                    'trading_plan_versions', ['trading_plan_id', 'version'],
+                    unique=True)
+    op.add_column('trades',
+                  sa.Column('trading_plan_version', sa.Integer(),
+                            nullable=True))
+    op.add_column('journal_entries',
+                  sa.Column('trading_plan_version', sa.Integer(),
+                            nullable=True))
+    op.create_index('ix_trades_plan_version', 'trades',
+                    ['trading_plan_id', 'trading_plan_version'])
+
+    _backfill_checkpoints(guid)
+    # Existing trades are attributed to the version they now compare against
+    op.execute('UPDATE trades SET trading_plan_version = ('
+               'SELECT version FROM trading_plans '
+               'WHERE trading_plans.id = trades.trading_plan_id)')
+    op.execute('UPDATE journal_entries SET trading_plan_version = ('
+               'SELECT version FROM trading_plans '
+               'WHERE trading_plans.id = journal_entries.trading_plan_id)')
+
+
+def downgrade():
+    op.drop_index('ix_trades_plan_version', table_name='trades')
+    with op.batch_alter_table('journal_entries') as batch_op:
+        batch_op.drop_column('trading_plan_version')
+    with op.batch_alter_table('trades') as batch_op:
+        batch_op.drop_column('trading_plan_version')
+    op.drop_index('ix_trading_plan_versions_plan_version',
+                  table_name='trading_plan_versions')
+    op.drop_table('trading_plan_versions')
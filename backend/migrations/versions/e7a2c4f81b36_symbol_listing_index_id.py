@@ -0,0 +1,27 @@
+"""add id to the symbol listing index
+
+Revision ID: e7a2c4f81b36
+Revises: d41c7e2a9f05
+Create Date: 2026-10-18 17:05:41.218904
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a2c4f81b36'
+down_revision = 'd41c7e2a9f05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index('ix_trades_symbol_entry_time', table_name='trades')
+    op.create_index('ix_trades_symbol_entry_time', 'trades',
+                    ['symbol', 'entry_time', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_trades_symbol_entry_time', table_name='trades')
+    op.create_index('ix_trades_symbol_entry_time', 'trades',
+                    ['symbol', 'entry_time'])
@@ -1,5 +1,7 @@
 import sys
 import os
+import threading
+import time
 import pytest
 
 # Add the backend directory to the Python path
@@ -8,6 +10,7 @@ sys.path.insert(0, backend_dir)
 
 from app import create_app, db
 from app.models.user import User
+from app.services.synthetic_data_service import SyntheticDataService
 from config.testing import TestingConfig  # Direct import of TestingConfig
 
 
@@ -45,3 +48,134 @@ def test_user(app):
         db.session.add(user)
         db.session.commit()
         return user
+
+
+@pytest.fixture
+def synthetic_data(app):
+    """Bulk-load a small seeded dataset (users synth42_0 and synth42_1)"""
+    with app.app_context():
+        return SyntheticDataService.generate(users=2,
+                                             plans_per_user=2,
+                                             strategies=3,
+                                             trades_per_plan=200)
+
+
+class FakeRedis:
+    """Minimal in-process stand-in for the redis-py client used by the app"""
+
+    def __init__(self):
+        self._data = {}
+        self._expiry = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+    def _alive(self, key):
+        deadline = self._expiry.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return key in self._data
+
+    def get(self, key):
+        with self._lock:
+            return self._data[key] if self._alive(key) else None
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        with self._lock:
+            if nx and self._alive(key):
+                return None
+            self._data[key] = self._encode(value)
+            self._expiry.pop(key, None)
+            if ex is not None:
+                self._expiry[key] = time.monotonic() + ex
+            elif px is not None:
+                self._expiry[key] = time.monotonic() + px / 1000
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            removed = 0
+            for key in keys:
+                removed += self._alive(key)
+                self._data.pop(key, None)
+                self._expiry.pop(key, None)
+            return removed
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            value = int(self.get(key) or 0) + amount
+            self._data[key] = self._encode(value)
+            return value
+
+    def hincrby(self, name, field, amount=1):
+        with self._lock:
+            fields = self._data.setdefault(name, {})
+            fields[self._encode(field)] = fields.get(self._encode(field),
+                                                     0) + amount
+            return fields[self._encode(field)]
+
+    def hgetall(self, name):
+        with self._lock:
+            return {
+                field: self._encode(value)
+                for field, value in self._data.get(name, {}).items()
+            }
+
+    def hdel(self, name, *fields):
+        with self._lock:
+            fields_ = self._data.get(name, {})
+            return sum(
+                fields_.pop(self._encode(field), None) is not None
+                for field in fields)
+
+    def sadd(self, name, *values):
+        with self._lock:
+            members = self._data.setdefault(name, set())
+            before = len(members)
+            members.update(self._encode(value) for value in values)
+            return len(members) - before
+
+    def smembers(self, name):
+        with self._lock:
+            return set(self._data.get(name, set()))
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+
+    def __init__(self, client):
+        self._client = client
+        self._calls = []
+
+    def __getattr__(self, name):
+
+        def queue(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        calls, self._calls = self._calls, []
+        return [
+            getattr(self._client, name)(*args, **kwargs)
+            for name, args, kwargs in calls
+        ]
+
+
+@pytest.fixture
+def fake_redis(app):
+    """Swap app.redis for an in-process fake and enable the cache"""
+    app.redis = FakeRedis()
+    app.config['CACHE_ENABLED'] = True
+    return app.redis
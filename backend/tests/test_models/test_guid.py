@@ -0,0 +1,38 @@
+import uuid
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql, sqlite, mysql
+from app import db
+from app.models import GUID, Strategy
+
+
+def test_guid_stored_as_16_bytes_on_sqlite(app):
+    """Test ids are stored as raw bytes and loaded as UUIDs"""
+    with app.app_context():
+        strategy = Strategy(name="Stored")
+        db.session.add(strategy)
+        db.session.commit()
+
+        assert isinstance(strategy.id, uuid.UUID)
+        raw = db.session.execute(text("SELECT id FROM strategies")).scalar()
+        assert raw == strategy.id.bytes
+
+        db.session.expire_all()
+        loaded = Strategy.query.filter_by(id=str(strategy.id)).one()
+        assert loaded.id == strategy.id
+
+
+def test_guid_dialect_binds():
+    """Test bind values per dialect, with and without the UUID fast path"""
+    guid = GUID()
+    value = uuid.uuid4()
+
+    assert guid.process_bind_param(value, postgresql.dialect()) is value
+    assert guid.process_bind_param(str(value),
+                                   postgresql.dialect()) == value
+    assert guid.process_bind_param(value, sqlite.dialect()) == value.bytes
+    assert guid.process_bind_param(value, mysql.dialect()) == str(value)
+    assert guid.process_bind_param(None, sqlite.dialect()) is None
+
+    assert guid.process_result_value(value, postgresql.dialect()) is value
+    assert guid.process_result_value(value.bytes, sqlite.dialect()) == value
+    assert guid.process_result_value(str(value), mysql.dialect()) == value
@@ -128,3 +128,46 @@ def test_model_image_validation(app: Flask, test_setup):
                     'upload_date': datetime.utcnow().isoformat()
                 }]
             )
+
+
+def test_image_validation_skipped_when_loading(app: Flask):
+    """Test assignments are validated while loaded rows are not"""
+    with app.app_context():
+        strategy = Strategy(name="Loaded")
+        db.session.add(strategy)
+        db.session.commit()
+
+        # Rows written outside the ORM are loaded as-is
+        db.session.execute(
+            Strategy.__table__.update().values(
+                strategy_image_url='legacy.png'))
+        db.session.commit()
+        db.session.expire_all()
+        assert db.session.get(Strategy,
+                              strategy.id).strategy_image_url == 'legacy.png'
+
+        with pytest.raises(ValidationError):
+            strategy.strategy_image_url = 'http://external-site.com/a.png'
+        strategy.strategy_image_url = '/static/strategy/main.png'
+        assert strategy.strategy_image_url == '/static/strategy/main.png'
+
+
+def test_validate_image_mappings(app: Flask):
+    """Test batch validation of bulk insert rows"""
+    with app.app_context():
+        Trade.validate_image_mappings([{
+            'entry_image_url': '/static/trades/entry.png',
+            'exit_image_url': None
+        }, {
+            'symbol': 'EURUSD'
+        }])
+
+        with pytest.raises(ValidationError):
+            Trade.validate_image_mappings([{
+                'entry_image_url': '/static/trades/entry.png'
+            }, {
+                'exit_image_url': 'invalid-url'
+            }])
+
+        with pytest.raises(ValidationError):
+            Journal.validate_image_mappings([{'images': [{'url': 'x'}]}])
@@ -0,0 +1,26 @@
+from sqlalchemy import inspect, text
+from app import db
+
+
+def test_foreign_keys_are_indexed(app):
+    """Test every foreign key is the leading column of some index"""
+    with app.app_context():
+        inspector = inspect(db.engine)
+        for table in inspector.get_table_names():
+            leading = {
+                index['column_names'][0]
+                for index in inspector.get_indexes(table)
+            }
+            for foreign_key in inspector.get_foreign_keys(table):
+                assert foreign_key['constrained_columns'][0] in leading, (
+                    table, foreign_key['constrained_columns'])
+
+
+def test_open_trades_partial_index(app):
+    """Test the open-trade index only covers rows without an exit"""
+    with app.app_context():
+        sql = db.session.execute(
+            text("SELECT sql FROM sqlite_master "
+                 "WHERE name = 'ix_trades_open_plan_entry_time'")).scalar()
+
+        assert sql.endswith('WHERE exit_time IS NULL')
@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import inspect
+from app import db
+from app.models import User, TradingPlan, Strategy
+from app.models.loader_profiles import loader_options
+from app.services.query_stats_service import QueryStatsService
+from app.services.strategy_service import StrategyService
+from app.services.synthetic_data_service import SyntheticDataService
+from app.services.trading_plan_service import TradingPlanService
+
+
+def _plan_dashboard(plan):
+    user_id, plan_id = plan.user_id, plan.id
+    db.session.expire_all()
+    with QueryStatsService.track() as stats:
+        dashboard = TradingPlanService.get_plan_aggregate(user_id, plan_id)
+    return dashboard, stats.count
+
+
+def test_plan_aggregate_query_count(app, synthetic_data):
+    """Test a plan dashboard takes four queries whatever its size"""
+    with app.app_context():
+        SyntheticDataService.generate(users=1,
+                                      plans_per_user=1,
+                                      strategies=1,
+                                      trades_per_plan=5,
+                                      seed=7)
+        small = TradingPlan.query.join(User).filter(
+            User.username == 'synth7_0').one()
+        large = TradingPlan.query.join(User).filter(
+            User.username == 'synth42_0').first()
+
+        small_dashboard, small_count = _plan_dashboard(small)
+        large_dashboard, large_count = _plan_dashboard(large)
+
+        assert len(small_dashboard['trades']) == 5
+        assert len(large_dashboard['trades']) == 200
+        assert small_count == large_count == 4
+        assert any(trade['journal_entry']
+                   for trade in large_dashboard['trades'])
+
+
+def test_json_columns_load_only_when_included(app, synthetic_data):
+    """Test deferred JSON columns stay unloaded and out of the response"""
+    with app.app_context():
+        plan_id = TradingPlan.query.first().id
+        db.session.expire_all()
+        plan = db.session.execute(
+            db.select(TradingPlan).options(
+                *loader_options('plan_aggregate')).where(
+                    TradingPlan.id == plan_id)).scalar_one()
+        journal = next(trade.journal_entry for trade in plan.trades
+                       if trade.journal_entry)
+        assert {'risk_management', 'entry_rules'} <= inspect(plan).unloaded
+        assert {'market_conditions', 'images'} <= inspect(journal).unloaded
+        assert 'metrics' in inspect(plan.performances[0]).unloaded
+
+        db.session.expire_all()
+        dashboard = TradingPlanService.get_plan_aggregate(
+            plan.user_id, plan_id, include=('images', 'metrics'))
+        assert 'risk_management' not in dashboard['trading_plan']
+        entry = next(trade['journal_entry'] for trade in dashboard['trades']
+                     if trade['journal_entry'])
+        assert 'images' in entry and 'market_conditions' not in entry
+        assert 'summary' in dashboard['performances'][0]['metrics']
+
+        with pytest.raises(ValueError, match='cannot include: notes'):
+            loader_options('plan_aggregate', include=('notes', ))
+
+
+def test_strategy_aggregate_scoped_to_user(app, synthetic_data):
+    """Test a strategy dashboard shows only the user's trades"""
+    with app.app_context():
+        user = User.query.filter_by(username='synth42_0').one()
+        user_id, strategy_id = user.id, Strategy.query.first().id
+        plan_ids = {str(plan.id) for plan in user.trading_plans}
+        db.session.expire_all()
+
+        with QueryStatsService.track() as stats:
+            dashboard = StrategyService.get_strategy_aggregate(
+                user_id, strategy_id)
+
+        assert stats.count == 3
+        assert dashboard['trades']
+        assert {trade['trading_plan_id']
+                for trade in dashboard['trades']} <= plan_ids
+        assert {p['trading_plan_id']
+                for p in dashboard['performances']} <= plan_ids
+        assert all('metrics' not in p for p in dashboard['performances'])
+        assert dashboard['trades'][0]['trading_plan_name'].startswith(
+            'Synthetic plan')
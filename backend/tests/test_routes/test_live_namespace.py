@@ -0,0 +1,149 @@
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from flask_jwt_extended import create_access_token, create_refresh_token
+from app import db, socketio
+from app.models import User, TradingPlan, Trade
+from app.services.live_pnl_service import LivePnLService
+from app.services.tick_service import (TickIngestService, TickReplaySource,
+                                       write_ticks)
+
+
+@pytest.fixture
+def live_setup(app, fake_redis):
+    """Create a user with an open trade and live P&L enabled"""
+    app.config['LIVE_PNL_ENABLED'] = True
+    LivePnLService.reset()
+    with app.app_context():
+        user = User(email='stream@example.com', username='stream')
+        user.set_password('Password123!')
+        other = User(email='other@example.com', username='other')
+        other.set_password('Password123!')
+        db.session.add_all([user, other])
+        db.session.commit()
+
+        plan = TradingPlan(user_id=user.id, name="Live", type="day_trading")
+        db.session.add(plan)
+        db.session.commit()
+        db.session.add(
+            Trade(trading_plan_id=plan.id,
+                  entry_price=Decimal('1.1'),
+                  entry_time=datetime(2025, 1, 1),
+                  symbol='EURUSD',
+                  position_size=Decimal('1000')))
+        db.session.commit()
+        yield {
+            'plan_id': str(plan.id),
+            'token': create_access_token(identity=str(user.id)),
+            'other_token': create_access_token(identity=str(other.id)),
+            'refresh_token': create_refresh_token(identity=str(user.id))
+        }
+    LivePnLService.reset()
+
+
+def _connect(app, token):
+    return socketio.test_client(app,
+                                namespace='/live',
+                                auth={'token': token})
+
+
+def _events(client):
+    return [(message['name'], message['args'][0])
+            for message in client.get_received('/live')]
+
+
+def test_connect_requires_a_valid_token(app, live_setup):
+    """Test connections without a valid token are refused"""
+    client = _connect(app, 'not-a-token')
+    assert not client.is_connected('/live')
+
+
+def test_connect_rejects_refresh_tokens(app, live_setup):
+    """Test a refresh token cannot open the stream"""
+    client = _connect(app, live_setup['refresh_token'])
+    assert not client.is_connected('/live')
+
+
+def test_subscriber_gets_snapshot_then_deltas(app, live_setup):
+    """Test a subscribed client receives a snapshot and then deltas"""
+    client = _connect(app, live_setup['token'])
+    ack = client.emit('subscribe', {'trading_plan_id': live_setup['plan_id']},
+                      namespace='/live',
+                      callback=True)
+    assert ack == {'subscribed': live_setup['plan_id']}
+
+    LivePnLService.flush()
+    [(name, snapshot)] = _events(client)
+    assert name == 'snapshot'
+    assert snapshot['seq'] == 1
+    [position] = snapshot['positions'].values()
+    assert position['price'] is None
+
+    LivePnLService.on_tick('EURUSD', 1.2)
+    LivePnLService.on_tick('EURUSD', 1.15)
+    LivePnLService.flush()
+    [(name, delta)] = _events(client)
+    assert name == 'delta'
+    assert delta['seq'] == 2
+    [fields] = delta['positions'].values()
+    assert fields == {'price': 1.15, 'unrealized_pnl': pytest.approx(50)}
+
+    # Closing the trade reloads the plan and moves the P&L to realized
+    trade = Trade.query.one()
+    trade.exit_price = Decimal('1.15')
+    trade.exit_time = datetime(2025, 1, 2)
+    db.session.commit()
+    LivePnLService.flush()
+    [(name, delta)] = _events(client)
+    assert delta['closed'] == [str(trade.id)]
+    assert delta['equity'] == {
+        'realized_pnl': pytest.approx(50),
+        'unrealized_pnl': 0
+    }
+
+
+def test_replayed_ticks_reach_subscribers(app, live_setup, tmp_path):
+    """Test the replay pipeline publishes frames for the ticks it feeds"""
+    client = _connect(app, live_setup['token'])
+    client.emit('subscribe', {'trading_plan_id': live_setup['plan_id']},
+                namespace='/live',
+                callback=True)
+    path = str(tmp_path / 'ticks.csv')
+    write_ticks(path, ['EURUSD', 'EURUSD'], [1735689600000, 1735689601000],
+                [1.2, 1.15])
+
+    with app.app_context():
+        TickReplaySource(path, speed=None).replay(
+            TickIngestService(['1m'], publish=True))
+
+    [(name, snapshot)] = _events(client)
+    assert name == 'snapshot'
+    [position] = snapshot['positions'].values()
+    assert position['price'] == 1.15
+    assert position['unrealized_pnl'] == pytest.approx(50)
+
+
+def test_cannot_subscribe_to_another_users_plan(app, live_setup):
+    """Test plan rooms are only joined by the plan's owner"""
+    client = _connect(app, live_setup['other_token'])
+    ack = client.emit('subscribe', {'trading_plan_id': live_setup['plan_id']},
+                      namespace='/live',
+                      callback=True)
+
+    assert ack == {'error': 'Trading plan not found'}
+    LivePnLService.flush()
+    assert _events(client) == []
+
+
+def test_disconnect_releases_the_subscription(app, live_setup, fake_redis):
+    """Test the shared subscriber count follows connections"""
+    client = _connect(app, live_setup['token'])
+    client.emit('subscribe', {'trading_plan_id': live_setup['plan_id']},
+                namespace='/live')
+    assert fake_redis.hgetall('live:subscribers') == {
+        live_setup['plan_id'].encode(): b'1'
+    }
+
+    client.disconnect(namespace='/live')
+
+    assert fake_redis.hgetall('live:subscribers') == {}
@@ -0,0 +1,238 @@
+import io
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import User, TradingPlan, Strategy, Trade
+
+
+def _create_user(email, username):
+    user = User(email=email, username=username)
+    user.set_password('Password123!')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def trade_listing(app):
+    """Create two users with trades across plans, symbols and states"""
+    with app.app_context():
+        owner = _create_user('owner@example.com', 'owner')
+        other = _create_user('other@example.com', 'other')
+
+        plan = TradingPlan(user_id=owner.id, name="Main", type="day_trading")
+        second_plan = TradingPlan(user_id=owner.id,
+                                  name="Second",
+                                  type="swing_trading")
+        foreign_plan = TradingPlan(user_id=other.id,
+                                   name="Foreign",
+                                   type="day_trading")
+        strategy = Strategy(name="Breakout")
+        db.session.add_all([plan, second_plan, foreign_plan, strategy])
+        db.session.commit()
+
+        start = datetime(2025, 1, 1)
+        trades = []
+        for i in range(25):
+            # Pairs of trades share an entry_time to exercise the id tie-break
+            entry_time = start + timedelta(hours=i // 2)
+            trades.append(
+                Trade(trading_plan_id=plan.id if i % 5 else second_plan.id,
+                      strategy_id=strategy.id if i % 2 else None,
+                      entry_price=Decimal('1.1000'),
+                      exit_price=Decimal('1.1010') if i % 3 else None,
+                      entry_time=entry_time,
+                      exit_time=entry_time +
+                      timedelta(minutes=30) if i % 3 else None,
+                      symbol='EURUSD' if i % 4 else 'GBPUSD',
+                      timeframe='H1',
+                      position_size=Decimal('1000')))
+        trades.append(
+            Trade(trading_plan_id=foreign_plan.id,
+                  entry_price=Decimal('1.2'),
+                  entry_time=start,
+                  symbol='EURUSD',
+                  position_size=Decimal('1')))
+        db.session.add_all(trades)
+        db.session.commit()
+
+        token = create_access_token(identity=str(owner.id))
+        return {
+            'headers': {
+                'Authorization': f'Bearer {token}'
+            },
+            'plan_id': str(plan.id),
+            'strategy_id': str(strategy.id),
+        }
+
+
+def test_list_trades_requires_auth(client):
+    """Test listing trades without a token is rejected"""
+    response = client.get('/api/v1/trades/')
+
+    assert response.status_code == 401
+
+
+def test_list_trades_keyset_pagination(client, trade_listing):
+    """Test walking all pages with the cursor returns every trade once"""
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        query = {'limit': 10}
+        if cursor:
+            query['cursor'] = cursor
+        response = client.get('/api/v1/trades/',
+                              query_string=query,
+                              headers=trade_listing['headers'])
+        assert response.status_code == 200
+        data = response.get_json()
+        seen.extend(data['trades'])
+        pages += 1
+        cursor = data['next_cursor']
+        if not data['has_more']:
+            assert cursor is None
+            break
+
+    assert pages == 3
+    assert len(seen) == 25
+    assert len({trade['id'] for trade in seen}) == 25
+    keys = [(trade['entry_time'], trade['id']) for trade in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_list_trades_without_plans(client, app):
+    """Test a user with no plans gets an empty page"""
+    with app.app_context():
+        user = _create_user('empty@example.com', 'empty')
+        token = create_access_token(identity=str(user.id))
+
+    response = client.get('/api/v1/trades/',
+                          headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 200
+    assert response.get_json()['trades'] == []
+    assert response.get_json()['has_more'] is False
+
+
+def test_list_trades_filters(client, trade_listing):
+    """Test symbol, plan, strategy, status and date filters"""
+    headers = trade_listing['headers']
+
+    def fetch(**query):
+        response = client.get('/api/v1/trades/',
+                              query_string=dict(query, limit=200),
+                              headers=headers)
+        assert response.status_code == 200
+        return response.get_json()['trades']
+
+    assert all(t['symbol'] == 'GBPUSD' for t in fetch(symbol='GBPUSD'))
+    assert len(fetch(symbol='GBPUSD')) == 7
+    assert len(fetch(trading_plan_id=trade_listing['plan_id'])) == 20
+    assert len(fetch(strategy_id=trade_listing['strategy_id'])) == 12
+    assert all(t['is_open'] for t in fetch(status='open'))
+    assert len(fetch(status='open')) == 9
+    assert len(fetch(status='closed')) == 16
+    assert len(fetch(timeframe='H1')) == 25
+    assert len(fetch(start='2025-01-01T05:00:00',
+                     end='2025-01-01T07:00:00')) == 4
+
+
+def test_list_trades_rejects_bad_input(client, trade_listing):
+    """Test invalid filters and cursors return 400"""
+    headers = trade_listing['headers']
+
+    response = client.get('/api/v1/trades/',
+                          query_string={'status': 'pending'},
+                          headers=headers)
+    assert response.status_code == 400
+
+    response = client.get('/api/v1/trades/',
+                          query_string={'cursor': 'not-a-cursor'},
+                          headers=headers)
+    assert response.status_code == 400
+
+    response = client.get('/api/v1/trades/',
+                          query_string={'limit': 1000},
+                          headers=headers)
+    assert response.status_code == 400
+
+
+def test_import_trades_endpoint(client, trade_listing):
+    """Test uploading a CSV file through the import endpoint"""
+    csv_data = ('symbol,entry_price,exit_price,entry_time,exit_time,'
+                'position_size\n'
+                'EURUSD,1.1,1.2,2025-02-01T00:00:00,2025-02-01T01:00:00,10\n'
+                'EURUSD,bad,1.2,2025-02-01T00:00:00,2025-02-01T01:00:00,10\n')
+
+    response = client.post('/api/v1/trades/import',
+                           data={
+                               'trading_plan_id': trade_listing['plan_id'],
+                               'file': (io.BytesIO(csv_data.encode()),
+                                        'fills.csv'),
+                           },
+                           headers=trade_listing['headers'])
+
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['inserted'] == 1
+    assert report['failed'] == 1
+
+
+@pytest.mark.parametrize('chunk_size', ['0', '100000', 'many'])
+def test_import_trades_rejects_bad_chunk_size(client, trade_listing,
+                                              chunk_size):
+    """Test chunk sizes outside 1..MAX_CHUNK_SIZE are refused"""
+    response = client.post('/api/v1/trades/import',
+                           data={
+                               'trading_plan_id': trade_listing['plan_id'],
+                               'chunk_size': chunk_size,
+                               'file': (io.BytesIO(b'symbol\n'), 'fills.csv'),
+                           },
+                           headers=trade_listing['headers'])
+
+    assert response.status_code == 400
+    assert 'chunk_size' in response.get_json()['error']
+
+
+def test_import_trades_rejects_foreign_plan(client, trade_listing, app):
+    """Test importing into another user's plan is refused"""
+    with app.app_context():
+        foreign = TradingPlan.query.filter_by(name="Foreign").one()
+        foreign_id = str(foreign.id)
+
+    response = client.post('/api/v1/trades/import',
+                           data={
+                               'trading_plan_id': foreign_id,
+                               'file': (io.BytesIO(b'symbol\n'), 'fills.csv'),
+                           },
+                           headers=trade_listing['headers'])
+
+    assert response.status_code == 404
+
+
+def test_export_trades_endpoint(client, trade_listing):
+    """Test the trade export streams an attachment"""
+    response = client.get('/api/v1/trades/export',
+                          query_string={
+                              'format': 'ndjson',
+                              'symbol': 'GBPUSD'
+                          },
+                          headers=trade_listing['headers'])
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert 'trades.ndjson' in response.headers['Content-Disposition']
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 7
+
+
+def test_export_trades_rejects_bad_format(client, trade_listing):
+    """Test unsupported export formats return 400"""
+    response = client.get('/api/v1/trades/export',
+                          query_string={'format': 'xlsx'},
+                          headers=trade_listing['headers'])
+
+    assert response.status_code == 400
@@ -0,0 +1,131 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import User, TradingPlan, Strategy, Performance
+
+
+@pytest.fixture
+def plan_setup(app):
+    """Create a plan with a rollup row and a foreign plan"""
+    with app.app_context():
+        owner = User(email='planner@example.com', username='planner')
+        other = User(email='stranger@example.com', username='stranger')
+        for user in (owner, other):
+            user.set_password('Password123!')
+        db.session.add_all([owner, other])
+        db.session.commit()
+
+        plan = TradingPlan(user_id=owner.id, name="Mine", type="day_trading")
+        foreign = TradingPlan(user_id=other.id,
+                              name="Theirs",
+                              type="day_trading")
+        strategy = Strategy(name="Trend")
+        db.session.add_all([plan, foreign, strategy])
+        db.session.commit()
+        db.session.add(
+            Performance(strategy_id=strategy.id,
+                        trading_plan_id=plan.id,
+                        timeframe='all',
+                        period='all_time',
+                        metrics={'summary': {
+                            'total_trades': 0
+                        }}))
+        db.session.commit()
+
+        token = create_access_token(identity=str(owner.id))
+        return {
+            'headers': {
+                'Authorization': f'Bearer {token}'
+            },
+            'plan_id': str(plan.id),
+            'foreign_id': str(foreign.id),
+            'strategy_id': str(strategy.id)
+        }
+
+
+def test_get_trading_plan(client, plan_setup):
+    """Test fetching an own plan and hiding foreign ones"""
+    headers = plan_setup['headers']
+
+    response = client.get(f"/api/v1/trading-plans/{plan_setup['plan_id']}",
+                          headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['name'] == "Mine"
+
+    response = client.get(
+        f"/api/v1/trading-plans/{plan_setup['foreign_id']}", headers=headers)
+    assert response.status_code == 404
+
+
+def test_list_strategies(client, plan_setup):
+    """Test the strategy listing and detail endpoints"""
+    response = client.get('/api/v1/strategies/',
+                          headers=plan_setup['headers'])
+    assert response.status_code == 200
+    assert [s['name'] for s in response.get_json()['strategies']] == ["Trend"]
+
+    response = client.get(f"/api/v1/strategies/{plan_setup['strategy_id']}",
+                          headers=plan_setup['headers'])
+    assert response.get_json()['name'] == "Trend"
+
+
+def test_performance_dashboard(client, plan_setup):
+    """Test the dashboard returns the plan's rollups"""
+    response = client.get(
+        f"/api/v1/analysis/performance/{plan_setup['plan_id']}",
+        headers=plan_setup['headers'])
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert len(data['rollups']) == 1
+    assert data['performances'] == []
+
+    response = client.get(
+        f"/api/v1/analysis/performance/{plan_setup['foreign_id']}",
+        headers=plan_setup['headers'])
+    assert response.status_code == 404
+
+
+def test_trading_plan_dashboard(client, plan_setup):
+    """Test the dashboard loads in fixed queries and defers JSON columns"""
+    headers = plan_setup['headers']
+    url = f"/api/v1/trading-plans/{plan_setup['plan_id']}/dashboard"
+
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    # Plan, trades and performances; without trades no journal query
+    assert response.headers['X-DB-Query-Count'] == '3'
+    body = response.get_json()
+    assert body['trading_plan']['name'] == "Mine"
+    assert body['trades'] == []
+    assert 'metrics' not in body['performances'][0]
+
+    response = client.get(f"{url}?include=metrics", headers=headers)
+    assert response.get_json()['performances'][0]['metrics'] == {
+        'summary': {
+            'total_trades': 0
+        }
+    }
+
+    response = client.get(f"{url}?include=parameters", headers=headers)
+    assert response.status_code == 400
+
+    response = client.get(
+        f"/api/v1/trading-plans/{plan_setup['foreign_id']}/dashboard",
+        headers=headers)
+    assert response.status_code == 404
+
+
+def test_strategy_dashboard(client, plan_setup):
+    """Test the strategy dashboard lists the user's performances"""
+    response = client.get(
+        f"/api/v1/strategies/{plan_setup['strategy_id']}/dashboard"
+        "?include=metrics",
+        headers=plan_setup['headers'])
+    assert response.status_code == 200
+    assert response.headers['X-DB-Query-Count'] == '3'
+    body = response.get_json()
+    assert body['strategy']['name'] == "Trend"
+    assert [p['trading_plan_id'] for p in body['performances']
+            ] == [plan_setup['plan_id']]
+    assert 'summary' in body['performances'][0]['metrics']
@@ -0,0 +1,232 @@
+import io
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from app import db
+from app.models import User, TradingPlan, Strategy, Trade
+from app.services.performance_service import PerformanceService
+from app.services.trade_import_service import TradeImportService
+from app.tasks import analysis_tasks
+
+
+@pytest.fixture
+def async_setup(app, fake_redis):
+    """Create a plan and strategy with background rollups"""
+    app.config.update(PERFORMANCE_ROLLUPS_ENABLED=True,
+                      PERFORMANCE_ROLLUP_MODE='async',
+                      PERFORMANCE_RECOMPUTE_DEBOUNCE=5)
+    with app.app_context():
+        user = User(email='async@example.com', username='async')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+
+        plan = TradingPlan(user_id=user.id,
+                           name="Async Plan",
+                           type="day_trading")
+        strategy = Strategy(name="Async Strategy")
+        db.session.add_all([plan, strategy])
+        db.session.commit()
+        return {
+            'user_id': user.id,
+            'plan_id': plan.id,
+            'strategy_id': strategy.id
+        }
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    """Record recompute tasks instead of sending them"""
+    calls = []
+    monkeypatch.setattr(analysis_tasks.recompute_performance_task,
+                        'apply_async',
+                        lambda args, countdown: calls.append(
+                            (args, countdown)))
+    return calls
+
+
+def _closed_trade(setup, exit_price, exit_time, timeframe='H1'):
+    return Trade(trading_plan_id=setup['plan_id'],
+                 strategy_id=setup['strategy_id'],
+                 entry_price=Decimal('100'),
+                 exit_price=Decimal(exit_price),
+                 entry_time=exit_time - timedelta(hours=1),
+                 exit_time=exit_time,
+                 symbol='EURUSD',
+                 timeframe=timeframe,
+                 position_size=Decimal('1'))
+
+
+def _row_keys(setup, timeframes, periods):
+    return {(str(setup['strategy_id']), str(setup['plan_id']), timeframe,
+             period)
+            for timeframe in timeframes for period in periods}
+
+
+def _run_scheduled(scheduled):
+    for args, _ in scheduled:
+        analysis_tasks.recompute_performance_task(*args)
+
+
+def _metrics(setup, timeframe, period):
+    return PerformanceService.get_row(setup['strategy_id'],
+                                      setup['plan_id'],
+                                      timeframe,
+                                      period,
+                                      create=False).metrics['summary']
+
+
+def test_trade_edits_coalesce_into_one_recompute(app, async_setup,
+                                                 scheduled):
+    """Test repeated edits within the window enqueue one task per row"""
+    with app.app_context():
+        trade = _closed_trade(async_setup, '110', datetime(2025, 1, 2))
+        db.session.add(trade)
+        db.session.commit()
+        for price in ('105', '90'):
+            trade.exit_price = Decimal(price)
+            db.session.commit()
+
+        # The write itself leaves analytics untouched
+        assert PerformanceService.get_rollup_row(async_setup['strategy_id'],
+                                                 async_setup['plan_id'],
+                                                 create=False) is None
+        # The rollup plus the trade's timeframe and every period it is in
+        assert len(scheduled) == 6
+        assert {tuple(args) for args, _ in scheduled} == _row_keys(
+            async_setup, ('all', 'H1'), ('all_time', '2025', '2025-01'))
+        assert {countdown for _, countdown in scheduled} == {5}
+
+        _run_scheduled(scheduled)
+        summary = _metrics(async_setup, 'all', 'all_time')
+        assert summary['total_trades'] == 1
+        assert summary['net_profit'] == pytest.approx(-10)
+        assert _metrics(async_setup, 'H1',
+                        '2025-01')['net_profit'] == pytest.approx(-10)
+
+        # The tasks released their keys, so the next edit schedules again
+        trade.exit_price = Decimal('120')
+        db.session.commit()
+        assert len(scheduled) == 12
+
+
+def test_failed_enqueue_releases_its_key(app, async_setup, fake_redis,
+                                        monkeypatch):
+    """Test a broker error does not leave the debounce marker behind"""
+    def unavailable(args, countdown):
+        raise ConnectionError('broker unavailable')
+
+    monkeypatch.setattr(analysis_tasks.recompute_performance_task,
+                        'apply_async', unavailable)
+    key = (async_setup['strategy_id'], async_setup['plan_id'], 'all',
+           'all_time')
+    with app.app_context():
+        assert PerformanceService.schedule_recompute([key]) == 0
+        assert fake_redis.get(PerformanceService.pending_key(key)) is None
+
+
+def test_trade_edit_refreshes_old_and_new_rows(app, async_setup,
+                                               scheduled):
+    """Test moving a trade between timeframes and months updates both"""
+    with app.app_context():
+        trade = _closed_trade(async_setup, '110', datetime(2025, 1, 2))
+        db.session.add(trade)
+        db.session.commit()
+        _run_scheduled(scheduled)
+        assert _metrics(async_setup, 'H1', '2025-01')['total_trades'] == 1
+        scheduled.clear()
+
+        trade.timeframe = 'D1'
+        trade.exit_time = datetime(2025, 2, 3)
+        db.session.commit()
+
+        assert {tuple(args) for args, _ in scheduled} == _row_keys(
+            async_setup, ('all', 'H1', 'D1'),
+            ('all_time', '2025', '2025-01', '2025-02'))
+        _run_scheduled(scheduled)
+        assert _metrics(async_setup, 'H1', '2025-01')['total_trades'] == 0
+        assert _metrics(async_setup, 'H1', 'all_time')['total_trades'] == 0
+        assert _metrics(async_setup, 'D1', '2025-02')['total_trades'] == 1
+        assert _metrics(async_setup, 'all',
+                        '2025-02')['net_profit'] == pytest.approx(10)
+
+
+def test_bulk_import_schedules_derived_rows(app, async_setup, scheduled):
+    """Test Core imports schedule the same rows as ORM trade writes"""
+    with app.app_context():
+        csv_data = ('symbol,entry_price,exit_price,entry_time,exit_time,'
+                    'position_size,timeframe,strategy_id\n'
+                    f'EURUSD,100,110,2025-03-01T00:00:00,2025-03-01T01:00:00,'
+                    f'1,M15,{async_setup["strategy_id"]}\n')
+        TradeImportService.import_stream(io.BytesIO(csv_data.encode()),
+                                         'csv', async_setup['plan_id'])
+
+        assert {tuple(args) for args, _ in scheduled} == _row_keys(
+            async_setup, ('all', 'M15'), ('all_time', '2025', '2025-03'))
+
+
+def test_open_trades_and_rollbacks_schedule_nothing(app, async_setup,
+                                                    scheduled):
+    """Test only committed changes to closed trades are scheduled"""
+    with app.app_context():
+        trade = _closed_trade(async_setup, '110', datetime(2025, 1, 2))
+        trade.exit_price = trade.exit_time = None
+        db.session.add(trade)
+        db.session.commit()
+
+        db.session.add(
+            _closed_trade(async_setup, '110', datetime(2025, 1, 3)))
+        db.session.flush()
+        db.session.rollback()
+
+        assert scheduled == []
+
+
+def test_recompute_key_for_period_and_timeframe(app, async_setup,
+                                                scheduled):
+    """Test derived keys only include trades of their timeframe/period"""
+    with app.app_context():
+        db.session.add_all([
+            _closed_trade(async_setup, '110', datetime(2025, 1, 31, 23)),
+            _closed_trade(async_setup, '95', datetime(2025, 2, 1)),
+            _closed_trade(async_setup, '104', datetime(2025, 2, 3), 'D1'),
+        ])
+        db.session.commit()
+
+        key = (async_setup['strategy_id'], async_setup['plan_id'])
+        february = PerformanceService.recompute_key(*key, 'all', '2025-02')
+        hourly = PerformanceService.recompute_key(*key, 'H1', '2025')
+
+        assert february.metrics['summary']['net_profit'] == pytest.approx(-1)
+        assert hourly.metrics['summary']['total_trades'] == 2
+        assert PerformanceService.period_bounds('2025-12') == (datetime(
+            2025, 12, 1), datetime(2026, 1, 1))
+        with pytest.raises(ValueError):
+            PerformanceService.period_bounds('bt-20250101-20250201')
+
+
+def test_account_rebuild_fans_out_in_chunks(app, async_setup, scheduled):
+    """Test a full rebuild recomputes every derived row through a chord"""
+    with app.app_context():
+        db.session.add_all([
+            _closed_trade(async_setup, '110', datetime(2025, 1, 2)),
+            _closed_trade(async_setup, '95', datetime(2025, 3, 2)),
+        ])
+        db.session.commit()
+        key = (async_setup['strategy_id'], async_setup['plan_id'])
+        PerformanceService.get_row(*key, 'all', '2025-03')
+        PerformanceService.get_row(*key, 'H1', 'bt-20250101-20250201')
+        db.session.commit()
+
+        result = PerformanceService.rebuild_account(async_setup['user_id'],
+                                                    chunk_size=1)
+
+        assert result.get() == {
+            'user_id': str(async_setup['user_id']),
+            'recomputed': 2
+        }
+        rollup = PerformanceService.get_rollup_row(*key, create=False)
+        march = PerformanceService.get_row(*key, 'all', '2025-03',
+                                           create=False)
+        assert rollup.metrics['summary']['total_trades'] == 2
+        assert march.metrics['summary']['net_profit'] == pytest.approx(-5)
@@ -0,0 +1,181 @@
+import numpy as np
+import pytest
+from app import db
+from app.models import User, TradingPlan, Strategy, Trade, Performance
+from app.services.backtest_service import (BacktestService, run_backtest,
+                                           EXIT_STOP_LOSS, EXIT_SIGNAL)
+from app.services.market_data_service import MarketDataStore
+
+NO_RULES = {
+    'entry_rules': {},
+    'exit_rules': {},
+    'position_sizing': {},
+    'risk_management': {},
+}
+
+
+def _wave_candles(count=600, start=1735689600, step=3600):
+    bars = np.arange(count)
+    close = 100 + 10 * np.sin(bars / 15.0) + bars * 0.01
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    return {
+        'time': start + bars * step,
+        'open': open_,
+        'high': np.maximum(open_, close) + 0.2,
+        'low': np.minimum(open_, close) - 0.2,
+        'close': close,
+        'volume': np.ones(count),
+    }
+
+
+def _reference_crossover(candles, fast, slow):
+    """Per-bar loop used to check the vectorized engine"""
+    close = candles['close']
+    trades = []
+    held = False
+    for i in range(1, len(close)):
+        if i - 1 >= slow - 1:
+            fast_ma = close[i - fast:i].mean()
+            slow_ma = close[i - slow:i].mean()
+            want = fast_ma > slow_ma
+        else:
+            want = False
+        if want and not held:
+            entry = candles['open'][i]
+            held = True
+        elif not want and held:
+            trades.append(candles['open'][i] - entry)
+            held = False
+    if held:
+        trades.append(close[-1] - entry)
+    return np.array(trades)
+
+
+def test_crossover_matches_reference_loop():
+    """Test vectorized fills match a bar-by-bar simulation"""
+    candles = _wave_candles()
+    result = run_backtest(candles, {'fast_ma': 5, 'slow_ma': 20}, NO_RULES)
+
+    expected = _reference_crossover(candles, 5, 20)
+    assert len(expected) > 3
+    np.testing.assert_allclose(result['net_pnl'], expected)
+    assert result['equity'][-1] == pytest.approx(10000 + expected.sum())
+    assert result['metrics']['summary']['total_trades'] == len(expected)
+
+
+def test_fees_and_sizing_from_plan_rules():
+    """Test fee rate and percent-equity sizing come from the plan"""
+    candles = _wave_candles()
+    rules = dict(NO_RULES,
+                 position_sizing={
+                     'type': 'percent_equity',
+                     'value': 50
+                 },
+                 risk_management={
+                     'initial_capital': 20000,
+                     'fee_rate': 0.001
+                 })
+    result = run_backtest(candles, {'fast_ma': 5, 'slow_ma': 20}, rules)
+
+    notional = result['entry_price'] * result['position_size']
+    np.testing.assert_allclose(notional, 10000)
+    np.testing.assert_allclose(result['entry_fee'], 10)
+    gross = (result['exit_price'] -
+             result['entry_price']) * result['position_size']
+    np.testing.assert_allclose(
+        result['net_pnl'], gross - result['entry_fee'] - result['exit_fee'])
+
+
+def test_stop_loss_exits_inside_segment():
+    """Test stops are found with a vectorized first-hit search"""
+    candles = _wave_candles()
+    rules = dict(NO_RULES, exit_rules={'stop_loss_pct': 0.005})
+    result = run_backtest(candles, {'fast_ma': 5, 'slow_ma': 20}, rules)
+
+    stopped = result['exit_reason'] == EXIT_STOP_LOSS
+    assert stopped.any()
+    stop_level = result['entry_price'][stopped] * 0.995
+    # Stopped trades fill at the stop, or at a worse gapped open
+    assert np.all(result['exit_price'][stopped] <= stop_level + 1e-9)
+    assert np.all(result['exit_index'] >= result['entry_index'])
+
+
+def test_short_and_max_holding_rules():
+    """Test short-side entries and the max holding period"""
+    candles = _wave_candles()
+    rules = dict(NO_RULES,
+                 entry_rules={'direction': 'short'},
+                 exit_rules={'max_holding_bars': 3})
+    result = run_backtest(candles, {'fast_ma': 5, 'slow_ma': 20}, rules)
+
+    assert np.all(result['position_size'] < 0)
+    held = result['exit_index'] - result['entry_index']
+    capped = result['exit_reason'] == EXIT_SIGNAL
+    assert np.all(held[capped] <= 3)
+
+
+def test_rsi_and_breakout_signals():
+    """Test the other supported strategy parameter sets"""
+    candles = _wave_candles()
+    rsi = run_backtest(candles, {
+        'rsi_period': 14,
+        'overbought': 70,
+        'oversold': 30
+    }, NO_RULES)
+    breakout = run_backtest(candles, {'breakout_period': 20}, NO_RULES)
+
+    assert len(rsi['net_pnl']) > 0
+    assert len(breakout['net_pnl']) > 0
+    with pytest.raises(ValueError):
+        run_backtest(candles, {'unknown': 1}, NO_RULES)
+
+
+def test_backtest_service_builds_trades_and_performance(app, tmp_path):
+    """Test a backtest builds trades but persists only its Performance"""
+    store = MarketDataStore(str(tmp_path))
+    store.append('EURUSD', 'H1', _wave_candles())
+
+    with app.app_context():
+        user = User(email='backtest@example.com', username='backtest')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+
+        plan = TradingPlan(user_id=user.id,
+                           name="Backtest Plan",
+                           type="swing_trading",
+                           timeframes=["H1"],
+                           risk_management={"fee_rate": 0.0005})
+        strategy = Strategy(name="MA Cross",
+                            parameters={
+                                "fast_ma": 5,
+                                "slow_ma": 20,
+                                "timeframe": "H1"
+                            })
+        db.session.add_all([plan, strategy])
+        db.session.commit()
+
+        trades, performance, result = BacktestService.run(strategy,
+                                                          plan,
+                                                          'EURUSD',
+                                                          store=store,
+                                                          persist=True)
+
+        assert len(trades) == len(result['net_pnl'])
+        # Simulated fills stay out of the real trade history
+        assert Trade.query.filter_by(strategy_id=strategy.id).count() == 0
+        assert trades[0].timeframe == '1h'
+        assert trades[0].exit_time > trades[0].entry_time
+
+        performance = db.session.get(Performance, performance.id)
+        assert performance.period == 'bt-20250101-20250125'
+        assert performance.metrics['summary']['total_trades'] == len(trades)
+        assert performance.metrics['backtest']['bars'] == 600
+
+        # Rerunning the same range replaces the row instead of adding one
+        _, rerun, _ = BacktestService.run(strategy, plan, 'EURUSD',
+                                          store=store, persist=True)
+        assert rerun.id == performance.id
+        assert Performance.query.filter_by(
+            strategy_id=strategy.id,
+            period='bt-20250101-20250125').count() == 1
@@ -0,0 +1,172 @@
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from app import db
+from app.models import User, TradingPlan, Strategy, Trade
+from app.services.cache_service import CacheService
+
+
+@pytest.fixture
+def cache_setup(app, fake_redis):
+    """Create a user with two plans and a strategy"""
+    with app.app_context():
+        user = User(email='cache@example.com', username='cache')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+
+        first = TradingPlan(user_id=user.id, name="First", type="day_trading")
+        second = TradingPlan(user_id=user.id,
+                             name="Second",
+                             type="swing_trading")
+        strategy = Strategy(name="Cached")
+        db.session.add_all([first, second, strategy])
+        db.session.commit()
+        return {
+            'user_id': user.id,
+            'first_id': first.id,
+            'second_id': second.id,
+            'strategy_id': strategy.id
+        }
+
+
+class Loader:
+
+    def __init__(self, value='fresh'):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return {'value': self.value, 'calls': self.calls}
+
+
+def test_read_through_and_counters(app, fake_redis):
+    """Test the second read is a hit and counters are recorded"""
+    loader = Loader()
+    with app.app_context():
+        first = CacheService.get_or_load('plans', ['u1'], loader, ['tag:a'])
+        second = CacheService.get_or_load('plans', ['u1'], loader, ['tag:a'])
+        other = CacheService.get_or_load('plans', ['u2'], loader, ['tag:a'])
+
+        assert first == second == {'value': 'fresh', 'calls': 1}
+        assert other['calls'] == 2
+        assert CacheService.stats() == {'plans': {'hit': 1, 'miss': 2}}
+
+
+def test_model_changes_evict_only_dependent_entries(app, cache_setup):
+    """Test a commit evicts entries tagged with the changed rows only"""
+    first_loader, second_loader, trades_loader = Loader(), Loader(), Loader()
+    first_tag = f"plan:{cache_setup['first_id']}"
+    second_tag = f"plan:{cache_setup['second_id']}"
+    trades_tag = f"trades:plan:{cache_setup['first_id']}"
+
+    def read_all():
+        CacheService.get_or_load('plan', [1], first_loader, [first_tag])
+        CacheService.get_or_load('plan', [2], second_loader, [second_tag])
+        CacheService.get_or_load('trades', [1], trades_loader, [trades_tag])
+
+    with app.app_context():
+        read_all()
+        plan = db.session.get(TradingPlan, cache_setup['first_id'])
+        plan.notes = "Updated"
+        db.session.commit()
+        read_all()
+
+        assert (first_loader.calls, second_loader.calls,
+                trades_loader.calls) == (2, 1, 1)
+
+        # A trade in the first plan only evicts the trade-dependent entry
+        db.session.add(
+            Trade(trading_plan_id=cache_setup['first_id'],
+                  strategy_id=cache_setup['strategy_id'],
+                  entry_price=Decimal('1.1'),
+                  entry_time=datetime(2025, 1, 1),
+                  symbol='EURUSD',
+                  position_size=Decimal('1')))
+        db.session.commit()
+        read_all()
+
+        assert (first_loader.calls, second_loader.calls,
+                trades_loader.calls) == (2, 1, 2)
+
+
+def test_rolled_back_changes_do_not_evict(app, cache_setup):
+    """Test invalidation waits for the commit"""
+    loader = Loader()
+    tag = f"plan:{cache_setup['first_id']}"
+
+    with app.app_context():
+        CacheService.get_or_load('plan', [1], loader, [tag])
+        plan = db.session.get(TradingPlan, cache_setup['first_id'])
+        plan.notes = "Discarded"
+        db.session.flush()
+        db.session.rollback()
+        CacheService.get_or_load('plan', [1], loader, [tag])
+
+        assert loader.calls == 1
+
+
+def test_single_flight_coalesces_concurrent_misses(app, fake_redis):
+    """Test only one caller rebuilds a missing entry"""
+    calls = []
+    started = threading.Event()
+
+    def slow_loader():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return {'value': 'built'}
+
+    results = []
+
+    def read():
+        with app.app_context():
+            results.append(
+                CacheService.get_or_load('slow', ['k'], slow_loader))
+
+    builder = threading.Thread(target=read)
+    builder.start()
+    started.wait(2)
+    waiter = threading.Thread(target=read)
+    waiter.start()
+    builder.join()
+    waiter.join()
+
+    assert len(calls) == 1
+    assert results == [{'value': 'built'}, {'value': 'built'}]
+    with app.app_context():
+        assert CacheService.stats()['slow'] == {'miss': 2, 'coalesced': 1}
+
+
+def test_cached_route_serves_until_plan_changes(app, client, cache_setup):
+    """Test the trading plan listing is cached per user and evicted"""
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        token = create_access_token(identity=str(cache_setup['user_id']))
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.get('/api/v1/trading-plans/', headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()['trading_plans']) == 2
+
+    with app.app_context():
+        db.session.add(
+            TradingPlan(user_id=cache_setup['user_id'],
+                        name="Third",
+                        type="day_trading"))
+        db.session.commit()
+
+    response = client.get('/api/v1/trading-plans/', headers=headers)
+    assert len(response.get_json()['trading_plans']) == 3
+
+    with app.app_context():
+        stats = CacheService.stats()['trading_plans']
+        assert stats == {'miss': 2}
+
+    client.get('/api/v1/trading-plans/', headers=headers)
+    with app.app_context():
+        assert CacheService.stats()['trading_plans']['hit'] == 1
@@ -0,0 +1,149 @@
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+import numpy as np
+import pytest
+from app import db
+from app.models import User, TradingPlan, Strategy, Trade
+from app.services.equity_curve_service import EquityCurveService
+from app.utils.downsampling import lttb
+
+PNL = [100, -50, -100, 200, -25]
+
+
+@pytest.fixture
+def equity_setup(app):
+    """Create a plan with five closed trades and one open trade"""
+    with app.app_context():
+        user = User(email='equity@example.com', username='equity')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+        plan = TradingPlan(user_id=user.id,
+                           name="Equity",
+                           type="day_trading",
+                           risk_management={'initial_capital': 1000})
+        strategy = Strategy(name="Curve")
+        db.session.add_all([plan, strategy])
+        db.session.commit()
+
+        for day, pnl in enumerate(PNL):
+            entry_time = datetime(2025, 1, 1 + day, 9)
+            db.session.add(
+                Trade(trading_plan_id=plan.id,
+                      strategy_id=strategy.id,
+                      symbol='EURUSD',
+                      entry_price=Decimal('100'),
+                      exit_price=Decimal(100 + pnl),
+                      position_size=Decimal('1'),
+                      entry_time=entry_time,
+                      exit_time=entry_time + timedelta(hours=1)))
+        db.session.add(
+            Trade(trading_plan_id=plan.id,
+                  symbol='EURUSD',
+                  entry_price=Decimal('100'),
+                  position_size=Decimal('1'),
+                  entry_time=datetime(2025, 1, 10, 9)))
+        db.session.commit()
+        return {
+            'user_id': user.id,
+            'plan_id': plan.id,
+            'strategy_id': strategy.id
+        }
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    """Test the output size and that an isolated spike survives"""
+    x = np.arange(10000, dtype=np.float64)
+    y = np.sin(x / 500.0)
+    y[4321] = 25.0
+
+    index = lttb(x, y, 200)
+    assert len(index) == 200
+    assert index[0] == 0 and index[-1] == 9999
+    assert np.all(np.diff(index) > 0)
+    assert 4321 in index
+    assert np.array_equal(lttb(x[:50], y[:50], 200), np.arange(50))
+
+
+def test_curve_values(app, equity_setup):
+    """Test equity, running peak and drawdown of the closed trades"""
+    with app.app_context():
+        plan = db.session.get(TradingPlan, equity_setup['plan_id'])
+        curve = EquityCurveService.plan_curve(plan)
+
+    assert curve['trades'] == 5
+    assert curve['equity']['value'] == [1100, 1050, 950, 1150, 1125]
+    assert curve['equity']['time'][0] == '2025-01-01T10:00:00'
+    assert curve['drawdown']['value'] == [0, -50, -150, 0, -25]
+    assert curve['max_drawdown'] == -150
+    assert curve['max_drawdown_pct'] == pytest.approx(-13.64, abs=0.01)
+    assert curve['final_equity'] == 1125
+
+
+def test_window_starts_from_prior_equity(app, equity_setup):
+    """Test P&L before the window is carried into its opening balance"""
+    with app.app_context():
+        plan = db.session.get(TradingPlan, equity_setup['plan_id'])
+        curve = EquityCurveService.plan_curve(plan,
+                                              start=datetime(2025, 1, 3),
+                                              end=datetime(2025, 1, 5))
+
+    assert curve['initial_capital'] == 1050
+    assert curve['equity']['value'] == [950, 1150]
+
+
+def test_build_is_fast_and_bounded():
+    """Test 200k trades reduce to the requested points quickly"""
+    rng = np.random.default_rng(7)
+    exit_time = 1.4e9 + np.arange(200000) * 1577.0
+    net = rng.normal(1, 50, 200000)
+
+    started = time.perf_counter()
+    curve = EquityCurveService.build(exit_time, net, 10000.0, 1000)
+    elapsed = time.perf_counter() - started
+
+    assert len(curve['equity']['value']) == 1000
+    assert len(curve['drawdown']['value']) <= 1001
+    equity = 10000.0 + np.cumsum(net)
+    drawdown = equity - np.maximum.accumulate(np.maximum(equity, 10000.0))
+    assert curve['max_drawdown'] == round(drawdown.min(), 2)
+    assert min(curve['drawdown']['value']) == curve['max_drawdown']
+    assert elapsed < 0.25
+
+
+def test_equity_routes(app, client, equity_setup):
+    """Test plan and strategy curves, validation and ownership"""
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        token = create_access_token(identity=str(equity_setup['user_id']))
+        other = User(email='other@example.com', username='other')
+        other.set_password('Password123!')
+        db.session.add(other)
+        db.session.commit()
+        other_token = create_access_token(identity=str(other.id))
+
+    plan_url = f"/api/v1/analysis/equity/plan/{equity_setup['plan_id']}"
+    response = client.get(f'{plan_url}?points=3',
+                          headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['equity']['value']) == 3
+    assert body['equity']['value'][0] == 1100
+    assert body['equity']['value'][-1] == 1125
+
+    response = client.get(f'{plan_url}?points=1',
+                          headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 400
+
+    response = client.get(plan_url,
+                          headers={'Authorization': f'Bearer {other_token}'})
+    assert response.status_code == 404
+
+    response = client.get(
+        f"/api/v1/analysis/equity/strategy/{equity_setup['strategy_id']}"
+        "?initial_capital=500",
+        headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert response.get_json()['final_equity'] == 625
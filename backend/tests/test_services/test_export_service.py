@@ -0,0 +1,114 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from app import db
+from app.models import User, TradingPlan, Trade, Journal
+from app.services.export_service import ExportService
+from app.utils.exceptions import ExportFormatError
+
+
+@pytest.fixture
+def export_setup(app):
+    """Create a user with a plan, trades and a journal entry"""
+    with app.app_context():
+        user = User(email='exporter@example.com', username='exporter')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+
+        plan = TradingPlan(user_id=user.id, name="Export", type="day_trading")
+        db.session.add(plan)
+        db.session.commit()
+
+        start = datetime(2025, 1, 1)
+        trades = [
+            Trade(trading_plan_id=plan.id,
+                  entry_price=Decimal('1.1000'),
+                  exit_price=Decimal('1.1050') if i % 2 else None,
+                  entry_time=start + timedelta(minutes=i),
+                  exit_time=start + timedelta(minutes=i + 30) if i %
+                  2 else None,
+                  symbol='EURUSD',
+                  position_size=Decimal('1000')) for i in range(7)
+        ]
+        db.session.add_all(trades)
+        db.session.commit()
+
+        db.session.add(
+            Journal(trade_id=trades[0].id,
+                    trading_plan_id=plan.id,
+                    notes="Followed the plan, with a comma",
+                    emotions='calm',
+                    market_conditions={'trend': 'up'}))
+        db.session.commit()
+        return {'user_id': user.id, 'plan_id': plan.id}
+
+
+def test_export_trades_csv_in_chunks(app, export_setup):
+    """Test CSV export yields a header and one chunk per fetch"""
+    with app.app_context():
+        stmt = ExportService.trades_query(export_setup['user_id'])
+        chunks = list(ExportService.stream(stmt, 'csv', chunk_size=3))
+
+        assert len(chunks) == 3
+        rows = list(csv.DictReader(io.StringIO(''.join(chunks))))
+        assert len(rows) == 7
+        assert rows[0]['symbol'] == 'EURUSD'
+        assert Decimal(rows[1]['exit_price']) == Decimal('1.105')
+        assert rows[0]['exit_price'] == ''
+        entry_times = [row['entry_time'] for row in rows]
+        assert entry_times == sorted(entry_times)
+
+
+def test_export_trades_ndjson_with_filters(app, export_setup):
+    """Test NDJSON export honours the trade filters"""
+    with app.app_context():
+        stmt = ExportService.trades_query(export_setup['user_id'],
+                                          {'status': 'closed'})
+        body = ''.join(ExportService.stream(stmt, 'ndjson', chunk_size=2))
+
+        records = [json.loads(line) for line in body.splitlines()]
+        assert len(records) == 3
+        assert all(record['exit_time'] for record in records)
+        assert records[0]['trading_plan_id'] == str(export_setup['plan_id'])
+
+
+def test_export_journal_csv(app, export_setup):
+    """Test journal export serializes JSON columns as text"""
+    with app.app_context():
+        stmt = ExportService.journal_query(export_setup['user_id'],
+                                           export_setup['plan_id'])
+        rows = list(
+            csv.DictReader(io.StringIO(''.join(ExportService.stream(
+                stmt, 'csv')))))
+
+        assert len(rows) == 1
+        assert rows[0]['notes'] == "Followed the plan, with a comma"
+        assert json.loads(rows[0]['market_conditions']) == {'trend': 'up'}
+
+
+def test_export_trades_parquet(app, export_setup):
+    """Test Parquet export writes one row group per chunk"""
+    pq = pytest.importorskip('pyarrow.parquet')
+
+    with app.app_context():
+        stmt = ExportService.trades_query(export_setup['user_id'])
+        body = b''.join(ExportService.stream(stmt, 'parquet', chunk_size=3))
+
+    parquet = pq.ParquetFile(io.BytesIO(body))
+    assert parquet.metadata.num_rows == 7
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column('symbol').to_pylist() == ['EURUSD'] * 7
+    assert Decimal(table.column('entry_price')[0].as_py()) == Decimal('1.1')
+
+
+def test_export_rejects_unknown_format(app, export_setup):
+    """Test unsupported formats raise ExportFormatError"""
+    with app.app_context():
+        stmt = ExportService.trades_query(export_setup['user_id'])
+        with pytest.raises(ExportFormatError):
+            ExportService.stream(stmt, 'xlsx')
@@ -0,0 +1,107 @@
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from app import db
+from app.models import User, TradingPlan, Trade
+from app.services.live_pnl_service import LiveBook, LivePnLService
+
+
+@pytest.fixture
+def book():
+    book = LiveBook()
+    book.load_plan('p1', [('t1', 'EURUSD', 1.1, 1000, 1),
+                          ('t2', 'BTCUSD', 100, -2, 0)], 50)
+    book.snapshot('p1')
+    return book
+
+
+def test_ticks_within_a_frame_send_one_delta(book):
+    """Test ticks are coalesced and only changed fields are sent"""
+    book.update_price('EURUSD', 1.2)
+    book.update_price('EURUSD', 1.15)
+
+    [(plan_id, delta)] = book.frame()
+
+    assert plan_id == 'p1'
+    assert delta['seq'] == 2
+    assert delta['positions'] == {
+        't1': {
+            'price': 1.15,
+            'unrealized_pnl': pytest.approx(49)
+        }
+    }
+    assert delta['equity'] == {
+        'unrealized_pnl': pytest.approx(49),
+        'equity': pytest.approx(99)
+    }
+    assert book.frame() == []
+
+
+def test_unchanged_prices_and_other_symbols_send_nothing(book):
+    """Test repeated prices and unrelated symbols produce no delta"""
+    book.update_price('BTCUSD', 90)
+    book.frame()
+    book.update_price('BTCUSD', 90)
+    book.update_price('XAUUSD', 2000)
+
+    assert book.frame() == []
+    # Short position: price falling from 100 to 90 earns 2 * 10
+    assert book.state('p1')['positions']['t2']['unrealized_pnl'] == 20
+
+
+def test_reload_reports_new_and_closed_positions(book):
+    """Test a plan reload sends new positions in full and closed ids"""
+    book.update_price('BTCUSD', 90)
+    book.frame()
+    book.load_plan('p1', [('t2', 'BTCUSD', 100, -2, 0),
+                          ('t3', 'EURUSD', 1.3, 10, 0)], 60)
+
+    [(_, delta)] = book.frame()
+
+    assert delta['closed'] == ['t1']
+    assert delta['positions'] == {
+        't3': {
+            'symbol': 'EURUSD',
+            'position_size': 10,
+            'entry_price': 1.3,
+            'price': None,
+            'unrealized_pnl': None
+        }
+    }
+    assert delta['equity'] == {'realized_pnl': 60, 'equity': 80}
+
+
+def test_load_positions_reads_open_trades_and_realized_pnl(app):
+    """Test the plan state loaded from the database"""
+    with app.app_context():
+        user = User(email='live@example.com', username='live')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+        plan = TradingPlan(user_id=user.id, name="Live", type="day_trading")
+        db.session.add(plan)
+        db.session.commit()
+
+        db.session.add_all([
+            Trade(trading_plan_id=plan.id,
+                  entry_price=Decimal('100'),
+                  exit_price=Decimal('110'),
+                  entry_time=datetime(2025, 1, 1),
+                  exit_time=datetime(2025, 1, 2),
+                  symbol='EURUSD',
+                  position_size=Decimal('2'),
+                  entry_fee=Decimal('1'),
+                  exit_fee=Decimal('1')),
+            Trade(trading_plan_id=plan.id,
+                  entry_price=Decimal('50'),
+                  entry_time=datetime(2025, 1, 3),
+                  symbol='BTCUSD',
+                  position_size=Decimal('1')),
+        ])
+        db.session.commit()
+
+        positions, realized = LivePnLService.load_positions(plan.id)
+
+        assert float(realized) == pytest.approx(18)
+        assert [(row.symbol, float(row.entry_price)) for row in positions
+                ] == [('BTCUSD', 50.0)]
@@ -0,0 +1,201 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+from app.services.market_data_service import MarketDataStore, resample_candles
+from app.utils.timeframes import (normalize_symbol, normalize_timeframe,
+                                  timeframe_seconds)
+
+
+def _candles(start, count, step=60):
+    times = start + np.arange(count, dtype=np.int64) * step
+    close = 100 + np.arange(count, dtype=np.float64)
+    return {
+        'time': times,
+        'open': close - 0.5,
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': np.full(count, 10.0),
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MarketDataStore(str(tmp_path))
+
+
+def test_append_and_read_full_series(store):
+    """Test appended candles read back as memory-mapped columns"""
+    assert store.append('EURUSD', '1m', _candles(0, 100)) == 100
+
+    candles = store.read('EURUSD', '1m')
+
+    assert len(candles['close']) == 100
+    assert isinstance(candles['close'], np.memmap)
+    assert candles['time'][-1] == 99 * 60
+    np.testing.assert_allclose(candles['high'] - candles['low'], 2.0)
+
+
+def test_range_read_is_a_view(store):
+    """Test range reads slice the memmap without copying"""
+    store.append('EURUSD', '1m', _candles(0, 1000))
+
+    candles = store.read('EURUSD', '1m', start=60 * 10, end=60 * 20)
+
+    assert list(candles['time']) == list(range(600, 1200, 60))
+    assert not candles['close'].flags.owndata
+    assert not candles['close'].flags.writeable
+
+
+def test_read_accepts_datetimes_and_aliases(store):
+    """Test datetime bounds and broker-style timeframe aliases"""
+    start = int(datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp())
+    store.append('EUR/USD', 'H1', _candles(start, 48, step=3600))
+
+    candles = store.read('EURUSD',
+                         '1h',
+                         start=datetime(2025, 1, 2),
+                         end=np.datetime64('2025-01-02T06:00'))
+
+    assert len(candles['time']) == 6
+    assert store.series() == [('EURUSD', '1h')]
+
+
+def test_append_only_rejects_overlap(store):
+    """Test the store refuses to rewrite history"""
+    store.append('BTCUSD', '5m', _candles(0, 10, step=300))
+
+    with pytest.raises(ValueError):
+        store.append('BTCUSD', '5m', _candles(300 * 5, 10, step=300))
+
+    assert store.append('BTCUSD', '5m', _candles(300 * 10, 5,
+                                                 step=300)) == 5
+    assert store.length('BTCUSD', '5m') == 15
+    assert store.last_time('BTCUSD', '5m') == 300 * 14
+
+
+def test_append_recovers_from_partial_write(store):
+    """Test a crashed append is cut back before the next one lands"""
+    store.append('EURUSD', '1m', _candles(0, 10))
+    # Crash after two price columns of the next batch were written
+    partial = _candles(600, 3)
+    for column in ('open', 'high'):
+        path = store._column_path('EURUSD', '1m', column)
+        with open(path, 'ab') as handle:
+            handle.write(partial[column].tobytes())
+    assert store.length('EURUSD', '1m') == 10
+
+    store.append('EURUSD', '1m', _candles(600, 5))
+
+    candles = store.read('EURUSD', '1m')
+    assert store.length('EURUSD', '1m') == 15
+    np.testing.assert_allclose(candles['open'], candles['close'] - 0.5)
+    np.testing.assert_allclose(candles['high'], candles['close'] + 1)
+
+
+def test_concurrent_appends_are_serialized(store):
+    """Test parallel appends to one series never interleave columns"""
+    batches = [_candles(i * 6000, 100) for i in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda batch: _append_quietly(store, batch), batches))
+
+    candles = store.read('EURUSD', '1m')
+    assert np.all(np.diff(candles['time']) > 0)
+    np.testing.assert_allclose(candles['open'], candles['close'] - 0.5)
+    assert len({len(values) for values in candles.values()}) == 1
+
+
+def _append_quietly(store, batch):
+    try:
+        store.append('EURUSD', '1m', batch)
+    except ValueError:
+        pass  # An older batch landing after a newer one is rejected
+
+
+def test_append_validates_input(store):
+    """Test malformed candle batches are rejected"""
+    candles = _candles(0, 5)
+    candles['time'] = candles['time'][::-1]
+    with pytest.raises(ValueError):
+        store.append('EURUSD', '1m', candles)
+
+    candles = _candles(0, 5)
+    del candles['volume']
+    with pytest.raises(ValueError):
+        store.append('EURUSD', '1m', candles)
+
+
+def test_read_missing_series_is_empty(store):
+    """Test reading a series that was never written"""
+    candles = store.read('GBPUSD', '1d')
+
+    assert len(candles['time']) == 0
+    assert store.last_time('GBPUSD', '1d') is None
+
+
+def test_timeframe_and_symbol_normalization():
+    """Test the shared symbol/timeframe vocabulary"""
+    assert normalize_timeframe('H4') == '4h'
+    assert timeframe_seconds('15m') == 900
+    assert normalize_symbol('gbp/usd') == 'GBPUSD'
+    with pytest.raises(ValueError):
+        normalize_timeframe('7m')
+    with pytest.raises(ValueError):
+        normalize_symbol('../etc')
+
+
+def test_resample_matches_full_aggregation(store):
+    """Test cached 5m/1h/4h/1d bars equal a fresh full-history resample"""
+    rng = np.random.default_rng(11)
+    base = _candles(0, 3 * 1440 + 17)
+    base['high'] = base['close'] + rng.random(len(base['close']))
+    base['low'] = base['close'] - rng.random(len(base['close']))
+    store.append('EURUSD', '1m', base)
+
+    for timeframe in ('5m', '15m', '1h', '4h', '1d'):
+        seconds = timeframe_seconds(timeframe)
+        candles = store.candles('EURUSD', timeframe)
+        expected = resample_candles(base, seconds)
+        for column in expected:
+            np.testing.assert_allclose(candles[column], expected[column])
+
+
+def test_resampled_cache_updates_incrementally(store, monkeypatch):
+    """Test new base candles extend the cache without re-reading history"""
+    store.append('EURUSD', '1m', _candles(0, 130))
+    first = store.candles('EURUSD', '1h')
+    assert list(first['time']) == [0, 3600, 7200]
+    # Only the two complete hours are cached; the third is built per read
+    assert store.resampled.length('EURUSD', '1h') == 2
+
+    reads = []
+    original = store.read
+
+    def tracking_read(symbol, timeframe, start=None, end=None):
+        reads.append((timeframe, start))
+        return original(symbol, timeframe, start=start, end=end)
+
+    monkeypatch.setattr(store, 'read', tracking_read)
+    more = _candles(130 * 60, 60)
+    more['close'] = more['close'] + 130
+    store.append('EURUSD', '1m', more)
+
+    assert store.resampled.length('EURUSD', '1h') == 3
+    assert reads == [('1m', 7200)]
+    candles = store.candles('EURUSD', '1h', start=3600)
+    assert list(candles['time']) == [3600, 7200, 10800]
+    assert candles['close'][-1] == 100 + 189
+    assert ('.resampled', '1h') not in store.series()
+
+
+def test_native_series_is_not_resampled(store):
+    """Test a stored timeframe is read as is"""
+    store.append('EURUSD', '1m', _candles(0, 120))
+    store.append('EURUSD', '1h', _candles(0, 2, step=3600))
+
+    candles = store.candles('EURUSD', 'H1')
+
+    assert isinstance(candles['close'], np.memmap)
+    assert list(candles['close']) == [100, 101]
+    assert store.resampled.length('EURUSD', '1h') == 0
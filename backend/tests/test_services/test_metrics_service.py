@@ -0,0 +1,138 @@
+import time
+import pytest
+import redis
+from flask import Response
+from sqlalchemy import create_engine, text
+from app.services import metrics_service
+from app.services.cache_service import CacheService
+from app.services.metrics_service import (MetricsService, TimedQueuePool,
+                                          TimedRedis)
+from app.services.password_service import PasswordService
+from app.utils.metrics import Counter, Histogram, MetricsRegistry
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    MetricsService.reset()
+    yield
+    MetricsService.reset()
+
+
+def test_text_format():
+    """Test cumulative buckets, sum/count lines and label escaping"""
+    registry = MetricsRegistry()
+    histogram = registry.register(
+        Histogram('latency_seconds', 'Latency.', ('path', ),
+                  buckets=(0.1, 1.0)))
+    counter = registry.register(Counter('hits_total', 'Hits.', ('path', )))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, '/a')
+    counter.inc('say "hi"\n', amount=2)
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == [
+        '# HELP latency_seconds Latency.', '# TYPE latency_seconds histogram'
+    ]
+    assert 'latency_seconds_bucket{path="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{path="/a",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{path="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{path="/a"} 4.05' in lines
+    assert 'latency_seconds_count{path="/a"} 4' in lines
+    assert 'hits_total{path="say \\"hi\\"\\n"} 2' in lines
+
+
+def test_request_metrics_endpoint(app, client):
+    """Test latency, status and in-flight series per blueprint/endpoint"""
+    assert client.get('/api/v1/analysis/').status_code == 200
+    assert client.get('/api/v1/analysis/').status_code == 200
+    assert client.get('/no-such-route').status_code == 404
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    body = response.get_data(as_text=True)
+
+    labels = 'blueprint="analysis",endpoint="analysis.get_analysis"'
+    assert (f'http_request_duration_seconds_count{{{labels},method="GET"}} 2'
+            in body)
+    assert (f'http_requests_total{{{labels},method="GET",status="200"}} 2'
+            in body)
+    assert ('http_requests_total{blueprint="app",endpoint="unmatched",'
+            'method="GET",status="404"} 1' in body)
+    # Only the scrape itself is still in flight
+    assert 'http_requests_in_flight{blueprint="analysis"} 0' in body
+    assert 'http_requests_in_flight{blueprint="prometheus"} 1' in body
+
+
+def test_metrics_token(app, client):
+    """Test scrapers must send the configured bearer token"""
+    app.config['METRICS_AUTH_TOKEN'] = 'scrape-secret'
+    assert client.get('/metrics').status_code == 401
+    response = client.get('/metrics',
+                          headers={'Authorization': 'Bearer scrape-secret'})
+    assert response.status_code == 200
+
+
+def test_hash_pool_and_cache_counts_are_exported(app, client, fake_redis,
+                                                 monkeypatch):
+    """Test PasswordService and CacheService counts reach /metrics"""
+    monkeypatch.setattr(PasswordService, 'stats', lambda: {
+        'running': 4,
+        'queued': 7,
+        'rejected': 3
+    })
+    with app.app_context():
+        CacheService.get_or_load('plans', ['a'], lambda: 1)
+        CacheService.get_or_load('plans', ['a'], lambda: 1)
+
+    body = client.get('/metrics').get_data(as_text=True)
+
+    assert 'password_hash_tasks{state="running"} 4' in body
+    assert 'password_hash_tasks{state="queued"} 7' in body
+    assert 'password_hash_rejected_total 3' in body
+    assert 'cache_requests_total{namespace="plans",outcome="hit"} 1' in body
+    assert 'cache_requests_total{namespace="plans",outcome="miss"} 1' in body
+
+
+def test_pool_checkout_is_timed(tmp_path):
+    """Test every checkout from the timed pool is observed"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}",
+                           poolclass=TimedQueuePool)
+    for _ in range(3):
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+    engine.dispose()
+
+    assert MetricsService.pool_checkout.count() == 3
+
+
+def test_redis_round_trips_are_timed():
+    """Test commands and pipelines are observed, failed ones included"""
+    client = TimedRedis(host='127.0.0.1', port=1, socket_connect_timeout=0.05)
+    with pytest.raises(redis.ConnectionError):
+        client.get('key')
+    pipeline = client.pipeline()
+    pipeline.incr('key')
+    with pytest.raises(redis.ConnectionError):
+        pipeline.execute()
+
+    assert MetricsService.redis_latency.count('GET') == 1
+    assert MetricsService.redis_latency.count('PIPELINE') == 1
+
+
+def test_request_hooks_overhead(app):
+    """Test the per-request bookkeeping stays in the microseconds"""
+    response = Response()
+    timings = []
+    with app.test_request_context('/api/v1/analysis/'):
+        # Best of several batches, so a GC pause or a busy neighbour
+        # does not decide the outcome
+        for _ in range(5):
+            started = time.perf_counter()
+            for _ in range(400):
+                metrics_service._start_request()
+                metrics_service._after_request(response)
+                metrics_service._teardown_request(None)
+            timings.append((time.perf_counter() - started) / 400)
+
+    assert min(timings) < 20e-6
@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+from app import db
+from app.models import User, TradingPlan, Strategy, Performance
+from app.services.market_data_service import MarketDataStore
+from app.services.optimizer_service import (DEFAULT_KEEP_TOP,
+                                            OptimizerService,
+                                            grid_combinations,
+                                            random_combinations)
+
+
+@pytest.fixture
+def sweep_setup(app, tmp_path):
+    """Create candles, a plan and a strategy to sweep"""
+    bars = np.arange(800)
+    close = 100 + 8 * np.sin(bars / 20.0) + 3 * np.sin(bars / 7.0)
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    store = MarketDataStore(str(tmp_path))
+    store.append(
+        'EURUSD', '1h', {
+            'time': 1735689600 + bars * 3600,
+            'open': open_,
+            'high': np.maximum(open_, close) + 0.1,
+            'low': np.minimum(open_, close) - 0.1,
+            'close': close,
+            'volume': np.ones(len(bars)),
+        })
+
+    with app.app_context():
+        user = User(email='sweep@example.com', username='sweeper')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+
+        plan = TradingPlan(user_id=user.id,
+                           name="Sweep Plan",
+                           type="swing_trading",
+                           timeframes=["H1"])
+        strategy = Strategy(name="MA Sweep",
+                            parameters={
+                                "fast_ma": 5,
+                                "slow_ma": 20
+                            })
+        db.session.add_all([plan, strategy])
+        db.session.commit()
+        return {'store': store, 'plan_id': plan.id, 'strategy_id': strategy.id}
+
+
+def test_grid_combinations():
+    """Test grid expansion of list and range specs"""
+    combos = grid_combinations({
+        'fast_ma': [5, 10],
+        'slow_ma': {
+            'start': 20,
+            'stop': 40,
+            'step': 10
+        }
+    })
+
+    assert len(combos) == 6
+    assert {'fast_ma': 10, 'slow_ma': 40} in combos
+
+
+def test_random_combinations_are_seeded():
+    """Test random search is reproducible with a seed"""
+    ranges = {'fast_ma': {'min': 2, 'max': 15}, 'fee_rate': [0, 0.001]}
+
+    first = random_combinations(ranges, 20, seed=7)
+    second = random_combinations(ranges, 20, seed=7)
+
+    assert first == second
+    assert all(2 <= combo['fast_ma'] <= 15 for combo in first)
+
+
+@pytest.mark.parametrize('max_workers', [0, 2])
+def test_optimize_ranks_and_persists(app, sweep_setup, max_workers):
+    """Test a sweep ranks results and stores Performance rows"""
+    with app.app_context():
+        plan = db.session.get(TradingPlan, sweep_setup['plan_id'])
+        strategy = db.session.get(Strategy, sweep_setup['strategy_id'])
+        progress = []
+
+        ranked, performances = OptimizerService.optimize(
+            strategy,
+            plan,
+            'EURUSD',
+            {
+                'fast_ma': [3, 5, 8],
+                'slow_ma': [15, 30]
+            },
+            store=sweep_setup['store'],
+            max_workers=max_workers,
+            batch_size=2,
+            keep_top=3,
+            progress=lambda done, total: progress.append((done, total)))
+
+        profits = [item['metrics']['summary']['net_profit'] for item in ranked]
+        assert len(ranked) == 6
+        assert profits == sorted(profits, reverse=True)
+        assert progress[-1] == (6, 6)
+
+        stored = Performance.query.filter_by(
+            strategy_id=strategy.id).order_by(Performance.created_at).all()
+        assert len(stored) == 3
+        best = min(stored, key=lambda p: p.metrics['optimization']['rank'])
+        assert best.metrics['optimization']['parameters'] == ranked[0][
+            'parameters']
+        assert best.period.startswith('opt-')
+
+
+def test_optimize_keeps_top_results_by_default(app, sweep_setup):
+    """Test a large sweep only builds rows for the default top N"""
+    with app.app_context():
+        plan = db.session.get(TradingPlan, sweep_setup['plan_id'])
+        strategy = db.session.get(Strategy, sweep_setup['strategy_id'])
+
+        ranked, performances = OptimizerService.optimize(
+            strategy,
+            plan,
+            'EURUSD', {
+                'fast_ma': [2, 3, 5, 8],
+                'slow_ma': [12, 15, 20, 25, 30, 40]
+            },
+            store=sweep_setup['store'],
+            max_workers=0,
+            persist=False)
+
+        assert len(ranked) == 24
+        assert len(performances) == DEFAULT_KEEP_TOP
+
+
+def test_optimize_ascending_metric(app, sweep_setup):
+    """Test drawdown ranks lowest first"""
+    with app.app_context():
+        plan = db.session.get(TradingPlan, sweep_setup['plan_id'])
+        strategy = db.session.get(Strategy, sweep_setup['strategy_id'])
+
+        ranked, _ = OptimizerService.optimize(strategy,
+                                              plan,
+                                              'EURUSD',
+                                              {'fast_ma': [3, 5, 8]},
+                                              method='random',
+                                              samples=5,
+                                              seed=1,
+                                              metric='max_drawdown',
+                                              store=sweep_setup['store'],
+                                              max_workers=0,
+                                              persist=False)
+
+        drawdowns = [
+            item['metrics']['summary']['max_drawdown'] for item in ranked
+        ]
+        assert drawdowns == sorted(drawdowns)
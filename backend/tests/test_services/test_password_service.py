@@ -0,0 +1,105 @@
+import threading
+import pytest
+from app import db
+from app.models import User
+from app.services import password_service
+from app.services.auth_service import AuthService
+from app.services.password_service import PasswordService
+from app.utils.exceptions import PasswordHashingBusyError
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool():
+    PasswordService.reset()
+    yield
+    PasswordService.reset()
+
+
+def test_hash_and_verify_on_pool(app):
+    """Test hashing round trip through the executor"""
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+    with app.app_context():
+        password_hash = PasswordService.hash_password('Password123!')
+
+        assert password_hash.startswith('pbkdf2:sha256:1000$')
+        assert PasswordService.verify_password(password_hash, 'Password123!')
+        assert not PasswordService.verify_password(password_hash, 'wrong')
+        stats = PasswordService.stats()
+        assert stats['in_flight'] == 0
+        assert stats['workers'] == app.config.get('PASSWORD_HASH_WORKERS', 4)
+
+
+def test_login_rehashes_outdated_hash(app):
+    """Test a login upgrades a hash made with an older cost"""
+    with app.app_context():
+        user = User(email='rehash@example.com', username='rehash')
+        user.set_password('Password123!', method='pbkdf2:sha256:1000')
+        db.session.add(user)
+        db.session.commit()
+
+        app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:2000'
+        AuthService.login_user('rehash@example.com', 'Password123!')
+
+        user = User.query.filter_by(email='rehash@example.com').one()
+        assert user.password_hash.startswith('pbkdf2:sha256:2000$')
+        assert not user.needs_rehash('pbkdf2:sha256:2000')
+        assert user.check_password('Password123!')
+
+
+def test_saturated_pool_rejects_instead_of_queueing(app, monkeypatch,
+                                                    caplog):
+    """Test callers beyond workers + max_queue fail fast"""
+    app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_QUEUE=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_hash(password, method):
+        started.set()
+        release.wait(5)
+        return 'hash'
+
+    monkeypatch.setattr(password_service, 'generate_password_hash',
+                        slow_hash)
+
+    def hold_worker():
+        with app.app_context():
+            PasswordService.hash_password('Password123!')
+
+    holder = threading.Thread(target=hold_worker)
+    holder.start()
+    try:
+        assert started.wait(5)
+        with app.app_context():
+            with pytest.raises(PasswordHashingBusyError):
+                PasswordService.hash_password('Password123!')
+            assert PasswordService.stats()['rejected'] == 1
+            assert PasswordService.stats()['running'] == 1
+        # Every rejection logs the pool usage behind the 503
+        assert ('Password hashing is saturated: in_flight=1 running=1 '
+                'queued=0 rejected=1') in caplog.text
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_login_returns_503_when_busy(client, monkeypatch):
+    """Test the login route sheds load with Retry-After"""
+
+    def busy(*args):
+        raise PasswordHashingBusyError("Password hashing is saturated")
+
+    monkeypatch.setattr(PasswordService, 'verify_password', busy)
+    with client.application.app_context():
+        user = User(email='busy@example.com', username='busy')
+        user.set_password('Password123!', method='pbkdf2:sha256:1000')
+        db.session.add(user)
+        db.session.commit()
+
+    response = client.post('/api/v1/auth/login',
+                           json={
+                               'email': 'busy@example.com',
+                               'password': 'Password123!'
+                           })
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
@@ -0,0 +1,256 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from app import db
+from app.models import User, TradingPlan, Strategy, Trade, Performance
+from app.services.performance_service import (PerformanceService,
+                                              PerformanceRollup)
+from app.tasks import analysis_tasks
+
+
+@pytest.fixture
+def rollup_setup(app):
+    """Create a plan and strategy with rollups enabled"""
+    app.config['PERFORMANCE_ROLLUPS_ENABLED'] = True
+    with app.app_context():
+        user = User(email='rollup@example.com', username='rollup')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+
+        plan = TradingPlan(user_id=user.id,
+                           name="Rollup Plan",
+                           type="day_trading")
+        strategy = Strategy(name="Rollup Strategy")
+        db.session.add_all([plan, strategy])
+        db.session.commit()
+
+        return {'plan_id': plan.id, 'strategy_id': strategy.id}
+
+
+@pytest.fixture
+def scheduled(monkeypatch, fake_redis):
+    """Record drawdown repairs instead of sending them"""
+    calls = []
+    monkeypatch.setattr(analysis_tasks.recompute_performance_task,
+                        'apply_async',
+                        lambda args, countdown: calls.append(args))
+    return calls
+
+
+def _run_scheduled(scheduled):
+    for args in scheduled:
+        analysis_tasks.recompute_performance_task(*args)
+    scheduled.clear()
+
+
+def _closed_trade(setup, exit_price, day, size='1'):
+    entry_time = datetime(2025, 1, 1) + timedelta(days=day)
+    return Trade(trading_plan_id=setup['plan_id'],
+                 strategy_id=setup['strategy_id'],
+                 entry_price=Decimal('100'),
+                 exit_price=Decimal(exit_price),
+                 entry_time=entry_time,
+                 exit_time=entry_time + timedelta(hours=1),
+                 symbol='EURUSD',
+                 position_size=Decimal(size),
+                 entry_fee=Decimal('1'),
+                 exit_fee=Decimal('0'))
+
+
+def _summary(setup):
+    performance = PerformanceService.get_rollup_row(setup['strategy_id'],
+                                                    setup['plan_id'],
+                                                    create=False)
+    return performance.metrics['summary']
+
+
+def test_rollup_created_on_closed_trades(app, rollup_setup):
+    """Test closing trades creates and updates the rollup row"""
+    with app.app_context():
+        db.session.add_all([
+            _closed_trade(rollup_setup, '111', 0),
+            _closed_trade(rollup_setup, '95', 1),
+            _closed_trade(rollup_setup, '106', 2),
+        ])
+        db.session.commit()
+
+        summary = _summary(rollup_setup)
+        assert summary['total_trades'] == 3
+        assert summary['winning_trades'] == 2
+        assert summary['profit_factor'] == pytest.approx(15 / 6)
+        assert summary['max_drawdown'] == pytest.approx(6)
+        assert PerformanceService.verify(rollup_setup['strategy_id'],
+                                         rollup_setup['plan_id'])
+
+
+def test_open_trade_is_ignored_until_closed(app, rollup_setup):
+    """Test open trades only count once they are closed"""
+    with app.app_context():
+        trade = Trade(trading_plan_id=rollup_setup['plan_id'],
+                      strategy_id=rollup_setup['strategy_id'],
+                      entry_price=Decimal('100'),
+                      entry_time=datetime(2025, 2, 1),
+                      symbol='EURUSD',
+                      position_size=Decimal('1'))
+        db.session.add(trade)
+        db.session.commit()
+        assert Performance.query.count() == 0
+
+        trade = db.session.get(Trade, trade.id)
+        trade.exit_price = Decimal('105')
+        trade.exit_time = datetime(2025, 2, 2)
+        db.session.commit()
+
+        summary = _summary(rollup_setup)
+        assert summary['total_trades'] == 1
+        assert summary['net_profit'] == pytest.approx(5)
+
+
+def test_rollup_tracks_edits_and_deletes(app, rollup_setup, scheduled):
+    """Test edits and deletes update the rollup incrementally"""
+    with app.app_context():
+        trades = [
+            _closed_trade(rollup_setup, '111', 0),
+            _closed_trade(rollup_setup, '95', 1),
+            _closed_trade(rollup_setup, '106', 2),
+        ]
+        db.session.add_all(trades)
+        db.session.commit()
+
+        loser = db.session.get(Trade, trades[1].id)
+        loser.exit_price = Decimal('99')
+        db.session.commit()
+
+        winner = db.session.get(Trade, trades[0].id)
+        db.session.delete(winner)
+        db.session.commit()
+
+        summary = _summary(rollup_setup)
+        assert summary['total_trades'] == 2
+        assert summary['winning_trades'] == 1
+        assert summary['net_profit'] == pytest.approx(-2 + 5)
+
+        # Drawdown cannot be unwound in O(1); it stays an estimate until
+        # the background repair runs
+        performance = PerformanceService.get_rollup_row(
+            rollup_setup['strategy_id'], rollup_setup['plan_id'])
+        assert performance.metrics['rollup']['drawdown_exact'] is False
+        assert scheduled
+
+        _run_scheduled(scheduled)
+        performance = PerformanceService.get_rollup_row(
+            rollup_setup['strategy_id'], rollup_setup['plan_id'])
+        assert performance.metrics['rollup']['drawdown_exact'] is True
+        assert PerformanceService.verify(rollup_setup['strategy_id'],
+                                         rollup_setup['plan_id'])
+
+
+def test_inexact_drawdown_is_not_rescanned_at_commit(app, rollup_setup,
+                                                     scheduled, monkeypatch):
+    """Test a delete keeps the O(1) update and defers the rescan"""
+    with app.app_context():
+        trades = [_closed_trade(rollup_setup, '111', 0),
+                  _closed_trade(rollup_setup, '80', 1)]
+        db.session.add_all(trades)
+        db.session.commit()
+
+        def fail(*args, **kwargs):
+            raise AssertionError('recompute ran inside the commit')
+
+        monkeypatch.setattr(PerformanceService, 'recompute', fail)
+        db.session.delete(db.session.get(Trade, trades[1].id))
+        db.session.commit()
+
+        assert scheduled == [[str(rollup_setup['strategy_id']),
+                              str(rollup_setup['plan_id']),
+                              'all', 'all_time']]
+
+
+def test_deleting_trough_trade_repairs_drawdown(app, rollup_setup, scheduled):
+    """Test max_drawdown is exact again after the trough trade goes"""
+    with app.app_context():
+        trades = [
+            _closed_trade(rollup_setup, '111', 0),
+            _closed_trade(rollup_setup, '80', 1),
+            _closed_trade(rollup_setup, '106', 2),
+        ]
+        db.session.add_all(trades)
+        db.session.commit()
+        assert _summary(rollup_setup)['max_drawdown'] == pytest.approx(21)
+
+        db.session.delete(db.session.get(Trade, trades[1].id))
+        db.session.commit()
+        _run_scheduled(scheduled)
+
+        assert _summary(rollup_setup)['max_drawdown'] == pytest.approx(0)
+        assert PerformanceService.verify(rollup_setup['strategy_id'],
+                                         rollup_setup['plan_id'])
+
+
+def test_backdated_close_repairs_drawdown(app, rollup_setup, scheduled):
+    """Test an out-of-order exit still yields the exact drawdown"""
+    with app.app_context():
+        db.session.add(_closed_trade(rollup_setup, '111', 5))
+        db.session.commit()
+        db.session.add(_closed_trade(rollup_setup, '90', 0))
+        db.session.commit()
+        _run_scheduled(scheduled)
+
+        assert _summary(rollup_setup)['max_drawdown'] == pytest.approx(11)
+        assert PerformanceService.verify(rollup_setup['strategy_id'],
+                                         rollup_setup['plan_id'])
+
+
+def test_edit_of_expired_trade_is_repaired(app, rollup_setup):
+    """Test edits without a loaded old value fall back to recompute"""
+    with app.app_context():
+        trade = _closed_trade(rollup_setup, '110', 0)
+        db.session.add(trade)
+        db.session.commit()
+
+        # Object is expired after commit; assign without loading first
+        trade.exit_price = Decimal('120')
+        db.session.commit()
+
+        assert _summary(rollup_setup)['net_profit'] == pytest.approx(19)
+
+
+def test_recompute_repairs_rollup(app, rollup_setup):
+    """Test full recompute restores a corrupted rollup"""
+    with app.app_context():
+        db.session.add_all([
+            _closed_trade(rollup_setup, '111', 0),
+            _closed_trade(rollup_setup, '95', 1),
+        ])
+        db.session.commit()
+
+        performance = PerformanceService.get_rollup_row(
+            rollup_setup['strategy_id'], rollup_setup['plan_id'])
+        performance.metrics = PerformanceRollup().to_metrics()
+        db.session.commit()
+        assert not PerformanceService.verify(rollup_setup['strategy_id'],
+                                             rollup_setup['plan_id'])
+
+        PerformanceService.recompute(rollup_setup['strategy_id'],
+                                     rollup_setup['plan_id'])
+        assert PerformanceService.verify(rollup_setup['strategy_id'],
+                                         rollup_setup['plan_id'])
+        assert _summary(rollup_setup)['max_drawdown'] == pytest.approx(6)
+
+
+def test_rollup_welford_matches_batch_variance():
+    """Test incremental add/remove keeps Welford state consistent"""
+    exit_time = datetime(2025, 1, 1)
+    rollup = PerformanceRollup()
+    for value in [1.0, -2.0, 3.5, 0.5]:
+        rollup.add(value, value, exit_time)
+    rollup.remove(3.5, 3.5, exit_time)
+
+    expected = PerformanceRollup()
+    for value in [1.0, -2.0, 0.5]:
+        expected.add(value, value, exit_time)
+
+    assert rollup.mean == pytest.approx(expected.mean)
+    assert rollup.m2 == pytest.approx(expected.m2)
+    assert rollup.monthly_returns['2025-01'] == pytest.approx(-0.5)
@@ -0,0 +1,186 @@
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+import numpy as np
+import pytest
+from app import db
+from app.models import User, TradingPlan, Trade, Journal
+from app.services.plan_rules_service import PlanRulesService
+
+RULES = {
+    'markets': ['EUR/USD', 'GBP/USD'],
+    'timeframes': ['H1', 'H4'],
+    'entry_rules': {
+        'direction': 'long'
+    },
+    'exit_rules': {
+        'stop_loss_pct': 0.01,
+        'max_holding_bars': 5
+    },
+    'position_sizing': {
+        'type': 'fixed',
+        'value': 1000
+    },
+    'risk_management': {
+        'initial_capital': 10000,
+        'max_risk_per_trade': 0.02,
+        'max_daily_trades': 2
+    },
+}
+
+
+@pytest.fixture
+def plan_setup(app):
+    """Create a plan with every supported rule"""
+    PlanRulesService.clear_cache()
+    with app.app_context():
+        user = User(email='rules@example.com', username='rules')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+        plan = TradingPlan(user_id=user.id,
+                           name="Rules",
+                           type="day_trading",
+                           **RULES)
+        db.session.add(plan)
+        db.session.commit()
+        return {'plan_id': plan.id}
+
+
+def _trade(setup, hour=0, exit_price='1.1050', **overrides):
+    entry_time = datetime(2025, 1, 6, 8) + timedelta(hours=hour)
+    values = dict(trading_plan_id=setup['plan_id'],
+                  symbol='EURUSD',
+                  timeframe='H1',
+                  entry_price=Decimal('1.1000'),
+                  exit_price=Decimal(exit_price) if exit_price else None,
+                  entry_time=entry_time,
+                  exit_time=entry_time + timedelta(hours=2),
+                  position_size=Decimal('1000'),
+                  entry_fee=Decimal('0'),
+                  exit_fee=Decimal('0'))
+    values.update(overrides)
+    return Trade(**values)
+
+
+def test_compliant_and_violating_trades(app, plan_setup):
+    """Test each rule flags only its own violation"""
+    with app.app_context():
+        plan = db.session.get(TradingPlan, plan_setup['plan_id'])
+        compiled = PlanRulesService.compile(plan)
+
+        result = compiled.evaluate(_trade(plan_setup))
+        assert result['followed_rules'] is True
+        assert set(result['checks']) == {
+            'market', 'timeframe', 'direction', 'position_size',
+            'risk_per_trade', 'stop_loss', 'holding_time'
+        }
+
+        cases = {
+            'market': dict(symbol='USDJPY'),
+            'timeframe': dict(timeframe='D1'),
+            'direction': dict(position_size=Decimal('-1000')),
+            'position_size': dict(position_size=Decimal('1500')),
+            'stop_loss': dict(exit_price='1.0850'),
+            'holding_time': dict(exit_time=datetime(2025, 1, 6, 14)),
+        }
+        for rule, overrides in cases.items():
+            result = compiled.evaluate(_trade(plan_setup, **overrides))
+            assert result['violations'] == [rule], rule
+
+        # Open trades skip the rules that need an exit
+        open_trade = _trade(plan_setup, exit_price=None, exit_time=None)
+        assert 'stop_loss' not in compiled.evaluate(open_trade)['checks']
+
+
+def test_compiled_plan_is_cached_per_version(app, plan_setup):
+    """Test rule edits bump the version and recompile"""
+    with app.app_context():
+        plan = db.session.get(TradingPlan, plan_setup['plan_id'])
+        compiled = PlanRulesService.compile(plan)
+        assert PlanRulesService.compile(plan) is compiled
+
+        plan.notes = "Not a rule"
+        db.session.commit()
+        assert plan.version == 1
+
+        plan.markets = ['USD/JPY']
+        db.session.commit()
+        assert plan.version == 2
+        recompiled = PlanRulesService.compile(plan)
+        assert recompiled is not compiled
+        assert recompiled.evaluate(
+            _trade(plan_setup))['violations'] == ['market']
+
+
+def test_single_trade_check_is_fast(app, plan_setup):
+    """Test one trade evaluates in microseconds"""
+    with app.app_context():
+        compiled = PlanRulesService.compile(
+            db.session.get(TradingPlan, plan_setup['plan_id']))
+        trade = _trade(plan_setup)
+        runs = 2000
+        per_call = min(
+            timeit.repeat(lambda: compiled.evaluate(trade),
+                          number=runs,
+                          repeat=3)) / runs
+        assert per_call < 100e-6
+
+
+def test_journal_adherence_filled_on_write(app, plan_setup):
+    """Test journals get compliance on insert and on trade edits"""
+    with app.app_context():
+        trade = _trade(plan_setup)
+        db.session.add(trade)
+        db.session.commit()
+        journal = Journal(trade_id=trade.id,
+                          trading_plan_id=plan_setup['plan_id'],
+                          plan_adherence={'lessons_learned': 'Be patient'})
+        db.session.add(journal)
+        db.session.commit()
+
+        assert journal.plan_adherence['lessons_learned'] == 'Be patient'
+        assert journal.plan_adherence['compliance']['followed_rules'] is True
+
+        trade.exit_price = Decimal('1.0800')
+        db.session.commit()
+        db.session.refresh(journal)
+        compliance = journal.plan_adherence['compliance']
+        assert compliance['violations'] == ['stop_loss']
+        assert compliance['plan_version'] == 1
+
+
+def test_vectorized_fill_matches_single_checks(app, plan_setup):
+    """Test the batch pass agrees with per-trade checks and adds daily
+    limits"""
+    with app.app_context():
+        trades = [
+            _trade(plan_setup, hour=0),
+            _trade(plan_setup, hour=1, symbol='USDJPY'),
+            _trade(plan_setup, hour=2, exit_price='1.0800'),
+            _trade(plan_setup, hour=26, exit_price=None, exit_time=None),
+        ]
+        db.session.add_all(trades)
+        db.session.commit()
+        db.session.add_all([
+            Journal(trade_id=trade.id, trading_plan_id=plan_setup['plan_id'])
+            for trade in trades
+        ])
+        db.session.commit()
+
+        assert PlanRulesService.fill_plan(plan_setup['plan_id']) == 4
+
+        compiled = PlanRulesService.compile(
+            db.session.get(TradingPlan, plan_setup['plan_id']))
+        columns = PlanRulesService.load_columns(plan_setup['plan_id'])
+        assert np.array_equal(
+            compiled.evaluate_many(columns)['followed_rules'],
+            [True, False, False, True])
+
+        for trade in trades:
+            stored = Journal.query.filter_by(
+                trade_id=trade.id).one().plan_adherence['compliance']
+            single = compiled.evaluate(trade)
+            extra = {'daily_trades'} if trade is trades[2] else set()
+            assert set(stored['violations']) == set(
+                single['violations']) | extra
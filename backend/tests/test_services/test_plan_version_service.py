@@ -0,0 +1,186 @@
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from app import db
+from app.models import User, TradingPlan, TradingPlanVersion, Trade, Journal
+from app.services.plan_rules_service import PlanRulesService
+from app.services.plan_version_service import (PlanVersionService,
+                                               apply_diff, diff_rules)
+
+
+@pytest.fixture
+def version_setup(app):
+    """Create a plan restricted to EUR/USD"""
+    PlanVersionService.clear_cache()
+    PlanRulesService.clear_cache()
+    with app.app_context():
+        user = User(email='versions@example.com', username='versions')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+        plan = TradingPlan(user_id=user.id,
+                           name="Versioned",
+                           type="day_trading",
+                           markets=['EUR/USD'],
+                           risk_management={
+                               'max_risk_per_trade': 0.02,
+                               'limits': {
+                                   'daily': 3
+                               }
+                           })
+        db.session.add(plan)
+        db.session.commit()
+        return {'user_id': user.id, 'plan_id': plan.id}
+
+
+def _trade(plan_id, symbol='EURUSD'):
+    return Trade(trading_plan_id=plan_id,
+                 symbol=symbol,
+                 entry_price=Decimal('1.1'),
+                 entry_time=datetime(2025, 1, 6, 8),
+                 position_size=Decimal('1'))
+
+
+def test_diff_round_trip():
+    """Test nested changes, removals and list replacements"""
+    old = {'a': {'b': 1, 'c': 2}, 'd': [1, 2], 'e': None}
+    new = {'a': {'b': 1, 'x': {'y': 1}}, 'd': [1], 'e': {'f': 1}}
+
+    diff = diff_rules(old, new)
+    assert ['a', 'c'] in diff['unset']
+    assert [['a', 'b'], 1] not in diff['set']
+    assert apply_diff(old, diff) == new
+    assert old['a'] == {'b': 1, 'c': 2}
+    assert diff_rules(new, new) == {'set': [], 'unset': []}
+
+
+def test_history_stores_diffs_between_checkpoints(app, version_setup):
+    """Test every rule edit is a version and each one can be rebuilt"""
+    expected = {}
+    with app.app_context():
+        plan = db.session.get(TradingPlan, version_setup['plan_id'])
+        expected[1] = plan.rules()
+        plan.notes = "Not a rule"
+        db.session.commit()
+        assert plan.version == 1
+
+        for step in range(2, 14):
+            plan.risk_management = dict(plan.risk_management,
+                                        max_daily_trades=step)
+            db.session.commit()
+            expected[plan.version] = plan.rules()
+        assert plan.version == 13
+
+        rows = TradingPlanVersion.query.filter_by(
+            trading_plan_id=plan.id).order_by(TradingPlanVersion.version).all()
+        assert [row.version for row in rows] == list(range(1, 14))
+        assert [row.version for row in rows if row.is_checkpoint] == [1, 11]
+        assert rows[2].data == {
+            'set': [[['risk_management', 'max_daily_trades'], 3]],
+            'unset': []
+        }
+
+        PlanVersionService.clear_cache()
+        for version, rules in expected.items():
+            assert PlanVersionService.state_at(plan.id, version) == rules
+
+        # Versions past a checkpoint never read the diffs before it
+        PlanVersionService.clear_cache()
+        TradingPlanVersion.query.filter(
+            TradingPlanVersion.trading_plan_id == plan.id,
+            TradingPlanVersion.version.between(2, 10)).delete()
+        db.session.commit()
+        assert PlanVersionService.state_at(plan.id, 13) == expected[13]
+        with pytest.raises(LookupError):
+            PlanVersionService.state_at(plan.id, 5)
+
+
+@pytest.mark.parametrize('interval, checkpoints', [(1, [1, 2, 3, 4]),
+                                                    (2, [1, 3])])
+def test_checkpoint_interval(app, version_setup, interval, checkpoints):
+    """Test every interval-th version is a checkpoint, even every one"""
+    app.config['PLAN_CHECKPOINT_INTERVAL'] = interval
+    with app.app_context():
+        plan = db.session.get(TradingPlan, version_setup['plan_id'])
+        for step in range(2, 5):
+            plan.risk_management = dict(plan.risk_management,
+                                        max_daily_trades=step)
+            db.session.commit()
+
+        rows = TradingPlanVersion.query.filter_by(
+            trading_plan_id=plan.id).order_by(TradingPlanVersion.version).all()
+        assert [row.version for row in rows if row.is_checkpoint
+                ] == checkpoints
+
+        app.config['PLAN_CHECKPOINT_INTERVAL'] = 0
+        with pytest.raises(ValueError):
+            PlanVersionService.checkpoint_interval()
+
+
+def test_trades_and_journals_keep_their_plan_version(app, version_setup):
+    """Test compliance is judged by the rules a trade was made under"""
+    plan_id = version_setup['plan_id']
+    with app.app_context():
+        old_trade = _trade(plan_id)
+        db.session.add(old_trade)
+        db.session.commit()
+        db.session.add(Journal(trade_id=old_trade.id, trading_plan_id=plan_id))
+        db.session.commit()
+
+        plan = db.session.get(TradingPlan, plan_id)
+        plan.markets = ['GBP/USD']
+        db.session.commit()
+
+        new_trade = _trade(plan_id)
+        db.session.add(new_trade)
+        db.session.commit()
+        new_journal = Journal(trade=new_trade, trading_plan_id=plan_id)
+        db.session.add(new_journal)
+        db.session.commit()
+
+        assert old_trade.trading_plan_version == 1
+        assert old_trade.journal_entry.trading_plan_version == 1
+        assert new_trade.trading_plan_version == 2
+        assert new_journal.trading_plan_version == 2
+        assert new_journal.plan_adherence['compliance']['violations'] == [
+            'market'
+        ]
+
+        PlanRulesService.clear_cache()
+        assert PlanRulesService.fill_plan(plan_id) == 2
+        db.session.expire_all()
+        old_result = old_trade.journal_entry.plan_adherence['compliance']
+        new_result = new_trade.journal_entry.plan_adherence['compliance']
+        assert (old_result['plan_version'], old_result['followed_rules']) == (
+            1, True)
+        assert (new_result['plan_version'], new_result['followed_rules']) == (
+            2, False)
+
+
+def test_version_routes(app, client, version_setup):
+    """Test listing versions and reading a historical one"""
+    from flask_jwt_extended import create_access_token
+
+    plan_id = version_setup['plan_id']
+    with app.app_context():
+        token = create_access_token(identity=str(version_setup['user_id']))
+        plan = db.session.get(TradingPlan, plan_id)
+        plan.markets = ['GBP/USD']
+        db.session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.get(f'/api/v1/trading-plans/{plan_id}/versions',
+                          headers=headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['current_version'] == 2
+    assert [v['version'] for v in body['versions']] == [1, 2]
+
+    response = client.get(f'/api/v1/trading-plans/{plan_id}/versions/1',
+                          headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['markets'] == ['EUR/USD']
+
+    response = client.get(f'/api/v1/trading-plans/{plan_id}/versions/7',
+                          headers=headers)
+    assert response.status_code == 404
@@ -0,0 +1,112 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import User, TradingPlan
+from app.services.query_stats_service import QueryStatsService, fingerprint
+from app.utils.decorators import query_budget
+from app.utils.exceptions import QueryBudgetExceededError
+
+
+@pytest.fixture
+def stats_setup(app):
+    """Create a user with six plans"""
+    QueryStatsService.reset()
+    with app.app_context():
+        user = User(email='queries@example.com', username='queries')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+        db.session.add_all(
+            TradingPlan(user_id=user.id, name=f"Plan {i}", type="day_trading")
+            for i in range(6))
+        db.session.commit()
+        token = create_access_token(identity=str(user.id))
+        return {
+            'user_id': user.id,
+            'headers': {
+                'Authorization': f'Bearer {token}'
+            }
+        }
+
+
+def test_fingerprint_folds_values():
+    """Test literals, placeholders and IN lists share one fingerprint"""
+    first = fingerprint("SELECT * FROM trades WHERE id IN (?, ?, ?)\n"
+                        "  AND symbol = 'EURUSD' LIMIT 10")
+    second = fingerprint("SELECT * FROM trades WHERE id IN (?, ?) "
+                         "AND symbol = 'GBPUSD' LIMIT 50")
+    assert first == second
+    assert first == ("SELECT * FROM trades WHERE id IN (...) "
+                     "AND symbol = ? LIMIT ?")
+    assert fingerprint("SELECT 1 WHERE a = %(a_1)s") == \
+        fingerprint("SELECT 1 WHERE a = :a_1")
+
+
+def test_lazy_loads_are_reported_as_repeated(app, stats_setup):
+    """Test a lazy relationship read per plan is flagged as an N+1"""
+    with app.app_context():
+        db.session.expire_all()
+        with QueryStatsService.track() as stats:
+            plans = TradingPlan.query.filter_by(
+                user_id=stats_setup['user_id']).all()
+            for plan in plans:
+                len(plan.trades)
+
+        assert stats.count == 7
+        assert stats.duration > 0
+        (text, count), = stats.repeated(threshold=5)
+        assert count == 6
+        assert 'FROM trades' in text
+
+
+def test_request_headers_and_metrics(app, client, stats_setup):
+    """Test per-request headers and the per-endpoint totals"""
+    response = client.get('/api/v1/trading-plans/',
+                          headers=stats_setup['headers'])
+    assert response.status_code == 200
+    assert int(response.headers['X-DB-Query-Count']) >= 1
+    assert float(response.headers['X-DB-Time-Ms']) > 0
+    assert response.headers['X-DB-Repeated-Statements'] == '0'
+
+    # Totals cover every user's traffic, so only admins may read them
+    response = client.get('/api/v1/metrics/queries',
+                          headers=stats_setup['headers'])
+    assert response.status_code == 403
+    with app.app_context():
+        db.session.get(User, stats_setup['user_id']).role = 'admin'
+        db.session.commit()
+
+    response = client.get('/api/v1/metrics/queries',
+                          headers=stats_setup['headers'])
+    assert response.status_code == 200
+    totals = response.get_json()['endpoints'][
+        'trading_plan.get_trading_plans']
+    assert totals['requests'] == 1
+    assert totals['queries'] >= 1
+    assert totals['over_budget'] == 0
+
+
+def test_strict_budget_fails_the_request(app, client, stats_setup):
+    """Test a route over its budget raises in strict mode"""
+
+    @query_budget(2)
+    def list_plans():
+        return {
+            'names':
+            [plan.name for plan in TradingPlan.query.all() if plan.trades]
+        }
+
+    app.add_url_rule('/plans-with-trades', 'plans_with_trades', list_plans)
+    with app.app_context():
+        db.session.expire_all()
+    with pytest.raises(QueryBudgetExceededError, match='budget is 2'):
+        client.get('/plans-with-trades')
+
+    app.config['SQL_QUERY_BUDGET_STRICT'] = False
+    response = client.get('/plans-with-trades')
+    assert response.status_code == 200
+    with app.app_context():
+        totals = QueryStatsService.snapshot()['plans_with_trades']
+    assert totals['over_budget'] == 2
+    assert totals['n_plus_one'] == 2
+    assert totals['repeated'][0]['count'] == 12
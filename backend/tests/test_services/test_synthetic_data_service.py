@@ -0,0 +1,108 @@
+import pytest
+from marshmallow.exceptions import ValidationError
+from sqlalchemy import func, select
+from app import db
+from app.models import Trade, Journal, Performance, TradingPlan
+from app.services.auth_service import AuthService
+from app.services.performance_service import PerformanceService
+from app.services.synthetic_data_service import (BulkWriter,
+                                                 SyntheticDataService,
+                                                 _copy_text)
+from app.utils.validators import ImageValidator
+
+
+def _trade_rows():
+    return db.session.execute(
+        select(Trade.id, Trade.symbol, Trade.entry_price, Trade.exit_price,
+               Trade.entry_time, Trade.exit_time, Trade.strategy_id).order_by(
+                   Trade.entry_time, Trade.id)).all()
+
+
+def test_generated_rows(app, synthetic_data):
+    """Test counts, rollups, images and logins of the generated data"""
+    with app.app_context():
+        for model in (Trade, Journal, Performance, TradingPlan):
+            count = db.session.scalar(
+                select(func.count()).select_from(model))
+            assert count == synthetic_data[model.__tablename__]
+        assert synthetic_data['trades'] == 800
+        assert 0 < synthetic_data['journal_entries'] < 800
+
+        # Open trades are the latest ones; closed ones carry fees
+        open_trades = Trade.query.filter(Trade.exit_time.is_(None)).all()
+        assert open_trades and all(t.exit_fee is None for t in open_trades)
+
+        for performance in Performance.query.all():
+            assert PerformanceService.verify(performance.strategy_id,
+                                             performance.trading_plan_id)
+
+        for journal in Journal.query.all():
+            assert journal.trade.trading_plan_id == journal.trading_plan_id
+            ImageValidator.validate_image_list(journal.images)
+
+        plan = TradingPlan.query.first()
+        assert plan.versions.one().is_checkpoint
+
+        result = AuthService.login_user('synth42_1@example.com',
+                                        'Synthetic123!')
+        assert result['user']['username'] == 'synth42_1'
+
+
+def test_same_seed_same_data(app, synthetic_data):
+    """Test a seed reproduces identical rows and cannot be loaded twice"""
+    with app.app_context():
+        first = _trade_rows()
+        with pytest.raises(ValueError, match='already exists'):
+            SyntheticDataService.generate(users=2, trades_per_plan=200)
+
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        SyntheticDataService.generate(users=2,
+                                      plans_per_user=2,
+                                      strategies=3,
+                                      trades_per_plan=200)
+        assert _trade_rows() == first
+
+        SyntheticDataService.generate(users=1, trades_per_plan=10, seed=7)
+        assert len(_trade_rows()) == len(first) + 20
+
+
+def test_bulk_writer_validates_images(app):
+    """Test rows bypassing the ORM still get their images checked"""
+    with app.app_context():
+        writer = BulkWriter(db.session.connection())
+        with pytest.raises(ValidationError) as error:
+            writer.write(Journal.__table__, {
+                'images': [[], [{'url': 'http://example.com/x.png'}]],
+                'notes': ['ok', 'bad'],
+            })
+        assert 'images' in error.value.messages
+        assert writer.counts == {}
+
+
+def test_copy_text_format():
+    """Test values are escaped for PostgreSQL COPY"""
+    assert _copy_text(None) == '\\N'
+    assert _copy_text(True) == 't'
+    assert _copy_text(b'\x00' * 15 + b'\x01') == '0' * 31 + '1'
+    assert _copy_text(1.5) == '1.5'
+    assert _copy_text('a\tb\\c\n') == 'a\\tb\\\\c\\n'
+    assert _copy_text({'note': 'x\ty'}) == '{"note": "x\\\\ty"}'
+
+
+def test_generate_command(app):
+    """Test the CLI command reports what it wrote"""
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=[
+        'data', 'generate', '--users', '1', '--trades-per-plan', '50',
+        '--seed', '3'
+    ])
+    assert result.exit_code == 0, result.output
+    assert 'Generated 1 users' in result.output
+    assert '100 trades' in result.output
+
+    result = runner.invoke(
+        args=['data', 'generate', '--users', '1', '--seed', '3'])
+    assert result.exit_code != 0
+    assert 'already exists' in result.output
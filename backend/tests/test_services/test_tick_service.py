@@ -0,0 +1,185 @@
+import numpy as np
+import pytest
+from app.services.market_data_service import MarketDataStore
+from app.services.tick_service import (TickAggregator, TickIngestService,
+                                       TickReplaySource, write_ticks)
+
+# 2025-01-01 00:00:00 UTC in epoch milliseconds
+T0 = 1735689600000
+MINUTE = 60000
+
+
+def _ingest(aggregator, ticks):
+    symbols, times, prices, volumes = zip(*ticks)
+    aggregator.ingest(aggregator.codes(symbols), times, prices, volumes)
+
+
+def test_ticks_fold_into_candles_across_batches():
+    """Test OHLCV per bucket, including candles spanning batches"""
+    aggregator = TickAggregator(['1m', '5m'])
+    _ingest(aggregator, [('EURUSD', T0, 1.0, 1), ('EURUSD', T0 + 10, 1.5, 2),
+                         ('BTCUSD', T0 + 20, 100, 1)])
+    _ingest(aggregator, [('EURUSD', T0 + 30000, 0.5, 1),
+                         ('EURUSD', T0 + MINUTE, 2.0, 1),
+                         ('EURUSD', T0 + 2 * MINUTE + 1, 1.2, 3)])
+
+    series = aggregator.drain()
+    assert set(series) == {('EURUSD', '1m')}
+    candles = series[('EURUSD', '1m')]
+    assert candles['time'].tolist() == [T0 // 1000, T0 // 1000 + 60]
+    assert candles['open'].tolist() == [1.0, 2.0]
+    assert candles['high'].tolist() == [1.5, 2.0]
+    assert candles['low'].tolist() == [0.5, 2.0]
+    assert candles['close'].tolist() == [0.5, 2.0]
+    assert candles['volume'].tolist() == [4, 1]
+
+    aggregator.close_open()
+    series = aggregator.drain()
+    five = series[('EURUSD', '5m')]
+    assert (five['open'][0], five['high'][0], five['low'][0],
+            five['close'][0], five['volume'][0]) == (1.0, 2.0, 0.5, 1.2, 8)
+    assert series[('BTCUSD', '1m')]['close'].tolist() == [100]
+
+
+def test_latest_prices_and_late_ticks():
+    """Test the latest-price table and dropping of out-of-order ticks"""
+    aggregator = TickAggregator(['1m'])
+    _ingest(aggregator, [('EUR/USD', T0 + MINUTE, 1.1, 0)])
+    _ingest(aggregator, [('EURUSD', T0, 1.0, 0)])
+
+    assert aggregator.latest('EURUSD') == (1.1, T0 + MINUTE)
+    assert aggregator.prices() == {'EURUSD': 1.1}
+    assert aggregator.late == {'1m': 1}
+
+
+def test_vectorized_fold_matches_per_tick_reference():
+    """Test random batches against a straightforward per-tick fold"""
+    rng = np.random.default_rng(3)
+    count = 5000
+    symbols = np.array(['AAA', 'BBB', 'CCC'])[rng.integers(0, 3, count)]
+    times = T0 + np.cumsum(rng.integers(0, 2000, count))
+    prices = rng.random(count)
+
+    aggregator = TickAggregator(['1m', '15m'], capacity=1)
+    for start in range(0, count, 777):
+        window = slice(start, start + 777)
+        aggregator.ingest(aggregator.codes(symbols[window]), times[window],
+                          prices[window])
+    aggregator.close_open()
+    series = aggregator.drain()
+
+    for timeframe, seconds in (('1m', 60), ('15m', 900)):
+        expected = {}
+        for symbol, tick_time, price in zip(symbols, times, prices):
+            bucket = tick_time // 1000 // seconds * seconds
+            bars = expected.setdefault(symbol, {})
+            if bucket not in bars:
+                bars[bucket] = [price, price, price, price]
+            bar = bars[bucket]
+            bar[1], bar[2], bar[3] = max(bar[1], price), min(bar[2],
+                                                              price), price
+        for symbol, bars in expected.items():
+            candles = series[(symbol, timeframe)]
+            assert candles['time'].tolist() == sorted(bars)
+            assert np.column_stack([
+                candles['open'], candles['high'], candles['low'],
+                candles['close']
+            ]).tolist() == [bars[bucket] for bucket in sorted(bars)]
+
+
+@pytest.mark.parametrize('suffix', ['csv', 'npz'])
+def test_replay_paces_batches_and_stores_candles(tmp_path, suffix):
+    """Test N-times playback timing and candle persistence"""
+    path = str(tmp_path / f'ticks.{suffix}')
+    times = [T0, T0 + 1000, T0 + MINUTE, T0 + 2 * MINUTE]
+    write_ticks(path, ['EURUSD'] * 4, times, [1.0, 1.2, 1.1, 1.3], [1] * 4)
+
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    source = TickReplaySource(path,
+                              speed=60,
+                              batch_size=2,
+                              clock=lambda: now[0],
+                              sleep=sleep)
+    store = MarketDataStore(str(tmp_path / 'market'))
+    pipeline = TickIngestService(['1m'], store=store, publish=False)
+    report = source.replay(pipeline)
+
+    # The second batch starts one market minute later: one second at 60x
+    assert sleeps == [pytest.approx(1.0)]
+    assert report['ticks'] == 4
+    assert report['candles'] == 3
+    stored = store.read('EURUSD', '1m')
+    assert stored['close'].tolist() == [1.2, 1.1, 1.3]
+
+    # Replaying the same file again does not duplicate stored bars
+    TickReplaySource(path, speed=None).replay(
+        TickIngestService(['1m'], store=store, publish=False))
+    assert store.length('EURUSD', '1m') == 3
+
+
+def test_pipeline_uses_plan_timeframes_and_feeds_live_prices(app, fake_redis):
+    """Test the configured pipeline and its live P&L price feed"""
+    from app import db
+    from app.models import User, TradingPlan
+    from app.services.live_pnl_service import LivePnLService
+
+    LivePnLService.reset()
+    with app.app_context():
+        user = User(email='ticks@example.com', username='ticks')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+        db.session.add_all([
+            TradingPlan(user_id=user.id,
+                        name="Swing",
+                        type="swing_trading",
+                        timeframes=['H4', 'D1', 'weekly']),
+            TradingPlan(user_id=user.id,
+                        name="Scalp",
+                        type="day_trading",
+                        timeframes=['M5']),
+        ])
+        db.session.commit()
+
+        # Web processes leave publishing to the tick-ingesting process
+        assert TickIngestService.from_config(store=False).publish is False
+
+        pipeline = TickIngestService.from_config(store=False, publish=True)
+        pipeline.ingest(['EURUSD', 'EURUSD'], [T0, T0 + 1], [1.1, 1.2])
+
+        assert pipeline.aggregator.timeframes == ['5m', '4h', '1d']
+        assert LivePnLService._book.prices == {'EURUSD': 1.2}
+    LivePnLService.reset()
+
+
+def test_pipeline_publishes_frames_on_the_frame_interval(monkeypatch):
+    """Test ingest emits at most one live frame per interval"""
+    from app.services.live_pnl_service import LivePnLService
+
+    frames = []
+    monkeypatch.setattr(LivePnLService, 'flush',
+                        classmethod(lambda cls: frames.append(1) or 0))
+    now = [0.0]
+    pipeline = TickIngestService(['1m'],
+                                 frame_interval=0.1,
+                                 clock=lambda: now[0])
+
+    pipeline.ingest(['EURUSD'], [T0], [1.1])
+    now[0] = 0.05
+    pipeline.ingest(['EURUSD'], [T0 + 1], [1.2])
+    assert len(frames) == 1
+
+    now[0] = 0.1
+    pipeline.ingest(['EURUSD'], [T0 + 2], [1.3])
+    assert len(frames) == 2
+
+    # Closing the stream publishes the final prices
+    pipeline.flush(close=True)
+    assert len(frames) == 3
+    LivePnLService.reset()
@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+import numpy as np
+import pytest
+from app import db
+from app.models import User, TradingPlan, Trade
+from app.services.trade_analytics_service import TradeAnalyticsService
+
+
+@pytest.fixture
+def analytics_setup(app):
+    """Create a plan with a mix of closed and open trades"""
+    with app.app_context():
+        user = User(email='analyst@example.com', username='analyst')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+
+        plan = TradingPlan(user_id=user.id,
+                           name="Analytics Plan",
+                           type="day_trading")
+        db.session.add(plan)
+        db.session.commit()
+
+        start = datetime(2025, 1, 1, 9, 0)
+        trades = [
+            # Long winner: (110 - 100) * 2 - 1.5 = 18.5
+            Trade(trading_plan_id=plan.id,
+                  entry_price=Decimal('100.00'),
+                  exit_price=Decimal('110.00'),
+                  entry_time=start,
+                  exit_time=start + timedelta(hours=2),
+                  symbol='BTCUSD',
+                  position_size=Decimal('2'),
+                  entry_fee=Decimal('0.75'),
+                  exit_fee=Decimal('0.75')),
+            # Short winner: (90 - 100) * -1 - 0.25 = 9.75
+            Trade(trading_plan_id=plan.id,
+                  entry_price=Decimal('100.00'),
+                  exit_price=Decimal('90.00'),
+                  entry_time=start + timedelta(days=1),
+                  exit_time=start + timedelta(days=1, minutes=30),
+                  symbol='BTCUSD',
+                  position_size=Decimal('-1'),
+                  entry_fee=Decimal('0.25'),
+                  exit_fee=Decimal('0')),
+            # Long loser: (95 - 100) * 1 - 0.5 = -5.5
+            Trade(trading_plan_id=plan.id,
+                  entry_price=Decimal('100.00'),
+                  exit_price=Decimal('95.00'),
+                  entry_time=start + timedelta(days=2),
+                  exit_time=start + timedelta(days=2, hours=1),
+                  symbol='ETHUSD',
+                  position_size=Decimal('1'),
+                  entry_fee=Decimal('0.5')),
+            # Open trade, excluded from analytics
+            Trade(trading_plan_id=plan.id,
+                  entry_price=Decimal('100.00'),
+                  entry_time=start + timedelta(days=3),
+                  symbol='ETHUSD',
+                  position_size=Decimal('1')),
+        ]
+        db.session.add_all(trades)
+        db.session.commit()
+
+        return {'user_id': user.id, 'plan_id': plan.id}
+
+
+def test_load_closed_trades_columns(app, analytics_setup):
+    """Test closed trades load into aligned numpy columns"""
+    with app.app_context():
+        columns = TradeAnalyticsService.load_closed_trades(
+            trading_plan_id=analytics_setup['plan_id'])
+
+        assert len(columns['id']) == 3
+        assert columns['entry_price'].dtype == np.float64
+        assert columns['exit_time'].dtype == np.dtype('datetime64[us]')
+
+
+def test_compute_pnl_vectorized(app, analytics_setup):
+    """Test gross/net P&L, return %, R-multiple and holding time"""
+    with app.app_context():
+        result = TradeAnalyticsService.trade_pnl(
+            trading_plan_id=analytics_setup['plan_id'])
+
+        np.testing.assert_allclose(result['gross_pnl'], [20.0, 10.0, -5.0])
+        np.testing.assert_allclose(result['net_pnl'], [18.5, 9.75, -5.5])
+        np.testing.assert_allclose(result['return_pct'],
+                                   [9.25, 9.75, -5.5])
+        # Default 1R is the average loss (5.5)
+        np.testing.assert_allclose(result['r_multiple'],
+                                   [18.5 / 5.5, 9.75 / 5.5, -1.0])
+        np.testing.assert_allclose(result['holding_seconds'],
+                                   [7200, 1800, 3600])
+
+
+def test_compute_pnl_with_explicit_risk(app, analytics_setup):
+    """Test R-multiple against a supplied risk amount"""
+    with app.app_context():
+        result = TradeAnalyticsService.trade_pnl(
+            user_id=analytics_setup['user_id'], risk=10)
+
+        np.testing.assert_allclose(result['r_multiple'],
+                                   [1.85, 0.975, -0.55])
+
+
+def test_compute_pnl_exact_fixed_point(app, analytics_setup):
+    """Test fixed-point mode returns Decimal-exact results"""
+    with app.app_context():
+        result = TradeAnalyticsService.trade_pnl(
+            trading_plan_id=analytics_setup['plan_id'], exact=True)
+
+        net = TradeAnalyticsService.to_decimal(result['net_pnl'],
+                                               result['scale'])
+        fees = TradeAnalyticsService.to_decimal(result['fees'],
+                                                result['scale'])
+        assert net == [Decimal('18.5'), Decimal('9.75'), Decimal('-5.5')]
+        assert fees == [Decimal('1.5'), Decimal('0.25'), Decimal('0.5')]
+
+
+def test_compute_pnl_exact_large_values():
+    """Test fixed-point mode falls back to exact ints on int64 overflow"""
+    columns = {
+        'entry_price': np.array([Decimal('123456789.123456789')],
+                                dtype=object),
+        'exit_price': np.array([Decimal('123456790.123456789')],
+                               dtype=object),
+        'position_size': np.array([Decimal('1000000.000001')],
+                                  dtype=object),
+        'entry_fee': np.array([Decimal('0.000000001')], dtype=object),
+        'exit_fee': np.array([Decimal('0')], dtype=object),
+    }
+
+    result = TradeAnalyticsService.compute_pnl_exact(columns)
+    net = TradeAnalyticsService.to_decimal(result['net_pnl'],
+                                           result['scale'])
+
+    assert net == [Decimal('1000000.000001') - Decimal('0.000000001')]
+
+
+def test_load_requires_scope(app):
+    """Test loading without a plan or user is rejected"""
+    with app.app_context():
+        with pytest.raises(ValueError):
+            TradeAnalyticsService.load_closed_trades()
@@ -0,0 +1,187 @@
+import csv
+import io
+import json
+from decimal import Decimal
+import pytest
+from app import db
+from app.models import User, TradingPlan, Strategy, Trade
+from app.services.trade_import_service import (TradeImportService,
+                                               detect_format)
+
+CSV_HEADER = ('symbol,entry_price,exit_price,entry_time,exit_time,'
+              'position_size,entry_fee,exit_fee,timeframe,strategy_id\n')
+
+
+@pytest.fixture
+def import_setup(app):
+    """Create a plan and strategy to import into"""
+    with app.app_context():
+        user = User(email='importer@example.com', username='importer')
+        user.set_password('Password123!')
+        db.session.add(user)
+        db.session.commit()
+
+        plan = TradingPlan(user_id=user.id, name="Import", type="day_trading")
+        strategy = Strategy(name="Imported")
+        db.session.add_all([plan, strategy])
+        db.session.commit()
+        return {
+            'user_id': user.id,
+            'plan_id': plan.id,
+            'strategy_id': strategy.id
+        }
+
+
+def _csv(rows):
+    return io.BytesIO((CSV_HEADER + ''.join(rows)).encode())
+
+
+def test_import_csv_in_chunks(app, import_setup):
+    """Test a CSV export is inserted across several chunks"""
+    rows = [
+        f"EUR/USD,1.10{i % 10},1.11,2025-01-01T00:{i:02d}:00,"
+        f"2025-01-01T01:{i:02d}:00,1000,0.5,0.5,H1,"
+        f"{import_setup['strategy_id']}\n" for i in range(25)
+    ]
+    reports = []
+
+    with app.app_context():
+        report = TradeImportService.import_stream(
+            _csv(rows),
+            'csv',
+            import_setup['plan_id'],
+            chunk_size=10,
+            progress=lambda r: reports.append(dict(r, errors=None)))
+
+        assert report == {
+            'processed': 25,
+            'inserted': 25,
+            'failed': 0,
+            'errors': []
+        }
+        assert [r['processed'] for r in reports] == [10, 20, 25]
+
+        trade = Trade.query.filter_by(
+            trading_plan_id=import_setup['plan_id']).first()
+        assert trade.symbol == 'EURUSD'
+        assert trade.exit_fee == Decimal('0.5')
+        assert trade.strategy_id == import_setup['strategy_id']
+
+
+def test_import_reports_row_errors_without_aborting(app, import_setup):
+    """Test invalid rows are reported while valid rows still load"""
+    rows = [
+        "EURUSD,1.1,,2025-01-01T00:00:00,,1000,,,,\n",
+        "EURUSD,abc,,2025-01-01T00:00:00,,1000,,,,\n",
+        ",1.1,,2025-01-01T00:00:00,,1000,,,,\n",
+        "EURUSD,1.1,1.2,2025-01-02T00:00:00,2025-01-01T00:00:00,1,,,,\n",
+        "EURUSD,1.1,1.2,2025-01-01T00:00:00,,1,,,,\n",
+        "EURUSD,1.1,,2025-01-01T00:00:00,,1,,,,"
+        "00000000-0000-0000-0000-000000000000\n",
+        "GBPUSD,1.3,1.31,2025-01-01T00:00:00Z,2025-01-01T02:00:00Z,1,1,1,"
+        "H4,\n",
+    ]
+
+    with app.app_context():
+        report = TradeImportService.import_stream(_csv(rows), 'csv',
+                                                  import_setup['plan_id'])
+
+        assert report['processed'] == 7
+        assert report['inserted'] == 2
+        assert report['failed'] == 5
+        assert [e['line'] for e in report['errors']] == [3, 4, 5, 6, 7]
+        assert 'entry_price' in report['errors'][0]['error']
+        assert 'Unknown strategy_id' in report['errors'][4]['error']
+        assert Trade.query.count() == 2
+
+
+def test_import_reports_encoding_and_csv_errors_per_line(app, import_setup):
+    """Test bad bytes, oversized fields and timeframes fail only their row"""
+    valid = "EURUSD,1.1,,2025-01-01T00:00:00,,1000,,,H1,\n"
+    stream = io.BytesIO(
+        CSV_HEADER.encode() + valid.encode() +
+        b"EURUSD,1.1,,2025-01-01T00:00:00,,1000,,,\xff,\n" +
+        ('EURUSD,"' + 'x' * (csv.field_size_limit() + 1) +
+         '",,2025-01-01T00:00:00,,1,,,,\n').encode() +
+        "EURUSD,1.1,,2025-01-01T00:00:00,,1000,,,H7,\n".encode() +
+        valid.encode())
+
+    with app.app_context():
+        report = TradeImportService.import_stream(stream, 'csv',
+                                                  import_setup['plan_id'])
+
+        assert report['processed'] == 5
+        assert report['inserted'] == 2
+        assert [e['line'] for e in report['errors']] == [3, 4, 5]
+        assert 'UTF-8' in report['errors'][0]['error']
+        assert 'Invalid CSV' in report['errors'][1]['error']
+        assert 'Unsupported timeframe' in report['errors'][2]['error']
+        assert {trade.timeframe for trade in Trade.query} == {'H1'}
+
+
+def test_import_ndjson(app, import_setup):
+    """Test NDJSON imports, including malformed lines"""
+    lines = [
+        json.dumps({
+            'symbol': 'BTCUSD',
+            'entry_price': '50000',
+            'entry_time': '2025-01-01T00:00:00',
+            'position_size': 0.5
+        }), '{not json', '',
+        json.dumps(['not', 'an', 'object'])
+    ]
+    stream = io.BytesIO('\n'.join(lines).encode())
+
+    with app.app_context():
+        report = TradeImportService.import_stream(stream, 'ndjson',
+                                                  import_setup['plan_id'])
+
+        assert report['inserted'] == 1
+        assert [e['line'] for e in report['errors']] == [2, 4]
+        assert Trade.query.one().position_size == Decimal('0.5')
+
+
+def test_import_recomputes_rollups(app, import_setup):
+    """Test imported closed trades refresh the Performance rollup"""
+    app.config['PERFORMANCE_ROLLUPS_ENABLED'] = True
+    rows = [
+        f"EURUSD,100,110,2025-01-01T00:00:00,2025-01-01T01:00:00,1,,,,"
+        f"{import_setup['strategy_id']}\n"
+    ]
+
+    with app.app_context():
+        from app.services.performance_service import PerformanceService
+
+        TradeImportService.import_stream(_csv(rows), 'csv',
+                                         import_setup['plan_id'])
+
+        performance = PerformanceService.get_rollup_row(
+            import_setup['strategy_id'], import_setup['plan_id'],
+            create=False)
+        assert performance.metrics['summary']['net_profit'] == 10
+
+
+def test_import_cli_command(app, import_setup, tmp_path):
+    """Test the flask trades import command"""
+    path = tmp_path / 'fills.csv'
+    path.write_text(CSV_HEADER +
+                    "EURUSD,1.1,1.2,2025-01-01T00:00:00,2025-01-01T01:00:00,"
+                    "1000,,,,\n")
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=[
+        'trades', 'import',
+        str(path), '--plan-id',
+        str(import_setup['plan_id'])
+    ])
+
+    assert result.exit_code == 0, result.output
+    assert 'Imported 1 of 1 rows' in result.output
+
+
+def test_detect_format():
+    """Test format detection from file names"""
+    assert detect_format('export.CSV') == 'csv'
+    assert detect_format('fills.jsonl') == 'ndjson'
+    with pytest.raises(ValueError):
+        detect_format('fills.xlsx')